@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Compile CIS audits into one plan and a single-process PowerShell driver.
+
+Running the audit scripts one by one starts a PowerShell process per
+recommendation, and each of them imports the modules, checks elevation and
+reads one registry value, one secedit export or one auditpol setting. This
+module reads the catalog's structured fields (registry locations, expected
+values, section 17 subcategories, section 1/2 policy names) and the
+parameters of the existing audit scripts, and compiles a selection into a
+plan manifest:
+
+- registry_keys: every registry key to open, once, with the value names read
+  from it
+- checks: the recommendations grouped by data source (registry, service,
+  secedit, auditpol), each with the rule that decides compliance
+  (recommended_values.phrase_rule)
+
+render_driver() turns a plan into a PowerShell script that executes it in one
+process -- one pass over the registry keys, one `secedit /export`, one
+`auditpol /backup` -- and emits New-CISResultObject results, so the output
+goes straight into Export-CISAuditResults / Get-CISAuditSummary. Compiling a
+plan needs nothing but the catalog and the scripts, so it runs (and is
+tested) on Linux.
+
+Usage:
+    python audit_plan.py --profile L1 --plan audit-plan.json --driver Invoke-CISAuditPlan.ps1
+    .\\Invoke-CISAuditPlan.ps1 -OutputPath C:\\audit\\results.csv     (on the host)
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from auditpol_backup import SETTING_NAMES, required_setting, subcategory_guid
+from cis_catalog import REPO_ROOT, CatalogEntry, load_catalog, normalize_registry_path
+from cis_results import PROFILES, audit_timestamp
+from ps_tokenizer import parse_source
+from recommended_values import (
+    PRINCIPAL_PREFIXES, WELL_KNOWN_SIDS, parse_principals, phrase_rule,
+)
+from script_inventory import ScriptInventory
+from script_parameters import ScriptParameters, parameters_of
+from secedit_inf import (
+    ACCOUNT_NAME_KEYS, SYSTEM_ACCESS_KEYS, UNLIMITED_KEYS, USER_RIGHTS,
+    default_account_name, recommended_value, setting_name,
+)
+
+# Bump when the manifest layout changes; the driver refuses other versions
+PLAN_VERSION = 1
+
+DATA_SOURCES = ("registry", "service", "secedit", "auditpol")
+
+# Source column of the results, as the per-recommendation scripts report it
+SOURCES = {
+    "registry": "Registry",
+    "service": "Service Control Manager",
+    "secedit": "Local Policy",
+    "auditpol": "auditpol.exe",
+}
+
+MODULES_DIR = REPO_ROOT / "modules"
+
+def script_parameters(inventory: Optional[ScriptInventory] = None
+                      ) -> Dict[str, ScriptParameters]:
+    """CIS ID -> parameters of its audit script (first script per ID)."""
+    if inventory is None:
+        inventory = ScriptInventory()
+        inventory.refresh()
+    parameters = {}
+    for cis_id, records in inventory.cis_ids("audit").items():
+        record = sorted(records, key=lambda r: r.path)[0]
+        content = (REPO_ROOT / record.path).read_text(encoding='utf-8-sig', errors='replace')
+        parameters[cis_id] = parameters_of(record.path, parse_source(record.path, content))
+    return parameters
+
+
+def registry_key(path: str) -> Tuple[str, str]:
+    """("HKLM", "SOFTWARE\\Policies\\...") for any spelling of a key path."""
+    hive, _, _ = normalize_registry_path(path).partition('\\')
+    rest = path.replace('/', '\\').split('\\', 1)[1] if '\\' in path else ""
+    if hive == "hkcu" and path.upper().startswith(("HKU", "HKEY_USERS")):
+        rest = rest.split('\\', 1)[1] if '\\' in rest else ""     # drop [USER SID]
+    return hive.upper(), rest.strip('\\')
+
+
+class PlanBuilder:
+    """Accumulates checks and the registry reads they need"""
+
+    def __init__(self, scripts: Optional[Dict[str, ScriptParameters]] = None):
+        self.scripts = scripts or {}
+        self.checks: Dict[str, List[dict]] = {source: [] for source in DATA_SOURCES}
+        # normalized key path -> (hive, path, value names in first-seen order)
+        self.keys: Dict[str, Tuple[str, str, List[str]]] = {}
+        self.unplanned: List[Dict[str, str]] = []
+        self.warnings: List[str] = []
+
+    def _check(self, entry: CatalogEntry, **fields) -> dict:
+        check = {
+            "cis_id": entry.cis_id,
+            "title": entry.title,
+            "profile": entry.profile,
+            "recommended": recommended_value(entry),
+        }
+        script = self.scripts.get(entry.cis_id)
+        if script:
+            check["script"] = script.script
+        check.update(fields)
+        return check
+
+    def _read(self, path: str, value_name: str) -> str:
+        normalized = normalize_registry_path(path)
+        if normalized not in self.keys:
+            self.keys[normalized] = registry_key(path) + ([],)
+        hive, key_path, names = self.keys[normalized]
+        if value_name.lower() not in (name.lower() for name in names):
+            names.append(value_name)
+        return f"{hive}\\{key_path}"
+
+    def add(self, entry: CatalogEntry):
+        source = entry.data_source
+        if source in ("registry", "service"):
+            self._add_registry(entry, source)
+        elif source == "secedit":
+            self._add_secedit(entry)
+        elif source == "auditpol":
+            self._add_auditpol(entry)
+        else:
+            self.unplanned.append({"cis_id": entry.cis_id,
+                                   "reason": "no machine-readable source in the catalog"})
+
+    def _add_registry(self, entry: CatalogEntry, source: str):
+        if not entry.registry_locations:
+            self.unplanned.append({"cis_id": entry.cis_id,
+                                   "reason": "no registry location in the catalog"})
+            return
+        reads = []
+        for location in entry.registry_locations:
+            reads.append({
+                "key": self._read(location.path, location.value_name),
+                "value": location.value_name,
+                "rule": phrase_rule(entry.expected_data_for(location.value_name)),
+            })
+        self._compare_script(entry)
+        self.checks[source].append(self._check(entry, reads=reads))
+
+    def _compare_script(self, entry: CatalogEntry):
+        """Note audit scripts that read something other than the catalog names."""
+        script = self.scripts.get(entry.cis_id)
+        if not script:
+            return
+        if script.service_name:
+            services = {location.normalized_path.rsplit('\\', 1)[-1]
+                        for location in entry.registry_locations}
+            if script.service_name.lower() not in services:
+                self.warnings.append(
+                    f"{entry.cis_id}: {script.script} queries service {script.service_name}; "
+                    f"the plan uses the catalog location")
+            return
+        if not script.registry_path or not script.value_name \
+                or '$' in script.registry_path:      # built at run time, e.g. HKU\$sid
+            return
+        wanted = {(location.normalized_path, location.value_name.lower())
+                  for location in entry.registry_locations}
+        read = (normalize_registry_path(script.registry_path), script.value_name.lower())
+        if read not in wanted:
+            self.warnings.append(
+                f"{entry.cis_id}: {script.script} reads {script.registry_path}:"
+                f"{script.value_name}; the plan uses the catalog location")
+
+    def _add_secedit(self, entry: CatalogEntry):
+        name = setting_name(entry).lower()
+        if name in SYSTEM_ACCESS_KEYS:
+            key = SYSTEM_ACCESS_KEYS[name]
+            if key in ACCOUNT_NAME_KEYS:
+                fields = {"kind": "account_name", "key": key,
+                          "default": default_account_name(entry)}
+            else:
+                fields = {"kind": "system_access", "key": key,
+                          "rule": phrase_rule(entry.expected_value),
+                          "unlimited": key in UNLIMITED_KEYS}
+        elif name in USER_RIGHTS:
+            principals = sorted(parse_principals(entry.expected_value)) \
+                if entry.expected_value else None
+            fields = {"kind": "privilege", "key": USER_RIGHTS[name],
+                      "principals": principals, "inclusion": entry.expects_inclusion}
+        else:
+            self.unplanned.append({"cis_id": entry.cis_id,
+                                   "reason": "no secedit setting maps to this recommendation"})
+            return
+        self.checks["secedit"].append(self._check(entry, **fields))
+
+    def _add_auditpol(self, entry: CatalogEntry):
+        guid = subcategory_guid(entry)
+        required = required_setting(entry)
+        if guid is None or required is None:
+            self.unplanned.append({"cis_id": entry.cis_id,
+                                   "reason": "unknown audit subcategory or setting"})
+            return
+        self.checks["auditpol"].append(self._check(
+            entry, guid=guid, subcategory=setting_name(entry),
+            required=required, inclusion=entry.expects_inclusion))
+
+    def build(self, selection: Dict[str, Any]) -> Dict[str, Any]:
+        # Keep the checks of one key together so the driver's output follows the reads
+        key_order = {f"{hive}\\{path}".lower(): index
+                     for index, (hive, path, _) in enumerate(self.keys.values())}
+        for source in ("registry", "service"):
+            self.checks[source].sort(key=lambda check: key_order[check["reads"][0]["key"].lower()]
+                                     if check.get("reads") else len(key_order))
+        counts = {source: len(checks) for source, checks in self.checks.items()}
+        counts["registry_keys"] = len(self.keys)
+        counts["registry_values"] = sum(len(names) for _, _, names in self.keys.values())
+        return {
+            "version": PLAN_VERSION,
+            "generated": audit_timestamp(),
+            "selection": selection,
+            "counts": counts,
+            "principals": dict(WELL_KNOWN_SIDS),
+            "principal_prefixes": list(PRINCIPAL_PREFIXES),
+            "audit_settings": {str(value): name for value, name in SETTING_NAMES.items()},
+            "sources": SOURCES,
+            "registry_keys": [{"hive": hive, "path": path, "values": names}
+                              for hive, path, names in self.keys.values()],
+            "checks": self.checks,
+            "unplanned": self.unplanned,
+            "warnings": self.warnings,
+        }
+
+
+def build_plan(entries: Iterable[CatalogEntry],
+               scripts: Optional[Dict[str, ScriptParameters]] = None,
+               selection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Compile recommendations into a plan manifest (a JSON-ready dict)."""
+    builder = PlanBuilder(scripts)
+    for entry in entries:
+        builder.add(entry)
+    return builder.build(selection or {})
+
+
+DRIVER_TEMPLATE = r'''<#
+.SYNOPSIS
+    Runs a compiled CIS audit plan in a single PowerShell process.
+.DESCRIPTION
+    Generated by helpers/audit_plan.py on @@GENERATED@@ for @@TOTAL@@ recommendations.
+    Opens each of the @@KEYS@@ registry keys once, runs secedit /export and auditpol /backup
+    at most once, and returns one New-CISResultObject result per recommendation.
+    Do not edit; regenerate the plan instead.
+.PARAMETER OutputPath
+    CSV file to write with Export-CISAuditResults. Results are returned either way.
+.PARAMETER ModulesPath
+    Directory containing CISFramework.psm1.
+.EXAMPLE
+    .\Invoke-CISAuditPlan.ps1 -OutputPath "C:\audit\results.csv"
+#>
+param(
+    [string]$OutputPath,
+
+    [string]$ModulesPath = "$PSScriptRoot\@@MODULES@@"
+)
+
+Import-Module "$ModulesPath\CISFramework.psm1" -Force -WarningAction SilentlyContinue
+
+$plan = @'
+@@PLAN@@
+'@ | ConvertFrom-Json
+
+if ($plan.version -ne @@VERSION@@) {
+    Write-Error "Unsupported audit plan version $($plan.version)"
+    exit 2
+}
+
+function ConvertTo-PlanItems {
+    param($Value)
+    if ($null -eq $Value) { return ,@() }
+    $items = if ($Value -is [array]) { $Value } else { "$Value" -split ',' }
+    return ,@($items | ForEach-Object { "$_".Trim().ToLowerInvariant() } | Where-Object { $_ })
+}
+
+function ConvertTo-PlanNumber {
+    param($Value)
+    if ($Value -is [int] -or $Value -is [long] -or $Value -is [uint32]) { return [long]$Value }
+    if ($Value -is [string]) {
+        $text = $Value.Trim().Trim('"')
+        if ($text -match '^-?\d+$') { return [long]$text }
+        if ($text -match '^0x[0-9a-fA-F]+$') { return [Convert]::ToInt64($text.Substring(2), 16) }
+    }
+    return $null
+}
+
+function Test-PlanRule {
+    # Same decisions as evaluate_rule() in helpers/recommended_values.py
+    param($Rule, $Value)
+    if ($null -eq $Value -and $Rule.missing_ok) { return $true }
+    switch ($Rule.op) {
+        "any" {
+            $undecided = $false
+            foreach ($alternative in @($Rule.rules)) {
+                $outcome = Test-PlanRule $alternative $Value
+                if ($outcome -eq $true) { return $true }
+                if ($null -eq $outcome) { $undecided = $true }
+            }
+            if ($undecided) { return $null }
+            return $false
+        }
+        "unknown" { return $null }
+        "nonempty" {
+            if ($null -eq $Value) { return $null }
+            return ((ConvertTo-PlanItems $Value).Count -gt 0)
+        }
+        "blank" { return ((ConvertTo-PlanItems $Value).Count -eq 0) }
+    }
+    if ($null -eq $Value) { return $false }
+    if ($Rule.op -eq "match") {
+        if ($Value -is [array] -or $Rule.list) {
+            [string[]]$items = ConvertTo-PlanItems $Value
+            [Array]::Sort($items, [StringComparer]::Ordinal)
+            return (($items -join "`n") -ceq (@($Rule.items) -join "`n"))
+        }
+        return ("$Value".Trim().Trim('"').ToLowerInvariant() -ceq $Rule.text)
+    }
+    $number = ConvertTo-PlanNumber $Value
+    if ($null -eq $number) { return $false }
+    switch ($Rule.op) {
+        "eq" { return ($number -eq $Rule.value) }
+        "ge" { return ($number -ge $Rule.value) }
+        "le" { return ($number -le $Rule.value -and $number -ne $Rule.except) }
+        "between" { return ($number -ge $Rule.min -and $number -le $Rule.max) }
+        "ne" { return ($number -ne $Rule.value) }
+        "in" { return (@($Rule.values) -contains $number) }
+    }
+    throw "Unknown rule operator: $($Rule.op)"
+}
+
+function Get-PlanStatus {
+    # Any failure fails the recommendation; otherwise undecided is Not Applicable
+    param([System.Collections.IList]$Outcomes)
+    $undecided = $false
+    foreach ($outcome in $Outcomes) {
+        if ($null -eq $outcome) { $undecided = $true }
+        elseif ($false -eq $outcome) { return "Non-Compliant" }
+    }
+    if ($undecided) { return "Not Applicable" }
+    return "Compliant"
+}
+
+function Format-PlanValue {
+    param($Value)
+    if ($null -eq $Value) { return "Not Configured" }
+    if ($Value -is [array]) { return ($Value -join ", ") }
+    if ("$Value" -eq "") { return "(empty)" }
+    return "$Value"
+}
+
+function New-PlanResult {
+    param($Check, $CurrentValue, [string]$Status, [string]$Source, [string]$Details, [string]$ErrorMessage = "")
+    return New-CISResultObject -CIS_ID $Check.cis_id -Title $Check.title -CurrentValue (Format-PlanValue $CurrentValue) `
+        -RecommendedValue $Check.recommended -ComplianceStatus $Status -Source $Source -Details $Details `
+        -ErrorMessage $ErrorMessage -Profile $Check.profile
+}
+
+function Read-PlanRegistry {
+    $values = @{}
+    $hives = @{
+        HKLM = [Microsoft.Win32.RegistryKey]::OpenBaseKey([Microsoft.Win32.RegistryHive]::LocalMachine, [Microsoft.Win32.RegistryView]::Registry64)
+        HKCU = [Microsoft.Win32.Registry]::CurrentUser
+    }
+    foreach ($group in $plan.registry_keys) {
+        $key = $null
+        try { $key = $hives[$group.hive].OpenSubKey($group.path) } catch { $key = $null }
+        if (-not $key) { continue }
+        try {
+            foreach ($name in $group.values) {
+                $data = $key.GetValue($name, $null, [Microsoft.Win32.RegistryValueOptions]::DoNotExpandEnvironmentNames)
+                if ($null -eq $data) { continue }
+                switch ($key.GetValueKind($name)) {
+                    "DWord" { $data = [long][BitConverter]::ToUInt32([BitConverter]::GetBytes([int]$data), 0) }
+                    "Binary" { $data = ($data | ForEach-Object { $_.ToString("x2") }) -join "" }
+                }
+                $values["$($group.hive)\$($group.path)|$name"] = $data
+            }
+        }
+        finally {
+            $key.Close()
+        }
+    }
+    return $values
+}
+
+function Read-PlanSecurityPolicy {
+    $file = Join-Path $env:TEMP "cis-audit-plan-$PID.inf"
+    try {
+        $null = & secedit.exe /export /cfg $file /areas SECURITYPOLICY USER_RIGHTS /quiet
+        if ($LASTEXITCODE -ne 0) { throw "secedit /export failed with exit code $LASTEXITCODE" }
+        $sections = @{}
+        $current = $null
+        foreach ($line in Get-Content -Path $file -Encoding Unicode) {
+            $line = $line.Trim()
+            if ($line -match '^\[(.+)\]$') {
+                $current = @{}
+                $sections[$matches[1]] = $current
+            } elseif ($null -ne $current -and $line -match '^([^=]+?)\s*=\s*(.*)$') {
+                $current[$matches[1]] = $matches[2]
+            }
+        }
+        return $sections
+    }
+    finally {
+        Remove-Item -Path $file -Force -ErrorAction SilentlyContinue
+    }
+}
+
+function Read-PlanAuditPolicy {
+    $file = Join-Path $env:TEMP "cis-audit-plan-$PID.csv"
+    try {
+        $null = & auditpol.exe /backup "/file:$file"
+        if ($LASTEXITCODE -ne 0) { throw "auditpol /backup failed with exit code $LASTEXITCODE" }
+        $settings = @{}
+        foreach ($row in Import-Csv -Path $file) {
+            if ($row.'Subcategory GUID') { $settings[$row.'Subcategory GUID'.ToLowerInvariant()] = $row }
+        }
+        return $settings
+    }
+    finally {
+        Remove-Item -Path $file -Force -ErrorAction SilentlyContinue
+    }
+}
+
+function ConvertTo-PlanPrincipal {
+    param([string]$Principal)
+    $name = $Principal.Trim().Trim('"').TrimStart('*')
+    $known = $plan.principals.($name.ToUpperInvariant())
+    if ($known) { $name = $known }
+    $name = $name.ToLowerInvariant()
+    foreach ($prefix in $plan.principal_prefixes) {
+        if ($name.StartsWith($prefix)) { $name = $name.Substring($prefix.Length) }
+    }
+    return $name
+}
+
+function Invoke-PlanRegistryChecks {
+    param([array]$Checks, [string]$Source, [hashtable]$Values)
+    foreach ($check in $Checks) {
+        try {
+            $outcomes = New-Object System.Collections.ArrayList
+            $current = @()
+            $details = @()
+            foreach ($read in $check.reads) {
+                $id = "$($read.key)|$($read.value)"
+                $value = if ($Values.ContainsKey($id)) { $Values[$id] } else { $null }
+                [void]$outcomes.Add((Test-PlanRule -Rule $read.rule -Value $value))
+                $current += Format-PlanValue $value
+                $details += "$($read.key):$($read.value)"
+            }
+            New-PlanResult -Check $check -CurrentValue ($current -join "; ") -Status (Get-PlanStatus $outcomes) `
+                -Source $Source -Details ("Registry path: " + ($details -join "; "))
+        }
+        catch {
+            New-PlanResult -Check $check -CurrentValue "Error" -Status "Error" -Source $Source -ErrorMessage "Audit failed: $_"
+        }
+    }
+}
+
+function Invoke-PlanSecurityPolicyChecks {
+    param([array]$Checks)
+    $source = $plan.sources.secedit
+    try { $policy = Read-PlanSecurityPolicy } catch { $policy = $null; $failure = "$_" }
+    foreach ($check in $Checks) {
+        if ($null -eq $policy) {
+            New-PlanResult -Check $check -CurrentValue "Error" -Status "Error" -Source $source -ErrorMessage $failure
+            continue
+        }
+        try {
+            if ($check.kind -eq "privilege") {
+                $details = "[Privilege Rights] $($check.key)"
+                $line = if ($policy["Privilege Rights"]) { $policy["Privilege Rights"][$check.key] } else { $null }
+                $assigned = @("$line" -split ',' | ForEach-Object { $_.Trim() } | Where-Object { $_ })
+                $current = @($assigned | ForEach-Object {
+                    $sid = $_.TrimStart('*')
+                    if ($plan.principals.($sid.ToUpperInvariant())) { $plan.principals.($sid.ToUpperInvariant()) } else { $sid }
+                }) -join ", "
+                if (-not $current) { $current = "No One" }
+                if ($null -eq $check.principals) {
+                    New-PlanResult -Check $check -CurrentValue $current -Status "Not Applicable" -Source $source `
+                        -Details "${details}: site-specific assignment, review manually"
+                    continue
+                }
+                $actual = @($assigned | ForEach-Object { ConvertTo-PlanPrincipal $_ } | Sort-Object -Unique)
+                $expected = @($check.principals)
+                $missing = @($expected | Where-Object { $actual -notcontains $_ })
+                $compliant = ($missing.Count -eq 0) -and ($check.inclusion -or $actual.Count -eq $expected.Count)
+                $status = if ($compliant) { "Compliant" } else { "Non-Compliant" }
+                New-PlanResult -Check $check -CurrentValue $current -Status $status -Source $source -Details $details
+                continue
+            }
+
+            $raw = if ($policy["System Access"]) { $policy["System Access"][$check.key] } else { $null }
+            if ($null -eq $raw) {
+                New-PlanResult -Check $check -CurrentValue $null -Status "Not Applicable" -Source $source `
+                    -Details "[System Access] $($check.key) is not present in the export"
+                continue
+            }
+            $details = "[System Access] $($check.key) = $raw"
+            $value = $raw.Trim('"')
+            if ($check.kind -eq "account_name") {
+                $compliant = $value -and ($value -ne $check.default)
+                $status = if ($compliant) { "Compliant" } else { "Non-Compliant" }
+                New-PlanResult -Check $check -CurrentValue $value -Status $status -Source $source -Details $details
+                continue
+            }
+            $number = ConvertTo-PlanNumber $value
+            if ($number -eq -1 -and $check.unlimited) {
+                $outcome = Test-PlanRule -Rule $check.rule -Value ([long]::MaxValue)
+                $value = "-1 (never)"
+            } else {
+                $outcome = Test-PlanRule -Rule $check.rule -Value $number
+            }
+            New-PlanResult -Check $check -CurrentValue $value -Status (Get-PlanStatus @(,$outcome)) -Source $source -Details $details
+        }
+        catch {
+            New-PlanResult -Check $check -CurrentValue "Error" -Status "Error" -Source $source -ErrorMessage "Audit failed: $_"
+        }
+    }
+}
+
+function Invoke-PlanAuditPolicyChecks {
+    param([array]$Checks)
+    $source = $plan.sources.auditpol
+    try { $settings = Read-PlanAuditPolicy } catch { $settings = $null; $failure = "$_" }
+    foreach ($check in $Checks) {
+        if ($null -eq $settings) {
+            New-PlanResult -Check $check -CurrentValue "Error" -Status "Error" -Source $source -ErrorMessage $failure
+            continue
+        }
+        $row = $settings[$check.guid]
+        if (-not $row) {
+            New-PlanResult -Check $check -CurrentValue $null -Status "Not Applicable" -Source $source `
+                -Details "Subcategory GUID: $($check.guid) (not present in backup)"
+            continue
+        }
+        $setting = [int]$row.'Setting Value'
+        $compliant = if ($check.inclusion) { ($setting -band $check.required) -eq $check.required } else { $setting -eq $check.required }
+        $status = if ($compliant) { "Compliant" } else { "Non-Compliant" }
+        New-PlanResult -Check $check -CurrentValue $plan.audit_settings."$setting" -Status $status -Source $source `
+            -Details "Subcategory GUID: $($check.guid)"
+    }
+}
+
+$started = Get-Date
+$results = @()
+if (@($plan.checks.registry).Count -or @($plan.checks.service).Count) {
+    $registryValues = Read-PlanRegistry
+    $results += @(Invoke-PlanRegistryChecks -Checks @($plan.checks.registry) -Source $plan.sources.registry -Values $registryValues)
+    $results += @(Invoke-PlanRegistryChecks -Checks @($plan.checks.service) -Source $plan.sources.service -Values $registryValues)
+}
+if (@($plan.checks.secedit).Count) {
+    $results += @(Invoke-PlanSecurityPolicyChecks -Checks @($plan.checks.secedit))
+}
+if (@($plan.checks.auditpol).Count) {
+    $results += @(Invoke-PlanAuditPolicyChecks -Checks @($plan.checks.auditpol))
+}
+
+$elapsed = ((Get-Date) - $started).TotalSeconds
+Write-Host ("Audited {0} recommendations in {1:N1}s" -f $results.Count, $elapsed) -ForegroundColor Cyan
+
+if ($OutputPath) {
+    Export-CISAuditResults -Results $results -OutputPath $OutputPath
+}
+return $results
+'''
+
+
+def render_driver(plan: Dict[str, Any], modules_path: str = "..\\modules") -> str:
+    """The PowerShell driver for a plan; modules_path is relative to the driver."""
+    plan_json = json.dumps(plan, indent=1, ensure_ascii=False)
+    replacements = {
+        "@@GENERATED@@": plan["generated"],
+        "@@TOTAL@@": str(sum(plan["counts"][source] for source in DATA_SOURCES)),
+        "@@KEYS@@": str(plan["counts"]["registry_keys"]),
+        "@@MODULES@@": modules_path.replace('/', '\\'),
+        "@@VERSION@@": str(plan["version"]),
+        "@@PLAN@@": plan_json,
+    }
+    text = DRIVER_TEMPLATE
+    for marker, value in replacements.items():
+        text = text.replace(marker, value)
+    return text.replace('\n', '\r\n')
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Compile CIS audits into one plan and a single-process driver")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--section", action="append", dest="sections",
+                        help="section prefix, e.g. 2.3 or 18.9 (repeatable)")
+    parser.add_argument("--id", action="append", dest="cis_ids")
+    parser.add_argument("--no-scripts", action="store_true",
+                        help="use only the catalog, skip reading the audit scripts")
+    parser.add_argument("--plan", type=Path, help="write the plan manifest (JSON)")
+    parser.add_argument("--driver", type=Path, help="write the PowerShell driver")
+    args = parser.parse_args()
+
+    entries = load_catalog().select(args.profile, args.sections, args.cis_ids)
+    scripts = None if args.no_scripts else script_parameters()
+    selection = {"profile": args.profile, "sections": args.sections, "cis_ids": args.cis_ids}
+    plan = build_plan(entries, scripts, selection)
+
+    counts = plan["counts"]
+    print(f"Planned {sum(counts[s] for s in DATA_SOURCES)} of {len(entries)} recommendations: "
+          + ", ".join(f"{counts[s]} {s}" for s in DATA_SOURCES))
+    print(f"Registry: {counts['registry_values']} values from {counts['registry_keys']} keys")
+    for item in plan["unplanned"]:
+        print(f"Not planned {item['cis_id']}: {item['reason']}")
+    for warning in plan["warnings"]:
+        print(f"Warning: {warning}")
+
+    if args.plan:
+        args.plan.write_text(json.dumps(plan, indent=2), encoding='utf-8')
+        print(f"Plan written to {args.plan}")
+    if args.driver:
+        modules = os.path.relpath(MODULES_DIR, args.driver.resolve().parent)
+        # PowerShell's -Encoding Unicode/UTF8 readers expect a BOM for non-ASCII text
+        args.driver.write_bytes(render_driver(plan, modules).encode('utf-8-sig'))
+        print(f"Driver written to {args.driver}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for advanced audit policy backups (`auditpol /backup`).
+
+Every section 17 audit script runs `auditpol /get /subcategory:{GUID}` for a
+single subcategory. This module reads one `auditpol /backup /file:x.csv`
+export and evaluates all section 17 recommendations against it in one pass.
+
+Subcategories are matched by GUID, which is the same on every Windows
+language, and fall back to the English subcategory name. The numeric
+"Setting Value" column (1 = Success, 2 = Failure, 3 = both) decides
+inclusion, so localized "Inclusion Setting" text does not matter.
+
+Usage:
+    auditpol /backup /file:C:\\temp\\audit.csv      (on the host)
+    python auditpol_backup.py audit.csv --format csv --output results.csv
+"""
+
+import argparse
+import csv
+import io
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from cis_catalog import CatalogEntry, load_catalog
+from cis_results import PROFILES, CISResult, output_results, status_for
+from recommended_values import Observation
+from secedit_inf import decode_inf, setting_name
+
+SOURCE = "auditpol.exe"
+
+AUDIT_SUCCESS = 1
+AUDIT_FAILURE = 2
+
+SETTING_NAMES = {
+    0: "No Auditing",
+    AUDIT_SUCCESS: "Success",
+    AUDIT_FAILURE: "Failure",
+    AUDIT_SUCCESS | AUDIT_FAILURE: "Success and Failure",
+}
+SETTING_VALUES = {name.lower(): value for value, name in SETTING_NAMES.items()}
+
+# Advanced audit policy subcategories (ntsecapi.h Audit_* GUIDs)
+SUBCATEGORY_GUIDS = {
+    "{0cce9210-69ae-11d9-bed3-505054503030}": "Security State Change",
+    "{0cce9211-69ae-11d9-bed3-505054503030}": "Security System Extension",
+    "{0cce9212-69ae-11d9-bed3-505054503030}": "System Integrity",
+    "{0cce9213-69ae-11d9-bed3-505054503030}": "IPsec Driver",
+    "{0cce9214-69ae-11d9-bed3-505054503030}": "Other System Events",
+    "{0cce9215-69ae-11d9-bed3-505054503030}": "Logon",
+    "{0cce9216-69ae-11d9-bed3-505054503030}": "Logoff",
+    "{0cce9217-69ae-11d9-bed3-505054503030}": "Account Lockout",
+    "{0cce9218-69ae-11d9-bed3-505054503030}": "IPsec Main Mode",
+    "{0cce9219-69ae-11d9-bed3-505054503030}": "IPsec Quick Mode",
+    "{0cce921a-69ae-11d9-bed3-505054503030}": "IPsec Extended Mode",
+    "{0cce921b-69ae-11d9-bed3-505054503030}": "Special Logon",
+    "{0cce921c-69ae-11d9-bed3-505054503030}": "Other Logon/Logoff Events",
+    "{0cce921d-69ae-11d9-bed3-505054503030}": "File System",
+    "{0cce921e-69ae-11d9-bed3-505054503030}": "Registry",
+    "{0cce921f-69ae-11d9-bed3-505054503030}": "Kernel Object",
+    "{0cce9220-69ae-11d9-bed3-505054503030}": "SAM",
+    "{0cce9221-69ae-11d9-bed3-505054503030}": "Certification Services",
+    "{0cce9222-69ae-11d9-bed3-505054503030}": "Application Generated",
+    "{0cce9223-69ae-11d9-bed3-505054503030}": "Handle Manipulation",
+    "{0cce9224-69ae-11d9-bed3-505054503030}": "File Share",
+    "{0cce9225-69ae-11d9-bed3-505054503030}": "Filtering Platform Packet Drop",
+    "{0cce9226-69ae-11d9-bed3-505054503030}": "Filtering Platform Connection",
+    "{0cce9227-69ae-11d9-bed3-505054503030}": "Other Object Access Events",
+    "{0cce9228-69ae-11d9-bed3-505054503030}": "Sensitive Privilege Use",
+    "{0cce9229-69ae-11d9-bed3-505054503030}": "Non Sensitive Privilege Use",
+    "{0cce922a-69ae-11d9-bed3-505054503030}": "Other Privilege Use Events",
+    "{0cce922b-69ae-11d9-bed3-505054503030}": "Process Creation",
+    "{0cce922c-69ae-11d9-bed3-505054503030}": "Process Termination",
+    "{0cce922d-69ae-11d9-bed3-505054503030}": "DPAPI Activity",
+    "{0cce922e-69ae-11d9-bed3-505054503030}": "RPC Events",
+    "{0cce922f-69ae-11d9-bed3-505054503030}": "Audit Policy Change",
+    "{0cce9230-69ae-11d9-bed3-505054503030}": "Authentication Policy Change",
+    "{0cce9231-69ae-11d9-bed3-505054503030}": "Authorization Policy Change",
+    "{0cce9232-69ae-11d9-bed3-505054503030}": "MPSSVC Rule-Level Policy Change",
+    "{0cce9233-69ae-11d9-bed3-505054503030}": "Filtering Platform Policy Change",
+    "{0cce9234-69ae-11d9-bed3-505054503030}": "Other Policy Change Events",
+    "{0cce9235-69ae-11d9-bed3-505054503030}": "User Account Management",
+    "{0cce9236-69ae-11d9-bed3-505054503030}": "Computer Account Management",
+    "{0cce9237-69ae-11d9-bed3-505054503030}": "Security Group Management",
+    "{0cce9238-69ae-11d9-bed3-505054503030}": "Distribution Group Management",
+    "{0cce9239-69ae-11d9-bed3-505054503030}": "Application Group Management",
+    "{0cce923a-69ae-11d9-bed3-505054503030}": "Other Account Management Events",
+    "{0cce923b-69ae-11d9-bed3-505054503030}": "Directory Service Access",
+    "{0cce923c-69ae-11d9-bed3-505054503030}": "Directory Service Changes",
+    "{0cce923d-69ae-11d9-bed3-505054503030}": "Directory Service Replication",
+    "{0cce923e-69ae-11d9-bed3-505054503030}": "Detailed Directory Service Replication",
+    "{0cce923f-69ae-11d9-bed3-505054503030}": "Credential Validation",
+    "{0cce9240-69ae-11d9-bed3-505054503030}": "Kerberos Service Ticket Operations",
+    "{0cce9241-69ae-11d9-bed3-505054503030}": "Other Account Logon Events",
+    "{0cce9242-69ae-11d9-bed3-505054503030}": "Kerberos Authentication Service",
+    "{0cce9243-69ae-11d9-bed3-505054503030}": "Network Policy Server",
+    "{0cce9244-69ae-11d9-bed3-505054503030}": "Detailed File Share",
+    "{0cce9245-69ae-11d9-bed3-505054503030}": "Removable Storage",
+    "{0cce9246-69ae-11d9-bed3-505054503030}": "Central Policy Staging",
+    "{0cce9247-69ae-11d9-bed3-505054503030}": "User / Device Claims",
+    "{0cce9248-69ae-11d9-bed3-505054503030}": "PNP Activity",
+    "{0cce9249-69ae-11d9-bed3-505054503030}": "Group Membership",
+    "{0cce924a-69ae-11d9-bed3-505054503030}": "Token Right Adjusted Events",
+}
+SUBCATEGORY_NAMES = {name.lower(): guid for guid, name in SUBCATEGORY_GUIDS.items()}
+
+AUDIT_PREFIX = re.compile(r'^Audit\s+', re.IGNORECASE)
+
+
+def subcategory_key(name: str) -> str:
+    """"Audit Credential Validation" and "Credential Validation" match."""
+    key = name.strip().lower()
+    stripped = AUDIT_PREFIX.sub('', key)
+    # "Audit Policy Change" is itself a subcategory name
+    return stripped if stripped in SUBCATEGORY_NAMES else key
+
+
+def subcategory_guid(entry: CatalogEntry) -> Optional[str]:
+    """The subcategory GUID a section 17 recommendation is about."""
+    return SUBCATEGORY_NAMES.get(subcategory_key(setting_name(entry)))
+
+
+def parse_setting(value: str, inclusion: str = "") -> Optional[int]:
+    """Success/Failure bitmask from the Setting Value column (or its text)."""
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    return SETTING_VALUES.get(inclusion.strip().lower())
+
+
+@dataclass
+class AuditSetting:
+    """One subcategory row of an auditpol backup"""
+    subcategory: str
+    guid: str
+    inclusion: str
+    setting: int
+
+    @property
+    def setting_name(self) -> str:
+        return SETTING_NAMES.get(self.setting, self.inclusion or str(self.setting))
+
+
+class AuditPolicyBackup:
+    """The subcategory settings of one `auditpol /backup` CSV"""
+
+    def __init__(self, settings: List[AuditSetting], machine_name: str = "",
+                 options: Optional[Dict[str, str]] = None):
+        self.settings = settings
+        self.machine_name = machine_name
+        self.options = options or {}
+        self.by_guid = {s.guid: s for s in settings if s.guid}
+        self.by_name = {subcategory_key(s.subcategory): s for s in settings}
+
+    @classmethod
+    def from_text(cls, text: str) -> "AuditPolicyBackup":
+        settings = []
+        options = {}
+        machine_name = ""
+        for row in csv.DictReader(io.StringIO(text)):
+            row = {(k or "").strip(): (v or "").strip() for k, v in row.items()}
+            machine_name = machine_name or row.get("Machine Name", "")
+            subcategory = row.get("Subcategory", "")
+            if subcategory.lower().startswith("option:"):
+                options[subcategory.split(':', 1)[1]] = row.get("Setting Value", "")
+                continue
+            guid = row.get("Subcategory GUID", "").lower()
+            if not guid and not subcategory:
+                continue
+            setting = parse_setting(row.get("Setting Value", ""), row.get("Inclusion Setting", ""))
+            if setting is None:
+                continue
+            settings.append(AuditSetting(subcategory, guid, row.get("Inclusion Setting", ""),
+                                         setting))
+        return cls(settings, machine_name, options)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "AuditPolicyBackup":
+        return cls.from_text(decode_inf(Path(path).read_bytes()))
+
+    def find(self, guid: Optional[str], name: str = "") -> Optional[AuditSetting]:
+        if guid and guid.lower() in self.by_guid:
+            return self.by_guid[guid.lower()]
+        return self.by_name.get(subcategory_key(name)) if name else None
+
+
+def required_setting(entry: CatalogEntry) -> Optional[int]:
+    return SETTING_VALUES.get(entry.expected_value.strip().lower())
+
+
+def evaluate_setting(entry: CatalogEntry, setting: int) -> Optional[bool]:
+    """Exact match, or inclusion for "... is set to include 'X'"."""
+    required = required_setting(entry)
+    if required is None:
+        return None
+    if entry.expects_inclusion:
+        return setting & required == required
+    return setting == required
+
+
+class AuditPolicyEvaluator:
+    """Evaluates section 17 recommendations against an AuditPolicyBackup"""
+
+    def __init__(self, backup: AuditPolicyBackup, computer_name: Optional[str] = None):
+        self.backup = backup
+        self.computer_name = computer_name or backup.machine_name or None
+
+    def evaluate(self, entry: CatalogEntry) -> CISResult:
+        observation = self.observe(entry)
+        return self.result(entry, observation, observation.decide())
+
+    def observe(self, entry: CatalogEntry) -> Observation:
+        """
+        The backup's setting for a recommendation. Audit settings are
+        bitmasks, not phrases, so the outcome is decided here.
+        """
+        guid = subcategory_guid(entry)
+        found = self.backup.find(guid, setting_name(entry))
+        if found is None:
+            return Observation(
+                current="Not Configured",
+                details=f"Subcategory GUID: {guid or 'unknown'} (not present in backup)",
+            )
+        return Observation(outcome=evaluate_setting(entry, found.setting),
+                           current=found.setting_name,
+                           details=f"Subcategory GUID: {found.guid or guid}")
+
+    def result(self, entry: CatalogEntry, observation: Observation,
+               compliant: Optional[bool]) -> CISResult:
+        """The result for an observation once it is decided."""
+        extra = {"computer_name": self.computer_name} if self.computer_name else {}
+        return CISResult(
+            cis_id=entry.cis_id,
+            title=entry.title,
+            current_value=observation.current,
+            recommended_value=entry.expected_value,
+            compliance_status=status_for(compliant),
+            source=SOURCE,
+            details=observation.details,
+            profile=entry.profile,
+            **extra,
+        )
+
+    def evaluate_all(self, entries: Iterable[CatalogEntry]) -> List[CISResult]:
+        return [self.evaluate(entry) for entry in entries]
+
+
+def audit_policy_entries(profile: Optional[str] = None) -> List[CatalogEntry]:
+    return load_catalog().select(profile=profile, sections=["17"])
+
+
+def evaluate_backup(path: Union[str, Path], profile: Optional[str] = None,
+                    computer_name: Optional[str] = None) -> List[CISResult]:
+    """Evaluate every section 17 recommendation against one backup file."""
+    evaluator = AuditPolicyEvaluator(AuditPolicyBackup.from_file(path), computer_name)
+    return evaluator.evaluate_all(audit_policy_entries(profile))
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Evaluate an auditpol /backup CSV against CIS section 17")
+    parser.add_argument("backup", type=Path, help="auditpol /backup /file: output")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--computer-name", help="ComputerName for the results (default: Machine Name column)")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = evaluate_backup(args.backup, args.profile, args.computer_name)
+    elapsed = time.perf_counter() - started
+
+    output_results(results, args.format, args.output, elapsed, id_width=8, value_width=20)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Reproduce the trend store benchmark (trend_store.py).
+
+Generates one night of audit results for a synthetic fleet (every host runs
+every catalog recommendation), adds them to a fresh trend store, compacts
+the day and reports:
+
+  * time to add the CSVs and to compact the raw day into a daily rollup
+  * raw segment bytes vs. daily rollup bytes
+  * a 90-day section query over daily rollups
+  * a one-year query over weekly rollups
+
+The day's rollup is copied to the other 89 days and into 52 weekly
+rollups, so the query timings show how long it takes to read that many
+rollup files. They say nothing about the compaction of those periods.
+
+Statuses are drawn from a seeded RNG, so runs are repeatable.
+
+Usage:
+    python helpers/benchmark_trend_store.py [--hosts 2000] [--prefix 18.9] [--keep DIR]
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from cis_catalog import load_catalog
+from cis_results import CISResult, results_to_csv
+from trend_store import ROLLUP_SUFFIX, TrendStore, week_of
+
+DAY = date(2026, 9, 28)
+STATUS_WEIGHTS = (("Compliant", 80), ("Non-Compliant", 15), ("Error", 2), ("Not Applicable", 3))
+
+
+def write_fleet_csvs(folder: Path, hosts: int, seed: int = 1) -> list:
+    """One results CSV per host, every catalog recommendation once."""
+    entries = list(load_catalog())
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    rng = random.Random(seed)
+    files = []
+    for number in range(1, hosts + 1):
+        host = f"WS{number:05d}"
+        rows = [CISResult(entry.cis_id, entry.title, "1", "1",
+                          rng.choices(statuses, weights)[0], "Registry",
+                          profile=entry.profile, audit_timestamp=f"{DAY} 02:00:00",
+                          computer_name=host, user_name="auditor")
+                for entry in entries]
+        path = folder / f"{host}.csv"
+        path.write_text(results_to_csv(rows), encoding='utf-8')
+        files.append(path)
+    return files
+
+
+def timed(function, *args, repeat: int = 1, **kwargs):
+    """(result, best seconds) over repeat runs."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def run(folder: Path, hosts: int, prefix: str):
+    csvs = folder / "csv"
+    csvs.mkdir()
+    print(f"Writing {hosts:,} host CSVs...")
+    files = write_fleet_csvs(csvs, hosts)
+
+    store = TrendStore(folder / "trends")
+    (stats, errors), add_seconds = timed(store.add, files, today=DAY)
+    if errors:
+        raise SystemExit(f"{len(errors)} files failed, first: {errors[0]}")
+    _, compact_seconds = timed(store.compact, today=DAY)
+    footprint = store.footprint()
+
+    # History for the range queries: the same rollup on every day and week
+    rollup = store.path / "day" / f"{DAY}{ROLLUP_SUFFIX}"
+    for offset in range(1, 90):
+        shutil.copyfile(rollup, store.path / "day" / f"{DAY - timedelta(days=offset)}{ROLLUP_SUFFIX}")
+    for offset in range(52):
+        monday = week_of(DAY) - timedelta(weeks=offset + 1)
+        shutil.copyfile(rollup, store.path / "week" / f"{monday}{ROLLUP_SUFFIX}")
+
+    daily, daily_seconds = timed(store.trend, prefix, DAY - timedelta(days=89), DAY, repeat=5)
+    weekly, weekly_seconds = timed(store.trend, prefix, DAY - timedelta(days=365), DAY,
+                                   period="week", repeat=5)
+
+    print(f"\n{hosts:,} hosts x {len(load_catalog())} controls = {stats.rows:,} rows")
+    print(f"Add:     {add_seconds:.2f}s")
+    print(f"Compact: {compact_seconds:.2f}s")
+    print(f"Storage: {footprint['raw'][1] / 1e6:.1f} MB raw segments -> "
+          f"{footprint['day'][1] / 1e3:.0f} KB daily rollup")
+    print(f"Query {prefix}, 90 days of daily rollups: {daily_seconds * 1000:.0f} ms "
+          f"({len(daily)} points)")
+    print(f"Query {prefix}, a year of weekly rollups: {weekly_seconds * 1000:.0f} ms "
+          f"({len(weekly)} points)")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark the compliance trend store")
+    parser.add_argument("--hosts", type=int, default=2000)
+    parser.add_argument("--prefix", default="18.9", help="CIS_ID prefix of the range queries")
+    parser.add_argument("--keep", type=Path, help="build the store here instead of a temp dir")
+    args = parser.parse_args()
+
+    if args.keep:
+        args.keep.mkdir(parents=True)
+        run(args.keep, args.hosts, args.prefix)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(Path(tmp), args.hosts, args.prefix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Cross-check audit/remediation scripts against the CIS catalog.
+
+Extracts the arguments of every Invoke-CISAudit / Invoke-CISRemediation call
+under windows/ (via the shared PowerShell tokenizer), or the registry path and
+value name a script keeps in variables, and joins them against the parsed
+catalog (cis_catalog.py) using the catalog's hash indexes on cis_id and
+normalized registry path.
+
+Flags:
+- unknown-cis-id      script CIS_ID is not in the catalog
+- section-mismatch    -Section does not match the CIS_ID's top-level section
+- path-mismatch       -RegistryPath differs from the catalog's registry key
+- value-name-mismatch -RegistryValueName differs from the catalog's value
+- type-mismatch       -RegistryValueType differs from the catalog's REG_* type
+- data-mismatch       -RegistryValueData is not the catalog's expected data
+- not-registry-backed script uses the registry but the catalog does not
+
+Usage:
+    python helpers/check_script_catalog.py [--format text|json] [--output FILE]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cis_catalog import (
+    CISCatalog, REPO_ROOT, get_major_section, load_catalog,
+    normalize_registry_path,
+)
+from ps_lint import SCRIPT_NAME_PATTERN, repo_path
+from ps_tokenizer import parse_source
+from script_parameters import PATH_VARIABLES, parameters_of
+
+
+SCRIPTS_DIR = REPO_ROOT / "windows"
+INVOKE_COMMANDS = ("Invoke-CISAudit", "Invoke-CISRemediation")
+
+# REG_* names as used by -RegistryValueType
+REGISTRY_TYPE_NAMES = {
+    "dword": "REG_DWORD",
+    "qword": "REG_QWORD",
+    "string": "REG_SZ",
+    "expandstring": "REG_EXPAND_SZ",
+    "multistring": "REG_MULTI_SZ",
+    "binary": "REG_BINARY",
+}
+
+
+@dataclass
+class ScriptCall:
+    """One Invoke-CISAudit/Invoke-CISRemediation call and its arguments"""
+    path: str
+    line: int
+    command: str
+    arguments: Dict[str, str]
+
+    def get(self, name: str) -> Optional[str]:
+        for key, value in self.arguments.items():
+            if key.lower() == name.lower():
+                return value
+        return None
+
+
+@dataclass
+class Mismatch:
+    """A disagreement between a script and the catalog"""
+    kind: str
+    path: str
+    line: int
+    cis_id: str
+    script_value: str
+    catalog_value: str
+
+
+def extract_calls(path: str, content: str) -> List[ScriptCall]:
+    """
+    Extract the Invoke-CIS* calls of a script with $variables resolved at the
+    call site. A script whose calls pass no -RegistryPath but that keeps its
+    key in a variable ($registryPath = "HKLM:\\...") gets a "variables" call
+    with the values in effect where they are read, as audit_plan.py finds them.
+    """
+    parsed = parse_source(path, content)
+    calls = []
+    for command in parsed.find_commands(*INVOKE_COMMANDS):
+        arguments = {}
+        for name, value in command.arguments.items():
+            value = parsed.resolve(value, command.offset)
+            if value is True:
+                value = ""
+            elif isinstance(value, list):
+                value = ",".join(value)
+            arguments[name] = value
+        calls.append(ScriptCall(path, command.line, command.name, arguments))
+
+    if not any(call.get("RegistryPath") for call in calls):
+        invoked = calls[0].command if calls else INVOKE_COMMANDS[0]
+        parameters = parameters_of(path, parsed, invoked)
+        if parameters.registry_path and '$' not in parameters.registry_path:
+            arguments = {"RegistryPath": parameters.registry_path}
+            if parameters.value_name:
+                arguments["RegistryValueName"] = parameters.value_name
+            assigned = [found for found in map(parsed.assignment_in_effect, PATH_VARIABLES)
+                        if found and found[1] == parameters.registry_path]
+            line = parsed.line_of(assigned[0][0]) if assigned else 1
+            calls.append(ScriptCall(path, line, "variables", arguments))
+    return calls
+
+
+def normalize_data(value: str) -> str:
+    """Normalize registry data for comparison ("0x1" == "1")."""
+    value = value.strip().strip('"\'')
+    try:
+        return str(int(value, 16) if value.lower().startswith('0x') else int(value))
+    except ValueError:
+        return value.lower()
+
+
+def allowed_data(phrase: str) -> Optional[List[str]]:
+    """
+    The data values a catalog phrase allows, or None if the phrase is not a
+    plain list ("900 or less, but not 0" needs a predicate, not a list).
+    """
+    phrase = re.sub(r'\s*or that the key does not exist', '', phrase)
+    values = [v for v in re.split(r'\s*(?:,|\bor\b)\s*', phrase) if v]
+    if values and all(re.fullmatch(r'\d+', v) for v in values):
+        return [normalize_data(v) for v in values]
+    return None
+
+
+def check_call(call: ScriptCall, catalog: CISCatalog,
+               file_cis_id: Optional[str]) -> List[Mismatch]:
+    """Join one script call against the catalog and report disagreements."""
+    cis_id = call.get("CIS_ID") or file_cis_id or ""
+    mismatches = []
+
+    def flag(kind, script_value, catalog_value):
+        mismatches.append(Mismatch(kind, call.path, call.line, cis_id,
+                                   script_value, catalog_value))
+
+    entry = catalog.get(cis_id)
+    if entry is None:
+        flag("unknown-cis-id", cis_id, "")
+        return mismatches
+
+    section = call.get("Section")
+    if section and section != get_major_section(cis_id):
+        flag("section-mismatch", section, get_major_section(cis_id))
+
+    registry_path = call.get("RegistryPath")
+    value_name = call.get("RegistryValueName")
+    if not registry_path:
+        return mismatches
+    if not entry.registry_locations:
+        flag("not-registry-backed", registry_path, "")
+        return mismatches
+
+    normalized = normalize_registry_path(registry_path)
+    locations = [loc for loc in entry.registry_locations
+                 if loc.normalized_path == normalized]
+    if not locations:
+        # Use the path index to say whose key the script is actually reading
+        owners = sorted({e.cis_id for e in catalog.lookup_registry(registry_path)})
+        expected = ", ".join(sorted({loc.path for loc in entry.registry_locations}))
+        suffix = f" (key belongs to {', '.join(owners)})" if owners else ""
+        flag("path-mismatch", registry_path, expected + suffix)
+        locations = entry.registry_locations
+
+    if value_name:
+        named = [loc for loc in locations
+                 if loc.value_name.lower() == value_name.lower()]
+        if not named:
+            flag("value-name-mismatch", value_name,
+                 ", ".join(loc.value_name for loc in locations))
+            return mismatches
+        location = named[0]
+    else:
+        location = locations[0]
+
+    value_type = call.get("RegistryValueType")
+    if value_type and entry.registry_value_type:
+        script_type = REGISTRY_TYPE_NAMES.get(value_type.lower(), value_type.upper())
+        if script_type != entry.registry_value_type:
+            flag("type-mismatch", value_type, entry.registry_value_type)
+
+    data = call.get("RegistryValueData")
+    if data is not None and not data.startswith('$'):
+        phrase = entry.expected_data_for(location.value_name)
+        allowed = allowed_data(phrase)
+        if allowed is not None and normalize_data(data) not in allowed:
+            flag("data-mismatch", data, phrase)
+
+    return mismatches
+
+
+def check_tree(scripts_dir: Path = SCRIPTS_DIR,
+               catalog: Optional[CISCatalog] = None) -> dict:
+    """Check every audit/remediation script in one pass over the tree."""
+    start = time.perf_counter()
+    catalog = catalog or load_catalog()
+    mismatches: List[Mismatch] = []
+    scripts = calls = 0
+
+    for script in sorted(scripts_dir.rglob("*.ps1")):
+        match = SCRIPT_NAME_PATTERN.match(script.name)
+        if not match:
+            continue
+        scripts += 1
+        rel_path = repo_path(script)
+        content = script.read_text(encoding='utf-8-sig', errors='replace')
+        for call in extract_calls(rel_path, content):
+            calls += 1
+            mismatches.extend(check_call(call, catalog, match.group(1)))
+
+    return {
+        "mismatches": [asdict(m) for m in mismatches],
+        "stats": {
+            "scripts": scripts,
+            "calls": calls,
+            "catalog_entries": len(catalog),
+            "mismatches": len(mismatches),
+            "elapsed_seconds": round(time.perf_counter() - start, 4),
+        },
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Cross-check scripts against the CIS catalog")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = check_tree()
+    if args.format == "json":
+        output = json.dumps(report, indent=2)
+    else:
+        lines = [
+            f"{m['path']}:{m['line']}: [{m['kind']}] {m['cis_id']}: "
+            f"script={m['script_value']!r} catalog={m['catalog_value']!r}"
+            for m in report["mismatches"]
+        ]
+        stats = report["stats"]
+        lines.append(
+            f"\n{stats['mismatches']} mismatches in {stats['calls']} calls "
+            f"from {stats['scripts']} scripts ({stats['elapsed_seconds']:.3f}s)"
+        )
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8')
+        print(f"Report written to: {args.output}")
+    else:
+        print(output)
+
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Loader for the extracted CIS benchmark catalog (docs/json/cis_section_*.json).
+
+Parses the free-text fields produced by cis_robust_extractor.py into
+structured data that the rest of the tooling can join against:
+- registry locations from the audit procedure, with PDF line wraps and
+  "Page N" artifacts removed
+- the registry value type and expected data phrase
+- the expected value phrase from the recommendation title
+
+The CISCatalog object keeps hash indexes by cis_id and by normalized
+registry path so lookups from scripts or snapshots are O(1).
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CATALOG_DIR = REPO_ROOT / "docs" / "json"
+
+# Lines in the PDF wrap at roughly this width; a shorter line that ends a
+# registry location was broken at a space rather than mid-token.
+PDF_LINE_WIDTH = 76
+
+HIVE_ALIASES = {
+    "HKEY_LOCAL_MACHINE": "HKLM",
+    "HKLM": "HKLM",
+    "MACHINE": "HKLM",
+    "HKEY_CURRENT_USER": "HKCU",
+    "HKCU": "HKCU",
+    "USER": "HKCU",
+    "HKEY_USERS": "HKU",
+    "HKU": "HKU",
+}
+
+TITLE_EXPECTED_PATTERN = re.compile(
+    r"(is set to|is NOT set to|to include)\s+'(.*)'(.*)$"
+)
+REGISTRY_VALUE_PATTERN = re.compile(
+    r'with a (REG_[A-Z_]+)(?: or REG_[A-Z_]+)? (?:value )?(?:of |that is )?'
+    r'(.*?)\.?\s*$'
+)
+PAGE_ARTIFACT_PATTERN = re.compile(r'Page \d+$')
+
+
+def normalize_cis_id(cis_id: str) -> str:
+    """Normalize CIS ID for comparison (strip whitespace and trailing dots)."""
+    return cis_id.strip().rstrip('.')
+
+
+def get_major_section(cis_id: str) -> str:
+    """Return the top-level section of a CIS ID ("18" for "18.4.1")."""
+    return cis_id.split('.')[0]
+
+
+def normalize_registry_path(path: str) -> str:
+    """
+    Normalize a registry key path for comparison.
+
+    "HKLM:\\SOFTWARE\\Policies", "HKEY_LOCAL_MACHINE\\Software\\Policies\\"
+    and "Registry::HKLM\\software\\policies" all normalize to
+    "hklm\\software\\policies". Per-user keys ("HKU\\[USER SID]\\...")
+    normalize to HKCU, which is how the scripts address them.
+    """
+    path = path.strip().replace('/', '\\')
+    if path.lower().startswith("registry::"):
+        path = path[len("registry::"):]
+    hive, _, rest = path.partition('\\')
+    hive = HIVE_ALIASES.get(hive.rstrip(':').upper(), hive.rstrip(':').upper())
+    rest = re.sub(r'\\+', r'\\', rest).strip('\\')
+    if hive == "HKU":
+        # HKU\[USER SID]\Software\... is the current user's hive
+        first, _, remainder = rest.partition('\\')
+        if first.startswith('[') or first.upper().startswith('S-1-'):
+            hive, rest = "HKCU", remainder
+    return f"{hive}\\{rest}".lower() if rest else hive.lower()
+
+
+@dataclass(frozen=True)
+class RegistryLocation:
+    """A registry value named by a recommendation's audit procedure"""
+    path: str
+    value_name: str
+
+    @property
+    def normalized_path(self) -> str:
+        return normalize_registry_path(self.path)
+
+    @property
+    def hive(self) -> str:
+        return self.normalized_path.split('\\', 1)[0].upper()
+
+
+@dataclass
+class CatalogEntry:
+    """A CIS recommendation with its structured fields parsed out"""
+    cis_id: str
+    title: str
+    profile: str
+    audit_procedure: str
+    remediation_procedure: str
+    default_value: str
+    page_number: int
+    position: int
+    registry_locations: List[RegistryLocation] = field(default_factory=list)
+    registry_value_type: str = ""
+    registry_expected: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def section(self) -> str:
+        return get_major_section(self.cis_id)
+
+    @property
+    def data_source(self) -> str:
+        """
+        Where the setting is read from on a host: "auditpol" (section 17),
+        "service" (section 5), "registry" (any other registry-backed entry),
+        "secedit" (remaining section 1/2 account and local policies) or
+        "manual" when the catalog names no machine-readable source.
+        """
+        if self.section == "17":
+            return "auditpol"
+        if self.section == "5":
+            return "service"
+        if self.registry_locations:
+            return "registry"
+        if self.section in ("1", "2"):
+            return "secedit"
+        return "manual"
+
+    @property
+    def expected_value(self) -> str:
+        """The recommended value phrase from the title, e.g. "24 or more password(s)"."""
+        match = TITLE_EXPECTED_PATTERN.search(self.title)
+        if not match:
+            return ""
+        return (match.group(2) + match.group(3).rstrip("'")).strip()
+
+    @property
+    def expects_inclusion(self) -> bool:
+        """True for "... to include 'X'" recommendations."""
+        match = TITLE_EXPECTED_PATTERN.search(self.title)
+        return bool(match) and match.group(1) == "to include"
+
+    @property
+    def expects_negation(self) -> bool:
+        """True for "... is NOT set to 'X'" recommendations."""
+        match = TITLE_EXPECTED_PATTERN.search(self.title)
+        return bool(match) and match.group(1) == "is NOT set to"
+
+    def expected_data_for(self, value_name: str) -> str:
+        """Expected registry data phrase for one of this entry's values."""
+        return self.registry_expected.get(
+            value_name.lower(), self.registry_expected.get("*", "")
+        )
+
+
+def _join_wrapped(previous: str, line: str) -> str:
+    """Join a wrapped PDF line, restoring the space if the wrap consumed one."""
+    if line.startswith(':') or previous.endswith(('-', '\\')):
+        return previous + line
+    if len(previous) >= PDF_LINE_WIDTH:
+        return previous + line
+    return previous + ' ' + line
+
+
+def parse_registry_locations(audit_procedure: str) -> List[RegistryLocation]:
+    """
+    Extract "HIVE\\Key\\Path:ValueName" locations from an audit procedure.
+    Handles locations wrapped across PDF lines and trailing page footers.
+    """
+    marker = re.search(r'registry locations?', audit_procedure)
+    if not marker:
+        return []
+
+    locations = []
+    current: Optional[str] = None
+    current_line = ""
+    for line in audit_procedure[marker.end():].split('\n'):
+        line = line.strip()
+        starts_location = bool(re.match(r'(HK[A-Z_]+|MACHINE)\\', line))
+        if current is not None and line and not starts_location:
+            # Keep collecting while the path or a hard-wrapped value name
+            # is still incomplete
+            if (':' not in current or len(current_line) >= PDF_LINE_WIDTH) \
+                    and not PAGE_ARTIFACT_PATTERN.match(line) \
+                    and not line.startswith("Note:"):
+                current = _join_wrapped(current, line)
+                current_line = line
+                continue
+        if current is not None:
+            locations.append(current)
+            current = None
+        if starts_location:
+            current = line
+            current_line = line
+
+    if current is not None:
+        locations.append(current)
+
+    result = []
+    for location in locations:
+        path, sep, value_name = location.rpartition(':')
+        if not sep:
+            continue
+        value_name = PAGE_ARTIFACT_PATTERN.sub('', value_name).strip()
+        result.append(RegistryLocation(path.strip(), value_name))
+    return result
+
+
+def parse_registry_expectation(audit_procedure: str,
+                               locations: List[RegistryLocation]
+                               ) -> Tuple[str, Dict[str, str]]:
+    """
+    Parse the value type and expected data from the audit procedure sentence,
+    e.g. "with a REG_DWORD value of 4 or that the key does not exist."
+    Returns (value_type, {value_name_lower or "*": phrase}).
+    """
+    marker = re.search(r'registry locations?', audit_procedure)
+    if not marker:
+        return "", {}
+    sentence = audit_procedure[marker.end():]
+    sentence = sentence.split('\nHK', 1)[0]
+    sentence = ' '.join(sentence.split())
+    match = REGISTRY_VALUE_PATTERN.search(sentence)
+    if not match:
+        return "", {}
+    value_type = match.group(1)
+    phrase = match.group(2).strip().strip('`').rstrip(':')
+
+    # "1 (EnableSmartScreen) and REG_SZ value of Block (ShellSmartScreenLevel)"
+    per_value = re.findall(
+        r'(?:REG_[A-Z_]+ value of )?([^()]+?)\s*\((\w+)\)', phrase
+    )
+    names = {location.value_name.lower() for location in locations}
+    if per_value and all(name.lower() in names for _, name in per_value):
+        return value_type, {
+            name.lower(): re.sub(r'^(and\s+)?(REG_[A-Z_]+ value of\s+)?', '',
+                                 data.strip())
+            for data, name in per_value
+        }
+    return value_type, {"*": phrase}
+
+
+class CISCatalog:
+    """The parsed catalog with hash indexes by cis_id and registry path"""
+
+    def __init__(self, entries: List[CatalogEntry]):
+        self.entries = entries
+        self.by_id: Dict[str, CatalogEntry] = {}
+        self.by_registry_path: Dict[str, List[Tuple[CatalogEntry, RegistryLocation]]] = {}
+        self.by_registry_value: Dict[Tuple[str, str], List[CatalogEntry]] = {}
+
+        for entry in entries:
+            self.by_id[entry.cis_id] = entry
+            for location in entry.registry_locations:
+                path = location.normalized_path
+                self.by_registry_path.setdefault(path, []).append((entry, location))
+                key = (path, location.value_name.lower())
+                self.by_registry_value.setdefault(key, []).append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self.entries)
+
+    def __contains__(self, cis_id: str) -> bool:
+        return cis_id in self.by_id
+
+    def get(self, cis_id: str) -> Optional[CatalogEntry]:
+        return self.by_id.get(normalize_cis_id(cis_id))
+
+    def lookup_registry(self, path: str,
+                        value_name: Optional[str] = None) -> List[CatalogEntry]:
+        """Find the recommendations backed by a registry key (and value)."""
+        normalized = normalize_registry_path(path)
+        if value_name is None:
+            return [entry for entry, _ in self.by_registry_path.get(normalized, [])]
+        return list(self.by_registry_value.get((normalized, value_name.lower()), []))
+
+    def select(self, profile: Optional[str] = None,
+               sections: Optional[List[str]] = None,
+               cis_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        """
+        Select recommendations by profile, section prefixes ("18.9", "2")
+        and/or explicit IDs. Filters combine with AND; None means no filter.
+        """
+        selected = []
+        wanted_ids = {normalize_cis_id(c) for c in cis_ids} if cis_ids else None
+        for entry in self.entries:
+            if profile and entry.profile != profile:
+                continue
+            if sections and not any(
+                entry.cis_id == s or entry.cis_id.startswith(s + '.')
+                for s in sections
+            ):
+                continue
+            if wanted_ids is not None and entry.cis_id not in wanted_ids:
+                continue
+            selected.append(entry)
+        return selected
+
+
+def build_entry(item: dict, position: int) -> CatalogEntry:
+    """Create a CatalogEntry from one raw JSON catalog item."""
+    audit_procedure = item.get('audit_procedure', '')
+    locations = parse_registry_locations(audit_procedure)
+    value_type, expected = parse_registry_expectation(audit_procedure, locations)
+    return CatalogEntry(
+        cis_id=normalize_cis_id(item['cis_id']),
+        title=' '.join(item.get('title', '').split()),
+        profile=item.get('profile', ''),
+        audit_procedure=audit_procedure,
+        remediation_procedure=item.get('remediation_procedure', ''),
+        default_value=item.get('default_value', ''),
+        page_number=item.get('page_number', 0),
+        position=position,
+        registry_locations=locations,
+        registry_value_type=value_type,
+        registry_expected=expected,
+    )
+
+
+def cis_id_sort_key(cis_id: str) -> Tuple[int, ...]:
+    """Sort key that orders "2.3.10.1" after "2.3.9.5"."""
+    return tuple(int(part) for part in cis_id.split('.') if part.isdigit())
+
+
+def load_catalog(json_dir: Path = CATALOG_DIR) -> CISCatalog:
+    """Load and parse every cis_section_*.json file into a CISCatalog."""
+    raw_items = []
+    for json_file in sorted(Path(json_dir).glob("cis_section_*.json")):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            raw_items.extend(item for item in json.load(f) if 'cis_id' in item)
+
+    raw_items.sort(key=lambda item: cis_id_sort_key(item['cis_id']))
+    entries = []
+    seen = set()
+    for item in raw_items:
+        cis_id = normalize_cis_id(item['cis_id'])
+        if cis_id in seen:
+            continue
+        seen.add(cis_id)
+        entries.append(build_entry(item, len(entries)))
+    return CISCatalog(entries)
+
+
+if __name__ == "__main__":
+    catalog = load_catalog()
+    with_registry = sum(1 for entry in catalog if entry.registry_locations)
+    print(f"Loaded {len(catalog)} recommendations "
+          f"({with_registry} registry-backed)")
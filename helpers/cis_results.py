@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Python counterpart of the CIS result object.
+
+CISResult mirrors New-CISResultObject in modules/CISFramework.psm1 so the
+offline evaluators produce rows that line up with what the PowerShell audit
+scripts emit, and write_results_csv() writes them the way
+Export-CISAuditResults does (Export-Csv -NoTypeInformation).
+output_results() is the shared --format/--output handling of the evaluator
+CLIs.
+"""
+
+import csv
+import getpass
+import io
+import json
+import platform
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Union
+
+
+COMPLIANCE_STATUSES = ("Compliant", "Non-Compliant", "Error", "Not Applicable")
+
+# New-CISResultObject's -Profile ValidateSet (BL: the BitLocker recommendations)
+PROFILES = ("L1", "L2", "BL")
+
+# Property order of the object returned by New-CISResultObject
+RESULT_FIELDS = [
+    "CIS_ID", "Title", "CurrentValue", "RecommendedValue", "ComplianceStatus",
+    "IsCompliant", "Source", "Details", "ErrorMessage", "Profile",
+    "AuditTimestamp", "ComputerName", "UserName",
+]
+
+# Property order of the object returned by New-CISRemediationResult
+# (modules/CISRemediation.psm1), as Export-CISRemediationResults writes it
+REMEDIATION_FIELDS = [
+    "CIS_ID", "Title", "PreviousValue", "NewValue", "Status", "Message",
+    "IsCompliant", "RequiresManualAction", "Source", "ErrorMessage",
+    "RemediationTimestamp", "ComputerName", "UserName",
+]
+
+REMEDIATION_STATUSES = ("Remediated", "ManualActionRequired", "Failed", "Cancelled", "Error",
+                        "PartiallyRemediated")
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def audit_timestamp(moment: Optional[datetime] = None) -> str:
+    """Timestamp in the Get-Date -Format "yyyy-MM-dd HH:mm:ss" format."""
+    return (moment or datetime.now()).strftime(TIMESTAMP_FORMAT)
+
+
+@dataclass
+class CISResult:
+    """One audit result, field for field like New-CISResultObject"""
+    cis_id: str
+    title: str
+    current_value: str
+    recommended_value: str
+    compliance_status: str
+    source: str = "Unknown"
+    details: str = ""
+    error_message: str = ""
+    profile: str = "L1"
+    audit_timestamp: str = field(default_factory=audit_timestamp)
+    computer_name: str = field(default_factory=platform.node)
+    user_name: str = field(default_factory=getpass.getuser)
+
+    def __post_init__(self):
+        if self.compliance_status not in COMPLIANCE_STATUSES:
+            raise ValueError(
+                f"Invalid ComplianceStatus {self.compliance_status!r} for "
+                f"{self.cis_id}; expected one of {', '.join(COMPLIANCE_STATUSES)}"
+            )
+        if self.profile not in PROFILES:
+            raise ValueError(
+                f"Invalid Profile {self.profile!r} for {self.cis_id}; "
+                f"expected one of {', '.join(PROFILES)}"
+            )
+
+    @property
+    def is_compliant(self) -> bool:
+        return self.compliance_status == "Compliant"
+
+    def to_dict(self) -> dict:
+        """The result with New-CISResultObject property names."""
+        return {
+            "CIS_ID": self.cis_id,
+            "Title": self.title,
+            "CurrentValue": self.current_value,
+            "RecommendedValue": self.recommended_value,
+            "ComplianceStatus": self.compliance_status,
+            "IsCompliant": self.is_compliant,
+            "Source": self.source,
+            "Details": self.details,
+            "ErrorMessage": self.error_message,
+            "Profile": self.profile,
+            "AuditTimestamp": self.audit_timestamp,
+            "ComputerName": self.computer_name,
+            "UserName": self.user_name,
+        }
+
+
+def status_for(compliant: Optional[bool]) -> str:
+    """Map a predicate outcome to a ComplianceStatus (None = can't tell)."""
+    if compliant is None:
+        return "Not Applicable"
+    return "Compliant" if compliant else "Non-Compliant"
+
+
+def _csv_value(value) -> str:
+    # PowerShell renders booleans as True/False
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    return "" if value is None else str(value)
+
+
+def results_to_csv(results: Iterable[CISResult], header: bool = True) -> str:
+    """
+    Render results like Export-Csv -NoTypeInformation (all fields quoted).
+    header=False renders rows only, for appending to an existing file.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+    if header:
+        writer.writerow(RESULT_FIELDS)
+    for result in results:
+        row = result.to_dict()
+        writer.writerow([_csv_value(row[name]) for name in RESULT_FIELDS])
+    return buffer.getvalue()
+
+
+def write_results_csv(results: Iterable[CISResult], path: Union[str, Path]):
+    """Write results to a CSV file readable by the PowerShell tooling."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(results_to_csv(results))
+
+
+def summarize(results: List[CISResult]) -> dict:
+    """The same summary Get-CISAuditSummary computes."""
+    total = len(results)
+    counts = {status: 0 for status in COMPLIANCE_STATUSES}
+    for result in results:
+        counts[result.compliance_status] += 1
+    percentage = round(counts["Compliant"] / total * 100, 2) if total else 0
+    if percentage >= 90:
+        overall = "Excellent"
+    elif percentage >= 75:
+        overall = "Good"
+    elif percentage >= 50:
+        overall = "Fair"
+    else:
+        overall = "Poor"
+    return {
+        "TotalAudits": total,
+        "CompliantAudits": counts["Compliant"],
+        "NonCompliantAudits": counts["Non-Compliant"],
+        "ErrorAudits": counts["Error"],
+        "NotApplicableAudits": counts["Not Applicable"],
+        "CompliancePercentage": percentage,
+        "OverallStatus": overall,
+    }
+
+
+def results_to_text(results: List[CISResult], elapsed: float,
+                    id_width: int = 12, value_width: int = 50) -> str:
+    """One line per result plus the summary line the evaluator CLIs print."""
+    lines = [
+        f"{r.cis_id:<{id_width}} {r.compliance_status:<15} "
+        f"{r.current_value[:value_width]!s:<{value_width}} "
+        f"(recommended: {r.recommended_value})"
+        for r in results
+    ]
+    summary = summarize(results)
+    lines.append(
+        f"\n{summary['CompliantAudits']}/{summary['TotalAudits']} compliant "
+        f"({summary['CompliancePercentage']}%, {summary['OverallStatus']}), "
+        f"{summary['NotApplicableAudits']} not evaluated ({elapsed:.3f}s)"
+    )
+    return "\n".join(lines)
+
+
+def output_results(results: List[CISResult], fmt: str, output: Optional[Path] = None,
+                   elapsed: float = 0.0, id_width: int = 12, value_width: int = 50,
+                   text: Optional[Callable[[List[CISResult], float], str]] = None):
+    """
+    Render results as text, csv or json and write them to output, or print
+    them if no output file is given. text replaces results_to_text() for
+    CLIs with their own text layout.
+    """
+    if fmt == "csv":
+        rendered = results_to_csv(results)
+    elif fmt == "json":
+        rendered = json.dumps([result.to_dict() for result in results], indent=2)
+    elif text:
+        rendered = text(results, elapsed)
+    else:
+        rendered = results_to_text(results, elapsed, id_width, value_width)
+
+    if output:
+        Path(output).write_text(rendered, encoding='utf-8', newline='')
+        print(f"Results written to: {output}")
+    else:
+        print(rendered)
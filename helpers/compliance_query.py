@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Bitmap-indexed compliance queries over fleet audit results.
+
+Every host gets a bit position, and the index keeps one bitmap per
+(CIS_ID, ComplianceStatus) -- the hosts whose latest result for that
+control has that status -- plus one per host inventory attribute
+(type=laptop, site=hq, ...). Questions about the fleet become bitwise
+operations on these bitmaps instead of scans over result rows.
+
+Filter expressions select hosts:
+
+    fail:2.3.7.4                hosts failing a control
+    fail:18                     hosts failing any control under 18 (18.x.y...)
+    fail:18@L1                  ... counting only L1 controls
+    pass: / error: / na:        the other statuses
+    type=laptop                 an inventory attribute (host=WS01 names a host)
+    and, or, not, ( )           combine them
+
+    fail:2.3.7.4 and fail:18.4.6
+    (type=laptop or type=tablet) and not pass:1.1
+
+Prefixes expand along the catalog's ID hierarchy: "18.9" covers 18.9 and
+every 18.9.x.y below it. The index is built from a result store
+(result_store.py) and saved as one file in which each bitmap is stored
+zlib-compressed, so sparse bitmaps (a control failing on a handful of
+hosts) cost a few bytes.
+
+Usage:
+    python compliance_query.py build fleet-store/ --inventory hosts.csv --output fleet.cbm
+    python compliance_query.py hosts fleet.cbm "fail:18@L1"
+    python compliance_query.py controls fleet.cbm --where "type=laptop" --min-rate 10
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import struct
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from cis_catalog import cis_id_sort_key, load_catalog
+from result_store import ResultStore
+from secedit_inf import decode_inf
+
+MAGIC = b"CISBMAP\x00"
+VERSION = 1
+HEADER = struct.Struct('<8sHHII')
+LENGTH = struct.Struct('<I')
+
+# Query status words -> ComplianceStatus
+STATUS_WORDS = {
+    "fail": "Non-Compliant",
+    "pass": "Compliant",
+    "error": "Error",
+    "na": "Not Applicable",
+}
+
+HOST_COLUMNS = ("computername", "name", "host", "hostname")
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|([^\s()]+))')
+STATUS_TERM = re.compile(r'^([a-z]+):([\d.]+?)\.?\*?(?:@([A-Za-z0-9]+))?$')
+
+
+class QuerySyntaxError(ValueError):
+    """A filter expression that cannot be parsed or refers to nothing"""
+
+
+def popcount(bitmap: int) -> int:
+    return bin(bitmap).count('1')
+
+
+def bit_positions(bitmap: int) -> List[int]:
+    positions = []
+    while bitmap:
+        low = bitmap & -bitmap
+        positions.append(low.bit_length() - 1)
+        bitmap ^= low
+    return positions
+
+
+def bitmap_of(positions: Iterable[int], size: int) -> int:
+    """A bitmap with the given bits set (built in one pass, not bit by bit)."""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+@dataclass
+class ControlRate:
+    """How many selected hosts have a status for one control"""
+    cis_id: str
+    matching: int
+    evaluated: int
+
+    @property
+    def rate(self) -> float:
+        return round(self.matching / self.evaluated * 100, 2) if self.evaluated else 0.0
+
+
+class BitmapIndex:
+    """Host bitmaps per (CIS_ID, status) and per inventory attribute"""
+
+    def __init__(self, hosts: List[str], statuses: Dict[Tuple[str, str], int],
+                 profiles: Dict[str, str], attributes: Optional[Dict[Tuple[str, str], int]] = None):
+        self.hosts = hosts
+        self.host_ids = {host.lower(): position for position, host in enumerate(hosts)}
+        self.statuses = statuses
+        self.profiles = profiles
+        self.attributes = attributes or {}
+        self.universe = (1 << len(hosts)) - 1
+        self.controls = sorted(profiles, key=cis_id_sort_key)
+        self._catalog_ids: Optional[List[str]] = None
+        self._expanded: Dict[Tuple[str, str, Optional[str]], int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str, str, str]]) -> "BitmapIndex":
+        """
+        Build from (CIS_ID, ComplianceStatus, ComputerName, AuditTimestamp,
+        Profile) rows. A host audited more than once counts with its latest
+        result per control (timestamps are "yyyy-MM-dd HH:mm:ss", so they
+        compare as text).
+        """
+        host_ids: Dict[str, int] = {}
+        hosts: List[str] = []
+        latest: Dict[Tuple[int, str], Tuple[str, str]] = {}
+        profiles: Dict[str, str] = {}
+        for cis_id, status, host, timestamp, profile in rows:
+            position = host_ids.get(host.lower())
+            if position is None:
+                position = host_ids[host.lower()] = len(hosts)
+                hosts.append(host)
+            key = (position, cis_id)
+            seen = latest.get(key)
+            if seen is None or timestamp >= seen[0]:
+                latest[key] = (timestamp, status)
+            profiles.setdefault(cis_id, profile)
+        members: Dict[Tuple[str, str], List[int]] = {}
+        for (position, cis_id), (_, status) in latest.items():
+            members.setdefault((cis_id, status), []).append(position)
+        statuses = {key: bitmap_of(positions, len(hosts)) for key, positions in members.items()}
+        return cls(hosts, statuses, profiles)
+
+    @classmethod
+    def from_store(cls, store: ResultStore) -> "BitmapIndex":
+        return cls.from_rows(store.iter_rows(
+            ("CIS_ID", "ComplianceStatus", "ComputerName", "AuditTimestamp", "Profile")))
+
+    def add_inventory(self, inventory: Dict[str, Dict[str, str]]):
+        """Attribute bitmaps from {host: {attribute: value}}; unknown hosts are ignored."""
+        members: Dict[Tuple[str, str], List[int]] = {}
+        for host, attributes in inventory.items():
+            position = self.host_ids.get(host.lower())
+            if position is None:
+                continue
+            for name, value in attributes.items():
+                if value:
+                    members.setdefault((name.lower(), value.lower()), []).append(position)
+        for key, positions in members.items():
+            self.attributes[key] = self.attributes.get(key, 0) | bitmap_of(positions, len(self.hosts))
+
+    # Expansion and evaluation
+
+    def expand(self, prefix: str, profile: Optional[str] = None) -> List[str]:
+        """Indexed controls at or below a catalog ID prefix, optionally of one profile."""
+        if self._catalog_ids is None:
+            self._catalog_ids = [entry.cis_id for entry in load_catalog()]
+        known = set(self.controls) | set(self._catalog_ids)
+        if not any(c == prefix or c.startswith(prefix + '.') for c in known):
+            raise QuerySyntaxError(f"No controls under {prefix!r}")
+        return [c for c in self.controls
+                if (c == prefix or c.startswith(prefix + '.'))
+                and (profile is None or self.profiles.get(c, "").lower() == profile.lower())]
+
+    def status_hosts(self, status: str, prefix: str, profile: Optional[str] = None) -> int:
+        """Hosts with status for any control under prefix."""
+        key = (status, prefix, profile)
+        if key not in self._expanded:
+            bitmap = 0
+            for cis_id in self.expand(prefix, profile):
+                bitmap |= self.statuses.get((cis_id, status), 0)
+            self._expanded[key] = bitmap
+        return self._expanded[key]
+
+    def evaluated_hosts(self, cis_id: str) -> int:
+        bitmap = 0
+        for status in STATUS_WORDS.values():
+            bitmap |= self.statuses.get((cis_id, status), 0)
+        return bitmap
+
+    def term(self, text: str) -> int:
+        """The hosts one filter term selects."""
+        match = STATUS_TERM.match(text)
+        if match:
+            word, prefix, profile = match.groups()
+            if word not in STATUS_WORDS:
+                raise QuerySyntaxError(f"Unknown status {word!r} in {text!r}; "
+                                       f"expected one of {', '.join(STATUS_WORDS)}")
+            return self.status_hosts(STATUS_WORDS[word], prefix, profile)
+        name, separator, value = text.partition('=')
+        if separator and name and value:
+            if name.lower() == "host":
+                position = self.host_ids.get(value.lower())
+                return 0 if position is None else 1 << position
+            return self.attributes.get((name.lower(), value.lower()), 0)
+        raise QuerySyntaxError(f"Cannot parse term {text!r}")
+
+    def query(self, expression: str) -> int:
+        """The bitmap of hosts a filter expression selects."""
+        return QueryParser(self, expression).parse()
+
+    def host_names(self, bitmap: int) -> List[str]:
+        return [self.hosts[position] for position in bit_positions(bitmap)]
+
+    def control_rates(self, status: str = "Non-Compliant", within: Optional[int] = None,
+                      min_rate: float = 0.0) -> List[ControlRate]:
+        """Per control, the selected hosts with status out of those evaluated for it."""
+        within = self.universe if within is None else within
+        rates = []
+        for cis_id in self.controls:
+            evaluated = popcount(self.evaluated_hosts(cis_id) & within)
+            if not evaluated:
+                continue
+            rate = ControlRate(cis_id, popcount(self.statuses.get((cis_id, status), 0) & within),
+                               evaluated)
+            if rate.matching and rate.rate > min_rate:
+                rates.append(rate)
+        return rates
+
+    # Persistence
+
+    def save(self, path: Union[str, Path]):
+        """Write the index; every bitmap is stored zlib-compressed."""
+        manifest = json.dumps({"hosts": self.hosts, "profiles": self.profiles}).encode('utf-8')
+        bitmaps = [("s", cis_id, status, bitmap) for (cis_id, status), bitmap in self.statuses.items()]
+        bitmaps += [("a", name, value, bitmap) for (name, value), bitmap in self.attributes.items()]
+        data = bytearray(HEADER.pack(MAGIC, VERSION, 0, len(self.hosts), len(bitmaps)))
+        data += LENGTH.pack(len(manifest)) + manifest
+        size = (len(self.hosts) + 7) // 8
+        for kind, first, second, bitmap in bitmaps:
+            key = "\t".join((kind, first, second)).encode('utf-8')
+            packed = zlib.compress(bitmap.to_bytes(size, 'little'), 6)
+            data += LENGTH.pack(len(key)) + key + LENGTH.pack(len(packed)) + packed
+        Path(path).write_bytes(bytes(data))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BitmapIndex":
+        data = Path(path).read_bytes()
+        try:
+            magic, version, _, _, count = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a compliance bitmap index")
+            position = HEADER.size
+
+            def chunk() -> bytes:
+                nonlocal position
+                (length,) = LENGTH.unpack_from(data, position)
+                position += LENGTH.size + length
+                return data[position - length:position]
+
+            manifest = json.loads(chunk())
+            statuses, attributes = {}, {}
+            for _ in range(count):
+                kind, first, second = chunk().decode('utf-8').split('\t')
+                bitmap = int.from_bytes(zlib.decompress(chunk()), 'little')
+                (statuses if kind == "s" else attributes)[(first, second)] = bitmap
+        except (struct.error, zlib.error, UnicodeDecodeError, KeyError) as e:
+            raise ValueError(f"{path}: corrupt bitmap index ({e})") from None
+        return cls(manifest["hosts"], statuses, manifest["profiles"], attributes)
+
+
+class QueryParser:
+    """Recursive descent over: or-expressions of and-expressions of [not] terms"""
+
+    def __init__(self, index: BitmapIndex, expression: str):
+        self.index = index
+        self.tokens = [match.group(0).strip() for match in TOKEN_PATTERN.finditer(expression)
+                       if match.group(0).strip()]
+        self.position = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise QuerySyntaxError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def parse(self) -> int:
+        if not self.tokens:
+            raise QuerySyntaxError("Empty expression")
+        bitmap = self._or()
+        if self._peek() is not None:
+            raise QuerySyntaxError(f"Unexpected {self._peek()!r}")
+        return bitmap
+
+    def _or(self) -> int:
+        bitmap = self._and()
+        while (self._peek() or "").lower() == "or":
+            self._next()
+            bitmap |= self._and()
+        return bitmap
+
+    def _and(self) -> int:
+        bitmap = self._not()
+        while (self._peek() or "").lower() == "and":
+            self._next()
+            bitmap &= self._not()
+        return bitmap
+
+    def _not(self) -> int:
+        token = self._next()
+        if token.lower() == "not":
+            return self.index.universe & ~self._not()
+        if token == "(":
+            bitmap = self._or()
+            if self._next() != ")":
+                raise QuerySyntaxError("Missing ')'")
+            return bitmap
+        if token == ")" or token.lower() in ("and", "or"):
+            raise QuerySyntaxError(f"Unexpected {token!r}")
+        return self.index.term(token)
+
+
+def read_inventory(path: Union[str, Path]) -> Dict[str, Dict[str, str]]:
+    """Host attributes from a CSV with a ComputerName (or Name/Host) column."""
+    rows = list(csv.DictReader(io.StringIO(decode_inf(Path(path).read_bytes()))))
+    inventory = {}
+    for row in rows:
+        row = {(key or "").strip(): (value or "").strip() for key, value in row.items()}
+        host_column = next((key for key in row if key.lower() in HOST_COLUMNS), None)
+        if host_column is None:
+            raise ValueError(f"{path}: no ComputerName column")
+        if row[host_column]:
+            inventory[row[host_column]] = {key: value for key, value in row.items()
+                                           if key != host_column}
+    return inventory
+
+
+def open_index(source: Path, inventory: Optional[Path] = None) -> BitmapIndex:
+    """Load a saved index, or build one from a result store directory."""
+    if source.is_dir():
+        with ResultStore(source) as store:
+            index = BitmapIndex.from_store(store)
+    else:
+        index = BitmapIndex.load(source)
+    if inventory:
+        index.add_inventory(read_inventory(inventory))
+    return index
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Bitmap-indexed compliance queries over fleet results")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="index a result store")
+    build_parser.add_argument("store", type=Path)
+    build_parser.add_argument("--inventory", type=Path, help="CSV of host attributes")
+    build_parser.add_argument("--output", type=Path, required=True)
+
+    hosts_parser = commands.add_parser("hosts", help="hosts matching a filter expression")
+    hosts_parser.add_argument("index", type=Path, help="saved index or result store directory")
+    hosts_parser.add_argument("expression")
+    hosts_parser.add_argument("--inventory", type=Path)
+    hosts_parser.add_argument("--count", action="store_true", help="print only the number of hosts")
+
+    controls_parser = commands.add_parser("controls", help="controls by share of hosts with a status")
+    controls_parser.add_argument("index", type=Path, help="saved index or result store directory")
+    controls_parser.add_argument("--where", help="filter expression selecting the hosts")
+    controls_parser.add_argument("--status", choices=sorted(STATUS_WORDS), default="fail")
+    controls_parser.add_argument("--min-rate", type=float, default=0.0,
+                                 help="only controls above this percentage")
+    controls_parser.add_argument("--inventory", type=Path)
+    controls_parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    controls_parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = open_index(args.store if args.command == "build" else args.index, args.inventory)
+    if args.command == "build":
+        index.save(args.output)
+        print(f"Indexed {len(index.hosts):,} hosts, {len(index.controls)} controls, "
+              f"{len(index.statuses) + len(index.attributes):,} bitmaps "
+              f"({args.output.stat().st_size:,} bytes, {time.perf_counter() - started:.2f}s)")
+        return 0
+
+    try:
+        started = time.perf_counter()
+        if args.command == "hosts":
+            selected = index.query(args.expression)
+        else:
+            within = index.query(args.where) if args.where else None
+            rates = index.control_rates(STATUS_WORDS[args.status], within, args.min_rate)
+    except QuerySyntaxError as e:
+        print(f"Invalid query: {e}", file=sys.stderr)
+        return 2
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.command == "hosts":
+        if args.count:
+            print(popcount(selected))
+        else:
+            print("\n".join(index.host_names(selected)))
+        print(f"{popcount(selected):,} of {len(index.hosts):,} hosts ({elapsed:.1f} ms)",
+              file=sys.stderr)
+        return 0
+
+    if args.format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(["CIS_ID", "Hosts", "Evaluated", "Percentage"])
+        writer.writerows([r.cis_id, r.matching, r.evaluated, r.rate] for r in rates)
+        output = buffer.getvalue()
+    elif args.format == "json":
+        output = json.dumps([{"cis_id": r.cis_id, "hosts": r.matching, "evaluated": r.evaluated,
+                              "rate": r.rate} for r in rates], indent=2)
+    else:
+        lines = [f"{r.cis_id:<12} {r.rate:>7.2f}%  {r.matching:>8,}/{r.evaluated:<8,}" for r in rates]
+        lines.append(f"\n{len(rates)} controls ({elapsed:.1f} ms)")
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Results written to: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,47 @@
 #!/usr/bin/env python3
 
-import re
+import sys
+from pathlib import Path
 
-# Read the script content
-with open('windows/security/remediations/1.2.1-remediate-account-lockout-duration.ps1', 'r') as f:
-    content = f.read()
+from ps_tokenizer import COMMENT, HERESTRING, STRING, parse_file
+from ps_lint import module_import_paths, resolve_script_relative
 
-print("=== Debug Import Pattern ===")
-print("Looking for pattern: 'Import-Module.*ModuleIndex'")
+# Script to inspect when none is given (the account lockout remediation)
+DEFAULT_SCRIPT = Path(
+    'windows/deferred/security/remediations/section_1/'
+    '1.2.1-remediate-account-lockout-duration.ps1'
+)
 
-# Search for the pattern
-pattern = r'Import-Module.*ModuleIndex'
-matches = re.findall(pattern, content, re.MULTILINE | re.IGNORECASE)
 
-print(f"Matches found: {len(matches)}")
-for match in matches:
-    print(f"Match: '{match}'")
+def main():
+    """Main function"""
+    script = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SCRIPT
+    parsed = parse_file(script)
 
-# Also check for the exact line
-import_lines = [line for line in content.split('\n') if 'Import-Module' in line]
-print("\nImport lines found:")
-for line in import_lines:
-    print(f"'{line}'")
\ No newline at end of file
+    print("=== Debug Import Pattern ===")
+    print("Looking for Import-Module commands (comments and strings excluded)")
+
+    # Import-Module commands as seen by the tokenizer
+    commands = parsed.find_commands("Import-Module")
+    print(f"Matches found: {len(commands)}")
+    for command in commands:
+        print(f"Line {command.line}: arguments={command.arguments} "
+              f"positional={command.positional}")
+
+    # Module paths and whether they resolve from the script's directory
+    print("\nModule paths:")
+    for line, relative in module_import_paths(parsed):
+        exists = resolve_script_relative(parsed.path, relative).is_file()
+        print(f"Line {line}: '{relative}' ({'ok' if exists else 'MISSING'})")
+
+    # Mentions the old regex would also have matched
+    ignored = [token for token in parsed.tokens
+               if token.kind in (COMMENT, STRING, HERESTRING)
+               and 'Import-Module' in token.text]
+    print("\nImport-Module mentions in comments/strings (ignored):")
+    for token in ignored:
+        print(f"Line {token.line}: '{token.text.strip()[:80]}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Per-host drift detection between consecutive audit runs.
+
+Instead of keeping last night's CSVs around and comparing them row by row,
+the detector keeps a small fingerprint per host: for every control its last
+ComplianceStatus and a 64-bit hash of its CurrentValue. A new run is diffed
+against the fingerprint in one pass over its rows, and only transitions
+come out:
+
+    newly-failing   Non-Compliant now, anything else (or never seen) before
+    fixed           Compliant now, Non-Compliant before
+    status-changed  any other status change (e.g. Compliant -> Error)
+    value-changed   same status, different CurrentValue
+
+The fingerprint is then updated in place. Controls missing from a run keep
+their previous fingerprint, so a partial re-audit (one section) does not
+read as everything else having disappeared. The first run seen for a host
+only records its baseline. Runs no newer than the fingerprint (by
+AuditTimestamp) are skipped, so replaying a drop folder reports nothing.
+
+Fingerprint file layout (one <host>.fp per host, little-endian):
+
+    header   36 bytes   magic b"CISDRFT\\0", version u16, flags u16, control
+                        count u32, last AuditTimestamp (20 bytes, NUL-padded)
+    records             per control: CIS_ID length u8, status u8 (index into
+                        COMPLIANCE_STATUSES + 1; 0 = unknown), CurrentValue
+                        hash u64, then the CIS_ID in ASCII
+
+Files are processed one at a time, so memory stays at one host's results
+however large the drop is.
+
+Usage:
+    python drift_detector.py nightly-results/ --state drift-state/
+    python drift_detector.py nightly-results/ --state drift-state/ --kind newly-failing --format csv --output drift.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from cis_catalog import cis_id_sort_key
+from cis_results import COMPLIANCE_STATUSES
+from result_store import COLUMNS, find_csvs, read_results_csv
+
+MAGIC = b"CISDRFT\x00"
+VERSION = 1
+HEADER = struct.Struct('<8sHHI20s')
+RECORD = struct.Struct('<BBQ')
+
+FINGERPRINT_SUFFIX = ".fp"
+
+KINDS = ("newly-failing", "fixed", "status-changed", "value-changed")
+
+CIS_ID, CURRENT_VALUE, STATUS, TIMESTAMP, HOST = (
+    COLUMNS.index(name) for name in
+    ("CIS_ID", "CurrentValue", "ComplianceStatus", "AuditTimestamp", "ComputerName"))
+
+STATUS_CODES = {status: code for code, status in enumerate(COMPLIANCE_STATUSES, 1)}
+
+
+class FingerprintFormatError(ValueError):
+    """The file is not a valid host fingerprint"""
+
+
+def value_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@dataclass
+class Fingerprint:
+    """Last known (status code, value hash) per control for one host"""
+    host: str
+    timestamp: str = ""
+    controls: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def to_bytes(self) -> bytes:
+        parts = [HEADER.pack(MAGIC, VERSION, 0, len(self.controls), self.timestamp.encode('ascii'))]
+        for cis_id, (status, digest) in self.controls.items():
+            encoded = cis_id.encode('ascii')
+            parts.append(RECORD.pack(len(encoded), status, digest) + encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, host: str, data: bytes) -> "Fingerprint":
+        try:
+            magic, version, _, count, timestamp = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise FingerprintFormatError(f"{host}: not a drift fingerprint")
+            controls = {}
+            position = HEADER.size
+            for _ in range(count):
+                length, status, digest = RECORD.unpack_from(data, position)
+                position += RECORD.size + length
+                controls[data[position - length:position].decode('ascii')] = (status, digest)
+            if position != len(data):
+                raise FingerprintFormatError(f"{host}: {len(data) - position} trailing bytes")
+        except (struct.error, UnicodeDecodeError) as e:
+            raise FingerprintFormatError(f"{host}: corrupt fingerprint ({e})") from None
+        return cls(host, timestamp.rstrip(b"\x00").decode('ascii'), controls)
+
+
+@dataclass
+class Transition:
+    """One control on one host that changed since the previous run"""
+    host: str
+    cis_id: str
+    kind: str
+    previous_status: str
+    status: str
+    current_value: str
+    timestamp: str
+
+
+@dataclass
+class DriftStats:
+    """Totals of one scan"""
+    files: int = 0
+    failed: int = 0
+    runs: int = 0
+    baselined: int = 0
+    stale: int = 0
+    rows: int = 0
+    transitions: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    def describe(self) -> str:
+        changes = ", ".join(f"{self.transitions[kind]} {kind}" for kind in KINDS)
+        return (f"{self.files} files, {self.runs} host runs ({self.baselined} baselined, "
+                f"{self.stale} already seen), {self.rows:,} rows in {self.elapsed:.1f}s: {changes}")
+
+
+class FingerprintStore:
+    """A directory of per-host fingerprints"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, host: str) -> Path:
+        return self.path / (re.sub(r'[^\w.-]', '_', host.lower()) + FINGERPRINT_SUFFIX)
+
+    def load(self, host: str) -> Optional[Fingerprint]:
+        try:
+            data = self._file(host).read_bytes()
+        except FileNotFoundError:
+            return None
+        return Fingerprint.from_bytes(host, data)
+
+    def save(self, fingerprint: Fingerprint):
+        """Write under a temporary name and rename, so a crash leaves the old fingerprint."""
+        path = self._file(fingerprint.host)
+        temp = path.with_name(path.name + ".tmp")
+        temp.write_bytes(fingerprint.to_bytes())
+        os.replace(temp, path)
+
+    def hosts(self) -> List[str]:
+        return sorted(p.stem for p in self.path.glob(f"*{FINGERPRINT_SUFFIX}"))
+
+
+def diff_run(fingerprint: Fingerprint, rows: Sequence[Sequence[str]]) -> Iterator[Transition]:
+    """
+    Transitions of one host run against its fingerprint, updating the
+    fingerprint as it goes (rows in result_store.COLUMNS order).
+    """
+    controls = fingerprint.controls
+    for row in rows:
+        cis_id, status = row[CIS_ID], row[STATUS]
+        code, digest = STATUS_CODES.get(status, 0), value_hash(row[CURRENT_VALUE])
+        previous = controls.get(cis_id)
+        controls[cis_id] = (code, digest)
+        if previous == (code, digest):
+            continue
+        before = COMPLIANCE_STATUSES[previous[0] - 1] if previous and previous[0] else ""
+        if status == "Non-Compliant" and before != status:
+            kind = "newly-failing"
+        elif previous is None:
+            continue
+        elif status == "Compliant" and before == "Non-Compliant":
+            kind = "fixed"
+        elif previous[0] != code:
+            kind = "status-changed"
+        else:
+            kind = "value-changed"
+        yield Transition(fingerprint.host, cis_id, kind, before, status, row[CURRENT_VALUE],
+                         row[TIMESTAMP])
+
+
+def host_runs(rows: Iterable[Sequence[str]]) -> Dict[str, List[Sequence[str]]]:
+    """Rows of one results file by host (normally a file is one host's run)."""
+    runs: Dict[str, List[Sequence[str]]] = {}
+    for row in rows:
+        runs.setdefault(row[HOST], []).append(row)
+    return runs
+
+
+class DriftDetector:
+    """Streams result files through the per-host fingerprints"""
+
+    def __init__(self, state: Union[str, Path], update: bool = True):
+        self.store = FingerprintStore(state)
+        self.update = update
+        self.stats = DriftStats()
+        self.errors: List[Tuple[str, str]] = []
+
+    def process_run(self, host: str, rows: Sequence[Sequence[str]]) -> List[Transition]:
+        """Diff one host run and (unless update is off) record it as the new baseline."""
+        timestamp = max(row[TIMESTAMP] for row in rows)
+        fingerprint = self.store.load(host)
+        self.stats.runs += 1
+        self.stats.rows += len(rows)
+        if fingerprint is not None and timestamp <= fingerprint.timestamp:
+            self.stats.stale += 1
+            return []
+        if fingerprint is None:
+            fingerprint = Fingerprint(host)
+            list(diff_run(fingerprint, rows))
+            transitions = []
+            self.stats.baselined += 1
+        else:
+            transitions = list(diff_run(fingerprint, rows))
+        fingerprint.timestamp = timestamp
+        if self.update:
+            self.store.save(fingerprint)
+        self.stats.transitions.update(t.kind for t in transitions)
+        return transitions
+
+    def scan(self, files: Iterable[Union[str, Path]]) -> Iterator[Transition]:
+        """Transitions file by file; unreadable files are recorded in errors."""
+        started = time.perf_counter()
+        try:
+            for file in files:
+                try:
+                    rows = read_results_csv(file)
+                except (OSError, ValueError, csv.Error) as e:
+                    self.stats.failed += 1
+                    self.errors.append((str(file), str(e)))
+                    continue
+                self.stats.files += 1
+                for host, run in host_runs(rows).items():
+                    try:
+                        yield from self.process_run(host, run)
+                    except FingerprintFormatError as e:
+                        self.errors.append((str(file), str(e)))
+        finally:
+            self.stats.elapsed += time.perf_counter() - started
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Report what changed since each host's previous audit run")
+    parser.add_argument("paths", nargs="+", type=Path, help="result CSVs or directories of them")
+    parser.add_argument("--state", type=Path, required=True, help="fingerprint directory")
+    parser.add_argument("--kind", action="append", choices=KINDS,
+                        help="report only these transitions (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="do not update the fingerprints")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    detector = DriftDetector(args.state, update=not args.dry_run)
+    kinds = set(args.kind or KINDS)
+    transitions = [t for t in detector.scan(find_csvs(args.paths)) if t.kind in kinds]
+    transitions.sort(key=lambda t: (t.host.lower(), cis_id_sort_key(t.cis_id)))
+    for file, error in detector.errors:
+        print(f"Failed: {file}: {error}", file=sys.stderr)
+
+    if args.format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(["ComputerName", "CIS_ID", "Change", "PreviousStatus", "ComplianceStatus",
+                         "CurrentValue", "AuditTimestamp"])
+        writer.writerows([t.host, t.cis_id, t.kind, t.previous_status, t.status, t.current_value,
+                          t.timestamp] for t in transitions)
+        output = buffer.getvalue()
+    elif args.format == "json":
+        output = json.dumps({"summary": detector.stats.describe(),
+                             "transitions": [asdict(t) for t in transitions]}, indent=2)
+    else:
+        lines = [f"{t.host:<16} {t.cis_id:<12} {t.kind:<15} "
+                 f"{t.previous_status or '-'} -> {t.status}  [{t.current_value}]" for t in transitions]
+        lines.append(f"\n{detector.stats.describe()}")
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Results written to: {args.output}")
+    else:
+        print(output)
+    return 1 if detector.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Fixtures shared by the fleet test scripts: one host's exports for the
+offline evaluators and snapshot bundles (write_inputs), and a small fleet
+of audit result CSVs for the result store and its consumers (write_fleet).
+"""
+
+from pathlib import Path
+
+from cis_results import CISResult, results_to_csv
+
+# Exports of one host (write_inputs)
+
+SECEDIT = '''[Unicode]
+Unicode=yes
+[System Access]
+PasswordHistorySize = 24
+MinimumPasswordLength = 8
+[Privilege Rights]
+SeTrustedCredManAccessPrivilege =
+[Registry Values]
+MACHINE\\System\\CurrentControlSet\\Control\\Lsa\\LimitBlankPasswordUse=4,1
+'''
+
+REGISTRY = '''Windows Registry Editor Version 5.00
+
+[HKEY_LOCAL_MACHINE\\SYSTEM\\CurrentControlSet\\Services\\NetBT\\Parameters]
+"NodeType"=dword:00000002
+
+[HKEY_LOCAL_MACHINE\\SYSTEM\\CurrentControlSet\\Services\\Spooler]
+"Start"=dword:00000002
+'''
+
+AUDITPOL = '''Machine Name,Policy Target,Subcategory,Subcategory GUID,Inclusion Setting,Exclusion Setting,Setting Value
+WS01,System,Audit Credential Validation,{0cce923f-69ae-11d9-bed3-505054503030},Success and Failure,,3
+'''
+
+SERVICES = '''"Name","StartType","Status"
+"Spooler","Disabled","Stopped"
+'''
+
+
+def write_inputs(folder: Path) -> dict:
+    """One export of each kind, encoded as Windows writes them; kind -> [path]"""
+    files = {
+        "secedit": ("secpol.inf", SECEDIT.replace('\n', '\r\n').encode('utf-16')),
+        "registry": ("hklm.reg", REGISTRY.replace('\n', '\r\n').encode('utf-16')),
+        "auditpol": ("audit.csv", AUDITPOL.encode('utf-8')),
+        "services": ("services.csv", SERVICES.encode('utf-8')),
+    }
+    inputs = {}
+    for kind, (name, data) in files.items():
+        path = folder / name
+        path.write_bytes(data)
+        inputs[kind] = [path]
+    return inputs
+
+
+# Audit results of five hosts (write_fleet)
+
+CONTROLS = [("1.1.1", "L1"), ("2.3.7.4", "L1"), ("18.4.6", "L1"), ("18.9.3.1", "L2")]
+
+
+def host_results(host: str, failing: set) -> list:
+    """One result per control in CONTROLS, Non-Compliant for those in failing"""
+    return [CISResult(cis_id, f"Control {cis_id}", "1", "1",
+                      "Non-Compliant" if cis_id in failing else "Compliant",
+                      "Registry", profile=profile, audit_timestamp="2026-10-01 10:00:00",
+                      computer_name=host, user_name="auditor")
+            for cis_id, profile in CONTROLS]
+
+
+def write_fleet(folder: Path) -> list:
+    """Five host CSVs as Export-Csv writes them (one UTF-16, one with #TYPE)"""
+    failing = {"WS01": {"18.4.6"}, "WS02": {"18.4.6", "2.3.7.4"}, "WS03": set(),
+               "WS04": {"1.1.1"}, "WS05": {"18.9.3.1"}}
+    files = []
+    for host, fails in failing.items():
+        text = results_to_csv(host_results(host, fails))
+        if host == "WS04":
+            text = '#TYPE System.Management.Automation.PSCustomObject\r\n' + text
+        path = folder / f"{host}.csv"
+        path.write_bytes(text.encode('utf-16') if host == "WS02" else text.encode('utf-8'))
+        files.append(path)
+    return files
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Evaluate the catalog against a fleet of host snapshots on a process pool.
+
+Each host is a snapshot bundle (host_bundle.py) or a directory of loose
+exports (secedit .inf, .reg files, an auditpol backup CSV, a service dump).
+Hosts are spread across worker processes in small chunks; every worker
+loads and selects the catalog once, in its initializer, decides each
+chunk's predicates column-wise over the distinct values its hosts report
+(recommended_values.DecisionTable), and renders each host's results
+itself, so the parent only appends finished text to the output.
+
+- Streaming: results are written as each host finishes, and only a small
+  window of hosts is in flight, so memory does not grow with the fleet.
+- Resume: after each host the runner appends its path and the output
+  size to a journal (<output>.journal). --resume skips journaled hosts and
+  cuts the output back to the last journaled size, dropping the rows of a
+  host that was being written when the run stopped.
+- Throughput: progress and the final summary report hosts/sec.
+
+Usage:
+    python fleet_runner.py snapshots/ --output fleet.csv --workers 8
+    python fleet_runner.py snapshots/ --output fleet.csv --resume
+    python fleet_runner.py snapshots/ --output fleet.jsonl --format jsonl --profile L1
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from auditpol_backup import AuditPolicyBackup
+from cis_catalog import CatalogEntry, load_catalog
+from cis_results import PROFILES, CISResult, results_to_csv
+from host_bundle import BundleReader, Observed, decided_results, observe_bundle
+from recommended_values import DecisionTable
+from registry_snapshot import RegistrySnapshot
+from secedit_inf import SeceditExport
+from service_baseline import ServiceInventory
+
+BUNDLE_SUFFIX = ".cisb"
+JOURNAL_SUFFIX = ".journal"
+FORMATS = ("csv", "jsonl")
+
+# Hosts per worker task; a task decides its hosts' predicates together
+HOSTS_PER_TASK = 8
+# Tasks submitted per worker before the runner waits for one to finish
+WINDOW_PER_WORKER = 2
+
+
+def classify_export(path: Path) -> Optional[str]:
+    """The bundle member kind a loose export file would be."""
+    name, suffix = path.name.lower(), path.suffix.lower()
+    if suffix == ".inf":
+        return "secedit"
+    if suffix == ".reg":
+        return "registry"
+    if suffix == ".csv" and "audit" in name:
+        return "auditpol"
+    if suffix in (".csv", ".json") and "service" in name:
+        return "services"
+    return None
+
+
+class HostDirectory:
+    """A directory of one host's loose exports, read like a BundleReader"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.files: Dict[str, List[Path]] = {}
+        for file in sorted(self.path.iterdir()):
+            kind = classify_export(file) if file.is_file() else None
+            if kind:
+                self.files.setdefault(kind, []).append(file)
+
+    @property
+    def host(self) -> str:
+        return self.path.name
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "HostDirectory":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def secedit_export(self) -> Optional[SeceditExport]:
+        files = self.files.get("secedit")
+        return SeceditExport.from_file(files[0]) if files else None
+
+    def registry_snapshot(self, keep=None) -> Optional[RegistrySnapshot]:
+        files = self.files.get("registry")
+        if not files:
+            return None
+        snapshot = RegistrySnapshot(keep=keep)
+        for file in files:
+            snapshot.load(file)
+        return snapshot
+
+    def audit_policy(self) -> Optional[AuditPolicyBackup]:
+        files = self.files.get("auditpol")
+        return AuditPolicyBackup.from_file(files[0]) if files else None
+
+    def service_inventory(self) -> Optional[ServiceInventory]:
+        files = self.files.get("services")
+        return ServiceInventory.from_file(files[0]) if files else None
+
+
+def discover_hosts(paths: List[Path]) -> List[Path]:
+    """
+    Host snapshots under the given paths: .cisb bundles, and directories
+    holding loose exports. Sorted, so runs and resumes see the same order.
+    """
+    hosts = []
+    for path in paths:
+        if path.is_file():
+            hosts.append(path)
+            continue
+        for child in sorted(path.iterdir()):
+            if child.is_file() and child.suffix.lower() == BUNDLE_SUFFIX:
+                hosts.append(child)
+            elif child.is_dir() and any(classify_export(f) for f in child.iterdir()):
+                hosts.append(child)
+    return hosts
+
+
+def open_host(path: Path):
+    return HostDirectory(path) if path.is_dir() else BundleReader(path)
+
+
+def render_results(results: List[CISResult], output_format: str) -> str:
+    """Rows for the output file (CSV without header, or one JSON object per line)."""
+    if output_format == "jsonl":
+        return "".join(json.dumps(result.to_dict()) + "\n" for result in results)
+    return results_to_csv(results, header=False)
+
+
+@dataclass
+class HostOutcome:
+    """What a worker sends back for one host"""
+    path: str
+    host: str = ""
+    text: str = ""
+    results: int = 0
+    compliant: int = 0
+    error: str = ""
+    seconds: float = 0.0
+
+
+# Per-worker state, set once by the pool initializer
+_entries: List[CatalogEntry] = []
+_output_format = "csv"
+
+
+def init_worker(profile: Optional[str], sections: Optional[List[str]], output_format: str):
+    global _entries, _output_format
+    _entries = load_catalog().select(profile=profile, sections=sections)
+    _output_format = output_format
+
+
+def evaluate_hosts(paths: List[str]) -> List[HostOutcome]:
+    """
+    Evaluate a chunk of host snapshots (runs in a worker). Each host is
+    read on its own, then the chunk's predicates are decided together over
+    the distinct values its hosts report. A host that fails for any reason
+    is recorded as failed; the rest of the chunk and the run go on.
+    """
+    table = DecisionTable()
+    outcomes: List[HostOutcome] = []
+    observed: List[List[Observed]] = []
+    for path in paths:
+        started = time.perf_counter()
+        outcome = HostOutcome(path)
+        items: List[Observed] = []
+        try:
+            with open_host(Path(path)) as snapshot:
+                outcome.host = snapshot.host
+                items = observe_bundle(snapshot, _entries)
+        except Exception as e:
+            # Any parser failure (csv.Error on an oversized field, ...) fails this host only
+            outcome.error = f"{type(e).__name__}: {e}"
+        for item in items:
+            table.add(item.observation)
+        outcome.seconds = time.perf_counter() - started
+        outcomes.append(outcome)
+        observed.append(items)
+
+    table.decide()
+    for outcome, items in zip(outcomes, observed):
+        if outcome.error:
+            continue
+        started = time.perf_counter()
+        try:
+            results = decided_results(items, table)
+            outcome.text = render_results(results, _output_format)
+            outcome.results = len(results)
+            outcome.compliant = sum(result.is_compliant for result in results)
+        except Exception as e:
+            outcome.error = f"{type(e).__name__}: {e}"
+        outcome.seconds += time.perf_counter() - started
+    return outcomes
+
+
+def run_chunks(pool: ProcessPoolExecutor, task: Callable[[List[str]], List[HostOutcome]],
+               paths: List[str], workers: int) -> Iterator[HostOutcome]:
+    """
+    Run a worker function over hosts in chunks on a pool whose initializer
+    set up the worker, yielding each host's outcome as its chunk finishes.
+    Only a small window of chunks is in flight, so memory does not grow
+    with the fleet.
+    """
+    # Small chunks when the fleet is small, so every worker gets some
+    chunk = max(1, min(HOSTS_PER_TASK, len(paths) // workers))
+    queue = (paths[start:start + chunk] for start in range(0, len(paths), chunk))
+    in_flight: Set[Future] = set()
+    window = workers * WINDOW_PER_WORKER
+    while True:
+        for batch in queue:
+            in_flight.add(pool.submit(task, batch))
+            if len(in_flight) >= window:
+                break
+        if not in_flight:
+            return
+        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in finished:
+            yield from future.result()
+
+
+def read_journal(path: Path) -> Tuple[Set[str], int]:
+    """Hosts already written and the output size after the last of them."""
+    done: Set[str] = set()
+    size = 0
+    if not path.exists():
+        return done, size
+    for line in path.read_text(encoding='utf-8').splitlines():
+        offset, _, host_path = line.partition('\t')
+        if offset.isdigit() and host_path:
+            done.add(host_path)
+            size = int(offset)
+    return done, size
+
+
+@dataclass
+class FleetStats:
+    """Totals of one run"""
+    hosts: int = 0
+    skipped: int = 0
+    failed: int = 0
+    results: int = 0
+    compliant: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def hosts_per_second(self) -> float:
+        return self.hosts / self.elapsed if self.elapsed else 0.0
+
+    def describe(self) -> str:
+        return (f"{self.hosts} hosts evaluated ({self.failed} failed, {self.skipped} "
+                f"already done), {self.results} results in {self.elapsed:.1f}s "
+                f"({self.hosts_per_second:.1f} hosts/s)")
+
+
+class FleetRunner:
+    """Runs evaluate_host() over many hosts and appends results to one file"""
+
+    def __init__(self, output: Path, output_format: str = "csv",
+                 workers: Optional[int] = None, profile: Optional[str] = None,
+                 sections: Optional[List[str]] = None, resume: bool = False,
+                 progress: Optional[Callable[[FleetStats, int], None]] = None,
+                 progress_interval: float = 5.0):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}")
+        self.output = Path(output)
+        self.journal = self.output.with_name(self.output.name + JOURNAL_SUFFIX)
+        self.output_format = output_format
+        self.workers = workers or os.cpu_count() or 1
+        self.profile = profile
+        self.sections = sections
+        self.resume = resume
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.errors: List[Tuple[str, str]] = []
+
+    def _open_output(self) -> Tuple[Set[str], int]:
+        """Prepare output and journal; returns the hosts to skip and the output size."""
+        if not self.resume:
+            self.output.write_bytes(b"")
+            self.journal.write_bytes(b"")
+            return set(), 0
+        done, size = read_journal(self.journal)
+        if self.output.exists() and self.output.stat().st_size > size:
+            # Drop rows of a host that was being written when the run stopped
+            os.truncate(self.output, size)
+        elif not self.output.exists():
+            done, size = set(), 0
+            self.journal.write_bytes(b"")
+        return done, size
+
+    def run(self, hosts: List[Path]) -> FleetStats:
+        done, size = self._open_output()
+        pending = [str(host) for host in hosts if str(host) not in done]
+        stats = FleetStats(skipped=len(hosts) - len(pending))
+        total = len(pending)
+        started = last_report = time.perf_counter()
+
+        with open(self.output, 'a', encoding='utf-8', newline='') as output, \
+                open(self.journal, 'a', encoding='utf-8') as journal, \
+                ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                    initargs=(self.profile, self.sections, self.output_format)) as pool:
+            if size == 0 and self.output_format == "csv":
+                header = results_to_csv([])
+                output.write(header)
+                size += len(header.encode('utf-8'))
+            for outcome in run_chunks(pool, evaluate_hosts, pending, self.workers):
+                stats.hosts += 1
+                if outcome.error:
+                    stats.failed += 1
+                    self.errors.append((outcome.path, outcome.error))
+                else:
+                    output.write(outcome.text)
+                    output.flush()
+                    size += len(outcome.text.encode('utf-8'))
+                    stats.results += outcome.results
+                    stats.compliant += outcome.compliant
+                    journal.write(f"{size}\t{outcome.path}\n")
+                    journal.flush()
+                now = time.perf_counter()
+                stats.elapsed = now - started
+                if self.progress and now - last_report >= self.progress_interval:
+                    self.progress(stats, total)
+                    last_report = now
+
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Evaluate a fleet of host snapshots in parallel")
+    parser.add_argument("paths", nargs="+", type=Path,
+                        help="bundles, or directories of bundles / per-host export folders")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--section", action="append", dest="sections")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip hosts already in the journal and append to the output")
+    args = parser.parse_args()
+
+    hosts = discover_hosts(args.paths)
+    if not hosts:
+        print("No host snapshots found", file=sys.stderr)
+        return 1
+
+    def report(stats: FleetStats, total: int):
+        print(f"{stats.hosts}/{total} hosts, {stats.hosts_per_second:.1f} hosts/s",
+              file=sys.stderr)
+
+    runner = FleetRunner(args.output, args.format, args.workers, args.profile,
+                         args.sections, args.resume, progress=report)
+    stats = runner.run(hosts)
+    for path, error in runner.errors:
+        print(f"Failed: {path}: {error}", file=sys.stderr)
+    print(stats.describe())
+    print(f"Results written to: {args.output}")
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Streaming sketches for approximate fleet analytics.
+
+Dashboards over very large fleets need "roughly which controls fail most",
+"about how many hosts fail 18.9.3.1" and "the spread of lockout
+thresholds", not exact scans. Three mergeable sketches answer those from
+a fixed amount of memory, with known error bounds:
+
+    count-min     Non-Compliant results per control, plus a short list of
+                  heavy-hitter candidates for top-N. An estimate never
+                  undercounts, and overcounts by at most epsilon * N (N =
+                  results counted) with probability 1 - delta.
+    HyperLogLog   distinct failing hosts per control (and distinct hosts
+                  overall); relative standard error 1.04 / sqrt(2^precision).
+    DDSketch      quantiles of numeric CurrentValues per control; every
+                  quantile is within relative error alpha of a true value
+                  at that rank.
+
+A SketchSet holds all three for one period (a day, by AuditTimestamp).
+Sketch sets built on different ingestion shards merge exactly as if one
+shard had seen every row, so a week is the merge of its days. Queries
+merge the day files of a range one at a time, so a query uses the same
+memory for a year as for a day.
+
+Sketch file layout (<yyyy-mm-dd>.sketch):
+
+    header   12 bytes   magic b"CISSKCH\\0", version u16, flags u16
+    body                zlib-compressed sections, each: kind u8, key
+                        length u16, payload length u32, UTF-8 key, payload
+                        (kind 1 parameters and totals as JSON, 2 count-min,
+                        3 HyperLogLog, 4 DDSketch)
+
+The ingestion service (ingest_service.py --sketches DIR) updates the
+sketches as it commits batches; `build` backfills them from a result store,
+replacing each day it covers, so it can be re-run safely.
+
+Usage:
+    python fleet_sketches.py build fleet-store/ --sketches sketches/
+    python fleet_sketches.py top sketches/ --days 7 -n 20
+    python fleet_sketches.py hosts sketches/ 18.9.3.1 --days 30
+    python fleet_sketches.py quantiles sketches/ 1.2.2 --q 0.5 0.9 0.99
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import math
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from result_store import COLUMNS, ResultStore
+
+MAGIC = b"CISSKCH\x00"
+VERSION = 1
+HEADER = struct.Struct('<8sHH')
+SECTION = struct.Struct('<BHI')
+
+SKETCH_SUFFIX = ".sketch"
+
+META, COUNT_MIN, HYPERLOGLOG, DDSKETCH = 1, 2, 3, 4
+
+DEFAULT_EPSILON = 0.001
+DEFAULT_DELTA = 0.01
+DEFAULT_PRECISION = 11
+DEFAULT_ALPHA = 0.01
+CANDIDATES = 64
+
+NUMBER_PATTERN = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+CIS_ID, CURRENT_VALUE, STATUS, TIMESTAMP, HOST = (
+    COLUMNS.index(name) for name in
+    ("CIS_ID", "CurrentValue", "ComplianceStatus", "AuditTimestamp", "ComputerName"))
+
+
+class SketchFormatError(ValueError):
+    """The file is not a valid sketch set"""
+
+
+def hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@lru_cache(maxsize=8192)
+def _cells(key: str, width: int, depth: int) -> Tuple[int, ...]:
+    """Counter index per row for a key (double hashing from one 64-bit hash)."""
+    h = hash64(key)
+    low, high = h & 0xFFFFFFFF, (h >> 32) | 1
+    return tuple(row * width + (low + row * high) % width for row in range(depth))
+
+
+class CountMinSketch:
+    """Frequency estimates that overcount by at most epsilon * total w.p. 1 - delta"""
+
+    def __init__(self, width: int, depth: int):
+        self.width, self.depth = width, depth
+        self.total = 0
+        self.counts = array('Q', bytes(8 * width * depth))
+
+    @classmethod
+    def for_error(cls, epsilon: float = DEFAULT_EPSILON, delta: float = DEFAULT_DELTA) -> "CountMinSketch":
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    def add(self, key: str, count: int = 1):
+        counts = self.counts
+        for cell in _cells(key, self.width, self.depth):
+            counts[cell] += count
+        self.total += count
+
+    def estimate(self, key: str) -> int:
+        counts = self.counts
+        return min(counts[cell] for cell in _cells(key, self.width, self.depth))
+
+    @property
+    def error_bound(self) -> int:
+        return math.ceil(self.epsilon * self.total)
+
+    def merge(self, other: "CountMinSketch"):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("count-min sketches of different sizes do not merge")
+        counts = self.counts
+        for i, count in enumerate(other.counts):
+            if count:
+                counts[i] += count
+        self.total += other.total
+
+    def to_bytes(self) -> bytes:
+        counts = self.counts
+        if sys.byteorder != 'little':
+            counts = array('Q', counts)
+            counts.byteswap()
+        return struct.pack('<IIQ', self.width, self.depth, self.total) + counts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CountMinSketch":
+        width, depth, total = struct.unpack_from('<IIQ', data)
+        sketch = cls(width, depth)
+        sketch.total = total
+        sketch.counts = array('Q', data[16:])
+        if sys.byteorder != 'little':
+            sketch.counts.byteswap()
+        if len(sketch.counts) != width * depth:
+            raise SketchFormatError("count-min size does not match its counters")
+        return sketch
+
+
+class HyperLogLog:
+    """Distinct counts with relative standard error 1.04 / sqrt(2^precision)"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be 4..16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hash(self, h: int):
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, item: str):
+        self.add_hash(hash64(item))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)      # linear counting for small sets
+        return round(estimate)
+
+    def merge(self, other: "HyperLogLog"):
+        if self.precision != other.precision:
+            raise ValueError("HyperLogLogs of different precision do not merge")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        sketch = cls(data[0])
+        if len(data) - 1 != len(sketch.registers):
+            raise SketchFormatError("HyperLogLog register count does not match its precision")
+        sketch.registers = bytearray(data[1:])
+        return sketch
+
+
+class DDSketch:
+    """Quantiles within relative error alpha, from log-spaced buckets"""
+
+    MAX_BUCKETS = 2048
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _index(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        if value > 0:
+            store = self.positive
+        elif value < 0:
+            store = self.negative
+        else:
+            self.zeros += count
+            self.count += count
+            return
+        index = self._index(abs(value))
+        store[index] = store.get(index, 0) + count
+        self.count += count
+        if len(store) > self.MAX_BUCKETS:
+            self._collapse(store)
+
+    @staticmethod
+    def _collapse(store: Dict[int, int]):
+        """Fold the smallest-magnitude buckets together to bound memory."""
+        ordered = sorted(store)
+        excess = len(ordered) - DDSketch.MAX_BUCKETS
+        folded = sum(store.pop(index) for index in ordered[:excess + 1])
+        store[ordered[excess]] = store.get(ordered[excess], 0) + folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def merge(self, other: "DDSketch"):
+        if self.alpha != other.alpha:
+            raise ValueError("DDSketches of different accuracy do not merge")
+        for store, incoming in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in incoming.items():
+                store[index] = store.get(index, 0) + count
+            if len(store) > self.MAX_BUCKETS:
+                self._collapse(store)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def to_bytes(self) -> bytes:
+        parts = [struct.pack('<dQII', self.alpha, self.zeros, len(self.positive), len(self.negative))]
+        for store in (self.positive, self.negative):
+            parts += [struct.pack('<iQ', index, count) for index, count in sorted(store.items())]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DDSketch":
+        alpha, zeros, positive, negative = struct.unpack_from('<dQII', data)
+        sketch = cls(alpha)
+        sketch.zeros = zeros
+        buckets = list(struct.iter_unpack('<iQ', data[24:]))
+        if len(buckets) != positive + negative:
+            raise SketchFormatError("DDSketch bucket count does not match")
+        sketch.positive = dict(buckets[:positive])
+        sketch.negative = dict(buckets[positive:])
+        sketch.count = zeros + sum(count for _, count in buckets)
+        return sketch
+
+
+def as_number(value: str) -> Optional[float]:
+    text = value.strip().strip('"')
+    return float(text) if NUMBER_PATTERN.match(text) else None
+
+
+@dataclass
+class Estimate:
+    """An approximate answer and how far off it may be"""
+    key: str
+    value: float
+    error: float
+    bound: str
+
+
+class SketchSet:
+    """The sketches of one period; merges with sketch sets of other shards or periods"""
+
+    def __init__(self, epsilon: float = DEFAULT_EPSILON, delta: float = DEFAULT_DELTA,
+                 precision: int = DEFAULT_PRECISION, alpha: float = DEFAULT_ALPHA):
+        self.precision, self.alpha = precision, alpha
+        self.results = 0
+        self.failing = CountMinSketch.for_error(epsilon, delta)
+        self.candidates: Dict[str, int] = {}
+        self.hosts = HyperLogLog(precision)
+        self.failing_hosts: Dict[str, HyperLogLog] = {}
+        self.values: Dict[str, DDSketch] = {}
+
+    def _track(self, cis_id: str):
+        self.candidates[cis_id] = self.failing.estimate(cis_id)
+        if len(self.candidates) > 2 * CANDIDATES:
+            kept = sorted(self.candidates.items(), key=lambda item: -item[1])[:CANDIDATES]
+            self.candidates = dict(kept)
+
+    def add_rows(self, rows: Iterable[Sequence[str]]):
+        """Count result rows (in result_store.COLUMNS order)."""
+        host_hashes: Dict[str, int] = {}
+        for row in rows:
+            host = row[HOST].lower()
+            h = host_hashes.get(host)
+            if h is None:
+                h = host_hashes[host] = hash64(host)
+                self.hosts.add_hash(h)
+            cis_id = row[CIS_ID]
+            self.results += 1
+            if row[STATUS] == "Non-Compliant":
+                self.failing.add(cis_id)
+                self._track(cis_id)
+                hll = self.failing_hosts.get(cis_id)
+                if hll is None:
+                    hll = self.failing_hosts[cis_id] = HyperLogLog(self.precision)
+                hll.add_hash(h)
+            number = as_number(row[CURRENT_VALUE])
+            if number is not None:
+                sketch = self.values.get(cis_id)
+                if sketch is None:
+                    sketch = self.values[cis_id] = DDSketch(self.alpha)
+                sketch.add(number)
+
+    def merge(self, other: "SketchSet"):
+        self.results += other.results
+        self.failing.merge(other.failing)
+        self.hosts.merge(other.hosts)
+        for cis_id, hll in other.failing_hosts.items():
+            if cis_id in self.failing_hosts:
+                self.failing_hosts[cis_id].merge(hll)
+            else:
+                self.failing_hosts[cis_id] = HyperLogLog.from_bytes(hll.to_bytes())
+        for cis_id, sketch in other.values.items():
+            if cis_id in self.values:
+                self.values[cis_id].merge(sketch)
+            else:
+                self.values[cis_id] = DDSketch.from_bytes(sketch.to_bytes())
+        for cis_id in set(self.candidates) | set(other.candidates):
+            self._track(cis_id)
+
+    # Queries
+
+    def top_failing(self, n: int = 10) -> List[Estimate]:
+        """
+        Controls with the most Non-Compliant results (estimates never
+        undercount). Only the top CANDIDATES controls are tracked, so n may
+        not exceed it.
+        """
+        if not 1 <= n <= CANDIDATES:
+            raise ValueError(f"n must be between 1 and {CANDIDATES}")
+        bound = f"+{self.failing.error_bound} w.p. {1 - self.failing.delta:.0%}"
+        ranked = sorted(((self.failing.estimate(c), c) for c in self.candidates),
+                        key=lambda item: (-item[0], item[1]))
+        return [Estimate(cis_id, count, self.failing.error_bound, bound)
+                for count, cis_id in ranked[:n]]
+
+    def failing_host_count(self, cis_id: str) -> Estimate:
+        hll = self.failing_hosts.get(cis_id)
+        if hll is None:
+            return Estimate(cis_id, 0, 0, "exact")
+        count = hll.count()
+        return Estimate(cis_id, count, round(count * hll.standard_error, 1),
+                        f"±{hll.standard_error:.1%} (1 s.e.)")
+
+    def quantiles(self, cis_id: str, qs: Sequence[float]) -> List[Estimate]:
+        """Quantiles of a control's numeric CurrentValues (none if it has no numeric values)."""
+        sketch = self.values.get(cis_id)
+        if sketch is None:
+            return []
+        estimates = []
+        for q in qs:
+            value = sketch.quantile(q)
+            estimates.append(Estimate(f"q{q:g}", value, abs(value) * self.alpha,
+                                      f"±{self.alpha:.0%} relative"))
+        return estimates
+
+    # Persistence
+
+    def to_bytes(self) -> bytes:
+        meta = json.dumps({"precision": self.precision, "alpha": self.alpha,
+                           "results": self.results, "candidates": self.candidates})
+        sections = [(META, "", meta.encode('utf-8')), (COUNT_MIN, "", self.failing.to_bytes()),
+                    (HYPERLOGLOG, "", self.hosts.to_bytes())]
+        sections += [(HYPERLOGLOG, c, h.to_bytes()) for c, h in sorted(self.failing_hosts.items())]
+        sections += [(DDSKETCH, c, s.to_bytes()) for c, s in sorted(self.values.items())]
+        body = bytearray()
+        for kind, key, payload in sections:
+            encoded = key.encode('utf-8')
+            body += SECTION.pack(kind, len(encoded), len(payload)) + encoded + payload
+        return HEADER.pack(MAGIC, VERSION, 0) + zlib.compress(bytes(body), 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SketchSet":
+        try:
+            magic, version, _ = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise SketchFormatError("not a sketch set")
+            body = zlib.decompress(data[HEADER.size:])
+            sketches = cls.__new__(cls)
+            position = 0
+            sketches.failing_hosts, sketches.values = {}, {}
+            while position < len(body):
+                kind, key_length, length = SECTION.unpack_from(body, position)
+                position += SECTION.size + key_length + length
+                key = body[position - length - key_length:position - length].decode('utf-8')
+                payload = body[position - length:position]
+                if kind == META:
+                    meta = json.loads(payload)
+                    sketches.precision, sketches.alpha = meta["precision"], meta["alpha"]
+                    sketches.results, sketches.candidates = meta["results"], meta["candidates"]
+                elif kind == COUNT_MIN:
+                    sketches.failing = CountMinSketch.from_bytes(payload)
+                elif kind == HYPERLOGLOG and not key:
+                    sketches.hosts = HyperLogLog.from_bytes(payload)
+                elif kind == HYPERLOGLOG:
+                    sketches.failing_hosts[key] = HyperLogLog.from_bytes(payload)
+                elif kind == DDSKETCH:
+                    sketches.values[key] = DDSketch.from_bytes(payload)
+            if not all(hasattr(sketches, name) for name in ("precision", "failing", "hosts")):
+                raise SketchFormatError("missing parameters, count-min or HyperLogLog section")
+        except (struct.error, zlib.error, UnicodeDecodeError, ValueError, KeyError,
+                AttributeError, IndexError) as e:
+            if isinstance(e, SketchFormatError):
+                raise
+            raise SketchFormatError(f"corrupt sketch set ({e})") from None
+        return sketches
+
+
+class SketchStore:
+    """A directory of per-day sketch sets"""
+
+    def __init__(self, path: Union[str, Path], cache_days: int = 8, **parameters):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.parameters = parameters
+        self.cache_days = cache_days
+        self._open: "OrderedDict[str, SketchSet]" = OrderedDict()
+
+    def _file(self, day: str) -> Path:
+        return self.path / f"{day}{SKETCH_SUFFIX}"
+
+    def load(self, day: str) -> Optional[SketchSet]:
+        try:
+            data = self._file(day).read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            return SketchSet.from_bytes(data)
+        except SketchFormatError as e:
+            raise SketchFormatError(f"{self._file(day)}: {e}") from None
+
+    def _day(self, day: str) -> SketchSet:
+        if day in self._open:
+            self._open.move_to_end(day)
+        else:
+            self._open[day] = self.load(day) or SketchSet(**self.parameters)
+            while len(self._open) > self.cache_days:
+                self._open.popitem(last=False)
+        return self._open[day]
+
+    def _save(self, day: str, sketches: SketchSet):
+        temp = self._file(day).with_name(self._file(day).name + ".tmp")
+        temp.write_bytes(sketches.to_bytes())
+        temp.replace(self._file(day))
+
+    @staticmethod
+    def _by_day(rows: Iterable[Sequence[str]]) -> Dict[str, List[Sequence[str]]]:
+        by_day: Dict[str, List[Sequence[str]]] = {}
+        for row in rows:
+            day = row[TIMESTAMP][:10]
+            if len(day) == 10 and day[4] == '-' and day[7] == '-':
+                by_day.setdefault(day, []).append(row)
+        return by_day
+
+    def add_rows(self, rows: Iterable[Sequence[str]]) -> List[str]:
+        """
+        Fold new rows into their days' sketch sets and save those; returns the
+        days touched. Rows already sketched are counted again, so this is for
+        rows arriving once (as from the ingestion service); use rebuild() to
+        backfill.
+        """
+        by_day = self._by_day(rows)
+        for day, day_rows in sorted(by_day.items()):
+            sketches = self._day(day)
+            sketches.add_rows(day_rows)
+            self._save(day, sketches)
+        return sorted(by_day)
+
+    def rebuild(self, rows: Iterable[Sequence[str]], chunk_rows: int = 100_000) -> List[str]:
+        """
+        Replace the sketch set of every day the rows touch with one built from
+        those rows alone (idempotent, unlike add_rows); returns the days written.
+        At most cache_days days are held in memory: the least recently used is
+        written out, and read back if its rows turn up again.
+        """
+        rebuilt = set()
+        building: "OrderedDict[str, SketchSet]" = OrderedDict()
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            for day, day_rows in self._by_day(chunk).items():
+                sketches = building.pop(day, None)
+                if sketches is None:
+                    # The first rows of a day replace its file; later ones continue it
+                    sketches = self.load(day) if day in rebuilt else SketchSet(**self.parameters)
+                    rebuilt.add(day)
+                sketches.add_rows(day_rows)
+                building[day] = sketches
+                while len(building) > self.cache_days:
+                    self._save(*building.popitem(last=False))
+        for day, sketches in building.items():
+            self._save(day, sketches)
+        for day in rebuilt:
+            self._open.pop(day, None)
+        return sorted(rebuilt)
+
+    def days(self) -> List[str]:
+        return sorted(p.stem for p in self.path.glob(f"*{SKETCH_SUFFIX}"))
+
+    def merged(self, start: date, end: date) -> SketchSet:
+        """
+        The merge of the days in [start, end], one day file in memory at a
+        time. Raises ValueError if the days were sketched with different
+        parameters.
+        """
+        merged: Optional[SketchSet] = None
+        for day in self.days():
+            if start.isoformat() <= day <= end.isoformat():
+                sketches = self.load(day)
+                if merged is None:
+                    merged = sketches
+                    continue
+                try:
+                    merged.merge(sketches)
+                except ValueError as e:
+                    raise ValueError(f"{self._file(day)}: {e}") from None
+        return merged if merged is not None else SketchSet(**self.parameters)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Approximate fleet analytics from streaming sketches")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="backfill sketches from a result store")
+    build_parser.add_argument("store", type=Path)
+    build_parser.add_argument("--sketches", type=Path, required=True)
+
+    def add_query(name: str, help: str):
+        sub = commands.add_parser(name, help=help)
+        sub.add_argument("sketches", type=Path)
+        sub.add_argument("--days", type=int, default=7, help="days back from --end (default: 7)")
+        sub.add_argument("--end", type=date.fromisoformat, default=date.today(), help="last day (yyyy-mm-dd)")
+        sub.add_argument("--format", choices=["text", "csv", "json"], default="text")
+        sub.add_argument("--output", type=Path)
+        return sub
+
+    top_parser = add_query("top", "most frequently failing controls")
+    top_parser.add_argument("-n", type=int, default=10,
+                            help=f"controls to list, at most {CANDIDATES} (default: 10)")
+    hosts_parser = add_query("hosts", "distinct failing hosts per control")
+    hosts_parser.add_argument("cis_ids", nargs="+")
+    quantile_parser = add_query("quantiles", "quantiles of a control's numeric CurrentValue")
+    quantile_parser.add_argument("cis_id")
+    quantile_parser.add_argument("--q", type=float, nargs="+", default=[0.5, 0.9, 0.99])
+    args = parser.parse_args()
+    if args.command == "top" and not 1 <= args.n <= CANDIDATES:
+        parser.error(f"-n must be between 1 and {CANDIDATES}")
+
+    if args.command == "build":
+        store = SketchStore(args.sketches)
+        with ResultStore(args.store) as results:
+            days = store.rebuild(results.iter_rows())
+        print(f"Sketched {len(days)} days into {args.sketches}")
+        return 0
+
+    try:
+        sketches = SketchStore(args.sketches).merged(args.end - timedelta(days=args.days - 1), args.end)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.command == "top":
+        estimates = sketches.top_failing(args.n)
+    elif args.command == "hosts":
+        estimates = [sketches.failing_host_count(cis_id) for cis_id in args.cis_ids]
+    else:
+        estimates = sketches.quantiles(args.cis_id, args.q)
+
+    if args.format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(["Key", "Estimate", "Error", "Bound"])
+        writer.writerows([e.key, e.value, e.error, e.bound] for e in estimates)
+        output = buffer.getvalue()
+    elif args.format == "json":
+        output = json.dumps({"results": sketches.results, "hosts": sketches.hosts.count(),
+                             "estimates": [vars(e) for e in estimates]}, indent=2)
+    else:
+        lines = [f"{e.key:<12} {e.value:>12,.6g}  {e.bound}" for e in estimates]
+        lines.append(f"\n~{sketches.hosts.count():,} hosts, {sketches.results:,} results")
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Results written to: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for Group Policy report XML (Get-GPOReport -ReportType Xml).
+
+On domain members the audit scripts can only say "check your GPO"
+(Test-DomainMember, Get-DomainRemediationInstructions). This module reads
+the GPO report instead and evaluates the catalog recommendations the
+domain policy enforces, for one GPO or for several merged by precedence.
+
+Settings read from the report:
+
+- Security settings: account policies, user rights assignments, security
+  options (registry-backed and [System Access]) and system services
+- Advanced audit policy subcategories (by GUID)
+- Administrative templates (by policy name, category and state) and the
+  "Extra Registry Settings" the report lists by key path
+- Group Policy Preferences registry items
+
+The report is parsed with iterparse: each setting element is read when it
+closes and then dropped from the tree, so memory is bounded by the number
+of settings rather than by the report size (explain texts and
+-All reports of hundreds of GPOs run to hundreds of MB).
+
+A recommendation the evaluated GPOs do not configure is reported as
+Non-Compliant (unless its value may be absent): the domain does not
+enforce it, whatever the local policy currently says.
+
+Usage:
+    Get-GPOReport -All -ReportType Xml -Path gpos.xml       (on a DC)
+    python gpo_report.py gpos.xml --list
+    python gpo_report.py gpos.xml --gpo "CIS L1" --gpo "Default Domain Policy"
+"""
+
+import argparse
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union,
+)
+
+from auditpol_backup import SETTING_NAMES, evaluate_setting, subcategory_guid
+from cis_catalog import CatalogEntry, load_catalog, normalize_registry_path
+from cis_results import PROFILES, CISResult, output_results, status_for
+from recommended_values import (
+    WELL_KNOWN_SIDS, Value, as_int, combine_outcomes, evaluate_phrase,
+    evaluate_principals,
+)
+from secedit_inf import (
+    ACCOUNT_NAME_KEYS, SYSTEM_ACCESS_KEYS, UNLIMITED_KEYS, USER_RIGHTS,
+    default_account_name, display_principal, display_value, recommended_value,
+    setting_name,
+)
+from service_baseline import START_NAMES, parse_start, service_name, start_phrase
+
+SOURCE = "Group Policy"
+
+# Setting kinds, the first half of a setting key
+REGISTRY = "registry"
+SYSTEM_ACCESS = "system_access"
+PRIVILEGE = "privilege"
+AUDIT = "audit"
+SERVICE = "service"
+POLICY = "policy"
+
+# Report sections a setting can come from, and the hive their registry keys live in
+SCOPES = {"Computer": "HKLM", "User": "HKCU"}
+
+# Elements holding one setting each; everything inside them is read at once
+SETTING_ELEMENTS = {
+    "Account", "SecurityOptions", "UserRightsAssignment", "SystemServices",
+    "AuditSetting", "Policy", "RegistrySetting", "Registry",
+}
+
+# Children of an administrative template <Policy> that carry its options
+OPTION_ELEMENTS = {"DropDownList", "Numeric", "EditText", "CheckBox", "ListBox", "MultiText"}
+
+WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class GPOSetting:
+    """One configured setting, keyed the way the evaluator looks it up"""
+    kind: str
+    key: str
+    value: Value
+    display: str
+    scope: str = "Computer"
+    gpo: str = ""
+    # Administrative templates only: category path and (option, value) pairs
+    category: str = ""
+    options: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def lookup(self) -> Tuple[str, str]:
+        return self.kind, self.key
+
+
+@dataclass
+class GPO:
+    """The settings of one GPO in a report"""
+    name: str = ""
+    guid: str = ""
+    domain: str = ""
+    enabled: Dict[str, bool] = field(default_factory=lambda: dict.fromkeys(SCOPES, True))
+    settings: Dict[Tuple[str, str], GPOSetting] = field(default_factory=dict)
+
+    def add(self, setting: GPOSetting):
+        setting.gpo = self.name
+        self.settings[setting.lookup] = setting
+
+    def matches(self, wanted: Set[str]) -> bool:
+        return self.name.lower() in wanted or self.guid.lower() in wanted
+
+    def effective_settings(self) -> List[GPOSetting]:
+        """Settings of the sections (Computer/User) that are not disabled."""
+        return [s for s in self.settings.values() if self.enabled.get(s.scope, True)]
+
+
+def local_name(tag: str) -> str:
+    """"{http://www.microsoft.com/GroupPolicy/Settings}Name" -> "Name"."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child(elem: ET.Element, name: str) -> Optional[ET.Element]:
+    for child in elem:
+        if local_name(child.tag) == name:
+            return child
+    return None
+
+
+def _children(elem: ET.Element, name: str) -> List[ET.Element]:
+    return [child for child in elem if local_name(child.tag) == name]
+
+
+def _text(elem: ET.Element, name: str) -> Optional[str]:
+    child = _child(elem, name)
+    return (child.text or "").strip() if child is not None else None
+
+
+def _security_value(elem: ET.Element) -> Value:
+    """The value of an <Account> or <SecurityOptions> element."""
+    number = _text(elem, "SettingNumber")
+    if number is not None:
+        return as_int(number)
+    boolean = _text(elem, "SettingBoolean")
+    if boolean is not None:
+        return 1 if boolean.lower() == "true" else 0
+    strings = _child(elem, "SettingStrings")
+    if strings is not None:
+        return [(value.text or "").strip() for value in _children(strings, "Value")]
+    return _text(elem, "SettingString")
+
+
+def _principal(member: ET.Element) -> str:
+    """A <Member> as secedit would write it: *SID for well-known SIDs, else the name."""
+    sid = _text(member, "SID") or ""
+    name = _text(member, "Name") or ""
+    if sid and (sid.upper() in WELL_KNOWN_SIDS or not name):
+        return f"*{sid}"
+    return name
+
+
+def _option(elem: ET.Element) -> Tuple[str, str]:
+    """(name, value) of one administrative template option."""
+    name = _text(elem, "Name") or local_name(elem.tag)
+    value = _child(elem, "Value")
+    if value is None:
+        return name, _text(elem, "State") or ""
+    if _child(value, "Name") is not None:
+        return name, _text(value, "Name") or ""
+    return name, " ".join(text.strip() for text in value.itertext() if text.strip())
+
+
+def _registry_setting(scope: str, path: str, name: str, value: Value,
+                      display: str) -> GPOSetting:
+    normalized = normalize_registry_path(path)
+    return GPOSetting(REGISTRY, f"{normalized}:{name.lower()}", value, display, scope)
+
+
+def parse_setting(elem: ET.Element, scope: str) -> Optional[GPOSetting]:
+    """Turn one setting element of a report into a GPOSetting."""
+    kind = local_name(elem.tag)
+    hive = SCOPES[scope]
+
+    if kind == "Account":
+        name = _text(elem, "Name") or ""
+        return GPOSetting(SYSTEM_ACCESS, name.lower(), _security_value(elem),
+                          f"Account policy {name}", scope)
+
+    if kind == "SecurityOptions":
+        value = _security_value(elem)
+        key_name = _text(elem, "KeyName")
+        if key_name:
+            path, _, name = key_name.rpartition('\\')
+            return _registry_setting(scope, path, name, value, f"Security option {key_name}")
+        name = _text(elem, "SystemAccessPolicyName")
+        if name:
+            return GPOSetting(SYSTEM_ACCESS, name.lower(), value, f"Security option {name}", scope)
+        return None
+
+    if kind == "UserRightsAssignment":
+        name = _text(elem, "Name") or ""
+        principals = [_principal(member) for member in _children(elem, "Member")]
+        return GPOSetting(PRIVILEGE, name.lower(), [p for p in principals if p],
+                          f"User right {name}", scope)
+
+    if kind == "SystemServices":
+        name = _text(elem, "Name") or ""
+        return GPOSetting(SERVICE, name.lower(), parse_start(_text(elem, "StartupMode") or ""),
+                          f"System service {name}", scope)
+
+    if kind == "AuditSetting":
+        guid = (_text(elem, "SubcategoryGuid") or "").lower()
+        if not guid:
+            return None
+        return GPOSetting(AUDIT, guid, as_int(_text(elem, "SettingValue") or ""),
+                          f"Audit policy {_text(elem, 'SubcategoryName') or guid}", scope)
+
+    if kind == "Policy":
+        name = _text(elem, "Name") or ""
+        category = _text(elem, "Category") or ""
+        options = [_option(child) for child in elem if local_name(child.tag) in OPTION_ELEMENTS]
+        return GPOSetting(POLICY, f"{scope}\\{category}\\{name}".lower(),
+                          _text(elem, "State") or "", f"Policy {category}/{name}", scope,
+                          category=category, options=options)
+
+    if kind == "RegistrySetting":
+        # Extra Registry Settings: a key path relative to the section's hive
+        value = _child(elem, "Value")
+        if value is None:
+            return None
+        name = _text(value, "Name") or ""
+        number = _text(value, "Number")
+        data = as_int(number) if number is not None else _text(value, "String")
+        path = f"{hive}\\{_text(elem, 'KeyPath') or ''}"
+        return _registry_setting(scope, path, name, data, f"Registry setting {path}:{name}")
+
+    if kind == "Registry":
+        # Group Policy Preferences registry item
+        properties = _child(elem, "Properties")
+        if properties is None or properties.get("action", "U") == "D":
+            return None
+        path = f"{properties.get('hive', hive)}\\{properties.get('key', '')}"
+        name = properties.get("name", "")
+        data = properties.get("value", "")
+        if properties.get("type") in ("REG_DWORD", "REG_QWORD"):
+            data = int(data, 16) if data else 0
+        return _registry_setting(scope, path, name, data, f"Preference item {path}:{name}")
+
+    return None
+
+
+def iter_gpos(source: Union[str, Path, BinaryIO],
+              wanted: Optional[Iterable[str]] = None) -> Iterator[GPO]:
+    """
+    Stream the GPOs of a report (one <GPO> or a <report> of many).
+
+    With wanted= (GPO names or GUIDs) the settings of other GPOs are
+    skipped; they are still yielded, without settings, so callers can list them.
+    """
+    wanted_keys = {w.lower() for w in wanted} if wanted else None
+    if isinstance(source, Path):
+        source = str(source)
+    names: List[str] = []        # local names of the open elements
+    elements: List[ET.Element] = []
+    gpo: Optional[GPO] = None
+    skip = False
+    setting_depth = 0
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        name = local_name(elem.tag)
+        if event == "start":
+            names.append(name)
+            elements.append(elem)
+            if name == "GPO":
+                gpo, skip = GPO(), False
+            elif name in SETTING_ELEMENTS and not setting_depth and len(names) > 2:
+                setting_depth = len(names)
+            continue
+
+        depth = len(names)
+        names.pop()
+        elements.pop()
+        parent = names[-1] if names else ""
+
+        if name == "GPO" and gpo is not None:
+            yield gpo
+            gpo = None
+        elif gpo is not None and setting_depth == depth:
+            setting_depth = 0
+            scope = next((n for n in names if n in SCOPES), None)
+            if scope and not skip:
+                setting = parse_setting(elem, scope)
+                if setting is not None:
+                    gpo.add(setting)
+        elif gpo is not None and not setting_depth:
+            if parent == "GPO" and name == "Name":
+                gpo.name = (elem.text or "").strip()
+                skip = wanted_keys is not None and not gpo.matches(wanted_keys)
+            elif parent == "Identifier" and name == "Identifier":
+                gpo.guid = (elem.text or "").strip()
+            elif parent == "Identifier" and name == "Domain":
+                gpo.domain = (elem.text or "").strip()
+            elif parent in SCOPES and name == "Enabled":
+                gpo.enabled[parent] = (elem.text or "").strip().lower() != "false"
+
+        # Drop everything outside the setting being read
+        if not setting_depth and elements:
+            elem.clear()
+            elements[-1].remove(elem)
+
+
+def load_gpos(source: Union[str, Path, BinaryIO],
+              wanted: Optional[Iterable[str]] = None) -> List[GPO]:
+    return list(iter_gpos(source, wanted))
+
+
+def merge_gpos(gpos: List[GPO]) -> Dict[Tuple[str, str], GPOSetting]:
+    """
+    Resulting settings of GPOs listed highest precedence first (as the
+    Group Policy Inheritance tab shows them): a setting configured in
+    several GPOs comes from the first. User rights are not merged across
+    GPOs, so a higher GPO's assignment replaces the lower one's outright.
+    """
+    merged: Dict[Tuple[str, str], GPOSetting] = {}
+    for gpo in reversed(gpos):
+        for setting in gpo.effective_settings():
+            merged[setting.lookup] = setting
+    return merged
+
+
+def _compact(text: str) -> str:
+    return WHITESPACE.sub('', text).replace('/', '\\').lower()
+
+
+def evaluate_policy(phrase: str, state: str, options: List[Tuple[str, str]]) -> Optional[bool]:
+    """
+    Check an administrative template's state (and options) against a
+    recommendation phrase: "Enabled", "Disabled" or "Enabled: <option>".
+    """
+    head, _, detail = phrase.partition(':')
+    head = head.strip().lower()
+    if head not in ("enabled", "disabled"):
+        return None
+    if state.strip().lower() != head:
+        return False
+    detail = ' '.join(detail.split())
+    if not detail:
+        return True
+    outcomes = []
+    for _, value in options:
+        if value.strip().lower() == detail.lower():
+            return True
+        outcomes.append(evaluate_phrase(detail, value))
+    if True in outcomes:
+        return True
+    return False if False in outcomes else None
+
+
+class GPOEvaluator:
+    """Evaluates catalog recommendations against (merged) GPO settings"""
+
+    def __init__(self, settings: Dict[Tuple[str, str], GPOSetting],
+                 computer_name: Optional[str] = None):
+        self.settings = settings
+        self.computer_name = computer_name
+        self.policies: Dict[Tuple[str, str], List[GPOSetting]] = {}
+        for setting in settings.values():
+            if setting.kind == POLICY:
+                name = setting.key.rsplit('\\', 1)[-1]
+                self.policies.setdefault((setting.scope, name), []).append(setting)
+
+    def _result(self, entry: CatalogEntry, current: str, compliant: Optional[bool],
+                details: str) -> CISResult:
+        extra = {"computer_name": self.computer_name} if self.computer_name else {}
+        return CISResult(
+            cis_id=entry.cis_id,
+            title=entry.title,
+            current_value=current,
+            recommended_value=recommended_value(entry),
+            compliance_status=status_for(compliant),
+            source=SOURCE,
+            details=details,
+            profile=entry.profile,
+            **extra,
+        )
+
+    @staticmethod
+    def _describe(setting: GPOSetting) -> str:
+        return f"GPO: {setting.gpo}; {setting.display}"
+
+    def evaluate(self, entry: CatalogEntry) -> CISResult:
+        source = entry.data_source
+        if source == "auditpol":
+            return self._evaluate_audit(entry)
+        name = setting_name(entry).lower()
+        if source == "secedit" and name in SYSTEM_ACCESS_KEYS:
+            return self._evaluate_system_access(entry, SYSTEM_ACCESS_KEYS[name])
+        if source == "secedit" and name in USER_RIGHTS:
+            return self._evaluate_privilege(entry, USER_RIGHTS[name])
+        if entry.registry_locations:
+            return self._evaluate_registry(entry)
+        return self._result(entry, "N/A", None, "No Group Policy setting maps to this recommendation")
+
+    def evaluate_all(self, entries: Iterable[CatalogEntry]) -> List[CISResult]:
+        return [self.evaluate(entry) for entry in entries]
+
+    def _evaluate_audit(self, entry: CatalogEntry) -> CISResult:
+        guid = subcategory_guid(entry)
+        setting = self.settings.get((AUDIT, guid or ""))
+        if setting is None or setting.value is None:
+            return self._result(entry, "Not Configured", False,
+                                f"Subcategory GUID: {guid or 'unknown'} (not configured)")
+        return self._result(entry, SETTING_NAMES.get(setting.value, str(setting.value)),
+                            evaluate_setting(entry, setting.value), self._describe(setting))
+
+    def _evaluate_system_access(self, entry: CatalogEntry, key: str) -> CISResult:
+        setting = self.settings.get((SYSTEM_ACCESS, key.lower()))
+        if setting is None or setting.value is None:
+            return self._result(entry, "Not Configured", False, f"{key} is not defined")
+        details = self._describe(setting)
+        if key in ACCOUNT_NAME_KEYS:
+            value = str(setting.value)
+            compliant = bool(value) and value.lower() != default_account_name(entry).lower()
+            return self._result(entry, value, compliant, details)
+        number = as_int(setting.value)
+        if number == -1 and key in UNLIMITED_KEYS:
+            return self._result(entry, "-1 (never)",
+                                evaluate_phrase(entry.expected_value, sys.maxsize), details)
+        return self._result(entry, display_value(setting.value),
+                            evaluate_phrase(entry.expected_value, number), details)
+
+    def _evaluate_privilege(self, entry: CatalogEntry, constant: str) -> CISResult:
+        setting = self.settings.get((PRIVILEGE, constant.lower()))
+        if setting is None:
+            return self._result(entry, "Not Defined", False if entry.expected_value else None,
+                                f"{constant} is not defined")
+        principals = setting.value or []
+        current = ", ".join(display_principal(p) for p in principals) or "No One"
+        if not entry.expected_value:
+            return self._result(entry, current, None,
+                                f"{self._describe(setting)}: site-specific assignment, review manually")
+        compliant = evaluate_principals(entry.expected_value, principals,
+                                        inclusion=entry.expects_inclusion)
+        return self._result(entry, current, compliant, self._describe(setting))
+
+    def find_policy(self, entry: CatalogEntry) -> Optional[GPOSetting]:
+        """The administrative template a recommendation's GP path names."""
+        scope = "User" if entry.section == "19" else "Computer"
+        candidates = self.policies.get((scope, setting_name(entry).lower()), [])
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        procedure = _compact(entry.remediation_procedure)
+        for setting in candidates:
+            # key is scope\category\name; the procedure spells out category\name
+            if _compact(setting.key.split('\\', 1)[1]) in procedure:
+                return setting
+        return None
+
+    def _evaluate_registry(self, entry: CatalogEntry) -> CISResult:
+        found = [(location, self.settings.get((REGISTRY, f"{location.normalized_path}:"
+                                                         f"{location.value_name.lower()}")))
+                 for location in entry.registry_locations]
+        if not any(setting for _, setting in found):
+            service = service_name(entry) if entry.data_source == "service" else None
+            setting = self.settings.get((SERVICE, service.lower())) if service else None
+            if setting is not None and setting.value is not None:
+                return self._result(entry, START_NAMES.get(setting.value, str(setting.value)),
+                                    evaluate_phrase(start_phrase(entry), setting.value),
+                                    self._describe(setting))
+            policy = self.find_policy(entry)
+            if policy is not None:
+                current = str(policy.value)
+                if policy.options:
+                    current += ": " + ", ".join(value for _, value in policy.options)
+                return self._result(entry, current,
+                                    evaluate_policy(entry.expected_value, str(policy.value),
+                                                    policy.options),
+                                    self._describe(policy))
+
+        outcomes: List[Optional[bool]] = []
+        current = []
+        details = []
+        for location, setting in found:
+            value = setting.value if setting else None
+            outcomes.append(evaluate_phrase(entry.expected_data_for(location.value_name), value))
+            current.append(display_value(value))
+            details.append(self._describe(setting) if setting
+                           else f"{location.path}:{location.value_name} (not configured)")
+        return self._result(entry, "; ".join(current), combine_outcomes(outcomes),
+                            "; ".join(details))
+
+
+def evaluate_report(path: Union[str, Path], gpo_names: Optional[List[str]] = None,
+                    profile: Optional[str] = None,
+                    computer_name: Optional[str] = None) -> List[CISResult]:
+    """
+    Evaluate the catalog against the named GPOs of a report (highest
+    precedence first), or against its only GPO when none are named.
+    """
+    gpos = [gpo for gpo in load_gpos(path, gpo_names)
+            if not gpo_names or gpo.matches({n.lower() for n in gpo_names})]
+    if gpo_names:
+        order = {name.lower(): index for index, name in enumerate(gpo_names)}
+        gpos.sort(key=lambda g: order.get(g.name.lower(), order.get(g.guid.lower(), 0)))
+        missing = [n for n in gpo_names if not any(g.matches({n.lower()}) for g in gpos)]
+        if missing:
+            raise ValueError(f"GPO not found in report: {', '.join(missing)}")
+    elif len(gpos) != 1:
+        raise ValueError(f"Report contains {len(gpos)} GPOs; name the ones to evaluate")
+    evaluator = GPOEvaluator(merge_gpos(gpos), computer_name)
+    return evaluator.evaluate_all(load_catalog().select(profile=profile))
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Evaluate a Get-GPOReport XML export against the CIS catalog")
+    parser.add_argument("report", type=Path, help="Get-GPOReport -ReportType Xml output")
+    parser.add_argument("--gpo", action="append", dest="gpos", metavar="NAME",
+                        help="GPO name or GUID; repeat in precedence order, highest first")
+    parser.add_argument("--list", action="store_true", help="List the GPOs in the report")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--computer-name", help="ComputerName for the results (default: this host)")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.list:
+        for gpo in iter_gpos(args.report):
+            print(f"{gpo.guid:<40} {gpo.name} ({len(gpo.settings)} settings)")
+        return 0
+
+    started = time.perf_counter()
+    try:
+        results = evaluate_report(args.report, args.gpos, args.profile, args.computer_name)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    output_results(results, args.format, args.output, elapsed)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Per-host snapshot bundles: one file carrying every offline audit input.
+
+The offline evaluators each read their own file (secedit /export,
+reg export, auditpol /backup, a service dump). A bundle packs them for one
+host into a single archive with a table of contents, so snapshots can be
+moved as one file and an evaluator maps the bundle and reads only the
+members it needs.
+
+File layout (little-endian):
+
+    header   32 bytes   magic b"CISBNDL\\0", version u16, flags u16,
+                        member count u32, TOC offset u64, TOC length u64
+    members             each stored raw or zlib-compressed, 8-byte aligned
+    TOC                 per member a 32-byte record: name length u16,
+                        kind u8, compression u8, CRC-32 of the data u32,
+                        offset u64, stored length u64, size u64;
+                        followed by the UTF-8 name
+
+The TOC is written last, so the writer streams members straight to disk.
+Every bundle has a "manifest" member (JSON: host name, creation time and
+any extra metadata).
+
+Usage:
+    python host_bundle.py pack WS01.cisb --host WS01 --secedit secpol.inf \\
+        --registry hklm.reg --registry hkcu.reg --auditpol audit.csv --services services.csv
+    python host_bundle.py list WS01.cisb
+    python host_bundle.py validate bundles/*.cisb
+    python host_bundle.py evaluate WS01.cisb --format csv --output WS01.csv
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from auditpol_backup import AuditPolicyBackup, AuditPolicyEvaluator
+from cis_catalog import CatalogEntry, load_catalog
+from cis_results import PROFILES, CISResult, audit_timestamp, output_results
+from recommended_values import DecisionTable, Observation
+from registry_snapshot import RegistryEvaluator, RegistrySnapshot, catalog_key_paths
+from secedit_inf import SeceditEvaluator, SeceditExport, decode_inf
+from service_baseline import ServiceEvaluator, ServiceInventory, service_name
+
+MAGIC = b"CISBNDL\x00"
+VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')
+TOC_ENTRY = struct.Struct('<HBBIQQQ')
+ALIGNMENT = 8
+
+# Member kinds, by their code in the TOC
+KINDS = ("manifest", "secedit", "registry", "auditpol", "services")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+STORED = 0
+ZLIB = 1
+COMPRESSIONS = {STORED: "stored", ZLIB: "zlib"}
+
+MANIFEST = "manifest"
+
+
+class BundleFormatError(ValueError):
+    """The file is not a valid host bundle"""
+
+
+@dataclass(frozen=True)
+class Observed:
+    """A recommendation, the evaluator that read it and what it read"""
+    entry: CatalogEntry
+    evaluator: Any
+    observation: Observation
+
+
+@dataclass(frozen=True)
+class Member:
+    """One TOC record"""
+    name: str
+    kind: str
+    compression: int
+    crc: int
+    offset: int
+    stored_length: int
+    size: int
+
+
+def member_name(kind: str, path: Union[str, Path]) -> str:
+    """Default member name: "registry/hklm.reg" (the manifest is just "manifest")."""
+    return kind if kind == MANIFEST else f"{kind}/{Path(path).name}"
+
+
+class BundleWriter:
+    """
+    Writes a bundle member by member. The file is written under a temporary
+    name and renamed into place by close(), so readers never see half a bundle.
+    """
+
+    def __init__(self, path: Union[str, Path], host: str, compress: bool = True,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.host = host
+        self.compress = compress
+        self.metadata = dict(metadata or {})
+        self.members: List[Member] = []
+        self._temp = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._temp, 'wb')
+        self._file.write(b"\x00" * HEADER.size)
+
+    def add(self, kind: str, data: bytes, name: Optional[str] = None) -> Member:
+        """Append one member; name defaults to the kind."""
+        if kind not in KIND_CODES:
+            raise ValueError(f"Unknown member kind {kind!r}; expected one of {', '.join(KINDS)}")
+        name = name or kind
+        if any(member.name == name for member in self.members):
+            raise ValueError(f"Duplicate member {name!r}")
+        stored, compression = data, STORED
+        if self.compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                stored, compression = packed, ZLIB
+        offset = self._file.tell()
+        self._file.write(stored)
+        self._file.write(b"\x00" * (-len(stored) % ALIGNMENT))
+        member = Member(name, kind, compression, zlib.crc32(data), offset, len(stored), len(data))
+        self.members.append(member)
+        return member
+
+    def add_file(self, kind: str, path: Union[str, Path], name: Optional[str] = None) -> Member:
+        return self.add(kind, Path(path).read_bytes(), name or member_name(kind, path))
+
+    def close(self):
+        if self._file.closed:
+            return
+        manifest = {"host": self.host, "created": audit_timestamp(),
+                    "members": [member.name for member in self.members]}
+        manifest.update(self.metadata)
+        self.add(MANIFEST, json.dumps(manifest, indent=2).encode('utf-8'), MANIFEST)
+
+        toc = bytearray()
+        for member in self.members:
+            name = member.name.encode('utf-8')
+            toc += TOC_ENTRY.pack(len(name), KIND_CODES[member.kind], member.compression,
+                                  member.crc, member.offset, member.stored_length, member.size)
+            toc += name
+        toc_offset = self._file.tell()
+        self._file.write(toc)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, len(self.members), toc_offset, len(toc)))
+        self._file.close()
+        os.replace(self._temp, self.path)
+
+    def discard(self):
+        self._file.close()
+        self._temp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class BundleReader:
+    """
+    A bundle mapped into memory. Opening reads only the header and TOC;
+    member data is decompressed on demand.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if f.seek(0, 2) < HEADER.size:
+                raise BundleFormatError(f"{path} is too short to be a bundle")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.members = self._read_toc()
+        except BundleFormatError:
+            self._map.close()
+            raise
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    def _read_toc(self) -> Dict[str, Member]:
+        size = len(self._map)
+        magic, version, _, count, toc_offset, toc_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise BundleFormatError("Missing bundle signature")
+        if version != VERSION:
+            raise BundleFormatError(f"Unsupported bundle version {version}")
+        if toc_offset < HEADER.size or toc_offset + toc_length > size:
+            raise BundleFormatError("Table of contents lies outside the file")
+
+        members: Dict[str, Member] = {}
+        position, end = toc_offset, toc_offset + toc_length
+        for _ in range(count):
+            if position + TOC_ENTRY.size > end:
+                raise BundleFormatError("Truncated table of contents")
+            name_length, code, compression, crc, offset, stored, length = \
+                TOC_ENTRY.unpack_from(self._map, position)
+            position += TOC_ENTRY.size
+            name = self._map[position:position + name_length].decode('utf-8', errors='replace')
+            position += name_length
+            if code >= len(KINDS) or compression not in COMPRESSIONS:
+                raise BundleFormatError(f"Member {name!r} has unknown kind or compression")
+            if offset < HEADER.size or offset + stored > toc_offset:
+                raise BundleFormatError(f"Member {name!r} lies outside the data area")
+            if name in members:
+                raise BundleFormatError(f"Duplicate member {name!r}")
+            members[name] = Member(name, KINDS[code], compression, crc, offset, stored, length)
+        return members
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> "BundleReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def names(self, kind: Optional[str] = None) -> List[str]:
+        return [m.name for m in self.members.values() if kind is None or m.kind == kind]
+
+    def read(self, name: str, verify: bool = True) -> bytes:
+        """A member's data, decompressed and (by default) CRC-checked."""
+        member = self.members.get(name)
+        if member is None:
+            raise KeyError(f"No member {name!r} in {self.path}")
+        with memoryview(self._map)[member.offset:member.offset + member.stored_length] as stored:
+            try:
+                data = zlib.decompress(stored) if member.compression == ZLIB else bytes(stored)
+            except zlib.error as e:
+                raise BundleFormatError(f"Member {name!r} is corrupt ({e})") from None
+        if verify and (len(data) != member.size or zlib.crc32(data) != member.crc):
+            raise BundleFormatError(f"Member {name!r} is corrupt (size or CRC mismatch)")
+        return data
+
+    def text(self, name: str) -> str:
+        return decode_inf(self.read(name))
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            self._manifest = json.loads(self.read(MANIFEST)) if MANIFEST in self.members else {}
+        return self._manifest
+
+    @property
+    def host(self) -> str:
+        return self.manifest.get("host", "")
+
+    # Loaders for the offline evaluators; None when the bundle lacks the input
+
+    def secedit_export(self) -> Optional[SeceditExport]:
+        names = self.names("secedit")
+        return SeceditExport.from_text(self.text(names[0])) if names else None
+
+    def registry_snapshot(self, keep: Optional[Iterable[str]] = None) -> Optional[RegistrySnapshot]:
+        names = self.names("registry")
+        if not names:
+            return None
+        snapshot = RegistrySnapshot(keep=keep)
+        for name in names:
+            snapshot.load_lines(self.text(name).splitlines())
+        return snapshot
+
+    def audit_policy(self) -> Optional[AuditPolicyBackup]:
+        names = self.names("auditpol")
+        return AuditPolicyBackup.from_text(self.text(names[0])) if names else None
+
+    def service_inventory(self) -> Optional[ServiceInventory]:
+        names = self.names("services")
+        return ServiceInventory.from_text(self.text(names[0])) if names else None
+
+
+def validate_bundle(path: Union[str, Path], parse: bool = True) -> List[str]:
+    """
+    Problems with a bundle: format errors, corrupt members, a missing
+    manifest and (with parse=True) members their evaluator cannot read.
+    """
+    try:
+        reader = BundleReader(path)
+    except (OSError, BundleFormatError, struct.error) as e:
+        return [str(e)]
+    problems = []
+    with reader:
+        spans = sorted((m.offset, m.offset + m.stored_length, m.name) for m in reader.members.values())
+        for (_, end, name), (start, _, following) in zip(spans, spans[1:]):
+            if start < end:
+                problems.append(f"Members {name!r} and {following!r} overlap")
+        for name in reader.members:
+            try:
+                reader.read(name)
+            except (BundleFormatError, zlib.error) as e:
+                problems.append(f"{name}: {e}")
+        if problems:
+            return problems
+        if MANIFEST not in reader.members:
+            problems.append("No manifest member")
+        else:
+            try:
+                if not reader.host:
+                    problems.append("Manifest does not name the host")
+            except ValueError as e:
+                problems.append(f"{MANIFEST}: not valid JSON ({e})")
+        if parse:
+            loaders = (
+                ("secedit", reader.secedit_export, lambda export: len(export.sections)),
+                ("registry", reader.registry_snapshot, len),
+                ("auditpol", reader.audit_policy, lambda backup: len(backup.settings)),
+                ("services", reader.service_inventory, len),
+            )
+            for kind, loader, count in loaders:
+                try:
+                    loaded = loader()
+                except (ValueError, UnicodeDecodeError) as e:
+                    problems.append(f"{kind}: cannot parse ({e})")
+                    continue
+                if loaded is not None and not count(loaded):
+                    problems.append(f"{kind}: no settings found")
+    return problems
+
+
+def observe_bundle(reader: BundleReader, entries: Iterable[CatalogEntry],
+                   computer_name: Optional[str] = None) -> List[Observed]:
+    """
+    Read whatever the bundle holds for each recommendation: secedit for
+    sections 1/2, auditpol for 17, the service dump for 5 and the registry
+    export for everything else registry-backed. Recommendations the bundle
+    has no input for are left out. Nothing is decided yet, and the bundle
+    can be closed once this returns.
+    """
+    entries = list(entries)
+    computer_name = computer_name or reader.host or None
+    secedit = reader.secedit_export()
+    audit = reader.audit_policy()
+    services = reader.service_inventory()
+    registry = reader.registry_snapshot(keep=catalog_key_paths(entries))
+
+    evaluators = {
+        "secedit": SeceditEvaluator(secedit, computer_name) if secedit else None,
+        "auditpol": AuditPolicyEvaluator(audit, computer_name) if audit else None,
+        "services": ServiceEvaluator(services, computer_name) if services else None,
+        "registry": RegistryEvaluator(registry, computer_name) if registry else None,
+    }
+    observed = []
+    for entry in entries:
+        if entry.data_source == "auditpol":
+            evaluator = evaluators["auditpol"]
+        elif entry.section in ("1", "2") and evaluators["secedit"]:
+            evaluator = evaluators["secedit"]
+        elif service_name(entry) and evaluators["services"]:
+            evaluator = evaluators["services"]
+        elif entry.registry_locations:
+            evaluator = evaluators["registry"]
+        else:
+            evaluator = None
+        if evaluator is not None:
+            observed.append(Observed(entry, evaluator, evaluator.observe(entry)))
+    return observed
+
+
+def decided_results(observed: List[Observed], table: DecisionTable) -> List[CISResult]:
+    """Results of observe_bundle() once the table has decided them."""
+    return [item.evaluator.result(item.entry, item.observation, table.outcome(item.observation))
+            for item in observed]
+
+
+def evaluate_bundles(readers: Iterable[BundleReader],
+                     entries: Iterable[CatalogEntry]) -> List[List[CISResult]]:
+    """
+    Evaluate several bundles together, one result list per bundle. Every
+    predicate is decided once over the distinct values the bundles report.
+    """
+    entries = list(entries)
+    table = DecisionTable()
+    observed = []
+    for reader in readers:
+        observed.append(observe_bundle(reader, entries))
+        for item in observed[-1]:
+            table.add(item.observation)
+    table.decide()
+    return [decided_results(items, table) for items in observed]
+
+
+def evaluate_bundle(reader: BundleReader, entries: Iterable[CatalogEntry],
+                    computer_name: Optional[str] = None) -> List[CISResult]:
+    """Evaluate recommendations against one bundle (see observe_bundle())."""
+    observed = observe_bundle(reader, entries, computer_name)
+    table = DecisionTable()
+    for item in observed:
+        table.add(item.observation)
+    table.decide()
+    return decided_results(observed, table)
+
+
+def pack_bundle(path: Union[str, Path], host: str, inputs: Dict[str, List[Path]],
+                compress: bool = True) -> List[Member]:
+    """Write a bundle from {kind: [files]}."""
+    with BundleWriter(path, host, compress) as writer:
+        for kind, files in inputs.items():
+            for file in files:
+                writer.add_file(kind, file)
+        members = writer.members
+    return members
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Pack, inspect and evaluate per-host snapshot bundles")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = commands.add_parser("pack", help="bundle one host's exports")
+    pack_parser.add_argument("bundle", type=Path)
+    pack_parser.add_argument("--host", required=True)
+    pack_parser.add_argument("--secedit", type=Path, action="append", default=[])
+    pack_parser.add_argument("--registry", type=Path, action="append", default=[])
+    pack_parser.add_argument("--auditpol", type=Path, action="append", default=[])
+    pack_parser.add_argument("--services", type=Path, action="append", default=[])
+    pack_parser.add_argument("--no-compress", action="store_true")
+
+    list_parser = commands.add_parser("list", help="show the table of contents")
+    list_parser.add_argument("bundle", type=Path)
+
+    validate_parser = commands.add_parser("validate", help="check bundles")
+    validate_parser.add_argument("bundles", nargs="+", type=Path)
+    validate_parser.add_argument("--no-parse", action="store_true",
+                                 help="check structure and CRCs only")
+
+    evaluate_parser = commands.add_parser("evaluate", help="evaluate one bundle")
+    evaluate_parser.add_argument("bundle", type=Path)
+    evaluate_parser.add_argument("--profile", choices=PROFILES)
+    evaluate_parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    evaluate_parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        inputs = {kind: getattr(args, kind) for kind in KINDS[1:] if getattr(args, kind)}
+        started = time.perf_counter()
+        members = pack_bundle(args.bundle, args.host, inputs, not args.no_compress)
+        elapsed = time.perf_counter() - started
+        total = sum(m.size for m in members)
+        print(f"Wrote {len(members)} members ({total:,} bytes, "
+              f"{args.bundle.stat().st_size:,} on disk) to {args.bundle} ({elapsed:.3f}s)")
+        return 0
+
+    if args.command == "list":
+        with BundleReader(args.bundle) as reader:
+            print(f"Host: {reader.host}  Created: {reader.manifest.get('created', '')}")
+            for m in reader.members.values():
+                print(f"{m.name:<40} {m.kind:<10} {COMPRESSIONS[m.compression]:<7} "
+                      f"{m.size:>12,} {m.stored_length:>12,}")
+        return 0
+
+    if args.command == "validate":
+        failed = 0
+        for path in args.bundles:
+            problems = validate_bundle(path, parse=not args.no_parse)
+            status = "OK" if not problems else f"{len(problems)} problem(s)"
+            print(f"{path}: {status}")
+            for problem in problems:
+                print(f"  - {problem}")
+            failed += bool(problems)
+        return 1 if failed else 0
+
+    started = time.perf_counter()
+    with BundleReader(args.bundle) as reader:
+        results = evaluate_bundle(reader, load_catalog().select(profile=args.profile))
+    elapsed = time.perf_counter() - started
+
+    output_results(results, args.format, args.output, elapsed)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+Drop-folder ingestion service for audit and remediation exports.
+
+Hosts drop Export-CISAuditResults and Export-CISRemediationResults CSVs
+into a folder; this service picks them up and commits them into a result
+store (result_store.py): audit rows into the store's own segments,
+remediation rows into its remediation/ subdirectory.
+
+The service is one asyncio pipeline:
+
+    watcher ──queue──> parsers (N, on a process pool) ──queue──> committer
+
+  * The watcher finds files by inotify (Linux) or by polling the folder.
+    A polled file is taken once its size and mtime are unchanged between
+    two polls; with inotify a close-after-write or move-in is enough, and
+    a slower rescan still runs as a safety net (inotify does not see
+    writes made by other machines to a network share).
+  * Both queues are bounded, so when parsing or committing falls behind,
+    the stage before it waits instead of piling files up in memory.
+  * Files are deduplicated by SHA-256 of their content, so a host that
+    re-sends the same export is counted once.
+  * A parser process that dies (killed, out of memory) breaks the pool;
+    the pool is replaced and the file retried once before it is failed.
+  * The committer batches files into one segment per export kind. Each
+    batch is journaled (received.log: segment, kind, hash, file) before
+    its segments are synced and renamed into place; on start-up, journal
+    lines whose segment never appeared are ignored and that segment's
+    partial file is removed, so a crash mid-commit neither loses files nor
+    ingests them twice. Segment names are claimed with O_EXCL
+    (result_store.reserve_segment), so the bulk loader can write into the
+    same store at the same time.
+  * If a commit fails (disk full, ...), the service records the error and
+    stops instead of watching on while nothing is committed; the parsers
+    drop the files still queued, which stay in the drop folder.
+
+With --sketches, every committed batch of audit rows also updates the
+per-day fleet sketches (fleet_sketches.py).
+
+Committed files are moved to <drop>/processed/ (or deleted, or left in
+place), unreadable ones to <drop>/failed/ with a .error.txt beside them.
+
+Throughput and lag (time from a file's mtime to its commit) are printed
+every --report-interval seconds, and optionally written to a JSON file or
+served over HTTP (/metrics in Prometheus text format, anything else JSON).
+
+Usage:
+    python ingest_service.py \\\\share\\cis-drop fleet-store/ --concurrency 4 --metrics-port 9187
+    python ingest_service.py drop/ fleet-store/ --once
+"""
+
+import argparse
+import asyncio
+import csv
+import ctypes
+import hashlib
+import io
+import json
+import os
+import shutil
+import signal
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Set, Tuple, Union
+
+from fleet_sketches import SketchStore
+from result_store import (
+    COLUMNS, REMEDIATION_COLUMNS, SEGMENT_SUFFIX, SegmentWriter, export_rows, is_published,
+    reserve_segment,
+)
+from secedit_inf import decode_inf
+
+JOURNAL = "received.log"
+
+# Export kind -> (columns, required columns, store subdirectory)
+EXPORT_KINDS = {
+    "audit": (COLUMNS, ("CIS_ID", "ComplianceStatus"), ""),
+    "remediation": (REMEDIATION_COLUMNS, ("CIS_ID", "Status", "NewValue"), "remediation"),
+}
+
+WATCH_MODES = ("auto", "inotify", "poll")
+DONE_MODES = ("move", "delete", "keep")
+
+# Names hosts may use while a copy is in progress
+PARTIAL_PREFIXES = (".", "~")
+
+
+@dataclass
+class ParsedFile:
+    """A dropped file after parsing (in a worker process)"""
+    path: str
+    kind: str = ""
+    digest: str = ""
+    rows: List[List[str]] = field(default_factory=list)
+    size: int = 0
+    mtime: float = 0.0
+    error: str = ""
+
+
+def export_kind(data: bytes) -> str:
+    """"audit" or "remediation", from the header of an export."""
+    lines = decode_inf(data[:65536]).lstrip().splitlines()
+    if lines and lines[0].startswith("#TYPE"):
+        lines = lines[1:]
+    header = set(next(csv.reader(io.StringIO(lines[0])), [])) if lines else set()
+    for kind, (_, required, _) in EXPORT_KINDS.items():
+        if set(required) <= header:
+            return kind
+    raise ValueError("neither an audit nor a remediation results export")
+
+
+def parse_export(path: str) -> ParsedFile:
+    """Read, hash and parse one dropped file (runs in a worker)."""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    parsed = ParsedFile(path, digest=hashlib.sha256(data).hexdigest(), size=len(data),
+                        mtime=stat.st_mtime)
+    try:
+        parsed.kind = export_kind(data)
+        columns, required, _ = EXPORT_KINDS[parsed.kind]
+        parsed.rows = export_rows(data, columns, required, path)
+    except (ValueError, csv.Error) as e:
+        parsed.error = str(e)
+    return parsed
+
+
+class Inotify:
+    """inotify on one directory through libc, for close-after-write and move-in events"""
+
+    MASK = 0x00000008 | 0x00000080      # IN_CLOSE_WRITE | IN_MOVED_TO
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, folder: Path):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError("inotify is not available on this system") from None
+        self.fd = init(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if add_watch(self.fd, os.fsencode(str(folder)), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"cannot watch {folder}")
+
+    def read(self) -> List[str]:
+        """Names of files finished since the last read."""
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        names, position = [], 0
+        while position + self.EVENT.size <= len(data):
+            _, _, _, length = self.EVENT.unpack_from(data, position)
+            position += self.EVENT.size + length
+            name = data[position - length:position].rstrip(b"\x00")
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+@dataclass
+class Metrics:
+    """Counters, throughput and commit lag of a running service"""
+    started: float = field(default_factory=time.monotonic)
+    seen: int = 0
+    committed: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    rows: int = 0
+    bytes: int = 0
+    segments: int = 0
+    batches: int = 0
+    queued: int = 0
+    parsed_waiting: int = 0
+    lags: Deque[float] = field(default_factory=lambda: deque(maxlen=4096))
+
+    def lag(self, quantile: float) -> float:
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return round(ordered[min(len(ordered) - 1, int(quantile * len(ordered)))], 3)
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "files_seen": self.seen,
+            "files_committed": self.committed,
+            "files_duplicate": self.duplicates,
+            "files_failed": self.failed,
+            "rows_committed": self.rows,
+            "bytes_committed": self.bytes,
+            "segments_written": self.segments,
+            "batches_committed": self.batches,
+            "queue_depth": self.queued,
+            "parsed_waiting": self.parsed_waiting,
+            "files_per_second": round(self.committed / uptime, 2) if uptime else 0.0,
+            "rows_per_second": round(self.rows / uptime, 1) if uptime else 0.0,
+            "lag_p50_seconds": self.lag(0.5),
+            "lag_p95_seconds": self.lag(0.95),
+            "lag_max_seconds": round(max(self.lags), 3) if self.lags else 0.0,
+        }
+
+    def describe(self) -> str:
+        s = self.snapshot()
+        return (f"{s['files_committed']} files committed ({s['files_duplicate']} duplicate, "
+                f"{s['files_failed']} failed), {s['rows_committed']:,} rows, "
+                f"{s['files_per_second']} files/s, queue {s['queue_depth']}, "
+                f"lag p50 {s['lag_p50_seconds']}s p95 {s['lag_p95_seconds']}s")
+
+    def prometheus(self) -> str:
+        s = self.snapshot()
+        lines = []
+        for name, value in s.items():
+            metric = "cis_ingest_" + name
+            if name.endswith(("_seen", "_committed", "_duplicate", "_failed", "_written")):
+                metric, kind = metric + "_total", "counter"
+            else:
+                kind = "gauge"
+            lines += [f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class IngestService:
+    """Watches a drop folder and commits what arrives into a result store"""
+
+    def __init__(self, drop: Union[str, Path], store: Union[str, Path], concurrency: int = 4,
+                 queue_size: int = 64, batch_files: int = 256, batch_seconds: float = 2.0,
+                 watch: str = "auto", poll_interval: float = 2.0, rescan_interval: float = 30.0,
+                 done: str = "move", sketches: Optional[Union[str, Path]] = None):
+        if watch not in WATCH_MODES or done not in DONE_MODES:
+            raise ValueError(f"watch must be one of {WATCH_MODES}, done one of {DONE_MODES}")
+        self.drop = Path(drop)
+        self.store = Path(store)
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.batch_files = batch_files
+        self.batch_seconds = batch_seconds
+        self.watch = watch
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.done = done
+        self.sketches = SketchStore(sketches) if sketches else None
+        self.metrics = Metrics()
+        self.errors: List[Tuple[str, str]] = []
+        self.hashes: Set[str] = set()
+        self._numbers: Dict[str, int] = {}
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = asyncio.Event()
+        # Why the committer stopped the service, if it did
+        self.failure: Optional[str] = None
+        self._parsers_running = 0
+        self._recover()
+
+    # Store state
+
+    def _recover(self):
+        """
+        Load the content hashes of committed files from the journal, ignoring
+        entries whose segment never made it into place, and remove the partial
+        files of those segments. Temporary files the journal doesn't name
+        belong to some other writer and are left alone. Segment numbering
+        continues past every name the journal has used, so an orphaned entry
+        can never match a later segment.
+        """
+        for _, (_, _, subdir) in EXPORT_KINDS.items():
+            folder = self.store / subdir
+            folder.mkdir(parents=True, exist_ok=True)
+            self._numbers[subdir] = max((int(p.stem) for p in folder.glob(f"*{SEGMENT_SUFFIX}")
+                                         if p.stem.isdigit()), default=0)
+        journal = self.store / JOURNAL
+        if not journal.exists():
+            return
+        for line in journal.read_text(encoding='utf-8').splitlines():
+            parts = line.split('\t')
+            if len(parts) != 4:
+                continue
+            segment, kind, digest, _ = parts
+            if segment != "-":
+                subdir = EXPORT_KINDS.get(kind, (None, None, ""))[2]
+                stem = Path(segment).stem
+                if stem.isdigit():
+                    self._numbers[subdir] = max(self._numbers.get(subdir, 0), int(stem))
+                if not is_published(self.store / segment):
+                    # The empty claim stays, so the name is never reused
+                    partial = self.store / (segment + ".tmp")
+                    if partial.exists():
+                        partial.unlink()
+                    continue
+            self.hashes.add(digest)
+
+    def _write_batch(self, batch: List[ParsedFile]) -> int:
+        """Write one segment per kind in the batch; returns the segments written."""
+        writers, entries = [], []
+        for kind, (columns, _, subdir) in EXPORT_KINDS.items():
+            files = [parsed for parsed in batch if parsed.kind == kind]
+            if not files:
+                continue
+            path = reserve_segment(self.store / subdir, self._numbers[subdir])
+            self._numbers[subdir] = int(path.stem)
+            writer = SegmentWriter(path, columns)
+            for parsed in files:
+                for row in parsed.rows:
+                    writer.add(row)
+            segment = (Path(subdir) / path.name).as_posix() if writer.rows else "-"
+            entries += [f"{segment}\t{kind}\t{p.digest}\t{p.path}\n" for p in files]
+            if writer.rows:
+                writers.append(writer)
+            else:
+                path.unlink()
+        # Journal first: the segment rename below is the commit point
+        with open(self.store / JOURNAL, 'a', encoding='utf-8') as journal:
+            journal.writelines(entries)
+            journal.flush()
+            os.fsync(journal.fileno())
+        for writer in writers:
+            writer.close()
+        if self.sketches:
+            self.sketches.add_rows(row for parsed in batch if parsed.kind == "audit"
+                                   for row in parsed.rows)
+        return len(writers)
+
+    def _dispose(self, path: str, outcome: str, error: str = ""):
+        """Move, delete or keep a handled file; failed files always move aside."""
+        source = Path(path)
+        try:
+            if outcome == "failed":
+                target = self._unique(self.drop / "failed" / source.name)
+                shutil.move(str(source), target)
+                target.with_name(target.name + ".error.txt").write_text(error + "\n", encoding='utf-8')
+            elif self.done == "move":
+                shutil.move(str(source), self._unique(self.drop / "processed" / source.name))
+            elif self.done == "delete":
+                source.unlink()
+        except OSError as e:
+            self.errors.append((path, f"could not {self.done} file: {e}"))
+
+    @staticmethod
+    def _unique(target: Path) -> Path:
+        target.parent.mkdir(exist_ok=True)
+        number = 1
+        candidate = target
+        while candidate.exists():
+            candidate = target.with_name(f"{target.stem}.{number}{target.suffix}")
+            number += 1
+        return candidate
+
+    # Pipeline stages
+
+    def _candidates(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        try:
+            entries = list(os.scandir(self.drop))
+        except OSError as e:
+            self.errors.append((str(self.drop), str(e)))
+            return found
+        for entry in entries:
+            if entry.name.lower().endswith(".csv") and not entry.name.startswith(PARTIAL_PREFIXES) \
+                    and entry.is_file():
+                stat = entry.stat()
+                found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    async def _enqueue(self, path: str, key: Tuple[int, int], queue: asyncio.Queue):
+        if self._seen.get(path) == key:
+            return
+        self._seen[path] = key
+        self.metrics.seen += 1
+        await queue.put(path)       # waits while the parsers are behind
+        self.metrics.queued = queue.qsize()
+
+    async def _scan(self, queue: asyncio.Queue, settle: bool):
+        """Queue files present in the folder; with settle, only those unchanged since the last scan."""
+        found = self._candidates()
+        for path in list(self._seen):
+            if path not in found:
+                del self._seen[path]
+        ready = found if not settle else \
+            {path: key for path, key in found.items() if self._pending.get(path) == key}
+        self._pending = found
+        for path, key in sorted(ready.items()):
+            await self._enqueue(path, key, queue)
+
+    async def _watch(self, queue: asyncio.Queue, once: bool):
+        if once:
+            await self._scan(queue, settle=False)
+            return
+        inotify = None
+        if self.watch != "poll":
+            try:
+                inotify = Inotify(self.drop)
+            except OSError as e:
+                if self.watch == "inotify":
+                    raise
+                print(f"Polling {self.drop} ({e})", file=sys.stderr)
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        names: List[str] = []
+        if inotify:
+            loop.add_reader(inotify.fd, lambda: (names.extend(inotify.read()), wakeup.set()))
+        interval = self.rescan_interval if inotify else self.poll_interval
+        last_scan = 0.0
+        try:
+            while not self._stop.is_set():
+                while names:
+                    path = str(self.drop / names.pop(0))
+                    if path.lower().endswith(".csv") and not Path(path).name.startswith(PARTIAL_PREFIXES):
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        await self._enqueue(path, (stat.st_size, stat.st_mtime_ns), queue)
+                if time.monotonic() - last_scan >= interval:
+                    await self._scan(queue, settle=True)
+                    last_scan = time.monotonic()
+                wakeup.clear()
+                stop = asyncio.ensure_future(self._stop.wait())
+                event = asyncio.ensure_future(wakeup.wait())
+                await asyncio.wait([stop, event], timeout=min(interval, self.poll_interval),
+                                   return_when=asyncio.FIRST_COMPLETED)
+                for future in (stop, event):
+                    future.cancel()
+        finally:
+            if inotify:
+                loop.remove_reader(inotify.fd)
+                inotify.close()
+
+    async def _parse_file(self, path: str) -> ParsedFile:
+        """
+        Parse one file on the pool. A worker that dies breaks the whole pool
+        (every pending file fails with it), so the first parser to notice
+        replaces the pool and each affected file is retried once.
+        """
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            pool = self._pool
+            try:
+                return await loop.run_in_executor(pool, parse_export, path)
+            except BrokenProcessPool:
+                if self._pool is pool:
+                    pool.shutdown(wait=False)
+                    self._pool = ProcessPoolExecutor(self.concurrency)
+            except OSError as e:
+                return ParsedFile(path, error=str(e))
+        return ParsedFile(path, error="parser process exited while parsing the file")
+
+    async def _parse(self, queue: asyncio.Queue, parsed: asyncio.Queue):
+        while True:
+            path = await queue.get()
+            self.metrics.queued = queue.qsize()
+            if path is None:
+                await parsed.put(None)
+                return
+            if self.failure:
+                # Nothing will be committed; the file stays in the drop folder
+                continue
+            result = await self._parse_file(path)
+            await parsed.put(result)    # waits while the committer is behind
+            self.metrics.parsed_waiting = parsed.qsize()
+
+    async def _commit(self, parsed: asyncio.Queue):
+        """
+        Run the committer. If committing fails (a full or read-only store,
+        ...), record the error and stop the service, but keep draining the
+        parsed queue so no parser waits forever on it. Files not committed
+        stay in the drop folder; the journal makes the next start safe.
+        """
+        self._parsers_running = self.concurrency
+        try:
+            await self._commit_batches(parsed)
+        except Exception as e:
+            self.failure = f"{type(e).__name__}: {e}"
+            self.errors.append((str(self.store), f"commit failed, service stopped: {self.failure}"))
+            print(f"Error: commit failed, stopping: {self.failure}", file=sys.stderr)
+            self._stop.set()
+            while self._parsers_running:
+                if await parsed.get() is None:
+                    self._parsers_running -= 1
+
+    async def _commit_batches(self, parsed: asyncio.Queue):
+        """Deduplicate parsed files and commit them in batches, by size or by age."""
+        batch: List[ParsedFile] = []
+        batch_hashes: Set[str] = set()
+        deadline = 0.0
+        while self._parsers_running:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = await asyncio.wait_for(parsed.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush(batch)
+                batch, batch_hashes = [], set()
+                continue
+            self.metrics.parsed_waiting = parsed.qsize()
+            if item is None:
+                self._parsers_running -= 1
+            elif item.error:
+                self.metrics.failed += 1
+                self.errors.append((item.path, item.error))
+                self._dispose(item.path, "failed", item.error)
+            elif item.digest in self.hashes or item.digest in batch_hashes:
+                self.metrics.duplicates += 1
+                self._dispose(item.path, "duplicate")
+            else:
+                if not batch:
+                    deadline = time.monotonic() + self.batch_seconds
+                batch.append(item)
+                batch_hashes.add(item.digest)
+                if len(batch) >= self.batch_files:
+                    await self._flush(batch)
+                    batch, batch_hashes = [], set()
+        if batch:
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[ParsedFile]):
+        self.metrics.segments += await asyncio.to_thread(self._write_batch, batch)
+        self.metrics.batches += 1
+        now = time.time()
+        for parsed in batch:
+            self.hashes.add(parsed.digest)
+            self.metrics.committed += 1
+            self.metrics.rows += len(parsed.rows)
+            self.metrics.bytes += parsed.size
+            self.metrics.lags.append(max(0.0, now - parsed.mtime))
+            self._dispose(parsed.path, "committed")
+
+    async def _report(self, interval: float, metrics_file: Optional[Path]):
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            print(self.metrics.describe(), file=sys.stderr)
+            if metrics_file:
+                temp = metrics_file.with_name(metrics_file.name + ".tmp")
+                temp.write_text(json.dumps(self.metrics.snapshot(), indent=2), encoding='utf-8')
+                os.replace(temp, metrics_file)
+
+    async def _serve_metrics(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        request = (await reader.readline()).decode('latin-1').split()
+        if len(request) > 1 and request[1] == "/metrics":
+            body, content_type = self.metrics.prometheus(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(self.metrics.snapshot(), indent=2), "application/json"
+        payload = body.encode('utf-8')
+        writer.write(f"HTTP/1.0 200 OK\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(payload)}\r\n\r\n".encode('latin-1') + payload)
+        await writer.drain()
+        writer.close()
+
+    def stop(self):
+        self._stop.set()
+
+    async def run(self, once: bool = False, report_interval: float = 0.0,
+                  metrics_file: Optional[Path] = None, metrics_port: Optional[int] = None):
+        """Run until stop() (or, with once, until the files present now are committed)."""
+        self._stop = asyncio.Event()
+        self.drop.mkdir(parents=True, exist_ok=True)
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        parsed: asyncio.Queue = asyncio.Queue(self.concurrency * 2)
+        server = None
+        if metrics_port is not None:
+            server = await asyncio.start_server(self._serve_metrics, "127.0.0.1", metrics_port)
+        reporter = asyncio.ensure_future(self._report(report_interval, metrics_file)) \
+            if report_interval > 0 else None
+        self._pool = ProcessPoolExecutor(self.concurrency)
+        parsers = [asyncio.ensure_future(self._parse(queue, parsed))
+                   for _ in range(self.concurrency)]
+        committer = asyncio.ensure_future(self._commit(parsed))
+        try:
+            await self._watch(queue, once)
+        finally:
+            for _ in parsers:
+                await queue.put(None)
+            await asyncio.gather(*parsers)
+            await committer
+            self._stop.set()
+            if reporter:
+                await reporter
+            if server:
+                server.close()
+                await server.wait_closed()
+            self._pool.shutdown()
+            self._pool = None
+        return self.metrics
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Ingest audit/remediation exports dropped into a folder")
+    parser.add_argument("drop", type=Path, help="folder hosts drop CSV exports into")
+    parser.add_argument("store", type=Path, help="result store directory")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 4,
+                        help="files parsed at once (worker processes)")
+    parser.add_argument("--queue-size", type=int, default=64, help="files waiting to be parsed")
+    parser.add_argument("--batch-files", type=int, default=256, help="files per committed segment")
+    parser.add_argument("--batch-seconds", type=float, default=2.0,
+                        help="longest a parsed file waits for its batch")
+    parser.add_argument("--watch", choices=WATCH_MODES, default="auto")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--done", choices=DONE_MODES, default="move",
+                        help="what to do with committed files (default: move to processed/)")
+    parser.add_argument("--once", action="store_true", help="ingest what is there now and exit")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="seconds between metric lines")
+    parser.add_argument("--metrics-file", type=Path, help="JSON metrics rewritten every report")
+    parser.add_argument("--metrics-port", type=int, help="serve metrics on 127.0.0.1:PORT")
+    parser.add_argument("--sketches", type=Path,
+                        help="keep per-day fleet sketches of committed audit rows here")
+    args = parser.parse_args()
+
+    service = IngestService(args.drop, args.store, args.concurrency, args.queue_size,
+                            args.batch_files, args.batch_seconds, args.watch, args.poll_interval,
+                            done=args.done, sketches=args.sketches)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, service.stop)
+            except (NotImplementedError, RuntimeError):
+                pass            # Windows: Ctrl+C raises KeyboardInterrupt instead
+        return await service.run(args.once, 0 if args.once else args.report_interval,
+                                 args.metrics_file, args.metrics_port)
+
+    metrics = asyncio.run(run())
+    for file, error in service.errors:
+        print(f"Failed: {file}: {error}", file=sys.stderr)
+    print(metrics.describe())
+    return 1 if service.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
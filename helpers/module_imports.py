@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Module import slimming analyzer.
+
+Scripts import modules/ModuleIndex.psm1 (or a handful of modules) with
+-Force, which re-parses every module and its nested imports on each run.
+This tool builds a function -> module index and the module dependency graph
+from modules/*.psm1, works out which modules each script actually calls
+into, and can rewrite the import block of each script to load only those
+modules (with paths that resolve from the script's directory).
+
+Load work is measured as the number of module loads and bytes parsed when
+every Import-Module uses -Force, i.e. nested imports are re-run each time.
+
+Usage:
+    python helpers/module_imports.py [--format text|json] [--apply] [paths...]
+"""
+
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from cis_catalog import REPO_ROOT
+from ps_tokenizer import ParsedScript, parse_file, parse_source, string_value
+
+
+SCRIPTS_DIR = REPO_ROOT / "windows"
+MODULES_DIR = REPO_ROOT / "modules"
+INDEX_MODULE = "ModuleIndex"
+
+MODULE_FILE_PATTERN = re.compile(r'([A-Za-z0-9_]+)\.psm1', re.IGNORECASE)
+
+# Statements that make up a script's module import block
+IMPORT_LINE_PATTERN = re.compile(
+    r'^(?P<indent>[ \t]*)Import-Module\s+(?:-Name\s+)?'
+    r'(?P<target>"\$PSScriptRoot\\[^"]+?\.psm1"|\$PSScriptRoot\\\S+?\.psm1|\$modulePath)'
+    r'(?P<options>[^\r\n]*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+MODULE_PATH_ASSIGNMENT_PATTERN = re.compile(
+    r'^[ \t]*\$modulePath\s*=\s*Join-Path\s+\$PSScriptRoot\s+"([^"]+?\.psm1)"[ \t]*\r?\n',
+    re.IGNORECASE | re.MULTILINE
+)
+# Comment introducing the import block, e.g. "# Import the required modules using ModuleIndex"
+IMPORT_COMMENT_PATTERN = re.compile(
+    r'^(?P<indent>[ \t]*)#[ \t]*Import\b.*\n',
+    re.IGNORECASE | re.MULTILINE
+)
+IMPORT_COMMENT = "# Import the modules this script calls"
+
+
+@dataclass
+class ModuleInfo:
+    """Functions, exports and dependencies of one .psm1 module"""
+    name: str
+    path: str
+    size: int
+    functions: Set[str]
+    exports: Set[str]
+    imports: List[str]
+    calls: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class ScriptImports:
+    """Current and minimal module imports of one script"""
+    path: str
+    imported: List[str]
+    required: List[str]
+    called: Dict[str, List[str]]
+    current_cost: Tuple[int, int]
+    minimal_cost: Tuple[int, int]
+
+    @property
+    def missing(self) -> List[str]:
+        """Called modules the script does not import itself."""
+        if INDEX_MODULE in self.imported:
+            return []
+        return [name for name in self.required if name not in self.imported]
+
+    @property
+    def can_slim(self) -> bool:
+        return bool(self.imported) and bool(self.required) \
+            and self.minimal_cost < self.current_cost
+
+
+def referenced_modules(parsed: ParsedScript) -> List[str]:
+    """Modules named in Import-Module/Join-Path arguments, in order."""
+    modules = []
+    for command in parsed.find_commands("Import-Module", "Join-Path"):
+        for value in command.values():
+            for module in MODULE_FILE_PATTERN.findall(value):
+                if module not in modules:
+                    modules.append(module)
+    return modules
+
+
+def called_functions(parsed: ParsedScript) -> Set[str]:
+    """Lowercase names of commands invoked but not defined in the file."""
+    local = {name.lower() for name in parsed.function_definitions}
+    return {command.name.lower() for command in parsed.commands} - local
+
+
+def parse_module(path: Path) -> ModuleInfo:
+    parsed = parse_file(path)
+    exports = set()
+    for command in parsed.find_commands("Export-ModuleMember"):
+        functions = command.get("Function")
+        if isinstance(functions, str):
+            functions = [functions]
+        if isinstance(functions, list):
+            exports.update(f for f in functions if not f.startswith('$'))
+
+    # Direct Import-Module calls plus ModuleIndex's $modulesToImport list
+    imports = referenced_modules(parsed)
+    for token in parsed.strings:
+        for module in MODULE_FILE_PATTERN.findall(string_value(token)):
+            if module not in imports:
+                imports.append(module)
+    imports = [module for module in imports if module != path.stem]
+
+    functions = set(parsed.function_definitions)
+    return ModuleInfo(
+        name=path.stem,
+        path=path.relative_to(REPO_ROOT).as_posix(),
+        size=path.stat().st_size,
+        functions=functions,
+        exports=exports or functions,
+        imports=imports,
+        calls=called_functions(parsed),
+    )
+
+
+class ModuleGraph:
+    """Function -> module index plus the import and call graphs"""
+
+    def __init__(self, modules_dir: Path = MODULES_DIR):
+        self.modules: Dict[str, ModuleInfo] = {
+            path.stem: parse_module(path)
+            for path in sorted(modules_dir.glob("*.psm1"))
+        }
+        # ModuleIndex re-exports everything; map functions to their owner
+        self.function_index: Dict[str, str] = {}
+        for module in self.modules.values():
+            if module.name == INDEX_MODULE:
+                continue
+            for function in module.exports:
+                self.function_index.setdefault(function.lower(), module.name)
+        if INDEX_MODULE in self.modules:
+            for function in self.modules[INDEX_MODULE].exports:
+                self.function_index.setdefault(function.lower(), INDEX_MODULE)
+
+        self._load_cost: Dict[str, Tuple[int, int]] = {}
+
+    def call_graph(self) -> Dict[str, Dict[str, List[str]]]:
+        """module -> {called module: [functions]} for cross-module calls."""
+        graph = {}
+        for module in self.modules.values():
+            own = {f.lower() for f in module.functions}
+            edges: Dict[str, List[str]] = {}
+            for call in sorted(module.calls - own):
+                owner = self.function_index.get(call)
+                if owner and owner != module.name:
+                    edges.setdefault(owner, []).append(call)
+            graph[module.name] = edges
+        return graph
+
+    def undeclared_dependencies(self) -> Dict[str, List[str]]:
+        """Modules whose functions call into modules they don't import."""
+        result = {}
+        for name, edges in self.call_graph().items():
+            missing = sorted(set(edges) - set(self.closure([name])))
+            if missing:
+                result[name] = missing
+        return result
+
+    def closure(self, roots: Iterable[str]) -> List[str]:
+        """All modules loaded by importing roots (including the roots)."""
+        seen: List[str] = []
+        stack = list(roots)
+        while stack:
+            name = stack.pop()
+            if name in seen or name not in self.modules:
+                continue
+            seen.append(name)
+            stack.extend(self.modules[name].imports)
+        return seen
+
+    def load_cost(self, name: str) -> Tuple[int, int]:
+        """(module loads, bytes parsed) for one -Force import of a module."""
+        if name not in self._load_cost:
+            module = self.modules.get(name)
+            if module is None:
+                return (0, 0)
+            self._load_cost[name] = (0, 0)    # guards against import cycles
+            loads, size = 1, module.size
+            for dependency in module.imports:
+                dep_loads, dep_size = self.load_cost(dependency)
+                loads += dep_loads
+                size += dep_size
+            self._load_cost[name] = (loads, size)
+        return self._load_cost[name]
+
+    def import_cost(self, names: Iterable[str]) -> Tuple[int, int]:
+        costs = [self.load_cost(name) for name in names]
+        return (sum(c[0] for c in costs), sum(c[1] for c in costs))
+
+    def required_modules(self, parsed: ParsedScript) -> Dict[str, List[str]]:
+        """module -> functions the script calls from it."""
+        required: Dict[str, List[str]] = {}
+        for call in sorted(called_functions(parsed)):
+            owner = self.function_index.get(call)
+            if owner:
+                required.setdefault(owner, []).append(call)
+        return required
+
+    def order_modules(self, names: Iterable[str]) -> List[str]:
+        """Order modules dependencies-first, as ModuleIndex does."""
+        names = set(names)
+        ordered: List[str] = []
+
+        def visit(name):
+            if name in ordered:
+                return
+            for dependency in self.modules[name].imports:
+                if dependency in names:
+                    visit(dependency)
+            ordered.append(name)
+
+        for name in sorted(names):
+            visit(name)
+        return ordered
+
+
+def analyze_script(graph: ModuleGraph, path: Path) -> ScriptImports:
+    parsed = parse_file(path)
+    imported = referenced_modules(parsed)
+    called = graph.required_modules(parsed)
+    required = graph.order_modules(called)
+    return ScriptImports(
+        path=parsed.path,
+        imported=imported,
+        required=required,
+        called=called,
+        current_cost=graph.import_cost(imported),
+        minimal_cost=graph.import_cost(required),
+    )
+
+
+def modules_relative_path(script_path: Path, modules_dir: Path = MODULES_DIR) -> str:
+    """Backslash-separated path from the script's directory to modules/."""
+    relative = os.path.relpath(modules_dir, script_path.parent)
+    return relative.replace(os.sep, '\\')
+
+
+def rewrite_imports(content: str, script_path: Path, modules: List[str]) -> str:
+    """
+    Replace the script's module import block with one Import-Module per
+    required module. The first import keeps its position, indentation and
+    options (-Force, -WarningAction ...); the rest of the block is removed.
+    A comment line directly above the block, which may name the modules it
+    used to import, is replaced with a generic one.
+    """
+    # Only real Import-Module commands, not ones in comments or here-strings
+    offsets = {command.offset
+               for command in parse_source("", content).find_commands("Import-Module")}
+    matches = [match for match in IMPORT_LINE_PATTERN.finditer(content)
+               if match.start() + len(match.group("indent")) in offsets]
+    if not matches or not modules:
+        return content
+    first = matches[0]
+    relative = modules_relative_path(script_path)
+    indent = first.group("indent")
+    options = first.group("options").rstrip()
+    block = "\n".join(
+        f'{indent}Import-Module "$PSScriptRoot\\{relative}\\{module}.psm1"{options}'
+        for module in modules
+    )
+
+    result = []
+    position = 0
+    for index, match in enumerate(matches):
+        end = match.end()
+        # Drop the newline of removed lines so no blank lines are left behind
+        if index and content[end:end + 1] == '\n':
+            end += 1
+        result.append(content[position:match.start()])
+        result.append(block if index == 0 else "")
+        position = end
+    result.append(content[position:])
+    content = "".join(result)
+    if "$modulePath" not in content[content.find(block) + len(block):]:
+        content = MODULE_PATH_ASSIGNMENT_PATTERN.sub("", content)
+
+    start = content.find(block)
+    comments = list(IMPORT_COMMENT_PATTERN.finditer(content, 0, start))
+    if comments and comments[-1].end() == start:
+        comment = comments[-1]
+        content = (content[:comment.start()] + comment.group("indent")
+                   + IMPORT_COMMENT + "\n" + content[start:])
+    return content
+
+
+def find_scripts(paths: Iterable[Path]) -> List[Path]:
+    scripts = []
+    for path in paths:
+        path = path.resolve()
+        if path.is_dir():
+            scripts.extend(sorted(path.rglob("*.ps1")))
+        elif path.suffix.lower() == ".ps1":
+            scripts.append(path)
+    return scripts
+
+
+def analyze_tree(paths: Iterable[Path] = (SCRIPTS_DIR,),
+                 apply: bool = False) -> dict:
+    """Analyze (and optionally rewrite) every script under paths."""
+    graph = ModuleGraph()
+    scripts = []
+    rewritten = 0
+    for path in find_scripts(paths):
+        result = analyze_script(graph, path)
+        scripts.append(result)
+        if apply and result.can_slim:
+            content = path.read_text(encoding='utf-8-sig', errors='replace')
+            updated = rewrite_imports(content, path, result.required)
+            if updated != content:
+                path.write_text(updated, encoding='utf-8')
+                rewritten += 1
+
+    importing = [s for s in scripts if s.imported]
+    slimmable = [s for s in importing if s.can_slim]
+    current = [sum(s.current_cost[i] for s in importing) for i in (0, 1)]
+    minimal = [sum((s.minimal_cost if s.can_slim else s.current_cost)[i]
+                   for s in importing) for i in (0, 1)]
+
+    return {
+        "modules": {
+            name: {
+                "path": module.path,
+                "bytes": module.size,
+                "exports": sorted(module.exports),
+                "imports": module.imports,
+                "load_cost": graph.load_cost(name),
+            }
+            for name, module in graph.modules.items()
+        },
+        "call_graph": graph.call_graph(),
+        "undeclared_dependencies": graph.undeclared_dependencies(),
+        "scripts": [
+            {
+                "path": s.path,
+                "imported": s.imported,
+                "required": s.required,
+                "missing": s.missing,
+                "called": s.called,
+                "current_cost": s.current_cost,
+                "minimal_cost": s.minimal_cost,
+            }
+            for s in importing
+        ],
+        "stats": {
+            "scripts": len(scripts),
+            "importing_scripts": len(importing),
+            "slimmable_scripts": len(slimmable),
+            "unused_imports": sum(1 for s in importing if not s.required),
+            "missing_imports": sum(1 for s in importing if s.missing),
+            "rewritten": rewritten,
+            "module_loads_before": current[0],
+            "module_loads_after": minimal[0],
+            "bytes_parsed_before": current[1],
+            "bytes_parsed_after": minimal[1],
+        },
+    }
+
+
+def to_text(report: dict) -> str:
+    lines = ["Module load cost (-Force, nested imports included):"]
+    for name, module in report["modules"].items():
+        loads, size = module["load_cost"]
+        lines.append(f"  {name:<16} {loads:>2} loads {size:>8,} bytes  "
+                     f"imports: {', '.join(module['imports']) or '-'}")
+
+    lines.append("\nCross-module calls:")
+    for name, edges in report["call_graph"].items():
+        for target, functions in edges.items():
+            lines.append(f"  {name} -> {target}: {len(functions)} function(s)")
+    for name, missing in report["undeclared_dependencies"].items():
+        lines.append(f"  WARNING: {name} calls {', '.join(missing)} without importing it")
+
+    stats = report["stats"]
+    saved_loads = stats["module_loads_before"] - stats["module_loads_after"]
+    saved_bytes = stats["bytes_parsed_before"] - stats["bytes_parsed_after"]
+    lines.extend([
+        "",
+        f"Scripts analyzed: {stats['scripts']} "
+        f"({stats['importing_scripts']} import modules)",
+        f"Scripts that can import fewer modules: {stats['slimmable_scripts']}",
+        f"Scripts importing modules they never call: {stats['unused_imports']}",
+        f"Scripts calling modules they don't import: {stats['missing_imports']}",
+        f"Module loads: {stats['module_loads_before']:,} -> "
+        f"{stats['module_loads_after']:,} ({saved_loads:,} saved)",
+        f"Bytes parsed: {stats['bytes_parsed_before']:,} -> "
+        f"{stats['bytes_parsed_after']:,} ({saved_bytes:,} saved)",
+    ])
+    if stats["rewritten"]:
+        lines.append(f"Scripts rewritten: {stats['rewritten']}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Slim PowerShell module imports")
+    parser.add_argument("paths", nargs="*", type=Path, default=[SCRIPTS_DIR])
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--apply", action="store_true",
+                        help="Rewrite scripts to import only required modules")
+    args = parser.parse_args()
+
+    report = analyze_tree(args.paths, apply=args.apply)
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        print(to_text(report))
+
+
+if __name__ == "__main__":
+    main()
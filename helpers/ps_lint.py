@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Rule-based lint engine for the PowerShell scripts under windows/.
+
+Rules are registered with the @lint_rule decorator and applied to every .ps1
+file in the tree. Audit and remediation scripts (named
+"{cis_id}-{audit|remediate}-*.ps1") get the full CIS rule set; other scripts
+only get the rules that make sense for any script (module import paths).
+
+Rules work on the token stream from ps_tokenizer.py, so code in comments and
+here-strings doesn't trigger them. Files are scanned in parallel and results
+are cached by content hash in .cache/ps_lint.json, so a re-run over an
+unchanged tree only hashes files.
+
+Usage:
+    python helpers/ps_lint.py [--format text|json|junit] [--output FILE]
+                              [--rule RULE_ID ...] [--no-cache] [paths ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ps_tokenizer import COMMENT, KEYWORD, ParsedScript, default_cache, parse_source
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / "windows"
+MODULES_DIR = REPO_ROOT / "modules"
+CACHE_PATH = REPO_ROOT / ".cache" / "ps_lint.json"
+
+# Bump when rule behaviour changes so cached results are discarded
+RULESET_VERSION = 3
+
+# Rule selections whose results are kept in the cache at once
+CACHED_RULESETS = 4
+
+# Below this many uncached files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+# Pattern: {cis_id}-{audit|remediate}-*.ps1
+SCRIPT_NAME_PATTERN = re.compile(r'^(\d+(?:\.\d+)+)-(audit|remediate)-')
+
+
+@dataclass
+class LintFinding:
+    """A single rule violation in a script"""
+    rule_id: str
+    path: str
+    line: int
+    message: str
+
+
+@dataclass
+class ScriptContext:
+    """Everything a rule needs to know about the script being linted"""
+    path: str
+    content: str
+    cis_id: Optional[str] = None
+    kind: str = "other"
+
+    @property
+    def is_cis_script(self) -> bool:
+        return self.kind in ("audit", "remediation")
+
+    def line_of(self, offset: int) -> int:
+        """Convert a character offset into a 1-based line number."""
+        return self.content.count('\n', 0, offset) + 1
+
+    @property
+    def parsed(self) -> ParsedScript:
+        """Token stream of the script (shared token cache)."""
+        if not hasattr(self, "_parsed"):
+            self._parsed = parse_source(self.path, self.content)
+        return self._parsed
+
+
+@dataclass
+class LintRule:
+    """A registered lint rule"""
+    rule_id: str
+    description: str
+    check: Callable[[ScriptContext], Iterable[LintFinding]]
+    cis_only: bool = True
+
+
+RULES: Dict[str, LintRule] = {}
+
+
+def lint_rule(rule_id: str, description: str, cis_only: bool = True):
+    """Register a rule function in the RULES registry."""
+    def decorator(func):
+        RULES[rule_id] = LintRule(rule_id, description, func, cis_only)
+        return func
+    return decorator
+
+
+def build_context(path: str, content: str) -> ScriptContext:
+    """Create the rule context for a script, classifying it by filename."""
+    context = ScriptContext(path=path, content=content)
+    match = SCRIPT_NAME_PATTERN.match(PurePosixPath(path).name)
+    if match:
+        context.cis_id = match.group(1)
+        context.kind = "audit" if match.group(2) == "audit" else "remediation"
+    return context
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+HEADER_PATTERNS = [
+    # "# CIS Benchmark: 1.2.2 (L1) Ensure ..."
+    re.compile(r'^#\s*CIS Benchmark:\s*(\d+(?:\.\d+)+)', re.MULTILINE),
+    # ".NOTES ... CIS ID: 17.5.1" inside a comment-based help block
+    re.compile(r'^\s*CIS ID\s*:\s*(\d+(?:\.\d+)+)', re.MULTILINE),
+]
+
+
+@lint_rule("cis-header", "Script header names the CIS benchmark ID")
+def check_cis_header(context: ScriptContext) -> Iterable[LintFinding]:
+    header_ids = set()
+    for pattern in HEADER_PATTERNS:
+        header_ids.update(pattern.findall(context.content))
+
+    if not header_ids:
+        yield LintFinding("cis-header", context.path, 1,
+                          "Missing CIS Benchmark header")
+    elif context.cis_id not in header_ids:
+        yield LintFinding(
+            "cis-header", context.path, 1,
+            f"Header references {', '.join(sorted(header_ids))} "
+            f"but filename is {context.cis_id}"
+        )
+
+
+@lint_rule("cmdlet-binding", "Script declares [CmdletBinding()]")
+def check_cmdlet_binding(context: ScriptContext) -> Iterable[LintFinding]:
+    if not any(token.text.lower() == "cmdletbinding" and token.kind != COMMENT
+               for token in context.parsed.tokens):
+        yield LintFinding("cmdlet-binding", context.path, 1,
+                          "Missing [CmdletBinding()] attribute")
+
+
+def resolve_script_relative(script_path: str, relative: str) -> Path:
+    """Resolve a Windows-style path relative to the script's directory."""
+    script_dir = (REPO_ROOT / script_path).parent
+    parts = PureWindowsPath(relative).parts
+    return Path(os.path.normpath(script_dir.joinpath(*parts)))
+
+
+PSSCRIPTROOT_PREFIX = re.compile(r'^\$PSScriptRoot[\\/]', re.IGNORECASE)
+
+
+def module_references(parsed: ParsedScript) -> Iterable[tuple]:
+    """
+    Yield (line, path, relative) for every .psm1 path given to Import-Module
+    or Join-Path. relative is the part after $PSScriptRoot, or None when the
+    path is not built from $PSScriptRoot (so it depends on the caller's
+    working directory, or is damaged, e.g. "$..\\modules\\X.psm1").
+    """
+    for command in parsed.find_commands("Import-Module", "Join-Path"):
+        values = command.values()
+        for index, value in enumerate(values):
+            if not value.lower().endswith(".psm1"):
+                continue
+            prefix = PSSCRIPTROOT_PREFIX.match(value)
+            if prefix:
+                yield command.line, value, value[prefix.end():]
+            elif command.name.lower() == "join-path" and index:
+                parent = values[index - 1]
+                if parent.lower() == "$psscriptroot":
+                    yield command.line, value, value
+                elif not parent.startswith("$"):
+                    yield command.line, value, None
+                # else: relative to some other variable, which can't be checked here
+            else:
+                yield command.line, value, None
+
+
+def module_import_paths(parsed: ParsedScript) -> Iterable[tuple]:
+    """
+    Yield (line, relative path) for .psm1 paths built from $PSScriptRoot,
+    either inline ("$PSScriptRoot\\..\\X.psm1") or via Join-Path.
+    """
+    for line, _, relative in module_references(parsed):
+        if relative is not None:
+            yield line, relative
+
+
+@lint_rule("module-import-path", "Module imports resolve to existing files",
+           cis_only=False)
+def check_module_import_path(context: ScriptContext) -> Iterable[LintFinding]:
+    for line, path, relative in module_references(context.parsed):
+        if relative is None:
+            yield LintFinding(
+                "module-import-path", context.path, line,
+                f"Module path is not relative to $PSScriptRoot: {path}"
+            )
+        elif not resolve_script_relative(context.path, relative).is_file():
+            yield LintFinding(
+                "module-import-path", context.path, line,
+                f"Module path does not exist: {relative}"
+            )
+
+
+@lint_rule("admin-check", "Script checks for administrator rights")
+def check_admin_rights(context: ScriptContext) -> Iterable[LintFinding]:
+    if not context.parsed.find_commands("Test-AdminRights"):
+        yield LintFinding("admin-check", context.path, 1,
+                          "Missing Test-AdminRights check")
+
+
+@lint_rule("cis-id-match",
+           "Invoke-CISAudit/Invoke-CISRemediation is called with the filename's CIS_ID")
+def check_cis_id_match(context: ScriptContext) -> Iterable[LintFinding]:
+    command = ("Invoke-CISAudit" if context.kind == "audit"
+               else "Invoke-CISRemediation")
+    calls = [call for call in context.parsed.find_commands(command)
+             if call.get("CIS_ID") is not None]
+    if not calls:
+        yield LintFinding("cis-id-match", context.path, 1,
+                          f"No {command} call with -CIS_ID found")
+        return
+
+    for call in calls:
+        # $CIS_ID = "17.5.1" style indirection
+        value = context.parsed.resolve(call.get("CIS_ID"))
+        if value != context.cis_id:
+            yield LintFinding(
+                "cis-id-match", context.path, call.line,
+                f"{command} uses CIS_ID {value!r}, filename is {context.cis_id}"
+            )
+
+
+@lint_rule("error-handling", "Script body is wrapped in try/catch")
+def check_error_handling(context: ScriptContext) -> Iterable[LintFinding]:
+    if not any(token.kind == KEYWORD and token.text.lower() == "catch"
+               for token in context.parsed.tokens):
+        yield LintFinding("error-handling", context.path, 1,
+                          "Missing try/catch error handling")
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def applicable_rules(context: ScriptContext,
+                     rule_ids: Optional[List[str]] = None) -> List[LintRule]:
+    """Return the rules that apply to this script."""
+    selected = [RULES[rule_id] for rule_id in (rule_ids or RULES)]
+    return [rule for rule in selected
+            if context.is_cis_script or not rule.cis_only]
+
+
+def lint_source(path: str, content: str,
+                rule_ids: Optional[List[str]] = None) -> List[LintFinding]:
+    """Lint the content of a single script."""
+    context = build_context(path, content)
+    findings = []
+    for rule in applicable_rules(context, rule_ids):
+        findings.extend(rule.check(context))
+    return findings
+
+
+def _lint_worker(args) -> List[dict]:
+    """Process pool entry point (must be picklable, so module level)."""
+    path, content, rule_ids = args
+    return [asdict(finding) for finding in lint_source(path, content, rule_ids)]
+
+
+def ruleset_fingerprint(rule_ids: Optional[List[str]] = None) -> str:
+    """Fingerprint of everything besides file content that affects results."""
+    modules = sorted(p.name for p in MODULES_DIR.glob("*.psm1"))
+    payload = json.dumps([RULESET_VERSION, sorted(rule_ids or RULES), modules])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def repo_path(script: Path) -> str:
+    """Repository-relative POSIX path of a script (absolute if outside the repo)."""
+    resolved = script.resolve()
+    try:
+        return resolved.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def find_scripts(paths: Iterable[Path]) -> List[Path]:
+    """Collect .ps1 files from files and directories."""
+    scripts = []
+    for path in paths:
+        if path.is_dir():
+            scripts.extend(path.rglob("*.ps1"))
+        elif path.suffix.lower() == ".ps1":
+            scripts.append(path)
+    return sorted(set(scripts))
+
+
+def read_cache() -> Dict[str, Dict[str, dict]]:
+    """Cached entries per ruleset fingerprint."""
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    rulesets = cache.get("rulesets") if isinstance(cache, dict) else None
+    return rulesets if isinstance(rulesets, dict) else {}
+
+
+def load_cache(fingerprint: str) -> Dict[str, dict]:
+    """Load cached results for this ruleset (empty if it has none)."""
+    return read_cache().get(fingerprint, {})
+
+
+def save_cache(fingerprint: str, entries: Dict[str, dict]):
+    """
+    Merge entries into the cache for this ruleset, dropping files that no
+    longer exist, and keep the last few rulesets (so --rule runs don't evict
+    the full one). Written atomically so an interrupted run can't corrupt it.
+    """
+    rulesets = read_cache()
+    merged = rulesets.pop(fingerprint, {})
+    merged.update(entries)
+    rulesets[fingerprint] = {path: entry for path, entry in merged.items()
+                             if (REPO_ROOT / path).is_file()}
+    while len(rulesets) > CACHED_RULESETS:
+        del rulesets[next(iter(rulesets))]
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"rulesets": rulesets}, f)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def lint_tree(paths: Iterable[Path], rule_ids: Optional[List[str]] = None,
+              use_cache: bool = True, jobs: Optional[int] = None) -> dict:
+    """
+    Lint every script under the given paths.
+    Returns a report dict with per-file findings and run statistics.
+    """
+    start = time.perf_counter()
+    fingerprint = ruleset_fingerprint(rule_ids)
+    cached = load_cache(fingerprint) if use_cache else {}
+
+    results: Dict[str, List[dict]] = {}
+    pending = []
+
+    for script in find_scripts(paths):
+        rel_path = repo_path(script)
+        data = script.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = cached.get(rel_path)
+        if entry and entry["sha256"] == digest:
+            results[rel_path] = entry["findings"]
+        else:
+            content = data.decode('utf-8-sig', errors='replace')
+            pending.append((rel_path, digest, content))
+
+    work = [(rel_path, content, rule_ids) for rel_path, _, content in pending]
+    if len(work) >= PARALLEL_THRESHOLD and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunksize = max(1, len(work) // ((jobs or os.cpu_count() or 1) * 4))
+            outputs = list(executor.map(_lint_worker, work, chunksize=chunksize))
+    else:
+        outputs = [_lint_worker(item) for item in work]
+
+    entries: Dict[str, dict] = {}
+    for (rel_path, digest, _), findings in zip(pending, outputs):
+        results[rel_path] = findings
+        entries[rel_path] = {"sha256": digest, "findings": findings}
+
+    if use_cache and entries:
+        save_cache(fingerprint, entries)
+        default_cache().prune()     # token streams of the replaced versions
+
+    return {
+        "files": dict(sorted(results.items())),
+        "rules": {rule_id: RULES[rule_id].description
+                  for rule_id in (rule_ids or RULES)},
+        "stats": {
+            "files_scanned": len(results),
+            "files_checked": len(pending),
+            "files_cached": len(results) - len(pending),
+            "findings": sum(len(f) for f in results.values()),
+            "elapsed_seconds": round(time.perf_counter() - start, 4),
+        },
+    }
+
+
+def to_junit(report: dict) -> str:
+    """Render a report as JUnit XML: one testcase per file and rule."""
+    suite = ET.Element("testsuite", name="ps-lint")
+    tests = failures = 0
+    for path, findings in report["files"].items():
+        context = build_context(path, "")
+        by_rule: Dict[str, List[dict]] = {}
+        for finding in findings:
+            by_rule.setdefault(finding["rule_id"], []).append(finding)
+        for rule in applicable_rules(context, list(report["rules"])):
+            tests += 1
+            case = ET.SubElement(suite, "testcase",
+                                 classname=PurePosixPath(path).parent.as_posix(),
+                                 name=f"{PurePosixPath(path).name}::{rule.rule_id}")
+            if rule.rule_id in by_rule:
+                failures += 1
+                failure = ET.SubElement(case, "failure",
+                                        message=by_rule[rule.rule_id][0]["message"])
+                failure.text = "\n".join(
+                    f"line {f['line']}: {f['message']}" for f in by_rule[rule.rule_id]
+                )
+    suite.set("tests", str(tests))
+    suite.set("failures", str(failures))
+    suite.set("time", str(report["stats"]["elapsed_seconds"]))
+    return ET.tostring(suite, encoding="unicode")
+
+
+def to_text(report: dict) -> str:
+    """Render a report as human-readable text."""
+    lines = []
+    for path, findings in report["files"].items():
+        for finding in findings:
+            lines.append(f"{path}:{finding['line']}: "
+                         f"[{finding['rule_id']}] {finding['message']}")
+    stats = report["stats"]
+    lines.append(
+        f"\n{stats['findings']} findings in {stats['files_scanned']} files "
+        f"({stats['files_checked']} checked, {stats['files_cached']} cached) "
+        f"in {stats['elapsed_seconds']:.3f}s"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, default=[SCRIPTS_DIR])
+    parser.add_argument("--format", choices=["text", "json", "junit"],
+                        default="text")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--rule", action="append", choices=sorted(RULES),
+                        dest="rules", help="Only run the given rule(s)")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--jobs", type=int)
+    args = parser.parse_args()
+
+    report = lint_tree(args.paths, args.rules, not args.no_cache, args.jobs)
+
+    if args.format == "json":
+        output = json.dumps(report, indent=2)
+    elif args.format == "junit":
+        output = to_junit(report)
+    else:
+        output = to_text(report)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8')
+        print(f"Lint report written to: {args.output}")
+    else:
+        print(output)
+
+    return 1 if report["stats"]["findings"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,817 @@
+#!/usr/bin/env python3
+"""
+Tokenizer for the subset of PowerShell used by the scripts in this repo.
+
+Produces a flat token stream (commands, parameters, strings, here-strings,
+comments, variables, function definitions, ...) and a command view on top of
+it, so tools can ask "what does Import-Module get passed" without regexes
+that misfire on comments and here-strings.
+
+Token streams are cached on disk by content hash under .cache/ps_tokens/, so
+the linter, codemods and cross-checks share a single parse per file version.
+TokenCache.prune() drops the streams of file versions no longer in the tree;
+the linter calls it whenever it finds changed scripts.
+
+Usage:
+    python helpers/ps_tokenizer.py [--no-cache] [paths ...]   # throughput
+"""
+
+import argparse
+import hashlib
+import shutil
+import os
+import marshal
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from cis_catalog import REPO_ROOT
+
+
+SCRIPTS_DIR = REPO_ROOT / "windows"
+SOURCE_DIRS = (SCRIPTS_DIR, REPO_ROOT / "modules")
+CACHE_DIR = REPO_ROOT / ".cache" / "ps_tokens"
+
+# Bump when token kinds or boundaries change so cached streams are discarded
+TOKENIZER_VERSION = 1
+
+# Token streams kept in memory per cache (least recently used go first);
+# enough for every script and module in the tree
+MEMORY_ENTRIES = 1024
+
+# Token kinds
+COMMENT = "comment"
+STRING = "string"
+HERESTRING = "herestring"
+VARIABLE = "variable"
+PARAMETER = "parameter"
+OPERATOR = "operator"
+NUMBER = "number"
+WORD = "word"
+COMMAND = "command"
+KEYWORD = "keyword"
+FUNCTION = "function"
+PUNCT = "punct"
+NEWLINE = "newline"
+
+KEYWORDS = {
+    "begin", "break", "catch", "class", "continue", "data", "default", "do",
+    "dynamicparam", "else", "elseif", "end", "enum", "exit", "filter",
+    "finally", "for", "foreach", "function", "if", "param", "process",
+    "return", "switch", "throw", "trap", "try", "until", "while",
+}
+
+# Dash-prefixed words that are operators rather than parameters
+OPERATORS = {
+    "-and", "-or", "-xor", "-not", "-band", "-bor", "-bxor", "-bnot",
+    "-shl", "-shr", "-eq", "-ne", "-gt", "-ge", "-lt", "-le", "-like",
+    "-notlike", "-match", "-notmatch", "-replace", "-contains",
+    "-notcontains", "-in", "-notin", "-split", "-join", "-is", "-isnot",
+    "-as", "-f", "-ceq", "-cne", "-clike", "-cmatch", "-creplace",
+    "-ieq", "-ine", "-ilike", "-imatch", "-ireplace", "-csplit", "-isplit",
+}
+
+DOUBLE_QUOTES = '"“”„'
+SINGLE_QUOTES = "'‘’‚‛"
+
+# Characters that end a bareword
+WORD_PATTERN = re.compile(r'[^\s(){}\[\];,|&"\'`=$@#<>“”„‘’]+')
+NUMBER_PATTERN = re.compile(
+    r'(?:0x[0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)(?:kb|mb|gb|tb|pb)?',
+    re.IGNORECASE
+)
+VARIABLE_PATTERN = re.compile(
+    r'\$(?:\{[^}]*\}|(?:[A-Za-z]+:)?[A-Za-z_0-9]+|[$?^_])'
+)
+DASH_WORD_PATTERN = re.compile(r'-[A-Za-z_][A-Za-z0-9_]*:?')
+FUNCTION_NAME_PATTERN = re.compile(r'(?:[A-Za-z]+:)?[\w-]+')
+MULTI_CHAR_OPERATORS = ("::", "..", "+=", "-=", "*=", "/=", "++", "--",
+                        "&&", "||", "2>&1", ">>", "2>")
+
+# Tokens after which the next bareword starts a new pipeline
+COMMAND_STARTERS = {"(", "{", "}", ";", "|", "&", "$(", "@(", "=", "+=", "-=",
+                    "&&", "||", "."}
+STATEMENT_ENDS = {";", "|", "&&", "||"}
+OPENERS = {"(", "$(", "@(", "@{", "{", "["}
+CLOSERS = {")", "}", "]"}
+
+
+ArgumentValue = Union[str, bool, List[str]]
+
+
+class Token(NamedTuple):
+    """One lexical token: kind, exact source text, 1-based line, offset"""
+    kind: str
+    text: str
+    line: int
+    offset: int
+
+
+def _scan_single(content: str, i: int) -> int:
+    """Return the index just past a '...' string starting at i."""
+    j = i + 1
+    n = len(content)
+    while j < n:
+        if content[j] in SINGLE_QUOTES:
+            if j + 1 < n and content[j + 1] in SINGLE_QUOTES:
+                j += 2
+                continue
+            return j + 1
+        j += 1
+    return n
+
+
+def _scan_double(content: str, i: int) -> int:
+    """Return the index just past a "..." string, honouring `escapes and $()."""
+    j = i + 1
+    n = len(content)
+    while j < n:
+        ch = content[j]
+        if ch == '`':
+            j += 2
+            continue
+        if ch in DOUBLE_QUOTES:
+            if j + 1 < n and content[j + 1] in DOUBLE_QUOTES:
+                j += 2
+                continue
+            return j + 1
+        if ch == '$' and j + 1 < n and content[j + 1] == '(':
+            j = _scan_group(content, j + 1)
+            continue
+        j += 1
+    return n
+
+
+def _scan_group(content: str, i: int) -> int:
+    """Return the index just past the balanced (...) group starting at i."""
+    depth = 0
+    j = i
+    n = len(content)
+    while j < n:
+        ch = content[j]
+        if ch in DOUBLE_QUOTES:
+            j = _scan_double(content, j)
+            continue
+        if ch in SINGLE_QUOTES:
+            j = _scan_single(content, j)
+            continue
+        if ch == '`':
+            j += 2
+            continue
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    return n
+
+
+def _here_string_end(content: str, i: int) -> Optional[int]:
+    """
+    Return the index past a here-string opening at i ("@\"" or "@'"), or
+    None if the opener isn't followed by a line break (then it's not one).
+    """
+    quote = content[i + 1]
+    line_end = content.find('\n', i)
+    if line_end < 0 or content[i + 2:line_end].strip():
+        return None
+    terminator = re.compile(r'\n[ \t]*' + re.escape(quote) + '@')
+    match = terminator.search(content, line_end)
+    return match.end() if match else len(content)
+
+
+def tokenize(content: str) -> List[Token]:
+    """Split PowerShell source into tokens."""
+    tokens: List[Token] = []
+    i = 0
+    n = len(content)
+    line = 1
+    command_position = True
+    expect_function_name = False
+    # Open brackets: "block", "hash" or "paren"; newlines inside a
+    # hashtable separate keys rather than starting commands
+    stack: List[str] = []
+
+    def emit(kind: str, start: int, end: int):
+        nonlocal line
+        text = content[start:end]
+        tokens.append(Token(kind, text, line, start))
+        line += text.count('\n')
+
+    while i < n:
+        ch = content[i]
+
+        if ch in ' \t\r\f\v﻿':
+            i += 1
+            continue
+
+        if ch == '\n':
+            emit(NEWLINE, i, i + 1)
+            i += 1
+            command_position = not stack or stack[-1] != "hash"
+            continue
+
+        # Backtick line continuation
+        if ch == '`' and content[i + 1:i + 2] in ('\n', '\r'):
+            end = content.find('\n', i)
+            line += 1
+            i = end + 1
+            continue
+
+        if ch == '<' and content.startswith('<#', i):
+            end = content.find('#>', i + 2)
+            end = n if end < 0 else end + 2
+            emit(COMMENT, i, end)
+            i = end
+            continue
+
+        if ch == '#':
+            end = content.find('\n', i)
+            end = n if end < 0 else end
+            if content[end - 1:end] == '\r':
+                end -= 1
+            emit(COMMENT, i, end)
+            i = end
+            continue
+
+        if ch == '@' and content[i + 1:i + 2] in ('"', "'"):
+            end = _here_string_end(content, i)
+            if end is not None:
+                emit(HERESTRING, i, end)
+                i = end
+                command_position = False
+                continue
+
+        if ch in DOUBLE_QUOTES or ch in SINGLE_QUOTES:
+            end = (_scan_double if ch in DOUBLE_QUOTES else _scan_single)(content, i)
+            emit(STRING, i, end)
+            i = end
+            command_position = False
+            continue
+
+        if ch == '$':
+            if content[i + 1:i + 2] == '(':
+                emit(PUNCT, i, i + 2)
+                stack.append("paren")
+                i += 2
+                command_position = True
+                continue
+            match = VARIABLE_PATTERN.match(content, i)
+            if match:
+                end = match.end()
+                # $PSScriptRoot\..\modules\X.psm1 as a bare argument
+                if content[end:end + 1] in ('\\', '/'):
+                    word = WORD_PATTERN.match(content, end)
+                    emit(WORD, i, word.end())
+                    i = word.end()
+                else:
+                    emit(VARIABLE, i, end)
+                    i = end
+                command_position = False
+                continue
+
+        if ch == '@':
+            following = content[i + 1:i + 2]
+            if following in ('(', '{'):
+                emit(PUNCT, i, i + 2)
+                stack.append("paren" if following == '(' else "hash")
+                i += 2
+                command_position = following == '('
+                continue
+            match = re.compile(r'@\w+').match(content, i)
+            if match:    # splatting
+                emit(VARIABLE, i, match.end())
+                i = match.end()
+                command_position = False
+                continue
+
+        if ch == '-' and i + 1 < n and (content[i + 1].isalpha() or content[i + 1] == '_'):
+            match = DASH_WORD_PATTERN.match(content, i)
+            is_operator = match.group(0).lower() in OPERATORS
+            # "-not $x" can start an expression; "-Name" never starts a command
+            if is_operator or not command_position:
+                emit(OPERATOR if is_operator else PARAMETER, i, match.end())
+                i = match.end()
+                command_position = False
+                continue
+
+        if ch.isdigit() or (ch == '-' and content[i + 1:i + 2].isdigit()
+                            and not command_position):
+            match = NUMBER_PATTERN.match(content, i + 1 if ch == '-' else i)
+            end = match.end()
+            # Only a number if nothing word-like follows (1.2.3 is a word)
+            if end >= n or not (content[end].isalnum() or content[end] in '._:\\-'):
+                emit(NUMBER, i, end)
+                i = end
+                command_position = False
+                continue
+
+        if ch in '(){}[];,|&=':
+            operator = next((op for op in MULTI_CHAR_OPERATORS
+                             if content.startswith(op, i)), None)
+            if operator:
+                emit(OPERATOR, i, i + len(operator))
+                i += len(operator)
+                command_position = operator in COMMAND_STARTERS
+                continue
+            if ch in '({':
+                stack.append("paren" if ch == '(' else "block")
+            elif ch in ')}' and stack:
+                stack.pop()
+            # Arguments of a method call or attribute: .Invoke(...), [Parameter(...)]
+            adjacent = ch == '(' and tokens and tokens[-1].kind in (WORD, VARIABLE) \
+                and tokens[-1].offset + len(tokens[-1].text) == i
+            emit(OPERATOR if ch == '=' else PUNCT, i, i + 1)
+            i += 1
+            if ch == ';' and stack and stack[-1] == "hash":
+                command_position = False
+            else:
+                command_position = ch in COMMAND_STARTERS and not adjacent
+            if ch == '{' and expect_function_name:
+                expect_function_name = False
+            continue
+
+        # "/" and "%" are barewords in "auditpol /get" and "| % { }"
+        if (ch in '<>+*!' or (ch == '-' and not command_position)
+                or (ch == '/' and content[i + 1:i + 2] in (' ', '\t', '='))
+                or (ch == '%' and not command_position)):
+            operator = next((op for op in MULTI_CHAR_OPERATORS
+                             if content.startswith(op, i)), ch)
+            emit(OPERATOR, i, i + len(operator))
+            i += len(operator)
+            command_position = operator in COMMAND_STARTERS
+            continue
+
+        if expect_function_name:
+            match = FUNCTION_NAME_PATTERN.match(content, i)
+            if match:
+                emit(FUNCTION, i, match.end())
+                i = match.end()
+                expect_function_name = False
+                command_position = False
+                continue
+
+        # Dot-sourcing: ". .\script.ps1" / ". $path"
+        if ch == '.' and command_position and content[i + 1:i + 2] in (' ', '\t'):
+            emit(OPERATOR, i, i + 1)
+            i += 1
+            continue
+
+        match = WORD_PATTERN.match(content, i)
+        if not match:
+            # Stray backtick or similar: keep it as punctuation
+            emit(PUNCT, i, i + 1)
+            i += 1
+            continue
+        end = match.end()
+        text = match.group(0)
+        lowered = text.lower()
+        if command_position and lowered in KEYWORDS:
+            emit(KEYWORD, i, end)
+            expect_function_name = lowered in ("function", "filter")
+            command_position = lowered in ("return", "throw", "exit", "else",
+                                           "try", "finally", "do")
+        elif command_position:
+            emit(COMMAND, i, end)
+            command_position = False
+        else:
+            emit(WORD, i, end)
+        i = end
+
+    return tokens
+
+
+def string_value(token: Token) -> str:
+    """The literal content of a string/here-string token (not expanded)."""
+    text = token.text
+    if token.kind == HERESTRING:
+        body = text[2:]
+        body = body[body.find('\n') + 1:]
+        body = body[:body.rfind('\n')] if '\n' in body else ''
+        return body.rstrip('\r')
+    if token.kind == STRING and len(text) >= 2:
+        quote = text[0]
+        inner = text[1:-1] if text[-1] in DOUBLE_QUOTES + SINGLE_QUOTES else text[1:]
+        return inner.replace(quote * 2, quote)
+    return text
+
+
+@dataclass
+class Command:
+    """A command invocation and the tokens of its arguments"""
+    name: str
+    line: int
+    offset: int
+    elements: List[Token]
+    source: str = field(repr=False, default="")
+
+    @property
+    def arguments(self) -> Dict[str, ArgumentValue]:
+        """Named arguments: parameter name -> value (True for switches)."""
+        return self._bind()[0]
+
+    @property
+    def positional(self) -> List[ArgumentValue]:
+        return self._bind()[1]
+
+    def get(self, name: str) -> Optional[ArgumentValue]:
+        for key, value in self.arguments.items():
+            if key.lower() == name.lower():
+                return value
+        return None
+
+    def values(self) -> List[str]:
+        """Every named and positional argument value, lists flattened."""
+        result = []
+        for value in list(self.arguments.values()) + self.positional:
+            if isinstance(value, list):
+                result.extend(value)
+            elif isinstance(value, str):
+                result.append(value)
+        return result
+
+    def _value(self, index: int) -> Tuple[str, int]:
+        """Argument value starting at elements[index] and the next index."""
+        token = self.elements[index]
+        if token.kind in (STRING, HERESTRING):
+            return string_value(token), index + 1
+        if token.text in OPENERS:
+            depth = 0
+            for end in range(index, len(self.elements)):
+                text = self.elements[end].text
+                if text in OPENERS:
+                    depth += 1
+                elif text in CLOSERS:
+                    depth -= 1
+                    if depth == 0:
+                        last = self.elements[end]
+                        return (self.source[token.offset:last.offset + len(last.text)],
+                                end + 1)
+            return self.source[token.offset:], len(self.elements)
+        return token.text, index + 1
+
+    def _list_value(self, index: int) -> Tuple[ArgumentValue, int]:
+        """A value, or a list for comma-separated values (A, B, C)."""
+        value, index = self._value(index)
+        if index >= len(self.elements) or self.elements[index].text != ',':
+            return value, index
+        values = [value]
+        while index + 1 < len(self.elements) and self.elements[index].text == ',':
+            value, index = self._value(index + 1)
+            values.append(value)
+        return values, index
+
+    def _bind(self) -> Tuple[Dict[str, ArgumentValue], List[ArgumentValue]]:
+        if hasattr(self, "_bound"):
+            return self._bound
+        named: Dict[str, ArgumentValue] = {}
+        positional: List[ArgumentValue] = []
+        index = 0
+        count = len(self.elements)
+        while index < count:
+            token = self.elements[index]
+            if token.kind == PARAMETER:
+                name = token.text[1:].rstrip(':')
+                following = self.elements[index + 1] if index + 1 < count else None
+                if following is None or following.kind == PARAMETER:
+                    named[name] = True
+                    index += 1
+                else:
+                    named[name], index = self._list_value(index + 1)
+            elif token.kind == COMMENT:
+                index += 1
+            else:
+                value, index = self._list_value(index)
+                positional.append(value)
+        self._bound = (named, positional)
+        return self._bound
+
+
+def extract_commands(tokens: List[Token], source: str = "") -> List[Command]:
+    """Group the token stream into commands with their argument tokens."""
+    commands = []
+    count = len(tokens)
+    for index, token in enumerate(tokens):
+        if token.kind != COMMAND:
+            continue
+        elements = []
+        depth = 0
+        for following in tokens[index + 1:count]:
+            text = following.text
+            if following.kind == NEWLINE or (following.kind in (PUNCT, OPERATOR)
+                                             and text in STATEMENT_ENDS):
+                if depth == 0:
+                    break
+            if following.kind == PUNCT:
+                if text in OPENERS:
+                    depth += 1
+                elif text in CLOSERS:
+                    if depth == 0:
+                        break
+                    depth -= 1
+            if following.kind != NEWLINE:
+                elements.append(following)
+        commands.append(Command(token.text, token.line, token.offset,
+                                elements, source))
+    return commands
+
+
+@dataclass
+class ParsedScript:
+    """A tokenized script plus convenience views over its tokens"""
+    path: str
+    sha256: str
+    content: str
+    tokens: List[Token]
+
+    def line_of(self, offset: int) -> int:
+        return self.content.count('\n', 0, offset) + 1
+
+    @property
+    def commands(self) -> List[Command]:
+        if not hasattr(self, "_commands"):
+            self._commands = extract_commands(self.tokens, self.content)
+        return self._commands
+
+    def find_commands(self, *names: str) -> List[Command]:
+        wanted = {name.lower() for name in names}
+        return [c for c in self.commands if c.name.lower() in wanted]
+
+    @property
+    def function_definitions(self) -> List[str]:
+        """Names of functions defined in the script (scope prefix removed)."""
+        return [t.text.split(':')[-1] for t in self.tokens if t.kind == FUNCTION]
+
+    @property
+    def comments(self) -> List[Token]:
+        return [t for t in self.tokens if t.kind == COMMENT]
+
+    @property
+    def strings(self) -> List[Token]:
+        return [t for t in self.tokens if t.kind in (STRING, HERESTRING)]
+
+    @property
+    def assignments(self) -> Dict[str, List[Tuple[int, str]]]:
+        """Literal assignments in source order: lowercase name -> [(offset, value)]."""
+        if hasattr(self, "_assignments"):
+            return self._assignments
+        assignments: Dict[str, List[Tuple[int, str]]] = {}
+        tokens = [t for t in self.tokens if t.kind != COMMENT]
+        for index in range(len(tokens) - 2):
+            variable, operator, value = tokens[index:index + 3]
+            if variable.kind != VARIABLE or operator.text != '=' \
+                    or value.kind not in (STRING, NUMBER):
+                continue
+            if index and tokens[index - 1].kind not in (NEWLINE, PUNCT):
+                continue
+            if index + 3 < len(tokens) and tokens[index + 3].kind not in (NEWLINE, PUNCT):
+                continue
+            assignments.setdefault(variable.text[1:].lower(), []).append(
+                (variable.offset, string_value(value)))
+        self._assignments = assignments
+        return assignments
+
+    @property
+    def variables(self) -> Dict[str, str]:
+        """Literal assignments: lowercase name -> last value ($CIS_ID = "17.5.1")."""
+        if not hasattr(self, "_variables"):
+            self._variables = {name: values[-1][1] for name, values in self.assignments.items()}
+        return self._variables
+
+    def value_at(self, name: str, offset: int) -> Optional[str]:
+        """The literal value a variable was last assigned before offset."""
+        value = None
+        for assigned, literal in self.assignments.get(name.lstrip('$').lower(), ()):
+            if assigned >= offset:
+                break
+            value = literal
+        return value
+
+    def assignment_in_effect(self, name: str) -> Optional[Tuple[int, str]]:
+        """
+        (offset, value) of the assignment in effect where the variable is
+        first read -- a script that checks a setting and then re-assigns
+        $registryPath for a Group Policy check reads the first one. Falls
+        back to the first assignment if the variable is never read.
+        """
+        name = name.lstrip('$').lower()
+        assigned = self.assignments.get(name)
+        if not assigned:
+            return None
+        starts = {offset for offset, _ in assigned}
+        for token in self.tokens:
+            if token.kind == VARIABLE and token.offset not in starts \
+                    and token.text[1:].lower() == name:
+                before = [a for a in assigned if a[0] < token.offset]
+                if before:
+                    return before[-1]
+        return assigned[0]
+
+    def resolve(self, value: Optional[ArgumentValue],
+                offset: Optional[int] = None) -> Optional[ArgumentValue]:
+        """
+        Replace a bare $variable argument with its literal assignment: the
+        one in effect at offset (a call site) if given, else the last one.
+        """
+        if isinstance(value, str) and VARIABLE_PATTERN.fullmatch(value):
+            if offset is None:
+                return self.variables.get(value[1:].lower(), value)
+            literal = self.value_at(value, offset)
+            return value if literal is None else literal
+        return value
+
+
+class TokenCache:
+    """
+    Token streams persisted per content hash, with an LRU in-memory layer.
+    Streams are stored column-wise with marshal, which loads several times
+    faster than pickling a list of tuples.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = CACHE_DIR,
+                 memory_entries: int = MEMORY_ENTRIES):
+        self.root = cache_dir
+        self.directory = cache_dir / f"v{TOKENIZER_VERSION}" if cache_dir else None
+        self.memory: "OrderedDict[str, List[Token]]" = OrderedDict()
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.bin"
+
+    def tokens(self, content: str, digest: Optional[str] = None) -> Tuple[str, List[Token]]:
+        """Return (sha256, tokens) for content, tokenizing only on a miss."""
+        digest = digest or hashlib.sha256(content.encode('utf-8')).hexdigest()
+        tokens = self.memory.get(digest)
+        if tokens is not None:
+            self.memory.move_to_end(digest)
+            self.hits += 1
+            return digest, tokens
+
+        if self.directory:
+            try:
+                with open(self._path(digest), 'rb') as f:
+                    kinds, texts, lines, offsets = marshal.loads(f.read())
+                tokens = list(map(Token, kinds, texts, lines, offsets))
+            except (OSError, EOFError, ValueError, TypeError):
+                tokens = None
+        if tokens is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            tokens = tokenize(content)
+            self._store(digest, tokens)
+        self.memory[digest] = tokens
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+        return digest, tokens
+
+    def _store(self, digest: str, tokens: List[Token]):
+        if not self.directory:
+            return
+        path = self._path(digest)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(tuple(map(tuple, zip(*tokens))) if tokens
+                             else ((), (), (), ()), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass    # caching is best effort
+
+    def prune(self, paths: Iterable[Path] = SOURCE_DIRS) -> int:
+        """
+        Delete cached streams that no script under paths has any more (changed
+        or removed files), streams of other tokenizer versions and leftover
+        temp files. Returns the number of files deleted.
+        """
+        if not self.directory or not self.directory.is_dir():
+            return 0
+        live = {hashlib.sha256(path.read_text(encoding='utf-8-sig', errors='replace')
+                               .encode('utf-8')).hexdigest()
+                for path in find_scripts(paths)}
+        removed = 0
+        for other in self.root.iterdir():
+            if other.is_dir() and other != self.directory:
+                removed += sum(1 for f in other.rglob("*") if f.is_file())
+                shutil.rmtree(other, ignore_errors=True)
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".bin" and path.stem in live:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        for folder in self.directory.iterdir():
+            try:
+                if folder.is_dir() and not any(folder.iterdir()):
+                    folder.rmdir()
+            except OSError:
+                pass    # refilled by another process
+        return removed
+
+
+_default_cache: Optional[TokenCache] = None
+
+
+def default_cache() -> TokenCache:
+    """The process-wide cache shared by all tools."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TokenCache()
+    return _default_cache
+
+
+def parse_source(path: str, content: str,
+                 cache: Optional[TokenCache] = None) -> ParsedScript:
+    """Tokenize content (via the cache) into a ParsedScript."""
+    digest, tokens = (cache or default_cache()).tokens(content)
+    return ParsedScript(path, digest, content, tokens)
+
+
+def parse_file(path: Path, cache: Optional[TokenCache] = None) -> ParsedScript:
+    """Read and tokenize a script; path is reported relative to the repo."""
+    path = Path(path).resolve()
+    content = path.read_text(encoding='utf-8-sig', errors='replace')
+    try:
+        rel_path = path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        rel_path = path.as_posix()
+    return parse_source(rel_path, content, cache)
+
+
+def find_scripts(paths: Iterable[Path]) -> List[Path]:
+    scripts = []
+    for path in paths:
+        if path.is_dir():
+            scripts.extend(path.rglob("*.ps1"))
+            scripts.extend(path.rglob("*.psm1"))
+        elif path.suffix.lower() in (".ps1", ".psm1"):
+            scripts.append(path)
+    return sorted(set(scripts))
+
+
+def benchmark(paths: Iterable[Path], use_cache: bool = True) -> dict:
+    """Tokenize every file cold, then again through the cache."""
+    sources = [(p, p.read_text(encoding='utf-8-sig', errors='replace'))
+               for p in find_scripts(paths)]
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in sources)
+
+    start = time.perf_counter()
+    token_count = command_count = 0
+    for _, content in sources:
+        tokens = tokenize(content)
+        token_count += len(tokens)
+        command_count += len(extract_commands(tokens, content))
+    cold = time.perf_counter() - start
+
+    result = {
+        "files": len(sources),
+        "bytes": total_bytes,
+        "tokens": token_count,
+        "commands": command_count,
+        "tokenize_seconds": round(cold, 4),
+        "tokenize_mb_per_second": round(total_bytes / cold / 1e6, 2),
+    }
+    if use_cache:
+        # First pass fills the disk cache, second is what a new process sees
+        cache = TokenCache()
+        for _, content in sources:
+            cache.tokens(content)
+        start = time.perf_counter()
+        fresh = TokenCache()
+        for _, content in sources:
+            fresh.tokens(content)
+        warm = time.perf_counter() - start
+        result["cached_seconds"] = round(warm, 4)
+        result["cached_files_per_second"] = round(len(sources) / warm)
+    return result
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="PowerShell tokenizer throughput")
+    parser.add_argument("paths", nargs="*", type=Path, default=list(SOURCE_DIRS))
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    stats = benchmark(args.paths, use_cache=not args.no_cache)
+    print(f"Files: {stats['files']} ({stats['bytes']:,} bytes)")
+    print(f"Tokens: {stats['tokens']:,}, commands: {stats['commands']:,}")
+    print(f"Tokenize: {stats['tokenize_seconds']:.3f}s "
+          f"({stats['tokenize_mb_per_second']} MB/s)")
+    if "cached_seconds" in stats:
+        print(f"From cache: {stats['cached_seconds']:.3f}s "
+              f"({stats['cached_files_per_second']:,} files/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Evaluate CIS recommended-value phrases against observed values.
+
+The catalog states expectations as prose: the title says "24 or more
+password(s)" or "Administrators, LOCAL SERVICE", and the audit procedure says
+"with a REG_DWORD value of 10 or less, but not 0" or "4 or that the key does
+not exist". evaluate_phrase() turns one of those phrases and a value read
+from a host into a compliance decision, so every offline evaluator (secedit
+exports, registry snapshots, ...) applies the same rules.
+
+Values are passed as Python objects: int for DWORD/QWORD and numeric policy
+settings, str for SZ/EXPAND_SZ, a list of str for MULTI_SZ, and None when the
+setting or registry value is absent.
+
+Phrases are compiled once into typed predicate objects (numeric ranges,
+hex/decimal equality, choice sets, text and item-list matches, principal
+sets) and memoized per distinct phrase, so evaluating a fleet never parses
+a phrase twice. Evaluators can also hand back Observations (the predicate
+and value each recommendation is decided by) instead of deciding at once; a
+DecisionTable gathers those from many hosts and decides each predicate over
+the column of distinct values the fleet reported
+(Predicate.evaluate_distinct), so a value most hosts share is decided once.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import (
+    Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Union,
+)
+
+Value = Union[int, str, List[str], None]
+
+# Well-known SIDs as they appear in secedit [Privilege Rights] exports
+WELL_KNOWN_SIDS = {
+    "S-1-1-0": "Everyone",
+    "S-1-5-6": "SERVICE",
+    "S-1-5-11": "Authenticated Users",
+    "S-1-5-19": "LOCAL SERVICE",
+    "S-1-5-20": "NETWORK SERVICE",
+    "S-1-5-32-544": "Administrators",
+    "S-1-5-32-545": "Users",
+    "S-1-5-32-546": "Guests",
+    "S-1-5-32-547": "Power Users",
+    "S-1-5-32-551": "Backup Operators",
+    "S-1-5-32-555": "Remote Desktop Users",
+    "S-1-5-32-568": "IIS_IUSRS",
+    "S-1-5-83-0": "Virtual Machines",
+    "S-1-5-90-0": "Window Manager\\Window Manager Group",
+    "S-1-5-113": "Local account",
+    "S-1-5-114": "Local account and member of Administrators group",
+    "S-1-5-80-0": "NT SERVICE\\ALL SERVICES",
+    "S-1-5-80-3139157870-2983391045-3678747466-658725712-1809340420":
+        "NT SERVICE\\WdiServiceHost",
+}
+
+# Account domain prefixes that name the same principal with or without them
+PRINCIPAL_PREFIXES = ("builtin\\", "nt authority\\")
+
+NO_ONE = "no one"
+
+MISSING_SUFFIX = re.compile(r'\s+or that the key does not exist$')
+BLANK_PATTERN = re.compile(r'^<?blank\b')
+# "16,384" in titles; an optional unit may sit before "or more" ("90% or less")
+NUMBER = r'(\d{1,3}(?:,\d{3})+|\d+)'
+AT_LEAST_PATTERN = re.compile(rf'^{NUMBER}\s*(?:[a-z%()]+\s+)?or\s+(?:more|greater)\b')
+AT_MOST_PATTERN = re.compile(
+    rf'^{NUMBER}\s*(?:[a-z%()]+\s+)?or\s+(?:fewer|less)\b[^,]*?'
+    r'(?:,?\s*but\s+not\s+(?:[a-z]+\s+)?\(?(\d+)\)?)?$'
+)
+BETWEEN_PATTERN = re.compile(r'^between\s+(\d+)\s+and\s+(\d+)\b')
+NOT_EQUAL_PATTERN = re.compile(r'^anything other than\s+(\d+)$')
+CHOICE_PATTERN = re.compile(r'^\d+(?:\s*,\s*\d+)*\s+or\s+\d+$')
+INTEGER_PATTERN = re.compile(r'^-?\d+$')
+EACH_PATTERN = re.compile(r'^(\d+)\s+for each\b')
+HEX_PATTERN = re.compile(r'^0x([0-9a-f]+)(?:\s*\(\d+\)+)?$')
+# "Disabled' or 'Not Installed": the title quotes each acceptable value
+ALTERNATIVES_SEPARATOR = re.compile(r"'\s+or\s+'", re.IGNORECASE)
+
+BOOLEAN_PHRASES = {"enabled": 1, "disabled": 0}
+
+# "A, B and C" / "A, B, and C": the last item of a path or GUID list is
+# joined with "and"
+LIST_SEPARATOR = re.compile(r',\s*(?:and\s+)?|\s+and\s+(?=[A-Za-z]+\\|\{)')
+
+
+def normalize_principal(principal: str) -> str:
+    """
+    Normalize an account or group name for comparison: "*S-1-5-32-544",
+    "BUILTIN\\Administrators" and "administrators" are all "administrators".
+    """
+    name = principal.strip().strip('"').lstrip('*')
+    name = WELL_KNOWN_SIDS.get(name.upper(), name)
+    lowered = name.lower()
+    for prefix in PRINCIPAL_PREFIXES:
+        if lowered.startswith(prefix):
+            lowered = lowered[len(prefix):]
+    return lowered
+
+
+def parse_principals(phrase: str) -> Set[str]:
+    """Normalized principals from "Administrators, LOCAL SERVICE" or "No One"."""
+    if phrase.strip().lower() in (NO_ONE, "none", ""):
+        return set()
+    return {normalize_principal(name) for name in phrase.split(',') if name.strip()}
+
+
+def evaluate_principals(phrase: str, principals: Iterable[str],
+                        inclusion: bool = False) -> bool:
+    """
+    Compare assigned principals with a recommendation: the exact set by
+    default, or a superset for "... to include 'Guests'" recommendations.
+    """
+    return compile_principals(phrase, inclusion)(principals)
+
+
+def as_int(value: Value) -> Optional[int]:
+    """The value as an integer, or None when it is not numeric."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        text = value.strip().strip('"')
+        if INTEGER_PATTERN.match(text):
+            return int(text)
+        if text.lower().startswith('0x'):
+            try:
+                return int(text, 16)
+            except ValueError:
+                return None
+    return None
+
+
+def phrase_items(phrase: str) -> List[str]:
+    """Items of a list phrase, with PDF wraps after hyphens removed."""
+    return [re.sub(r'-\s+', '-', item.strip())
+            for item in LIST_SEPARATOR.split(phrase) if item.strip()]
+
+
+def _as_items(value: Value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        items = value
+    else:
+        items = str(value).split(',')
+    return [item.strip().lower() for item in items if item.strip()]
+
+
+def _number(text: str) -> int:
+    return int(text.replace(',', ''))
+
+
+def _any_outcome(outcomes: Iterable[Optional[bool]]) -> Optional[bool]:
+    """Alternatives: any match passes, otherwise any undecided stays undecided."""
+    outcomes = list(outcomes)
+    if True in outcomes:
+        return True
+    if None in outcomes:
+        return None
+    return False
+
+
+def value_key(value: Value) -> Hashable:
+    """A hashable key for an observed value (MULTI_SZ lists become tuples)."""
+    return type(value).__name__, tuple(value) if isinstance(value, list) else value
+
+
+class Predicate(ABC):
+    """A compiled recommended-value phrase; call it with an observed value"""
+    op = ""
+
+    @abstractmethod
+    def __call__(self, value: Value) -> Optional[bool]:
+        """Decide one observed value."""
+
+    def evaluate_distinct(self, values: Sequence[Value]) -> List[Optional[bool]]:
+        """Decide a column of distinct values, one outcome per value."""
+        return [self(value) for value in values]
+
+    def rule(self) -> Dict[str, Any]:
+        """The predicate as phrase_rule() data."""
+        return {"op": self.op}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        """A value that satisfies the predicate, or None when there is no fixed one."""
+        return None
+
+
+@dataclass(frozen=True)
+class Undecidable(Predicate):
+    """Free text or a list the PDF extraction cut short"""
+    op = "unknown"
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        return None
+
+
+@dataclass(frozen=True)
+class NonEmpty(Predicate):
+    """Site-specific text ("text"): anything configured"""
+    op = "nonempty"
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        return None if value is None else bool(_as_items(value))
+
+
+@dataclass(frozen=True)
+class Blank(Predicate):
+    """"<blank>" / "None": empty or absent"""
+    op = "blank"
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        return not _as_items(value)
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return [] if multi_string else ""
+
+
+class NumericPredicate(Predicate):
+    """Decimal or 0x-hex values compared as integers; absent or non-numeric fails"""
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        if value is None:
+            return False
+        number = as_int(value)
+        return number is not None and self.accepts(number)
+
+    @abstractmethod
+    def accepts(self, number: int) -> bool:
+        """Decide a value already converted to an integer."""
+
+
+@dataclass(frozen=True)
+class Equals(NumericPredicate):
+    value: int
+    op = "eq"
+
+    def accepts(self, number: int) -> bool:
+        return number == self.value
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "value": self.value}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.value
+
+
+@dataclass(frozen=True)
+class AtLeast(NumericPredicate):
+    value: int
+    op = "ge"
+
+    def accepts(self, number: int) -> bool:
+        return number >= self.value
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "value": self.value}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.value
+
+
+@dataclass(frozen=True)
+class AtMost(NumericPredicate):
+    value: int
+    exclude: Optional[int] = None
+    op = "le"
+
+    def accepts(self, number: int) -> bool:
+        return number <= self.value and number != self.exclude
+
+    def rule(self) -> Dict[str, Any]:
+        rule = {"op": self.op, "value": self.value}
+        if self.exclude is not None:
+            rule["except"] = self.exclude
+        return rule
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.value
+
+
+@dataclass(frozen=True)
+class Between(NumericPredicate):
+    low: int
+    high: int
+    op = "between"
+
+    def accepts(self, number: int) -> bool:
+        return self.low <= number <= self.high
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "min": self.low, "max": self.high}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.low
+
+
+@dataclass(frozen=True)
+class NotEqual(NumericPredicate):
+    value: int
+    op = "ne"
+
+    def accepts(self, number: int) -> bool:
+        return number != self.value
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "value": self.value}
+
+
+@dataclass(frozen=True)
+class OneOf(NumericPredicate):
+    """"1, 2 or 3"; choices kept in phrase order"""
+    values: Tuple[int, ...]
+    op = "in"
+
+    def accepts(self, number: int) -> bool:
+        return number in self.values
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "values": sorted(set(self.values))}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.values[0]
+
+
+@dataclass(frozen=True)
+class TextMatch(Predicate):
+    """Case-insensitive text, or an unordered item list for lists and MULTI_SZ"""
+    text: str
+    is_list: bool
+    items: Tuple[str, ...]
+    original: str
+    op = "match"
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        if value is None:
+            return False
+        if isinstance(value, list) or self.is_list:
+            return sorted(_as_items(value)) == list(self.items)
+        return str(value).strip().strip('"').lower() == self.text
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "text": self.text, "list": self.is_list, "items": list(self.items)}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return phrase_items(self.original) if multi_string else self.original
+
+
+@dataclass(frozen=True)
+class MissingOk(Predicate):
+    """"... or that the key does not exist": absence also passes"""
+    inner: Predicate
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        return True if value is None else self.inner(value)
+
+    def evaluate_distinct(self, values: Sequence[Value]) -> List[Optional[bool]]:
+        present = [value for value in values if value is not None]
+        outcomes = iter(self.inner.evaluate_distinct(present))
+        return [True if value is None else next(outcomes) for value in values]
+
+    def rule(self) -> Dict[str, Any]:
+        rule = self.inner.rule()
+        rule["missing_ok"] = True
+        return rule
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.inner.recommended(multi_string)
+
+
+@dataclass(frozen=True)
+class AnyOf(Predicate):
+    """"Disabled' or 'Not Installed": any alternative passes"""
+    alternatives: Tuple[Predicate, ...]
+    op = "any"
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        return _any_outcome(alternative(value) for alternative in self.alternatives)
+
+    def evaluate_distinct(self, values: Sequence[Value]) -> List[Optional[bool]]:
+        columns = [alternative.evaluate_distinct(values) for alternative in self.alternatives]
+        return [_any_outcome(row) for row in zip(*columns)]
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "rules": [alternative.rule() for alternative in self.alternatives]}
+
+    def recommended(self, multi_string: bool = False) -> Value:
+        return self.alternatives[0].recommended(multi_string)
+
+
+@dataclass(frozen=True)
+class PrincipalSet(Predicate):
+    """User-right assignees: exactly these, or at least these with inclusion"""
+    expected: FrozenSet[str]
+    inclusion: bool = False
+    op = "principals"
+
+    def __call__(self, value: Value) -> Optional[bool]:
+        actual = {normalize_principal(name) for name in value or () if name.strip()}
+        if self.inclusion:
+            return self.expected <= actual
+        return actual == self.expected
+
+    def rule(self) -> Dict[str, Any]:
+        return {"op": self.op, "principals": sorted(self.expected), "inclusion": self.inclusion}
+
+
+@lru_cache(maxsize=None)
+def compile_phrase(phrase: str) -> Predicate:
+    """The predicate for a recommended-value phrase (memoized per phrase)."""
+    text = ' '.join(phrase.split()).strip().rstrip('.')
+    lowered = text.lower()
+
+    if MISSING_SUFFIX.search(lowered):
+        return MissingOk(compile_phrase(MISSING_SUFFIX.sub('', text)))
+    alternatives = ALTERNATIVES_SEPARATOR.split(text)
+    if len(alternatives) > 1:
+        return AnyOf(tuple(compile_phrase(alternative.strip("' "))
+                           for alternative in alternatives))
+
+    if lowered == "text":
+        return NonEmpty()
+    if not lowered or lowered.endswith(','):
+        return Undecidable()
+    if BLANK_PATTERN.match(lowered) or lowered == "none":
+        return Blank()
+    if lowered in BOOLEAN_PHRASES:
+        return Equals(BOOLEAN_PHRASES[lowered])
+    match = AT_LEAST_PATTERN.match(lowered)
+    if match:
+        return AtLeast(_number(match.group(1)))
+    match = AT_MOST_PATTERN.match(lowered)
+    if match:
+        exclude = int(match.group(2)) if match.group(2) is not None else None
+        return AtMost(_number(match.group(1)), exclude)
+    match = BETWEEN_PATTERN.match(lowered)
+    if match:
+        return Between(int(match.group(1)), int(match.group(2)))
+    match = NOT_EQUAL_PATTERN.match(lowered)
+    if match:
+        return NotEqual(int(match.group(1)))
+    if CHOICE_PATTERN.match(lowered):
+        return OneOf(tuple(int(choice) for choice in re.findall(r'\d+', lowered)))
+    match = EACH_PATTERN.match(lowered)
+    if match:
+        return Equals(int(match.group(1)))
+    if INTEGER_PATTERN.match(lowered):
+        return Equals(int(lowered))
+    match = HEX_PATTERN.match(lowered)
+    if match:
+        return Equals(int(match.group(1), 16))
+    return TextMatch(lowered, ',' in text, tuple(sorted(_as_items(phrase_items(text)))), text)
+
+
+@lru_cache(maxsize=None)
+def compile_principals(phrase: str, inclusion: bool = False) -> PrincipalSet:
+    """The predicate for a user-right phrase (memoized per phrase)."""
+    return PrincipalSet(frozenset(parse_principals(phrase)), inclusion)
+
+
+def evaluate_phrase(phrase: str, value: Value) -> Optional[bool]:
+    """
+    Decide whether value satisfies a recommended-value phrase.
+
+    Returns True/False, or None when the phrase has no machine-checkable
+    meaning (free text, truncated lists) so the caller can report the
+    recommendation as not evaluated rather than guess.
+    """
+    return compile_phrase(phrase)(value)
+
+
+def recommended_setting(phrase: str, multi_string: bool = False) -> Value:
+    """
+    A concrete value that satisfies a phrase, for writing remediations: the
+    bound the benchmark names ("15 or less" -> 15), the first of several
+    choices, or the literal text. Lists become a list when multi_string.
+    Returns None when the phrase leaves the value to the site ("text",
+    "anything other than 3") or was cut short in the catalog.
+    """
+    return compile_phrase(phrase).recommended(multi_string)
+
+
+def phrase_rule(phrase: str) -> Dict[str, Any]:
+    """
+    The decision evaluate_phrase() makes for a phrase, as JSON-ready data, so
+    a script on the host can apply the same rule without a phrase parser:
+    {"op": "ge", "value": 24}, {"op": "le", "value": 900, "except": 0},
+    {"op": "in", "values": [1, 2]}, ... plus "missing_ok" for "... or that
+    the key does not exist". evaluate_rule() is the reference interpreter.
+    """
+    return compile_phrase(phrase).rule()
+
+
+def evaluate_rule(rule: Dict[str, Any], value: Value) -> Optional[bool]:
+    """Apply a phrase_rule() to a value; agrees with evaluate_phrase()."""
+    op = rule["op"]
+    if value is None and rule.get("missing_ok"):
+        return True
+    if op == "principals":
+        actual = {normalize_principal(name) for name in value or () if name.strip()}
+        if rule["inclusion"]:
+            return set(rule["principals"]) <= actual
+        return actual == set(rule["principals"])
+    if op == "any":
+        return _any_outcome(evaluate_rule(alternative, value) for alternative in rule["rules"])
+    if op == "unknown":
+        return None
+    if op == "nonempty":
+        return None if value is None else bool(_as_items(value))
+    if op == "blank":
+        return not _as_items(value)
+    if value is None:
+        return False
+    if op == "match":
+        if isinstance(value, list) or rule["list"]:
+            return sorted(_as_items(value)) == rule["items"]
+        return str(value).strip().strip('"').lower() == rule["text"]
+    number = as_int(value)
+    if number is None:
+        return False
+    if op == "eq":
+        return number == rule["value"]
+    if op == "ge":
+        return number >= rule["value"]
+    if op == "le":
+        return number <= rule["value"] and number != rule.get("except")
+    if op == "between":
+        return rule["min"] <= number <= rule["max"]
+    if op == "ne":
+        return number != rule["value"]
+    if op == "in":
+        return number in rule["values"]
+    raise ValueError(f"Unknown rule operator: {op}")
+
+
+def combine_outcomes(outcomes: Iterable[Optional[bool]]) -> Optional[bool]:
+    """
+    Combine per-value outcomes of a multi-value recommendation: any failure
+    fails it, otherwise any unevaluated value leaves it undecided.
+    """
+    outcomes = list(outcomes)
+    if any(outcome is False for outcome in outcomes):
+        return False
+    if any(outcome is None for outcome in outcomes):
+        return None
+    return True
+
+
+@dataclass
+class Observation:
+    """
+    What an evaluator read for one recommendation, before deciding it: the
+    (predicate, value) checks that decide it, or a fixed outcome when no
+    phrase is involved (a renamed account, an audit bitmask, nothing found).
+    """
+    checks: List[Tuple[Predicate, Value]] = field(default_factory=list)
+    outcome: Optional[bool] = None
+    current: str = ""
+    details: str = ""
+
+    def check(self, predicate: Predicate, value: Value):
+        self.checks.append((predicate, value))
+
+    def decide(self) -> Optional[bool]:
+        """Decide the checks here and now (one host, no table)."""
+        if not self.checks:
+            return self.outcome
+        return combine_outcomes(predicate(value) for predicate, value in self.checks)
+
+
+class DecisionTable:
+    """
+    Observations of many hosts, decided a column at a time: every distinct
+    value reported for a predicate goes through one evaluate_distinct() call.
+    """
+
+    def __init__(self):
+        self._columns: Dict[Predicate, Dict[Hashable, Value]] = {}
+        self._outcomes: Dict[Predicate, Dict[Hashable, Optional[bool]]] = {}
+
+    def add(self, observation: Observation):
+        for predicate, value in observation.checks:
+            self._columns.setdefault(predicate, {}).setdefault(value_key(value), value)
+
+    def decide(self):
+        """Decide every pending column."""
+        for predicate, column in self._columns.items():
+            outcomes = predicate.evaluate_distinct(list(column.values()))
+            self._outcomes.setdefault(predicate, {}).update(zip(column, outcomes))
+        self._columns.clear()
+
+    def outcome(self, observation: Observation) -> Optional[bool]:
+        """The decision for an observation added before the last decide()."""
+        if not observation.checks:
+            return observation.outcome
+        return combine_outcomes(self._outcomes[predicate][value_key(value)]
+                                for predicate, value in observation.checks)
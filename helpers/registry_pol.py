@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Reader and writer for Registry.pol (PReg) policy files.
+
+Registry remediations call Set-RegistryValue one value per script. A
+Registry.pol file carries any number of registry values and is applied in
+one operation (LGPO.exe /m Registry.pol, or copied to
+%SystemRoot%\\System32\\GroupPolicy\\Machine followed by gpupdate).
+
+File layout: the signature b"PReg", a little-endian uint32 version (1),
+then entries of UTF-16LE "[" key NUL ";" value NUL ";" type ";" size ";"
+data "]" where type and size are uint32 and data is size raw bytes.
+
+PolicyFile.parse() works over any buffer (bytes, bytearray, mmap or
+memoryview). Entry data is kept as a memoryview slice of that buffer rather
+than copied, and serialize() writes entries back unchanged, so reading and
+writing an existing file reproduces it byte-for-byte.
+
+compile_policy() turns the catalog's registry-backed recommendations for a
+profile into the entries of one Machine (HKLM) or User (HKCU) policy file.
+
+Usage:
+    python registry_pol.py compile --profile L1 --output Registry.pol
+    python registry_pol.py dump Registry.pol
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from cis_catalog import CatalogEntry, load_catalog
+from cis_results import PROFILES
+from recommended_values import Value, recommended_setting
+from registry_snapshot import (
+    REG_DWORD, REG_EXPAND_SZ, REG_MULTI_SZ, REG_QWORD, REG_SZ,
+    REG_TYPE_NAMES,
+)
+
+SIGNATURE = b"PReg"
+VERSION = 1
+HEADER = SIGNATURE + struct.pack('<I', VERSION)
+
+OPEN = "[".encode('utf-16-le')
+CLOSE = "]".encode('utf-16-le')
+SEMICOLON = ";".encode('utf-16-le')
+NUL = b"\x00\x00"
+UINT32 = struct.Struct('<I')
+
+# Hive each policy file applies to (keys in the file are relative to it)
+HIVES = {"machine": "hklm", "user": "hkcu"}
+
+REG_TYPES = {name: code for code, name in REG_TYPE_NAMES.items()}
+
+
+class PolicyFormatError(ValueError):
+    """The buffer is not a valid PReg file"""
+
+
+@dataclass(frozen=True)
+class PolicyEntry:
+    """One registry value in a Registry.pol file"""
+    key: str
+    value_name: str
+    value_type: int
+    data: Union[bytes, memoryview]
+
+    @property
+    def value(self) -> Value:
+        """The data decoded by type: int, str, list of str or bytes."""
+        raw = bytes(self.data)
+        if self.value_type in (REG_DWORD, REG_QWORD) and raw:
+            return int.from_bytes(raw, 'little')
+        if self.value_type in (REG_SZ, REG_EXPAND_SZ):
+            return raw.decode('utf-16-le', errors='replace').split('\x00', 1)[0]
+        if self.value_type == REG_MULTI_SZ:
+            text = raw.decode('utf-16-le', errors='replace')
+            return [item for item in text.split('\x00') if item]
+        return raw
+
+    def serialize(self) -> bytes:
+        return b"".join((
+            OPEN, self.key.encode('utf-16-le'), NUL, SEMICOLON,
+            self.value_name.encode('utf-16-le'), NUL, SEMICOLON,
+            UINT32.pack(self.value_type), SEMICOLON,
+            UINT32.pack(len(self.data)), SEMICOLON,
+            self.data, CLOSE,
+        ))
+
+
+def encode_value(value: Value, value_type: int) -> bytes:
+    """Registry data bytes for a value of the given REG_* type."""
+    if value_type == REG_DWORD:
+        return struct.pack('<I', int(value) & 0xFFFFFFFF)
+    if value_type == REG_QWORD:
+        return struct.pack('<Q', int(value))
+    if value_type in (REG_SZ, REG_EXPAND_SZ):
+        return (str(value) + '\x00').encode('utf-16-le')
+    if value_type == REG_MULTI_SZ:
+        items = value if isinstance(value, list) else [str(value)]
+        return ''.join(item + '\x00' for item in items).encode('utf-16-le') + NUL
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    raise ValueError(f"Cannot encode {value!r} as {REG_TYPE_NAMES.get(value_type, value_type)}")
+
+
+def make_entry(key: str, value_name: str, value: Value,
+               value_type: int) -> PolicyEntry:
+    return PolicyEntry(key, value_name, value_type, encode_value(value, value_type))
+
+
+def _find_string_end(buffer, start: int, end: int) -> int:
+    """Offset of the NUL terminator of a UTF-16LE string followed by ';'."""
+    position = start
+    while True:
+        found = buffer.find(NUL + SEMICOLON, position, end)
+        if found < 0:
+            raise PolicyFormatError(f"Unterminated string at offset {start}")
+        if (found - start) % 2 == 0:
+            return found
+        position = found + 1
+
+
+class PolicyFile:
+    """The entries of a Registry.pol file, in file order"""
+
+    def __init__(self, entries: Optional[List[PolicyEntry]] = None):
+        self.entries: List[PolicyEntry] = entries or []
+
+    @classmethod
+    def parse(cls, buffer) -> "PolicyFile":
+        """Parse a PReg buffer; entry data stays a view into the buffer."""
+        view = memoryview(buffer)
+        # bytes, bytearray and mmap can search in place; a bare memoryview
+        # has no find(), so search a copy but still slice data from the view
+        searchable = buffer if hasattr(buffer, 'find') else view.tobytes()
+        size = len(view)
+        if size < len(HEADER) or bytes(view[:4]) != SIGNATURE:
+            raise PolicyFormatError("Missing PReg signature")
+        version = UINT32.unpack_from(view, 4)[0]
+        if version != VERSION:
+            raise PolicyFormatError(f"Unsupported PReg version {version}")
+
+        entries = []
+        keys = {}
+        position = len(HEADER)
+        while position < size:
+            if bytes(view[position:position + 2]) != OPEN:
+                raise PolicyFormatError(f"Expected '[' at offset {position}")
+            key_start = position + 2
+            key_end = _find_string_end(searchable, key_start, size)
+            name_start = key_end + 4
+            name_end = _find_string_end(searchable, name_start, size)
+            fields = name_end + 4
+            if fields + 14 > size:
+                raise PolicyFormatError(f"Truncated entry at offset {position}")
+            value_type = UINT32.unpack_from(view, fields)[0]
+            data_size = UINT32.unpack_from(view, fields + 6)[0]
+            data_start = fields + 12
+            data_end = data_start + data_size
+            if data_end + 2 > size or bytes(view[data_end:data_end + 2]) != CLOSE:
+                raise PolicyFormatError(f"Malformed entry at offset {position}")
+
+            raw_key = bytes(view[key_start:key_end])
+            key = keys.get(raw_key)
+            if key is None:
+                # Many entries share a key; decode each distinct key once
+                key = keys[raw_key] = raw_key.decode('utf-16-le')
+            value_name = bytes(view[name_start:name_end]).decode('utf-16-le')
+            entries.append(PolicyEntry(key, value_name, value_type,
+                                       view[data_start:data_end]))
+            position = data_end + 2
+        return cls(entries)
+
+    @classmethod
+    def read(cls, path: Union[str, Path]) -> "PolicyFile":
+        """Read a file; the entries reference the file's bytes directly."""
+        with open(path, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                raise PolicyFormatError(f"{path} is empty")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.parse(mapped)
+
+    def serialize(self) -> bytes:
+        return HEADER + b"".join(entry.serialize() for entry in self.entries)
+
+    def write(self, path: Union[str, Path]):
+        Path(path).write_bytes(self.serialize())
+
+    def find(self, key: str, value_name: str) -> Optional[PolicyEntry]:
+        """The last entry for key/value (later entries override earlier)."""
+        key, value_name = key.lower(), value_name.lower()
+        for entry in reversed(self.entries):
+            if entry.key.lower() == key and entry.value_name.lower() == value_name:
+                return entry
+        return None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def policy_key(path: str, hive: str) -> Optional[str]:
+    """The key path relative to hive, or None for a key in another hive."""
+    head, _, rest = path.replace('/', '\\').partition('\\')
+    head = head.rstrip(':').upper()
+    aliases = {"hklm": ("HKLM", "HKEY_LOCAL_MACHINE", "MACHINE"),
+               "hkcu": ("HKCU", "HKEY_CURRENT_USER", "USER", "HKU", "HKEY_USERS")}
+    if head not in aliases[hive]:
+        return None
+    if head in ("HKU", "HKEY_USERS"):
+        # HKU\[USER SID]\Software\... -> Software\...
+        rest = rest.partition('\\')[2]
+    return rest.strip('\\')
+
+
+def value_type_for(entry: CatalogEntry, value: Value) -> int:
+    """The REG_* type to write: the catalog's type, corrected by the value."""
+    catalog_type = REG_TYPES.get(entry.registry_value_type, REG_DWORD)
+    if isinstance(value, list):
+        return REG_MULTI_SZ
+    if isinstance(value, str):
+        return catalog_type if catalog_type in (REG_SZ, REG_EXPAND_SZ) else REG_SZ
+    if catalog_type in (REG_SZ, REG_EXPAND_SZ, REG_QWORD):
+        return catalog_type
+    return REG_DWORD
+
+
+def compile_entry(entry: CatalogEntry, hive: str
+                  ) -> Tuple[List[PolicyEntry], List[str]]:
+    """Policy entries for one recommendation, plus reasons for skipped values."""
+    entries, skipped = [], []
+    for location in entry.registry_locations:
+        key = policy_key(location.path, hive)
+        if key is None:
+            continue
+        phrase = entry.expected_data_for(location.value_name)
+        placeholder = location.value_name.startswith('<')
+        multi = entry.registry_value_type == "REG_MULTI_SZ" or placeholder or (
+            ',' in phrase and '\\' in phrase)
+        value = recommended_setting(phrase, multi_string=multi)
+        if value is None:
+            skipped.append(f"{location.value_name}: no fixed value for {phrase!r}")
+            continue
+        if placeholder:
+            # "<numeric value>": list policies store one item per value 1..n
+            for number, item in enumerate(value, 1):
+                entries.append(make_entry(key, str(number), item, REG_SZ))
+            continue
+        value_type = value_type_for(entry, value)
+        if value_type == REG_SZ and isinstance(value, int):
+            value = str(value)
+        entries.append(make_entry(key, location.value_name, value, value_type))
+    return entries, skipped
+
+
+def compile_policy(entries: Iterable[CatalogEntry], hive: str = "hklm"
+                   ) -> Tuple[PolicyFile, List[Tuple[str, str]]]:
+    """
+    Compile recommendations into one policy file for hive ("hklm" or
+    "hkcu"). Returns the file and (cis_id, reason) for values left out.
+    """
+    policy = PolicyFile()
+    skipped = []
+    for entry in entries:
+        compiled, reasons = compile_entry(entry, hive)
+        policy.entries.extend(compiled)
+        skipped.extend((entry.cis_id, reason) for reason in reasons)
+    return policy, skipped
+
+
+def describe(entry: PolicyEntry) -> str:
+    value = entry.value
+    if isinstance(value, bytes):
+        value = value.hex(',')
+    type_name = REG_TYPE_NAMES.get(entry.value_type, str(entry.value_type))
+    return f"{entry.key}\\{entry.value_name} = {type_name}:{value!r}"
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Read and compile Registry.pol policy files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="compile catalog recommendations")
+    compile_parser.add_argument("--profile", choices=PROFILES)
+    compile_parser.add_argument("--section", action="append", dest="sections")
+    compile_parser.add_argument("--id", action="append", dest="cis_ids")
+    compile_parser.add_argument("--scope", choices=sorted(HIVES), default="machine")
+    compile_parser.add_argument("--output", type=Path, default=Path("Registry.pol"))
+
+    dump_parser = commands.add_parser("dump", help="list the entries of a policy file")
+    dump_parser.add_argument("path", type=Path)
+    dump_parser.add_argument("--verify", action="store_true",
+                             help="check the file round-trips byte-for-byte")
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        selected = load_catalog().select(args.profile, args.sections, args.cis_ids)
+        started = time.perf_counter()
+        policy, skipped = compile_policy(selected, HIVES[args.scope])
+        policy.write(args.output)
+        elapsed = time.perf_counter() - started
+        for cis_id, reason in skipped:
+            print(f"Skipped {cis_id}: {reason}")
+        print(f"Wrote {len(policy)} values from {len(selected)} recommendations "
+              f"to {args.output} ({elapsed:.3f}s)")
+        return 0
+
+    policy = PolicyFile.read(args.path)
+    for entry in policy.entries:
+        print(describe(entry))
+    print(f"\n{len(policy)} entries")
+    if args.verify:
+        identical = policy.serialize() == args.path.read_bytes()
+        print("Round-trip: " + ("identical" if identical else "DIFFERENT"))
+        return 0 if identical else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
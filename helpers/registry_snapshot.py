@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for registry snapshots exported with `reg export` / regedit.
+
+Registry audits (Invoke-CISAudit -AuditType "Registry") read one value per
+script run. This module parses a whole .reg export once, into a trie of
+interned key path components, and evaluates every registry-backed catalog
+recommendation against it in one sweep.
+
+- Both export formats: "Windows Registry Editor Version 5.00" (UTF-16 LE)
+  and "REGEDIT4" (ANSI).
+- Hive aliases: HKEY_LOCAL_MACHINE/HKLM, HKEY_CURRENT_USER/HKCU and
+  HKEY_USERS\\<SID> (treated as the current user, like the scripts do).
+- Value types: dword:, hex(b): (QWORD), strings, hex(2): (EXPAND_SZ),
+  hex(7): (MULTI_SZ), hex: (BINARY) and other hex(N): raw data.
+- Deletion syntax: [-Key] and "Value"=-
+
+The file is streamed line by line. With keep= (the evaluator passes the
+catalog's registry paths) only keys on those paths are stored, so memory is
+bounded by what the catalog can ask about rather than by the export size.
+
+Usage:
+    reg export HKLM\\SOFTWARE\\Policies policies.reg   (on the host)
+    python registry_snapshot.py policies.reg hkcu.reg --format csv
+"""
+
+import argparse
+import codecs
+import re
+import sys
+import time
+from pathlib import Path
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union,
+)
+
+from cis_catalog import CatalogEntry, load_catalog, normalize_registry_path
+from cis_results import PROFILES, CISResult, output_results, status_for
+from recommended_values import Observation, Value, compile_phrase
+
+SOURCE = "Registry"
+
+# Registry value types (winnt.h)
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_DWORD_BIG_ENDIAN = 5
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+REG_TYPE_NAMES = {
+    REG_NONE: "REG_NONE", REG_SZ: "REG_SZ", REG_EXPAND_SZ: "REG_EXPAND_SZ",
+    REG_BINARY: "REG_BINARY", REG_DWORD: "REG_DWORD",
+    REG_DWORD_BIG_ENDIAN: "REG_DWORD_BIG_ENDIAN", REG_MULTI_SZ: "REG_MULTI_SZ",
+    REG_QWORD: "REG_QWORD",
+}
+
+HEADER_V5 = "Windows Registry Editor Version 5.00"
+HEADER_V4 = "REGEDIT4"
+
+VALUE_LINE_PATTERN = re.compile(r'^(?:"((?:[^"\\]|\\.)*)"|(@))\s*=\s*(.*)$')
+HEX_TYPE_PATTERN = re.compile(r'^hex(?:\(([0-9a-fA-F]+)\))?:(.*)$')
+STRING_ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+DEFAULT_VALUE_NAME = ""
+
+
+class KeyNode:
+    """One registry key: children by lower-cased name, typed values by name"""
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Optional[Dict[str, "KeyNode"]] = None
+        self.values: Optional[Dict[str, Tuple[int, Value]]] = None
+
+    def child(self, name: str) -> "KeyNode":
+        if self.children is None:
+            self.children = {}
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[sys.intern(name)] = KeyNode()
+        return node
+
+
+def split_key_path(path: str) -> List[str]:
+    """Normalized, interned path components ("hklm", "software", ...)."""
+    return [sys.intern(part) for part in normalize_registry_path(path).split('\\') if part]
+
+
+def decode_string(text: str) -> str:
+    """Undo .reg string escaping (\\\\ and \\")."""
+    return STRING_ESCAPE_PATTERN.sub(r'\1', text)
+
+
+def decode_hex(data: str) -> bytes:
+    return bytes.fromhex(data.replace(',', ' ').replace('\\', ' '))
+
+
+def decode_text(raw: bytes, unicode: bool) -> str:
+    if unicode:
+        return raw.decode('utf-16-le', errors='replace')
+    return raw.decode('cp1252', errors='replace')
+
+
+def parse_value(data: str, unicode: bool = True) -> Tuple[int, Value]:
+    """
+    Decode the right-hand side of a .reg value line into (REG_* type, value).
+
+    DWORD and QWORD become int, SZ and EXPAND_SZ str, MULTI_SZ a list of str;
+    binary and unknown types stay as bytes (rendered as hex when compared).
+    """
+    data = data.strip()
+    if data.startswith('"'):
+        return REG_SZ, decode_string(data[1:-1] if data.endswith('"') else data[1:])
+    if data[:6].lower() == "dword:":
+        return REG_DWORD, int(data[6:], 16)
+    match = HEX_TYPE_PATTERN.match(data)
+    if not match:
+        raise ValueError(f"Unrecognized registry value data: {data[:40]!r}")
+    value_type = int(match.group(1), 16) if match.group(1) else REG_BINARY
+    raw = decode_hex(match.group(2))
+    if value_type in (REG_DWORD, REG_QWORD):
+        return value_type, int.from_bytes(raw, 'little')
+    if value_type == REG_DWORD_BIG_ENDIAN:
+        return REG_DWORD, int.from_bytes(raw, 'big')
+    if value_type in (REG_SZ, REG_EXPAND_SZ):
+        return value_type, decode_text(raw, unicode).split('\x00', 1)[0]
+    if value_type == REG_MULTI_SZ:
+        text = decode_text(raw, unicode)
+        return value_type, [item for item in text.split('\x00') if item]
+    return value_type, raw
+
+
+def format_value(value_type: int, value: Value, unicode: bool = True) -> str:
+    """The right-hand side of a .reg value line; the inverse of parse_value()."""
+    if value_type == REG_DWORD and isinstance(value, int):
+        return f"dword:{value & 0xFFFFFFFF:08x}"
+    if value_type == REG_SZ and not isinstance(value, (bytes, list)):
+        return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+    encoding = 'utf-16-le' if unicode else 'cp1252'
+    if isinstance(value, bytes):
+        raw = value
+    elif value_type == REG_QWORD and isinstance(value, int):
+        raw = (value & 0xFFFFFFFFFFFFFFFF).to_bytes(8, 'little')
+    elif value_type == REG_MULTI_SZ:
+        items = value if isinstance(value, list) else [str(value)]
+        raw = ''.join(item + '\x00' for item in items).encode(encoding) + '\x00'.encode(encoding)
+    else:
+        raw = (str(value) + '\x00').encode(encoding)
+    prefix = "hex:" if value_type == REG_BINARY else f"hex({value_type:x}):"
+    return prefix + raw.hex(',')
+
+
+def open_reg_text(path: Union[str, Path]):
+    """Open a .reg file as text, detecting UTF-16 (version 5) or ANSI (REGEDIT4)."""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        encoding = 'utf-16'
+    elif len(head) > 1 and head[1:2] == b'\x00':
+        encoding = 'utf-16-le'
+    elif head.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    else:
+        encoding = 'cp1252'
+    return open(path, 'r', encoding=encoding, errors='replace', newline=None)
+
+
+def logical_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Join hex data continued across lines with a trailing backslash."""
+    pending = ""
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if pending:
+            line = pending + line.strip()
+            pending = ""
+        if line.endswith('\\') and '=' in line and not line.rstrip().endswith('"'):
+            pending = line[:-1]
+            continue
+        yield line
+    if pending:
+        yield pending
+
+
+class RegistrySnapshot:
+    """
+    An in-memory registry built from one or more .reg exports.
+
+    Key path components are interned and shared across the trie, so a
+    snapshot of a full hive costs little more than its distinct names.
+    """
+
+    def __init__(self, keep: Optional[Iterable[str]] = None):
+        self.root = KeyNode()
+        self.value_count = 0
+        self.key_count = 0
+        self.skipped_keys = 0
+        # Value lines whose data could not be decoded ("Bad"=dword:)
+        self.bad_values = 0
+        self._keep: Optional[Set[Tuple[str, ...]]] = None
+        if keep is not None:
+            self._keep = {tuple(split_key_path(path)) for path in keep}
+
+    def _node(self, parts: List[str], create: bool) -> Optional[KeyNode]:
+        node = self.root
+        for part in parts:
+            if create:
+                node = node.child(part)
+            else:
+                if node.children is None or part not in node.children:
+                    return None
+                node = node.children[part]
+        return node
+
+    def _delete_key(self, parts: List[str]):
+        parent = self._node(parts[:-1], create=False)
+        if parent is None or not parent.children:
+            return
+        removed = parent.children.pop(parts[-1], None)
+        stack = [removed] if removed is not None else []
+        while stack:
+            node = stack.pop()
+            self.value_count -= len(node.values or ())
+            stack.extend((node.children or {}).values())
+
+    def load(self, path: Union[str, Path]) -> "RegistrySnapshot":
+        """Merge a .reg export into the snapshot (later files win)."""
+        with open_reg_text(path) as f:
+            self.load_lines(f)
+        return self
+
+    def load_lines(self, lines: Iterable[str]):
+        unicode = True
+        current: Optional[KeyNode] = None
+        for line in logical_lines(lines):
+            stripped = line.strip()
+            if not stripped or stripped.startswith(';'):
+                continue
+            if stripped == HEADER_V4:
+                unicode = False
+                continue
+            if stripped == HEADER_V5:
+                unicode = True
+                continue
+            if stripped.startswith('[') and stripped.endswith(']'):
+                key = stripped[1:-1]
+                if key.startswith('-'):
+                    self._delete_key(split_key_path(key[1:]))
+                    current = None
+                    continue
+                parts = split_key_path(key)
+                if self._keep is not None and tuple(parts) not in self._keep:
+                    current = None
+                    self.skipped_keys += 1
+                    continue
+                current = self._node(parts, create=True)
+                self.key_count += 1
+                continue
+            if current is None:
+                continue
+            match = VALUE_LINE_PATTERN.match(stripped)
+            if not match:
+                continue
+            name = DEFAULT_VALUE_NAME if match.group(2) else decode_string(match.group(1))
+            name = sys.intern(name.lower())
+            data = match.group(3)
+            if current.values is None:
+                current.values = {}
+            if data.strip() == '-':
+                if current.values.pop(name, None) is not None:
+                    self.value_count -= 1
+                continue
+            try:
+                parsed = parse_value(data, unicode)
+            except ValueError:
+                self.bad_values += 1
+                continue
+            if name not in current.values:
+                self.value_count += 1
+            current.values[name] = parsed
+
+    def key_exists(self, path: str) -> bool:
+        return self._node(split_key_path(path), create=False) is not None
+
+    def get(self, path: str, name: str) -> Optional[Tuple[int, Value]]:
+        """(REG_* type, value) for a value, or None when it is not present."""
+        node = self._node(split_key_path(path), create=False)
+        if node is None or node.values is None:
+            return None
+        return node.values.get(name.lower())
+
+    def value(self, path: str, name: str) -> Value:
+        found = self.get(path, name)
+        return found[1] if found else None
+
+    def walk(self) -> Iterator[Tuple[str, str, int, Value]]:
+        """Yield (key path, value name, type, value) for every stored value."""
+        stack: List[Tuple[str, KeyNode]] = [("", self.root)]
+        while stack:
+            path, node = stack.pop()
+            if node.values:
+                for name, (value_type, value) in node.values.items():
+                    yield path, name, value_type, value
+            if node.children:
+                for name, child in node.children.items():
+                    stack.append((f"{path}\\{name}" if path else name, child))
+
+    def __len__(self) -> int:
+        return self.value_count
+
+
+def display_value(value: Value) -> str:
+    if value is None:
+        return "Not Configured"
+    if isinstance(value, bytes):
+        return value.hex(',')
+    if isinstance(value, list):
+        return ", ".join(value)
+    return str(value)
+
+
+def registry_entries(profile: Optional[str] = None) -> List[CatalogEntry]:
+    """Every catalog recommendation backed by at least one registry value."""
+    return [entry for entry in load_catalog().select(profile=profile)
+            if entry.registry_locations]
+
+
+def catalog_key_paths(entries: Iterable[CatalogEntry]) -> Set[str]:
+    return {location.normalized_path
+            for entry in entries for location in entry.registry_locations}
+
+
+class RegistryEvaluator:
+    """Evaluates registry-backed recommendations against a RegistrySnapshot"""
+
+    def __init__(self, snapshot: RegistrySnapshot, computer_name: Optional[str] = None):
+        self.snapshot = snapshot
+        self.computer_name = computer_name
+
+    def evaluate(self, entry: CatalogEntry) -> CISResult:
+        observation = self.observe(entry)
+        return self.result(entry, observation, observation.decide())
+
+    def observe(self, entry: CatalogEntry) -> Observation:
+        """The snapshot's values for a recommendation, not yet decided."""
+        observation = Observation()
+        current = []
+        details = []
+        for location in entry.registry_locations:
+            found = self.snapshot.get(location.path, location.value_name)
+            value = found[1] if found else None
+            if isinstance(value, bytes):
+                value = value.hex()
+            observation.check(compile_phrase(entry.expected_data_for(location.value_name)), value)
+            current.append(display_value(value))
+            state = REG_TYPE_NAMES.get(found[0], f"type {found[0]}") if found else "missing"
+            details.append(f"{location.path}:{location.value_name} ({state})")
+        observation.current = "; ".join(current)
+        observation.details = "Registry path: " + "; ".join(details)
+        return observation
+
+    def result(self, entry: CatalogEntry, observation: Observation,
+               compliant: Optional[bool]) -> CISResult:
+        """The result for an observation once its checks are decided."""
+        extra = {"computer_name": self.computer_name} if self.computer_name else {}
+        return CISResult(
+            cis_id=entry.cis_id,
+            title=entry.title,
+            current_value=observation.current,
+            recommended_value=entry.expected_value or "; ".join(entry.registry_expected.values()),
+            compliance_status=status_for(compliant),
+            source=SOURCE,
+            details=observation.details,
+            profile=entry.profile,
+            **extra,
+        )
+
+    def evaluate_all(self, entries: Iterable[CatalogEntry]) -> List[CISResult]:
+        return [self.evaluate(entry) for entry in entries]
+
+
+def evaluate_snapshots(paths: List[Union[str, Path]], profile: Optional[str] = None,
+                       computer_name: Optional[str] = None) -> List[CISResult]:
+    """Load .reg exports (keeping only catalog keys) and evaluate them."""
+    entries = registry_entries(profile)
+    snapshot = RegistrySnapshot(keep=catalog_key_paths(entries))
+    for path in paths:
+        snapshot.load(path)
+    return RegistryEvaluator(snapshot, computer_name).evaluate_all(entries)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Evaluate .reg exports against registry-backed CIS recommendations")
+    parser.add_argument("exports", nargs="+", type=Path, help=".reg files (HKLM and/or HKCU)")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--computer-name", help="ComputerName for the results (default: this host)")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    entries = registry_entries(args.profile)
+    snapshot = RegistrySnapshot(keep=catalog_key_paths(entries))
+    for path in args.exports:
+        snapshot.load(path)
+    if snapshot.bad_values:
+        print(f"Warning: skipped {snapshot.bad_values} value line(s) with malformed data",
+              file=sys.stderr)
+    results = RegistryEvaluator(snapshot, args.computer_name).evaluate_all(entries)
+    elapsed = time.perf_counter() - started
+
+    output_results(results, args.format, args.output, elapsed)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Closed-loop remediation effectiveness: did the change stick?
+
+Export-CISRemediationResults records what a remediation changed and when;
+later audit runs record whether the setting is still compliant. This
+joins the two per (host, CIS_ID): every audit result is attributed to
+the latest remediation of that host and control before it, and each
+remediation then has
+
+    next audit      the first audit after it (within --window-days)
+    reverted        a Non-Compliant audit after a compliant next audit
+                    (within --revert-days), before any later remediation
+
+From those, per control:
+
+    success rate    compliant next audits / applied remediations with a
+                    next audit (Remediated or PartiallyRemediated events;
+                    Failed/Cancelled/... count as attempts only)
+    reversion rate  reverted / successful remediations
+    time to revert  remediation to first Non-Compliant audit, in hours
+
+It is a hash join: remediation events (the small side) are indexed by
+(host, CIS_ID) and the audit history is streamed through the index once,
+in any order. Each event keeps only the earliest next audit and earliest
+failure seen so far, so memory is proportional to the remediation events,
+never to the audit rows. With --partitions N the events are split by host
+hash and the audit history is streamed N times, holding 1/N of the events
+at a time.
+
+The inputs are result stores (result_store.py): audit segments in STORE,
+remediation segments in STORE/remediation/ as the ingestion service
+(ingest_service.py) writes them.
+
+Usage:
+    python remediation_join.py fleet-store/
+    python remediation_join.py fleet-store/ --window-days 3 --revert-days 60 --format csv --output effectiveness.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import statistics
+import sys
+import time
+import zlib
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from cis_catalog import cis_id_sort_key
+from cis_results import TIMESTAMP_FORMAT
+from result_store import ResultStore
+
+REMEDIATION_DIR = "remediation"
+
+# Remediation statuses after which the setting should be compliant
+APPLIED_STATUSES = ("Remediated", "PartiallyRemediated")
+
+AUDIT_FIELDS = ("ComputerName", "CIS_ID", "AuditTimestamp", "ComplianceStatus")
+EVENT_FIELDS = ("ComputerName", "CIS_ID", "RemediationTimestamp", "Status")
+
+HOUR = 3600.0
+
+
+@lru_cache(maxsize=65536)
+def epoch(timestamp: str) -> Optional[float]:
+    """Seconds for a "yyyy-MM-dd HH:mm:ss" timestamp (None if unparseable)."""
+    try:
+        return datetime.strptime(timestamp.strip(), TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class Event:
+    """One remediation and what the audits after it showed"""
+    when: float
+    applied: bool
+    next_audit: float = float("inf")
+    next_compliant: bool = False
+    first_failure: float = float("inf")
+
+
+@dataclass
+class ControlEffectiveness:
+    """Remediation outcomes for one control"""
+    cis_id: str
+    attempts: int = 0
+    applied: int = 0
+    verified: int = 0
+    succeeded: int = 0
+    reverted: int = 0
+    revert_hours: List[float] = field(default_factory=list)
+
+    @property
+    def unverified(self) -> int:
+        return self.applied - self.verified
+
+    @property
+    def success_rate(self) -> float:
+        return round(self.succeeded / self.verified * 100, 2) if self.verified else 0.0
+
+    @property
+    def reversion_rate(self) -> float:
+        return round(self.reverted / self.succeeded * 100, 2) if self.succeeded else 0.0
+
+    @property
+    def median_hours_to_revert(self) -> Optional[float]:
+        return round(statistics.median(self.revert_hours), 1) if self.revert_hours else None
+
+    def add(self, other: "ControlEffectiveness"):
+        self.attempts += other.attempts
+        self.applied += other.applied
+        self.verified += other.verified
+        self.succeeded += other.succeeded
+        self.reverted += other.reverted
+        self.revert_hours += other.revert_hours
+
+    def to_dict(self) -> dict:
+        return {
+            "cis_id": self.cis_id, "attempts": self.attempts, "applied": self.applied,
+            "verified": self.verified, "unverified": self.unverified,
+            "succeeded": self.succeeded, "success_rate": self.success_rate,
+            "reverted": self.reverted, "reversion_rate": self.reversion_rate,
+            "median_hours_to_revert": self.median_hours_to_revert,
+        }
+
+
+def partition_of(host: str, partitions: int) -> int:
+    return zlib.crc32(host.lower().encode('utf-8')) % partitions if partitions > 1 else 0
+
+
+class RemediationJoin:
+    """Hash join of remediation events to the audit results that follow them"""
+
+    def __init__(self, window_days: float = 7, revert_days: float = 30):
+        self.window = window_days * 24 * HOUR
+        self.revert_window = revert_days * 24 * HOUR
+        self.audit_rows = 0
+        self.matched_rows = 0
+        self.skipped_rows = 0
+
+    def build(self, events: Iterable[Sequence[str]], partition: int = 0, partitions: int = 1
+              ) -> Dict[Tuple[str, str], Tuple[List[float], List[Event]]]:
+        """Index (host, cis_id) -> (sorted times, events) for one partition of hosts."""
+        index: Dict[Tuple[str, str], List[Event]] = {}
+        for host, cis_id, timestamp, status in events:
+            when = epoch(timestamp)
+            if when is None or partition_of(host, partitions) != partition:
+                continue
+            index.setdefault((host.lower(), cis_id), []).append(Event(when, status in APPLIED_STATUSES))
+        table = {}
+        for key, key_events in index.items():
+            key_events.sort(key=lambda event: event.when)
+            table[key] = ([event.when for event in key_events], key_events)
+        return table
+
+    def probe(self, table: Dict[Tuple[str, str], Tuple[List[float], List[Event]]],
+              audits: Iterable[Sequence[str]]):
+        """Attribute each audit row to the latest remediation before it."""
+        for host, cis_id, timestamp, status in audits:
+            self.audit_rows += 1
+            entry = table.get((host.lower(), cis_id))
+            if entry is None:
+                continue
+            when = epoch(timestamp)
+            if when is None:
+                self.skipped_rows += 1
+                continue
+            times, events = entry
+            position = bisect_left(times, when) - 1     # strictly after the remediation
+            if position < 0:
+                continue
+            event = events[position]
+            elapsed = when - event.when
+            self.matched_rows += 1
+            if elapsed <= self.window and when < event.next_audit:
+                event.next_audit = when
+                event.next_compliant = status == "Compliant"
+            if status == "Non-Compliant" and elapsed <= self.revert_window and when < event.first_failure:
+                event.first_failure = when
+
+    @staticmethod
+    def outcomes(table: Dict[Tuple[str, str], Tuple[List[float], List[Event]]]
+                 ) -> Dict[str, ControlEffectiveness]:
+        controls: Dict[str, ControlEffectiveness] = {}
+        for (_, cis_id), (_, events) in table.items():
+            control = controls.setdefault(cis_id, ControlEffectiveness(cis_id))
+            for event in events:
+                control.attempts += 1
+                if not event.applied:
+                    continue
+                control.applied += 1
+                if event.next_audit == float("inf"):
+                    continue
+                control.verified += 1
+                if not event.next_compliant:
+                    continue
+                control.succeeded += 1
+                if event.first_failure > event.next_audit and event.first_failure != float("inf"):
+                    control.reverted += 1
+                    control.revert_hours.append((event.first_failure - event.when) / HOUR)
+        return controls
+
+    def run(self, events, audits, partitions: int = 1) -> List[ControlEffectiveness]:
+        """
+        Join; events and audits are callables returning fresh row iterators
+        ((host, cis_id, timestamp, status) tuples), as the audit side is
+        streamed once per partition.
+        """
+        totals: Dict[str, ControlEffectiveness] = {}
+        for partition in range(partitions):
+            table = self.build(events(), partition, partitions)
+            if table:
+                self.probe(table, audits())
+            for cis_id, control in self.outcomes(table).items():
+                totals.setdefault(cis_id, ControlEffectiveness(cis_id)).add(control)
+        return [totals[cis_id] for cis_id in sorted(totals, key=cis_id_sort_key)]
+
+
+def join_store(store: Union[str, Path], remediation: Optional[Union[str, Path]] = None,
+               window_days: float = 7, revert_days: float = 30, partitions: int = 1
+               ) -> Tuple[List[ControlEffectiveness], RemediationJoin]:
+    """Remediation effectiveness from a result store and its remediation segments."""
+    store = Path(store)
+    remediation = Path(remediation) if remediation else store / REMEDIATION_DIR
+    join = RemediationJoin(window_days, revert_days)
+    with ResultStore(store) as audits, ResultStore(remediation) as events:
+        if events.segments and "Status" not in events.segments[0].columns:
+            raise ValueError(f"{remediation} does not hold remediation results")
+        results = join.run(lambda: events.iter_rows(EVENT_FIELDS),
+                           lambda: audits.iter_rows(AUDIT_FIELDS), partitions)
+    return results, join
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Join remediation results to the audits that followed them")
+    parser.add_argument("store", type=Path, help="result store with audit segments")
+    parser.add_argument("--remediation", type=Path,
+                        help="remediation segments (default: STORE/remediation)")
+    parser.add_argument("--window-days", type=float, default=7,
+                        help="how long after a remediation its next audit may come (default: 7)")
+    parser.add_argument("--revert-days", type=float, default=30,
+                        help="how long after a remediation a failure counts as reversion (default: 30)")
+    parser.add_argument("--partitions", type=int, default=1,
+                        help="split remediation events by host into N passes to bound memory")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        results, join = join_store(args.store, args.remediation, args.window_days,
+                                   args.revert_days, max(1, args.partitions))
+    except (ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    overall = ControlEffectiveness("(all)")
+    for control in results:
+        overall.add(control)
+
+    if args.format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(["CIS_ID", "Attempts", "Applied", "Verified", "Succeeded", "SuccessRate",
+                         "Reverted", "ReversionRate", "MedianHoursToRevert"])
+        writer.writerows([c.cis_id, c.attempts, c.applied, c.verified, c.succeeded, c.success_rate,
+                          c.reverted, c.reversion_rate, c.median_hours_to_revert or ""]
+                         for c in results + [overall])
+        output = buffer.getvalue()
+    elif args.format == "json":
+        output = json.dumps({"overall": overall.to_dict(),
+                             "controls": [c.to_dict() for c in results]}, indent=2)
+    else:
+        lines = [f"{'CIS_ID':<12} {'Applied':>8} {'Verified':>9} {'Success':>8} {'Reverted':>9} "
+                 f"{'Median h':>9}"]
+        for c in results + [overall]:
+            median = "-" if c.median_hours_to_revert is None else f"{c.median_hours_to_revert:.1f}"
+            lines.append(f"{c.cis_id:<12} {c.applied:>8,} {c.verified:>9,} {c.success_rate:>7.2f}% "
+                         f"{c.reversion_rate:>8.2f}% {median:>9}")
+        lines.append(f"\n{join.audit_rows:,} audit rows streamed, {join.matched_rows:,} matched "
+                     f"to a remediation ({elapsed:.1f}s)")
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Results written to: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Plan remediations so every underlying setting is written once.
+
+Running every remediation script re-applies shared work (each section 1/2
+script runs its own `secedit /configure`) and, where two recommendations touch
+the same setting, the last script silently wins. This planner indexes the
+catalog by the setting each recommendation writes:
+
+- registry:  hive\\key:value (section 5 services are their Services\\<name>:Start)
+- secedit:   [System Access] key or [Privilege Rights] user right
+- auditpol:  advanced audit subcategory GUID
+
+and, for a profile, resolves the recommendations that share a setting:
+duplicates (same value) collapse into one write, compatible demands are
+merged (a value that satisfies every phrase, the union of "to include"
+principals or audit flags), and the rest are reported as conflicts. Related
+settings that Windows validates together (lockout reset vs. lockout
+duration, minimum vs. maximum password age) are checked after resolution,
+and settings that depend on a planned value are added to the plan
+(disabling the SMBv1 client driver also takes it out of the Workstation
+service's dependencies, which would otherwise fail to start).
+
+Levels are cumulative, as in the benchmark: --level L2 plans the L1 and L2
+recommendations, and --bitlocker adds BL. Without --level every
+recommendation is planned.
+
+The result is an ordered list of batches -- one security template, one
+registry policy, one service change set, one audit policy -- in which each
+setting appears once, plus counts of the writes and tool runs eliminated
+compared with running the scripts one by one.
+
+Usage:
+    python remediation_planner.py --level L2 --bitlocker
+    python remediation_planner.py --level L1 --format json --output plan.json
+"""
+
+import argparse
+import json
+import operator
+import sys
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from auditpol_backup import required_setting, subcategory_guid
+from cis_catalog import CatalogEntry, cis_id_sort_key, load_catalog
+from cis_results import PROFILES
+from recommended_values import evaluate_phrase, parse_principals, recommended_setting
+from secedit_inf import (
+    ACCOUNT_NAME_KEYS, PRIVILEGE_RIGHTS, SYSTEM_ACCESS, SYSTEM_ACCESS_KEYS,
+    USER_RIGHTS, setting_name,
+)
+
+# Levels build on each other: a Level 2 host also applies Level 1
+PROFILE_LEVELS = {"L1": ("L1",), "L2": ("L1", "L2")}
+
+# Batches in the order they are applied. The security template goes first:
+# it sets 2.3.2.1 (SCENoApplyLegacyAuditPolicy), without which the audit
+# subcategory settings of the last batch are overridden by legacy categories.
+BATCHES = (
+    ("secedit", "Security template (secedit /configure)"),
+    ("registry", "Registry policy values"),
+    ("service", "Service start types"),
+    ("auditpol", "Advanced audit policy (auditpol /restore)"),
+)
+
+# Settings Windows validates against each other: (left, op, right, message)
+RELATIONS = [
+    ("ResetLockoutCount", operator.le, "LockoutDuration",
+     "the lockout counter reset must not exceed the lockout duration"),
+    ("MinimumPasswordAge", operator.lt, "MaximumPasswordAge",
+     "the minimum password age must be less than the maximum password age"),
+]
+
+SINGLE, DUPLICATE, MERGED, CONFLICT, DEPENDENT = (
+    "single", "duplicate", "merged", "conflict", "dependent")
+
+
+@dataclass(frozen=True)
+class SettingKey:
+    """One underlying setting, identified independently of the recommendation"""
+    mechanism: str      # registry / secedit / auditpol
+    name: str           # normalized identity
+    display: str
+
+
+# Settings that must change with a planned value: (setting, value) -> dependent write.
+# The Workstation service depends on the SMBv1 client driver (Bowser, MRxSmb10,
+# MRxSmb20, NSI); disabling the driver alone leaves it unable to start.
+DEPENDENCIES = [
+    ("hklm\\system\\currentcontrolset\\services\\mrxsmb10:start", 4,
+     SettingKey("registry",
+                "hklm\\system\\currentcontrolset\\services\\lanmanworkstation:dependonservice",
+                "HKLM\\SYSTEM\\CurrentControlSet\\Services\\LanmanWorkstation:DependOnService"),
+     ("Bowser", "MRxSmb20", "NSI"),
+     "the Workstation service must no longer depend on the SMBv1 client driver"),
+]
+
+
+@dataclass
+class Demand:
+    """What one recommendation wants a setting to be"""
+    cis_id: str
+    profile: str
+    batch: str
+    phrase: str
+    value: Any          # Value, frozenset of principals or audit flags; None = site-specific
+    inclusion: bool = False
+
+
+@dataclass
+class PlannedSetting:
+    """A setting after resolving every demand on it"""
+    key: SettingKey
+    demands: List[Demand]
+    value: Any
+    status: str
+    note: str = ""
+
+    @property
+    def batch(self) -> str:
+        return self.demands[0].batch
+
+    @property
+    def writable(self) -> bool:
+        return self.value is not None and self.status != CONFLICT
+
+
+@dataclass
+class RemediationPlan:
+    profiles: Tuple[str, ...]
+    settings: List[PlannedSetting]
+    batches: List[Tuple[str, str, List[PlannedSetting]]] = field(default_factory=list)
+    violations: List[str] = field(default_factory=list)
+
+    def by_status(self, status: str) -> List[PlannedSetting]:
+        return [s for s in self.settings if s.status == status]
+
+    @property
+    def manual(self) -> List[PlannedSetting]:
+        return [s for s in self.settings if s.value is None]
+
+    def stats(self) -> Dict[str, int]:
+        writable = [s for s in self.settings if s.writable]
+        # Every script writes its own settings; manual values are never written and
+        # no script writes the dependent settings
+        naive_writes = sum(len(s.demands) for s in self.settings
+                           if s.value is not None and s.status != DEPENDENT)
+        recommendations = {d.cis_id for s in self.settings for d in s.demands}
+        return {
+            "recommendations": len(recommendations),
+            "settings": len(self.settings),
+            "naive_writes": naive_writes,
+            "planned_writes": len(writable),
+            "writes_eliminated": sum(len(s.demands) - 1 for s in writable),
+            # One script (and one secedit/auditpol/Set-Service run) per recommendation
+            "naive_runs": len(recommendations),
+            "planned_runs": len(self.batches),
+            "duplicates": len(self.by_status(DUPLICATE)),
+            "merged": len(self.by_status(MERGED)),
+            "conflicts": len(self.by_status(CONFLICT)),
+            "dependent": len(self.by_status(DEPENDENT)),
+            "manual": len(self.manual),
+        }
+
+
+def entry_batch(entry: CatalogEntry) -> str:
+    """The batch that applies a recommendation's settings."""
+    source = entry.data_source
+    if source == "registry" and entry.section in ("1", "2"):
+        return "secedit"            # security options go in [Registry Values]
+    return source
+
+
+def setting_demands(entry: CatalogEntry) -> List[Tuple[SettingKey, Demand]]:
+    """The settings a recommendation writes and the value it wants for each."""
+    batch = entry_batch(entry)
+
+    def demand(phrase: str, value: Any, inclusion: bool = False) -> Demand:
+        return Demand(entry.cis_id, entry.profile, batch, phrase, value, inclusion)
+
+    if entry.data_source in ("registry", "service"):
+        demands = []
+        for location in entry.registry_locations:
+            phrase = entry.expected_data_for(location.value_name)
+            multi = entry.registry_value_type == "REG_MULTI_SZ" or location.value_name.startswith('<') \
+                or (',' in phrase and '\\' in phrase)
+            value = recommended_setting(phrase, multi_string=multi)
+            key = SettingKey("registry",
+                             f"{location.normalized_path}:{location.value_name.lower()}",
+                             f"{location.path}:{location.value_name}")
+            demands.append((key, demand(phrase, tuple(value) if isinstance(value, list) else value)))
+        return demands
+
+    if entry.data_source == "auditpol":
+        guid = subcategory_guid(entry)
+        if guid is None:
+            return []
+        key = SettingKey("auditpol", guid, f"Audit {setting_name(entry)}")
+        return [(key, demand(entry.expected_value, required_setting(entry),
+                             entry.expects_inclusion))]
+
+    name = setting_name(entry).lower()
+    if name in SYSTEM_ACCESS_KEYS:
+        system_key = SYSTEM_ACCESS_KEYS[name]
+        key = SettingKey("secedit", f"{SYSTEM_ACCESS}\\{system_key}".lower(),
+                         f"[{SYSTEM_ACCESS}] {system_key}")
+        value = None if system_key in ACCOUNT_NAME_KEYS else recommended_setting(entry.expected_value)
+        return [(key, demand(entry.expected_value, value))]
+    if name in USER_RIGHTS:
+        constant = USER_RIGHTS[name]
+        key = SettingKey("secedit", f"{PRIVILEGE_RIGHTS}\\{constant}".lower(),
+                         f"[{PRIVILEGE_RIGHTS}] {constant}")
+        value = frozenset(parse_principals(entry.expected_value)) if entry.expected_value else None
+        return [(key, demand(entry.expected_value, value, entry.expects_inclusion))]
+    return []
+
+
+def _merge_sets(demands: List[Demand], union: Callable[[Any, Any], Any],
+                contains: Callable[[Any, Any], bool]) -> Tuple[Any, str, str]:
+    """Principal sets / audit flags: "include" demands add up, exact ones must agree."""
+    included = None
+    for d in demands:
+        if d.inclusion:
+            included = d.value if included is None else union(included, d.value)
+    exact = {d.value for d in demands if not d.inclusion}
+    if len(exact) > 1:
+        return demands[0].value, CONFLICT, "different exact assignments"
+    if exact:
+        value = exact.pop()
+        if included is not None and not contains(value, included):
+            return value, CONFLICT, "the exact assignment leaves out required members"
+        return value, MERGED, "exact assignment covers every 'include' demand"
+    return included, MERGED, "union of the 'include' demands"
+
+
+def resolve(key: SettingKey, demands: List[Demand]) -> PlannedSetting:
+    """Collapse the demands on one setting into a single value (or a conflict)."""
+    values = [d.value for d in demands]
+    if all(value is None for value in values):
+        # One site-specific value serves every recommendation on the setting
+        return PlannedSetting(key, demands, None, SINGLE if len(demands) == 1 else MERGED,
+                              "site-specific value, remediate manually")
+    if any(value is None for value in values):
+        return PlannedSetting(key, demands, None, CONFLICT,
+                              "site-specific and fixed values on one setting")
+    if len(demands) == 1:
+        return PlannedSetting(key, demands, values[0], SINGLE)
+    if len(set(values)) == 1 and len({d.inclusion for d in demands}) == 1:
+        return PlannedSetting(key, demands, values[0], DUPLICATE,
+                              f"same value from {len(demands)} recommendations")
+
+    if isinstance(values[0], frozenset):
+        value, status, note = _merge_sets(demands, operator.or_, operator.ge)
+    elif key.mechanism == "auditpol":
+        value, status, note = _merge_sets(demands, operator.or_,
+                                          lambda have, want: have & want == want)
+    else:
+        # Scalars: the first candidate value every phrase accepts
+        value, status, note = values[0], CONFLICT, "no single value satisfies every recommendation"
+        for candidate in values:
+            check = list(candidate) if isinstance(candidate, tuple) else candidate
+            if all(evaluate_phrase(d.phrase, check) for d in demands):
+                value, status, note = candidate, MERGED, f"{candidate!r} satisfies every recommendation"
+                break
+    return PlannedSetting(key, demands, value, status, note)
+
+
+def check_relations(settings: Dict[str, PlannedSetting]) -> List[str]:
+    """Violations of RELATIONS among the resolved [System Access] values."""
+    violations = []
+    for left, compare, right, message in RELATIONS:
+        a = settings.get(f"{SYSTEM_ACCESS}\\{left}".lower())
+        b = settings.get(f"{SYSTEM_ACCESS}\\{right}".lower())
+        if not a or not b or not isinstance(a.value, int) or not isinstance(b.value, int):
+            continue
+        if not compare(a.value, b.value):
+            violations.append(f"{left}={a.value} vs {right}={b.value}: {message} "
+                              f"({', '.join(d.cis_id for d in a.demands + b.demands)})")
+    return violations
+
+
+def dependent_settings(settings: Dict[str, PlannedSetting]) -> List[PlannedSetting]:
+    """The DEPENDENCIES writes the resolved registry values call for."""
+    dependent = []
+    for name, value, key, required, note in DEPENDENCIES:
+        trigger = settings.get(name)
+        if trigger is None or not trigger.writable or trigger.value != value:
+            continue
+        demand = replace(trigger.demands[0], phrase=", ".join(required), value=required)
+        dependent.append(PlannedSetting(key, [demand], required, DEPENDENT, note))
+    return dependent
+
+
+def level_profiles(level: Optional[str] = None, bitlocker: bool = False) -> Tuple[str, ...]:
+    """The catalog profiles a level applies (every profile when level is None)."""
+    if level is None:
+        return PROFILES
+    return PROFILE_LEVELS[level] + (("BL",) if bitlocker else ())
+
+
+def profile_entries(level: Optional[str] = None, bitlocker: bool = False,
+                    entries: Optional[Iterable[CatalogEntry]] = None) -> List[CatalogEntry]:
+    """The recommendations a level applies (all of them when level is None)."""
+    if entries is None:
+        entries = load_catalog().select()
+    profiles = level_profiles(level, bitlocker)
+    return [e for e in entries if e.profile in profiles]
+
+
+def build_plan(entries: Iterable[CatalogEntry], profiles: Tuple[str, ...] = ()) -> RemediationPlan:
+    """Index recommendations by setting, resolve each setting and batch the writes."""
+    index: Dict[SettingKey, List[Demand]] = {}
+    for entry in sorted(entries, key=lambda e: cis_id_sort_key(e.cis_id)):
+        for key, demand in setting_demands(entry):
+            index.setdefault(key, []).append(demand)
+
+    settings = [resolve(key, demands) for key, demands in index.items()]
+    settings += dependent_settings(
+        {s.key.name: s for s in settings if s.key.mechanism == "registry"})
+    plan = RemediationPlan(profiles, settings)
+    plan.violations = check_relations(
+        {s.key.name: s for s in settings if s.key.mechanism == "secedit"})
+
+    for batch, description in BATCHES:
+        members = sorted((s for s in settings if s.batch == batch and s.writable),
+                         key=lambda s: s.key.name)      # one pass per registry key
+        if members:
+            plan.batches.append((batch, description, members))
+    return plan
+
+
+def display(value: Any) -> str:
+    if isinstance(value, frozenset):
+        return ", ".join(sorted(value)) or "No One"
+    if isinstance(value, tuple):
+        return ", ".join(value)
+    return str(value)
+
+
+def plan_to_dict(plan: RemediationPlan) -> Dict[str, Any]:
+    def setting(s: PlannedSetting) -> Dict[str, Any]:
+        return {
+            "setting": s.key.display,
+            "mechanism": s.key.mechanism,
+            "value": display(s.value) if s.value is not None else None,
+            "status": s.status,
+            "note": s.note,
+            "cis_ids": [d.cis_id for d in s.demands],
+        }
+
+    return {
+        "profiles": list(plan.profiles),
+        "stats": plan.stats(),
+        "batches": [{"batch": batch, "description": description,
+                     "settings": [setting(s) for s in members]}
+                    for batch, description, members in plan.batches],
+        "duplicates": [setting(s) for s in plan.by_status(DUPLICATE)],
+        "merged": [setting(s) for s in plan.by_status(MERGED)],
+        "conflicts": [setting(s) for s in plan.by_status(CONFLICT)],
+        "dependent": [setting(s) for s in plan.by_status(DEPENDENT)],
+        "violations": plan.violations,
+        "manual": [setting(s) for s in plan.manual],
+    }
+
+
+def format_text(plan: RemediationPlan) -> str:
+    stats = plan.stats()
+    lines = [
+        f"Profiles: {', '.join(plan.profiles)}",
+        f"{stats['recommendations']} recommendations write {stats['settings']} settings",
+        f"Writes: {stats['naive_writes']} -> {stats['planned_writes']} "
+        f"({stats['writes_eliminated']} eliminated); "
+        f"tool runs: {stats['naive_runs']} -> {stats['planned_runs']}",
+        f"Duplicates: {stats['duplicates']}  Merged: {stats['merged']}  "
+        f"Conflicts: {stats['conflicts']}  Dependent: {stats['dependent']}  "
+        f"Manual: {stats['manual']}",
+        "",
+    ]
+    for number, (batch, description, members) in enumerate(plan.batches, 1):
+        lines.append(f"Batch {number}: {description} - {len(members)} settings")
+    for status in (DUPLICATE, MERGED, CONFLICT, DEPENDENT):
+        for s in plan.by_status(status):
+            lines.append(f"{status.capitalize()}: {s.key.display} = {display(s.value)} "
+                         f"[{', '.join(d.cis_id for d in s.demands)}] {s.note}")
+    for violation in plan.violations:
+        lines.append(f"Invalid combination: {violation}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Plan deduplicated, batched remediations for a CIS profile")
+    parser.add_argument("--level", choices=sorted(PROFILE_LEVELS),
+                        help="L2 includes L1 (default: every recommendation)")
+    parser.add_argument("--bitlocker", action="store_true",
+                        help="add the BitLocker (BL) recommendations to --level")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    entries = profile_entries(args.level, args.bitlocker)
+    plan = build_plan(entries, level_profiles(args.level, args.bitlocker))
+
+    if args.format == "json":
+        output = json.dumps(plan_to_dict(plan), indent=2)
+    else:
+        output = format_text(plan)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Plan written to: {args.output}")
+    else:
+        print(output)
+    return 1 if plan.by_status(CONFLICT) or plan.violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
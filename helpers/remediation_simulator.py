@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Predict what a remediation wave would do to a host, without touching it.
+
+The remediation plan (remediation_planner.py) for a selection of
+recommendations is applied to copy-on-write overlays of a host snapshot
+(a bundle from host_bundle.py or a folder of loose exports). An overlay
+holds only the settings the plan writes and reads everything else through
+to the parsed snapshot, so a simulation costs the size of the plan, not a
+copy of the host's policy. The selection is then evaluated twice with
+host_bundle.evaluate_bundle(), against the snapshot and against the
+overlays, which gives current and predicted compliance side by side.
+
+A setting is only written when its current value does not already satisfy
+every recommendation on it, so the changes are the minimal set, and their
+previous values become the rollback artifacts:
+
+- <host>-rollback.reg  registry values (policy keys, security options,
+                       service start types), restored or deleted ("Name"=-)
+- <host>-rollback.inf  [System Access] and [Privilege Rights] lines for
+                       `secedit /configure`
+
+The plan is built once per worker process and shared by every host it
+simulates. Hosts run on fleet_runner's process pool in chunks, and each
+host's output (and rollback files) is written as it finishes, so memory
+does not grow with the fleet. Audit policy (section 17) is not simulated;
+its recommendations keep their current result.
+
+Usage:
+    python remediation_simulator.py WS01.cisb --level L1
+    python remediation_simulator.py snapshots/ --level L2 --rollback rollback/
+    python remediation_simulator.py snapshots/ --id 2.3.1.2 --format csv --output predicted.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from auditpol_backup import AuditPolicyBackup
+from cis_catalog import CatalogEntry, load_catalog, normalize_registry_path
+from cis_results import CISResult, results_to_csv
+from fleet_runner import HostOutcome, discover_hosts, open_host, run_chunks
+from host_bundle import evaluate_bundle
+from recommended_values import (
+    Value, as_int, evaluate_phrase, evaluate_principals, normalize_principal,
+)
+from registry_pol import REG_SZ, value_type_for
+from registry_snapshot import (
+    HEADER_V5, REG_DWORD, RegistrySnapshot, catalog_key_paths, format_value,
+)
+from remediation_planner import (
+    DEPENDENT, PROFILE_LEVELS, RemediationPlan, build_plan, profile_entries,
+)
+from secedit_inf import (
+    PRIVILEGE_RIGHTS, SYSTEM_ACCESS, UNLIMITED_KEYS, RegistryValue, SeceditExport,
+    unquote,
+)
+from secedit_template import TemplateCompiler, format_registry_value, principal_token, write_template
+from service_baseline import ServiceInventory, service_name
+
+HIVE_NAMES = {"hklm": "HKEY_LOCAL_MACHINE", "hkcu": "HKEY_CURRENT_USER"}
+
+
+@dataclass(frozen=True)
+class PlannedWrite:
+    """One setting of the plan, in the form the overlays apply it"""
+    batch: str                          # secedit / registry / service
+    section: str                        # [System Access] / [Privilege Rights]; "" for registry
+    path: str                           # registry key; "" for secedit lines
+    name: str                           # value name, secedit key or user right
+    value_type: int
+    value: Any                          # Value, or a frozenset of principals
+    demands: Tuple[Tuple[str, bool], ...]   # (phrase, inclusion) per recommendation
+    cis_ids: Tuple[str, ...]
+    service: Optional[str] = None
+
+    @property
+    def display(self) -> str:
+        if self.section:
+            return f"[{self.section}] {self.name}"
+        return f"{self.path}:{self.name}"
+
+    def satisfied_by(self, current: Any) -> bool:
+        """Whether the current value already meets every recommendation."""
+        if self.section == PRIVILEGE_RIGHTS:
+            return all(evaluate_principals(phrase, current, inclusion=inclusion)
+                       for phrase, inclusion in self.demands)
+        return all(evaluate_phrase(phrase, current) for phrase, _ in self.demands)
+
+
+@dataclass
+class Change:
+    """A write the simulation made, with the value it replaced"""
+    write: PlannedWrite
+    previous: Any       # (REG_* type, value) / raw secedit text / principal list; None = absent
+    value: Any
+
+    def to_dict(self) -> Dict[str, Any]:
+        def shown(value: Any) -> Any:
+            if isinstance(value, tuple):
+                value = value[1]
+            return value.hex() if isinstance(value, bytes) else value
+        return {"setting": self.write.display, "previous": shown(self.previous),
+                "value": shown(self.value), "cis_ids": list(self.write.cis_ids)}
+
+
+class RegistryOverlay:
+    """Simulated registry writes over a RegistrySnapshot; reads fall through"""
+
+    def __init__(self, base: RegistrySnapshot):
+        self.base = base
+        self.writes: Dict[Tuple[str, str], Tuple[int, Value]] = {}
+
+    def set(self, path: str, name: str, value_type: int, value: Value):
+        self.writes[(normalize_registry_path(path), name.lower())] = (value_type, value)
+
+    def get(self, path: str, name: str) -> Optional[Tuple[int, Value]]:
+        written = self.writes.get((normalize_registry_path(path), name.lower()))
+        return written if written is not None else self.base.get(path, name)
+
+    def value(self, path: str, name: str) -> Value:
+        found = self.get(path, name)
+        return found[1] if found else None
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for path, name in self.writes
+                                    if self.base.get(path, name) is None)
+
+
+class SeceditOverlay:
+    """Simulated secedit lines over a SeceditExport; reads fall through"""
+
+    def __init__(self, base: SeceditExport):
+        self.base = base
+        self.access: Dict[str, str] = {}
+        self.rights: Dict[str, List[str]] = {}
+        self.values: Dict[Tuple[str, str], RegistryValue] = {}
+
+    def set_access(self, key: str, raw: str):
+        self.access[key.lower()] = raw
+
+    def set_privilege(self, constant: str, principals: List[str]):
+        self.rights[constant.lower()] = principals
+
+    def set_registry_value(self, path: str, name: str, value_type: int, value: Value):
+        data = format_registry_value(value, value_type).partition(',')[2]
+        self.values[(normalize_registry_path(path), name.lower())] = \
+            RegistryValue(path, name, value_type, data)
+
+    def system_access(self, key: str) -> Optional[str]:
+        raw = self.access.get(key.lower())
+        return raw if raw is not None else self.base.system_access(key)
+
+    def privilege(self, constant: str) -> List[str]:
+        principals = self.rights.get(constant.lower())
+        return principals if principals is not None else self.base.privilege(constant)
+
+    def registry_value(self, path: str, name: str) -> Optional[RegistryValue]:
+        written = self.values.get((normalize_registry_path(path), name.lower()))
+        return written if written is not None else self.base.registry_value(path, name)
+
+
+class ServiceOverlay:
+    """Simulated start types over a ServiceInventory; reads fall through"""
+
+    def __init__(self, base: ServiceInventory):
+        self.base = base
+        self.starts: Dict[str, int] = {}
+
+    def set_start(self, name: str, start: int):
+        self.starts[name.lower()] = start
+
+    def get(self, name: str):
+        record = self.base.get(name)
+        if record is None or name.lower() not in self.starts:
+            return record
+        return replace(record, start=self.starts[name.lower()])
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+
+class HostSnapshot:
+    """One host's parsed inputs, served through the BundleReader interface"""
+
+    def __init__(self, host: str, secedit=None, registry=None,
+                 audit: Optional[AuditPolicyBackup] = None, services=None):
+        self.host = host
+        self.secedit = secedit
+        self.registry = registry
+        self.audit = audit
+        self.services = services
+
+    @classmethod
+    def load(cls, reader, keep: Optional[Iterable[str]] = None) -> "HostSnapshot":
+        """Parse every input of a BundleReader / HostDirectory once."""
+        return cls(reader.host, reader.secedit_export(), reader.registry_snapshot(keep=keep),
+                   reader.audit_policy(), reader.service_inventory())
+
+    def overlay(self) -> "HostSnapshot":
+        """Empty copy-on-write layers over each input the host has."""
+        return HostSnapshot(
+            self.host,
+            SeceditOverlay(self.secedit) if self.secedit else None,
+            RegistryOverlay(self.registry) if self.registry else None,
+            self.audit,
+            ServiceOverlay(self.services) if self.services else None,
+        )
+
+    def secedit_export(self):
+        return self.secedit
+
+    def registry_snapshot(self, keep=None):
+        return self.registry
+
+    def audit_policy(self) -> Optional[AuditPolicyBackup]:
+        return self.audit
+
+    def service_inventory(self):
+        return self.services
+
+
+def planned_writes(plan: RemediationPlan, entries: Dict[str, CatalogEntry]
+                   ) -> Tuple[List[PlannedWrite], List[Tuple[str, str]]]:
+    """The plan's batches as overlay writes, plus (setting, reason) for those left out."""
+    writes, unsimulated = [], []
+    for batch, _, members in plan.batches:
+        for setting in members:
+            demands = tuple((d.phrase, d.inclusion) for d in setting.demands)
+            cis_ids = tuple(d.cis_id for d in setting.demands)
+            if setting.key.mechanism == "auditpol":
+                unsimulated.append((setting.key.display, "audit policy is not simulated"))
+                continue
+            if setting.status == DEPENDENT:
+                unsimulated.append((setting.key.display, "dependent settings are not simulated"))
+                continue
+            if setting.key.mechanism == "secedit":
+                section, _, key = setting.key.display[1:].partition('] ')
+                writes.append(PlannedWrite(batch, section, "", key, 0, setting.value,
+                                           demands, cis_ids))
+                continue
+            path, _, name = setting.key.display.rpartition(':')
+            if name.startswith('<'):
+                unsimulated.append((setting.key.display, "list policy values are not simulated"))
+                continue
+            value = list(setting.value) if isinstance(setting.value, tuple) else setting.value
+            entry = entries[cis_ids[0]]
+            value_type = value_type_for(entry, value)
+            if value_type == REG_SZ and isinstance(value, int):
+                value = str(value)
+            service = service_name(entry) if name.lower() == "start" else None
+            writes.append(PlannedWrite(batch, "", path, name, value_type, value, demands, cis_ids,
+                                       service))
+    return writes, unsimulated
+
+
+@dataclass
+class Simulation:
+    """Current and predicted results of one host, and the changes between them"""
+    host: str
+    current: List[CISResult]
+    predicted: List[CISResult]
+    changes: List[Change] = field(default_factory=list)
+
+    def _compliant(self, results: List[CISResult]) -> Dict[str, bool]:
+        return {result.cis_id: result.is_compliant for result in results}
+
+    @property
+    def fixed(self) -> List[str]:
+        before = self._compliant(self.current)
+        return [r.cis_id for r in self.predicted if r.is_compliant and not before.get(r.cis_id)]
+
+    @property
+    def regressed(self) -> List[str]:
+        after = self._compliant(self.predicted)
+        return [r.cis_id for r in self.current if r.is_compliant and not after.get(r.cis_id)]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "evaluated": len(self.predicted),
+            "compliant_before": sum(r.is_compliant for r in self.current),
+            "compliant_after": sum(r.is_compliant for r in self.predicted),
+            "changes": len(self.changes),
+            "fixed": self.fixed,
+            "regressed": self.regressed,
+        }
+
+
+class RemediationSimulator:
+    """Applies one remediation plan to any number of host snapshots"""
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self.entries = list(entries)
+        self.plan = build_plan(self.entries)
+        self.writes, self.unsimulated = planned_writes(
+            self.plan, {entry.cis_id: entry for entry in self.entries})
+        self.keep = catalog_key_paths(self.entries)
+
+    def simulate(self, reader) -> Simulation:
+        """Simulate the plan on an open BundleReader or HostDirectory."""
+        snapshot = HostSnapshot.load(reader, self.keep)
+        overlay = snapshot.overlay()
+        changes = []
+        for write in self.writes:
+            if write.section == SYSTEM_ACCESS:
+                change = self._apply_access(write, snapshot, overlay)
+            elif write.section == PRIVILEGE_RIGHTS:
+                change = self._apply_privilege(write, snapshot, overlay)
+            else:
+                change = self._apply_registry(write, snapshot, overlay)
+            if change is not None:
+                changes.append(change)
+        return Simulation(snapshot.host, evaluate_bundle(snapshot, self.entries),
+                          evaluate_bundle(overlay, self.entries), changes)
+
+    def _apply_access(self, write: PlannedWrite, snapshot: HostSnapshot,
+                      overlay: HostSnapshot) -> Optional[Change]:
+        if snapshot.secedit is None:
+            return None
+        previous = snapshot.secedit.system_access(write.name)
+        number = as_int(unquote(previous)) if previous is not None else None
+        if number == -1 and write.name in UNLIMITED_KEYS:
+            number = sys.maxsize
+        if write.satisfied_by(number):
+            return None
+        overlay.secedit.set_access(write.name, str(write.value))
+        return Change(write, previous, str(write.value))
+
+    def _apply_privilege(self, write: PlannedWrite, snapshot: HostSnapshot,
+                         overlay: HostSnapshot) -> Optional[Change]:
+        if snapshot.secedit is None:
+            return None
+        previous = snapshot.secedit.privilege(write.name)
+        if write.satisfied_by(previous):
+            return None
+        principals = sorted(write.value)
+        tokens = [principal_token(name) for name in principals]
+        if all(inclusion for _, inclusion in write.demands):
+            # secedit replaces the whole list; keep whoever holds the right now
+            tokens += [p for p in previous if normalize_principal(p) not in principals]
+        overlay.secedit.set_privilege(write.name, tokens)
+        return Change(write, previous, tokens)
+
+    def _apply_registry(self, write: PlannedWrite, snapshot: HostSnapshot,
+                        overlay: HostSnapshot) -> Optional[Change]:
+        if write.service and snapshot.services is not None:
+            record = snapshot.services.get(write.service)
+            if record is None:
+                return None         # not installed: nothing to configure
+            previous = (REG_DWORD, record.start) if record.start is not None else None
+        elif write.batch == "secedit" and snapshot.secedit is not None:
+            found = snapshot.secedit.registry_value(write.path, write.name)
+            previous = (found.value_type, found.value) if found else None
+        elif snapshot.registry is not None:
+            previous = snapshot.registry.get(write.path, write.name)
+        else:
+            return None             # the host has no snapshot of this value
+        current = previous[1] if previous else None
+        if write.satisfied_by(current.hex() if isinstance(current, bytes) else current):
+            return None
+
+        if overlay.registry is not None:
+            overlay.registry.set(write.path, write.name, write.value_type, write.value)
+        if write.batch == "secedit" and overlay.secedit is not None:
+            overlay.secedit.set_registry_value(write.path, write.name, write.value_type, write.value)
+        if write.service and overlay.services is not None:
+            overlay.services.set_start(write.service, write.value)
+        return Change(write, previous, (write.value_type, write.value))
+
+
+def reg_key_name(path: str) -> str:
+    """A catalog key path as a .reg section name ("HKLM\\X" -> "HKEY_LOCAL_MACHINE\\X")."""
+    parts = normalize_registry_path(path).split('\\')
+    original = [part for part in path.replace('/', '\\').split('\\') if part]
+    rest = original[len(original) - len(parts) + 1:] if len(parts) > 1 else []
+    return '\\'.join([HIVE_NAMES.get(parts[0], parts[0].upper())] + rest)
+
+
+def rollback_reg(changes: Iterable[Change]) -> str:
+    """A .reg file restoring the previous registry values; absent values are deleted."""
+    keys: Dict[str, List[str]] = {}
+    for change in changes:
+        if change.write.section:
+            continue
+        name = '"' + change.write.name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        data = format_value(*change.previous) if change.previous is not None else "-"
+        keys.setdefault(reg_key_name(change.write.path), []).append(f"{name}={data}")
+    if not keys:
+        return ""
+    lines = [HEADER_V5, ""]
+    for key, values in keys.items():
+        lines.append(f"[{key}]")
+        lines.extend(values)
+        lines.append("")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def rollback_inf(changes: Iterable[Change]) -> Tuple[str, List[str]]:
+    """
+    A security template restoring the previous secedit lines, and the
+    settings it cannot restore: secedit has no way to remove a
+    [System Access] key that was not defined before.
+    """
+    compiler = TemplateCompiler()
+    notes = []
+    for change in changes:
+        write = change.write
+        if write.section == SYSTEM_ACCESS:
+            if change.previous is None:
+                notes.append(f"{write.display} was not defined; secedit cannot undefine it")
+                continue
+            compiler.add(SYSTEM_ACCESS, write.name, change.previous, "rollback")
+        elif write.section == PRIVILEGE_RIGHTS:
+            # An empty assignment grants the right to no one, as before
+            compiler.add(PRIVILEGE_RIGHTS, write.name, ",".join(change.previous), "rollback")
+    return (compiler.render() if compiler.settings else ""), notes
+
+
+def write_rollback(simulation: Simulation, directory: Union[str, Path]) -> List[Path]:
+    """Write <host>-rollback.reg / .inf (UTF-16 with BOM, as regedit and secedit do)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    reg = rollback_reg(simulation.changes)
+    if reg:
+        path = directory / f"{simulation.host}-rollback.reg"
+        path.write_bytes(reg.encode('utf-16'))
+        written.append(path)
+    inf, _ = rollback_inf(simulation.changes)
+    if inf:
+        path = directory / f"{simulation.host}-rollback.inf"
+        write_template(inf, path)
+        written.append(path)
+    return written
+
+
+def simulation_text(simulation: Simulation) -> str:
+    summary = simulation.summary()
+    lines = [f"{summary['host']}: {summary['compliant_before']} -> "
+             f"{summary['compliant_after']} of {summary['evaluated']} compliant, "
+             f"{summary['changes']} changes"]
+    for cis_id in summary["regressed"]:
+        lines.append(f"  Regressed: {cis_id}")
+    for note in rollback_inf(simulation.changes)[1]:
+        lines.append(f"  No rollback: {note}")
+    return "\n".join(lines) + "\n"
+
+
+def render_simulation(simulation: Simulation, output_format: str) -> str:
+    """One host's part of the output: CSV rows without header, an indented JSON item, or text."""
+    if output_format == "csv":
+        return results_to_csv(simulation.predicted, header=False)
+    if output_format == "json":
+        item = dict(simulation.summary(), changes=[c.to_dict() for c in simulation.changes])
+        return textwrap.indent(json.dumps(item, indent=2), "  ")
+    return simulation_text(simulation)
+
+
+# Per-worker state, set once by the pool initializer
+_simulator: Optional[RemediationSimulator] = None
+_output_format = "text"
+_rollback: Optional[Path] = None
+
+
+def init_worker(entries: List[CatalogEntry], output_format: str, rollback: Optional[Path]):
+    global _simulator, _output_format, _rollback
+    _simulator = RemediationSimulator(entries)
+    _output_format = output_format
+    _rollback = rollback
+
+
+def simulate_hosts(paths: List[str]) -> List[HostOutcome]:
+    """
+    Simulate the plan on a chunk of hosts (runs in a worker, see
+    fleet_runner.run_chunks). Rollback files are written here; a host that
+    fails for any reason is reported and the rest go on.
+    """
+    outcomes = []
+    for path in paths:
+        started = time.perf_counter()
+        outcome = HostOutcome(path)
+        try:
+            with open_host(Path(path)) as reader:
+                simulation = _simulator.simulate(reader)
+            if _rollback:
+                write_rollback(simulation, _rollback)
+            outcome.host = simulation.host
+            outcome.text = render_simulation(simulation, _output_format)
+            outcome.results = len(simulation.predicted)
+            outcome.compliant = sum(r.is_compliant for r in simulation.predicted)
+        except Exception as e:
+            outcome.error = f"{type(e).__name__}: {e}"
+        outcome.seconds = time.perf_counter() - started
+        outcomes.append(outcome)
+    return outcomes
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Simulate a remediation wave against host snapshots")
+    parser.add_argument("paths", nargs="+", type=Path,
+                        help="bundles, or directories of bundles / per-host export folders")
+    parser.add_argument("--level", choices=sorted(PROFILE_LEVELS),
+                        help="L2 includes L1 (default: every recommendation)")
+    parser.add_argument("--bitlocker", action="store_true",
+                        help="add the BitLocker (BL) recommendations to --level")
+    parser.add_argument("--section", action="append", dest="sections")
+    parser.add_argument("--id", action="append", dest="cis_ids")
+    parser.add_argument("--rollback", type=Path, help="directory for per-host rollback .reg/.inf files")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    hosts = discover_hosts(args.paths)
+    if not hosts:
+        print("No host snapshots found", file=sys.stderr)
+        return 1
+    selected = load_catalog().select(sections=args.sections, cis_ids=args.cis_ids)
+    entries = profile_entries(args.level, args.bitlocker, selected)
+    for setting, reason in RemediationSimulator(entries).unsimulated:
+        print(f"Not simulated: {setting} ({reason})", file=sys.stderr)
+
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    simulated = failed = 0
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            output.write(results_to_csv([]))
+        elif args.format == "json":
+            output.write("[")
+        with ProcessPoolExecutor(workers, initializer=init_worker,
+                                 initargs=(entries, args.format, args.rollback)) as pool:
+            for outcome in run_chunks(pool, simulate_hosts, [str(h) for h in hosts], workers):
+                if outcome.error:
+                    print(f"Failed: {outcome.path}: {outcome.error}", file=sys.stderr)
+                    failed += 1
+                    continue
+                if args.format == "json":
+                    output.write(",\n" if simulated else "\n")
+                output.write(outcome.text)
+                output.flush()
+                simulated += 1
+        elapsed = time.perf_counter() - started
+        if args.format == "json":
+            output.write("\n]\n" if simulated else "]\n")
+        elif args.format == "text":
+            rate = simulated / elapsed if elapsed else 0.0
+            output.write(f"\n{simulated} hosts simulated in {elapsed:.2f}s ({rate:.1f} hosts/s)\n")
+    finally:
+        if args.output:
+            output.close()
+
+    if args.output:
+        print(f"Results written to: {args.output}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Columnar store for fleet audit results.
+
+Export-CISAuditResults writes one CSV per host run, and every row repeats
+the CIS_ID, Title, RecommendedValue, Source, Profile, ComputerName and
+UserName text. This store keeps the same rows column by column in segment
+files: each column is dictionary-encoded (every distinct string stored
+once per segment) and its codes are a packed array of u8, u16 or u32,
+whichever fits the dictionary. Segments are memory-mapped, and the code
+arrays are read in place as typed memoryviews, so an aggregation touches
+only the columns it groups by.
+
+Segment layout (little-endian):
+
+    header   24 bytes   magic b"CISRSEG\\0", version u16, flags u16,
+                        column count u32, row count u64
+    columns             per column a 32-byte record: name length u16,
+                        code type u8 (B/H/I), reserved u8, dictionary
+                        size u32, codes offset u64, dictionary offset u64,
+                        dictionary length u64; followed by the UTF-8 name
+    data                per column the code array, then the dictionary:
+                        (size + 1) u32 offsets into the UTF-8 string data;
+                        every block 8-byte aligned
+
+A store is a directory of segments. The bulk loader reads CSVs on a
+process pool, each worker writing one segment per batch of files, and
+logs the files it has ingested (ingested.log) so a later load skips them.
+Segment names are claimed with O_EXCL (reserve_segment()), so the loader
+and the ingest service can write into one store at once, and the log is
+written before a segment is renamed into place: a file counts as ingested
+only once the segment its log line names exists.
+
+Usage:
+    python result_store.py ingest fleet-store/ results/ --workers 8
+    python result_store.py info fleet-store/
+    python result_store.py rates fleet-store/ --by section --where Profile=L1
+"""
+
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from cis_catalog import cis_id_sort_key, get_major_section
+from cis_results import REMEDIATION_FIELDS, RESULT_FIELDS
+from secedit_inf import decode_inf
+
+MAGIC = b"CISRSEG\x00"
+VERSION = 1
+HEADER = struct.Struct('<8sHHIQ')
+COLUMN_ENTRY = struct.Struct('<HBBIQQQ')
+ALIGNMENT = 8
+
+SEGMENT_SUFFIX = ".seg"
+INGEST_LOG = "ingested.log"
+
+# IsCompliant is derived from ComplianceStatus, so it is not stored
+COLUMNS = [name for name in RESULT_FIELDS if name != "IsCompliant"]
+
+# Remediation results keep every field: IsCompliant is independent of Status there
+REMEDIATION_COLUMNS = list(REMEDIATION_FIELDS)
+
+# Smallest code array that holds a dictionary of a given size
+CODE_TYPES = (('B', 1 << 8), ('H', 1 << 16), ('I', 1 << 32))
+
+# Aggregation keys: column, and whether the key is the CIS_ID's top-level section
+GROUPS = {
+    "cis_id": ("CIS_ID", False),
+    "section": ("CIS_ID", True),
+    "host": ("ComputerName", False),
+    "profile": ("Profile", False),
+    "source": ("Source", False),
+}
+
+
+class StoreFormatError(ValueError):
+    """The file is not a valid result segment"""
+
+
+def _aligned(file) -> int:
+    """Pad the file to ALIGNMENT and return the position."""
+    file.write(b"\x00" * (-file.tell() % ALIGNMENT))
+    return file.tell()
+
+
+def _fsync_directory(path: Path):
+    """Make a rename in a directory durable (a no-op where directories can't be opened)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class SegmentWriter:
+    """
+    Builds one segment in memory and writes it on close(), under a temporary
+    name renamed into place, so readers never see a partial segment. The
+    data is synced before the rename and the directory after it, so a
+    segment that survives a crash is complete.
+    """
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str] = COLUMNS):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.rows = 0
+        self._index: List[Dict[str, int]] = [{} for _ in self.columns]
+        self._codes: List[array] = [array('I') for _ in self.columns]
+
+    def add(self, values: Sequence[str]):
+        """Append one row (values in column order)."""
+        if len(values) != len(self.columns):
+            raise ValueError(f"{self.path.name}: row has {len(values)} values for "
+                             f"{len(self.columns)} columns")
+        for index, codes, value in zip(self._index, self._codes, values):
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(index)
+            codes.append(code)
+        self.rows += 1
+
+    def write(self) -> Path:
+        """Write the segment, synced, under its temporary name; returns that name."""
+        names = [name.encode('utf-8') for name in self.columns]
+        table_size = sum(COLUMN_ENTRY.size + len(name) for name in names)
+        temp = self.path.with_name(self.path.name + ".tmp")
+        entries = []
+        with open(temp, 'wb') as f:
+            f.write(b"\x00" * (HEADER.size + table_size))
+            for index, codes in zip(self._index, self._codes):
+                typecode = next(code for code, limit in CODE_TYPES if len(index) <= limit)
+                codes_offset = _aligned(f)
+                f.write(_little_endian(array(typecode, codes)))
+                data = [value.encode('utf-8') for value in index]
+                offsets = array('I', [0])
+                for item in data:
+                    offsets.append(offsets[-1] + len(item))
+                dictionary_offset = _aligned(f)
+                f.write(_little_endian(offsets))
+                f.write(b"".join(data))
+                entries.append((typecode, len(index), codes_offset, dictionary_offset,
+                                f.tell() - dictionary_offset))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(self.columns), self.rows))
+            for name, (typecode, size, codes_offset, dictionary_offset, length) in zip(names, entries):
+                f.write(COLUMN_ENTRY.pack(len(name), ord(typecode), 0, size, codes_offset,
+                                          dictionary_offset, length))
+                f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        return temp
+
+    def close(self):
+        publish_segment(self.write(), self.path)
+
+
+def publish_segment(temp: Path, path: Path):
+    """Rename a written segment into place and make the rename durable."""
+    os.replace(temp, path)
+    _fsync_directory(path.parent)
+
+
+def reserve_segment(folder: Path, after: int = 0) -> Path:
+    """
+    Claim the next free segment name in a folder, numbered past the folder's
+    segments and after, by creating it empty with O_EXCL. A name another
+    writer claimed first is skipped, so concurrent writers (the ingest CLI
+    and the ingest service) never publish over each other. The claim is
+    replaced by the finished segment; readers skip empty files.
+    """
+    number = max([after] + [int(p.stem) for p in folder.glob(f"*{SEGMENT_SUFFIX}")
+                            if p.stem.isdigit()]) + 1
+    while True:
+        path = folder / f"{number:06d}{SEGMENT_SUFFIX}"
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            number += 1
+            continue
+        return path
+
+
+def is_published(path: Path) -> bool:
+    """True once a segment is in place (not a claim, not missing)."""
+    try:
+        return path.stat().st_size > 0
+    except OSError:
+        return False
+
+
+
+
+class Column:
+    """One column of a mapped segment: codes in place, dictionary decoded on demand"""
+
+    def __init__(self, segment: "Segment", name: str, typecode: str, size: int,
+                 codes_offset: int, dictionary_offset: int, dictionary_length: int):
+        self.segment = segment
+        self.name = name
+        self.typecode = typecode
+        self.size = size
+        self._codes_offset = codes_offset
+        self._dictionary_offset = dictionary_offset
+        self._dictionary_length = dictionary_length
+        self._codes = None
+        self._dictionary: Optional[List[str]] = None
+
+    @property
+    def codes(self) -> Sequence[int]:
+        """The dictionary code of every row (a view into the mapped file)."""
+        if self._codes is None:
+            itemsize = array(self.typecode).itemsize
+            start = self._codes_offset
+            self._codes = self.segment._view(start, start + self.segment.rows * itemsize, self.typecode)
+        return self._codes
+
+    @property
+    def dictionary(self) -> List[str]:
+        """The column's distinct values, indexed by code."""
+        if self._dictionary is None:
+            start = self._dictionary_offset
+            offsets = self.segment._view(start, start + (self.size + 1) * 4, 'I')
+            data = self.segment._map[start + (self.size + 1) * 4:start + self._dictionary_length]
+            self._dictionary = [data[offsets[i]:offsets[i + 1]].decode('utf-8')
+                                for i in range(self.size)]
+        return self._dictionary
+
+    def code_of(self, value: str) -> Optional[int]:
+        try:
+            return self.dictionary.index(value)
+        except ValueError:
+            return None
+
+    def values(self) -> Iterator[str]:
+        dictionary = self.dictionary
+        return (dictionary[code] for code in self.codes)
+
+
+class Segment:
+    """A segment file mapped into memory"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if f.seek(0, 2) < HEADER.size:
+                raise StoreFormatError(f"{path} is too short to be a result segment")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = []
+        try:
+            self.rows, self.columns = self._read_columns()
+        except (StoreFormatError, struct.error, UnicodeDecodeError) as e:
+            self._map.close()
+            raise StoreFormatError(f"{path}: {e}") from None
+
+    def _read_columns(self) -> Tuple[int, Dict[str, Column]]:
+        magic, version, _, count, rows = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise StoreFormatError("Missing segment signature")
+        if version != VERSION:
+            raise StoreFormatError(f"Unsupported segment version {version}")
+        columns: Dict[str, Column] = {}
+        position = HEADER.size
+        for _ in range(count):
+            name_length, typecode, _, size, codes_offset, dictionary_offset, length = \
+                COLUMN_ENTRY.unpack_from(self._map, position)
+            position += COLUMN_ENTRY.size
+            name = self._map[position:position + name_length].decode('utf-8')
+            position += name_length
+            typecode = chr(typecode)
+            if typecode not in dict(CODE_TYPES):
+                raise StoreFormatError(f"Column {name!r} has unknown code type {typecode!r}")
+            itemsize = array(typecode).itemsize
+            if codes_offset + rows * itemsize > len(self._map) or \
+                    dictionary_offset + length > len(self._map):
+                raise StoreFormatError(f"Column {name!r} lies outside the file")
+            columns[name] = Column(self, name, typecode, size, codes_offset,
+                                   dictionary_offset, length)
+        return rows, columns
+
+    def _view(self, start: int, end: int, typecode: str) -> Sequence[int]:
+        if sys.byteorder != 'little':
+            values = array(typecode, self._map[start:end])
+            values.byteswap()
+            return values
+        view = memoryview(self._map)[start:end].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def column(self, name: str) -> Column:
+        column = self.columns.get(name)
+        if column is None:
+            raise KeyError(f"No column {name!r} in {self.path}")
+        return column
+
+    def close(self):
+        # Views into the map must be released before it can be closed
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        for column in self.columns.values():
+            column._codes = None
+        self._map.close()
+
+
+@dataclass
+class GroupRate:
+    """Result counts of one group and its compliance rate"""
+    key: str
+    compliant: int
+    total: int
+    statuses: Dict[str, int]
+
+    @property
+    def rate(self) -> float:
+        """Compliant share in percent, like Get-CISAuditSummary's CompliancePercentage."""
+        return round(self.compliant / self.total * 100, 2) if self.total else 0.0
+
+
+class ResultStore:
+    """A directory of result segments, queried as one table"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.segments = [Segment(p) for p in sorted(self.path.glob(f"*{SEGMENT_SUFFIX}"))
+                         if is_published(p)]
+
+    @property
+    def rows(self) -> int:
+        return sum(segment.rows for segment in self.segments)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _selected(self, segment: Segment, where: Dict[str, str]) -> Optional[Sequence[bool]]:
+        """Per-row mask for column == value filters; None when every row matches."""
+        mask = None
+        for name, value in where.items():
+            column = segment.column(name)
+            code = column.code_of(value)
+            matches = [False] * segment.rows if code is None else \
+                [c == code for c in column.codes]
+            mask = matches if mask is None else [a and b for a, b in zip(mask, matches)]
+        return mask
+
+    def status_counts(self, by: str = "cis_id",
+                      where: Optional[Dict[str, str]] = None) -> Dict[str, Counter]:
+        """ComplianceStatus counts per group ("cis_id", "section", "host", ...)."""
+        if by not in GROUPS:
+            raise ValueError(f"Unknown grouping {by!r}; expected one of {', '.join(GROUPS)}")
+        name, by_section = GROUPS[by]
+        counts: Dict[str, Counter] = {}
+        for segment in self.segments:
+            keys, statuses = segment.column(name), segment.column("ComplianceStatus")
+            pairs = zip(keys.codes, statuses.codes)
+            mask = self._selected(segment, where or {})
+            if mask is not None:
+                pairs = (pair for pair, keep in zip(pairs, mask) if keep)
+            key_names, status_names = keys.dictionary, statuses.dictionary
+            for (key, status), count in Counter(pairs).items():
+                group = key_names[key]
+                if by_section:
+                    group = get_major_section(group)
+                counts.setdefault(group, Counter())[status_names[status]] += count
+        return counts
+
+    def compliance_rates(self, by: str = "cis_id",
+                         where: Optional[Dict[str, str]] = None) -> List[GroupRate]:
+        """Compliance rate per group, in key order."""
+        counts = self.status_counts(by, where)
+        order = cis_id_sort_key if GROUPS[by][0] == "CIS_ID" else str.lower
+        return [GroupRate(key, statuses["Compliant"], sum(statuses.values()), dict(statuses))
+                for key, statuses in sorted(counts.items(), key=lambda item: order(item[0]))]
+
+    def iter_rows(self, columns: Sequence[str] = COLUMNS) -> Iterator[Tuple[str, ...]]:
+        """Rows as tuples of strings, segment by segment."""
+        for segment in self.segments:
+            selected = [segment.column(name) for name in columns]
+            dictionaries = [column.dictionary for column in selected]
+            for codes in zip(*(column.codes for column in selected)):
+                yield tuple(d[code] for d, code in zip(dictionaries, codes))
+
+    def distinct(self, column: str) -> List[str]:
+        values = set()
+        for segment in self.segments:
+            values.update(segment.column(column).dictionary)
+        return sorted(values)
+
+
+def export_rows(data: bytes, columns: Sequence[str] = COLUMNS,
+                required: Sequence[str] = ("CIS_ID", "ComplianceStatus"),
+                source: str = "") -> List[List[str]]:
+    """
+    Rows of an Export-Csv file (UTF-8 or UTF-16, with or without a #TYPE
+    line), values in columns order. ValueError if a required column is missing.
+    """
+    lines = decode_inf(data).lstrip().splitlines()
+    if lines and lines[0].startswith("#TYPE"):
+        lines = lines[1:]       # Export-Csv without -NoTypeInformation
+    reader = csv.DictReader(io.StringIO('\n'.join(lines)))
+    if not reader.fieldnames or not set(required) <= set(reader.fieldnames):
+        raise ValueError(f"{source}: not an export with {'/'.join(required)} columns")
+    return [[row.get(name) or "" for name in columns] for row in reader]
+
+
+def read_results_csv(path: Union[str, Path]) -> List[List[str]]:
+    """Rows of an Export-CISAuditResults CSV, values in COLUMNS order."""
+    return export_rows(Path(path).read_bytes(), source=str(path))
+
+
+def build_segment(path: str, files: List[str]) -> Tuple[str, int, List[str], List[Tuple[str, str]]]:
+    """
+    Write a batch of CSVs as one segment under path's temporary name (runs
+    in a worker; the caller journals the files and then publishes it).
+    Returns the temporary file ("" when nothing was read), its rows, the
+    files ingested and (file, error) for files that could not be read.
+    """
+    writer = SegmentWriter(path)
+    ingested, errors = [], []
+    for file in files:
+        try:
+            rows = read_results_csv(file)
+        except (OSError, ValueError, csv.Error) as e:
+            errors.append((file, str(e)))
+            continue
+        for row in rows:
+            writer.add(row)
+        ingested.append(file)
+    if not writer.rows:
+        return "", 0, ingested, errors
+    return str(writer.write()), writer.rows, ingested, errors
+
+
+@dataclass
+class IngestStats:
+    """Totals of one bulk load"""
+    files: int = 0
+    skipped: int = 0
+    failed: int = 0
+    rows: int = 0
+    segments: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def describe(self) -> str:
+        return (f"{self.files} files ingested ({self.failed} failed, {self.skipped} already "
+                f"in the store), {self.rows:,} rows in {self.segments} segments in "
+                f"{self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+def find_csvs(paths: Iterable[Path]) -> List[Path]:
+    found = []
+    for path in paths:
+        found.extend(sorted(path.rglob("*.csv")) if path.is_dir() else [path])
+    return found
+
+
+def ingest(store: Union[str, Path], files: Iterable[Union[str, Path]],
+           workers: Optional[int] = None, files_per_segment: int = 256
+           ) -> Tuple[IngestStats, List[Tuple[str, str]]]:
+    """
+    Bulk-load result CSVs into a store on a process pool, one segment per
+    batch of files. Files already in the ingest log are skipped. Returns
+    the totals and (file, error) for files that could not be read.
+    """
+    store = Path(store)
+    store.mkdir(parents=True, exist_ok=True)
+    log = store / INGEST_LOG
+    done = set()
+    # Numbering continues past every name the log has used, so a line whose
+    # segment never appeared can never match a later segment
+    last = 0
+    if log.exists():
+        published: Dict[str, bool] = {"-": True}
+        for line in log.read_text(encoding='utf-8').splitlines():
+            name, _, file = line.partition('\t')
+            if name not in published:
+                published[name] = is_published(store / name)
+                stem = Path(name).stem
+                last = max(last, int(stem) if stem.isdigit() else 0)
+            if published[name]:
+                done.add(file)
+    files = [str(Path(f)) for f in files]
+    pending = [f for f in files if f not in done]
+    stats = IngestStats(skipped=len(files) - len(pending))
+    batches = [pending[i:i + files_per_segment] for i in range(0, len(pending), files_per_segment)]
+    errors: List[Tuple[str, str]] = []
+
+    started = time.perf_counter()
+    # Names are claimed before the workers start; a claim is only given up
+    # before the journal names it
+    claims = []
+    for _ in batches:
+        claims.append(reserve_segment(store, last))
+        last = int(claims[-1].stem)
+    unjournaled = set(claims)
+    try:
+        with ProcessPoolExecutor(workers) as pool, open(log, 'a', encoding='utf-8') as journal:
+            futures = [pool.submit(build_segment, str(path), batch)
+                       for path, batch in zip(claims, batches)]
+            for path, future in zip(claims, futures):
+                temp, rows, ingested, failed = future.result()
+                stats.files += len(ingested)
+                stats.failed += len(failed)
+                stats.rows += rows
+                stats.segments += bool(temp)
+                errors.extend(failed)
+                # Journal first: a line counts once its segment is published,
+                # so a crash before the rename re-ingests the batch
+                name = path.name if temp else "-"
+                journal.writelines(f"{name}\t{file}\n" for file in ingested)
+                journal.flush()
+                os.fsync(journal.fileno())
+                if temp:
+                    unjournaled.discard(path)
+                    publish_segment(Path(temp), path)
+    finally:
+        for path in unjournaled:
+            path.unlink()
+    stats.elapsed = time.perf_counter() - started
+    return stats, errors
+
+
+def parse_where(items: Iterable[str]) -> Dict[str, str]:
+    """["Profile=L1", ...] -> {"Profile": "L1"}; column names as in the CSV."""
+    where = {}
+    for item in items:
+        name, separator, value = item.partition('=')
+        if not separator or name not in COLUMNS:
+            raise ValueError(f"Bad filter {item!r}; expected Column=value with one of "
+                             f"{', '.join(COLUMNS)}")
+        where[name] = value
+    return where
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Columnar store for fleet audit results")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="bulk-load result CSVs")
+    ingest_parser.add_argument("store", type=Path)
+    ingest_parser.add_argument("paths", nargs="+", type=Path, help="CSV files or directories of them")
+    ingest_parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    ingest_parser.add_argument("--files-per-segment", type=int, default=256)
+
+    info_parser = commands.add_parser("info", help="describe the store")
+    info_parser.add_argument("store", type=Path)
+
+    rates_parser = commands.add_parser("rates", help="compliance rate per group")
+    rates_parser.add_argument("store", type=Path)
+    rates_parser.add_argument("--by", choices=sorted(GROUPS), default="cis_id")
+    rates_parser.add_argument("--where", action="append", default=[], metavar="COLUMN=VALUE")
+    rates_parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    rates_parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        stats, errors = ingest(args.store, find_csvs(args.paths), args.workers,
+                               args.files_per_segment)
+        for file, error in errors:
+            print(f"Failed: {file}: {error}", file=sys.stderr)
+        print(stats.describe())
+        return 1 if errors else 0
+
+    try:
+        where = parse_where(getattr(args, "where", []))
+    except ValueError as e:
+        parser.error(str(e))
+
+    with ResultStore(args.store) as store:
+        if args.command == "info":
+            size = sum(segment.path.stat().st_size for segment in store.segments)
+            print(f"{len(store.segments)} segments, {store.rows:,} rows, {size:,} bytes")
+            for name in COLUMNS:
+                print(f"{name:<18} {len(store.distinct(name)):>10,} distinct values")
+            return 0
+
+        started = time.perf_counter()
+        rates = store.compliance_rates(args.by, where)
+        elapsed = time.perf_counter() - started
+
+    if args.format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(["Group", "Compliant", "Total", "CompliancePercentage"])
+        writer.writerows([r.key, r.compliant, r.total, r.rate] for r in rates)
+        output = buffer.getvalue()
+    elif args.format == "json":
+        output = json.dumps([{"group": r.key, "compliant": r.compliant, "total": r.total,
+                              "rate": r.rate, "statuses": r.statuses} for r in rates], indent=2)
+    else:
+        lines = [f"{r.key:<24} {r.rate:>7.2f}%  {r.compliant:>10,}/{r.total:<10,}" for r in rates]
+        lines.append(f"\n{len(rates)} groups over {sum(r.total for r in rates):,} rows ({elapsed:.2f}s)")
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Results written to: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Incremental inventory of the audit/remediation scripts and a coverage
+matrix against the CIS catalog.
+
+The inventory caches per-script metadata (CIS ID, kind, mechanism) keyed by
+path and invalidated by mtime/size, so a refresh only re-reads scripts that
+changed. Coverage is computed with integer bitsets over catalog positions:
+bit i of the audit set is 1 if catalog entry i has an audit script. Group
+masks (per section, profile and data source) make every coverage cell a
+couple of AND/popcount operations regardless of tree size.
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cis_catalog import CISCatalog, REPO_ROOT, cis_id_sort_key, load_catalog
+from ps_lint import SCRIPT_NAME_PATTERN, repo_path
+from ps_tokenizer import ParsedScript, parse_source
+
+
+SCRIPTS_DIR = REPO_ROOT / "windows"
+CACHE_PATH = REPO_ROOT / ".cache" / "script_inventory.json"
+
+# Bump when ScriptRecord fields or parsing change
+INVENTORY_VERSION = 2
+
+INVOKE_COMMANDS = ("Invoke-CISAudit", "Invoke-CISRemediation")
+
+KINDS = ("audit", "remediation")
+
+
+@dataclass
+class ScriptRecord:
+    """Cached metadata about one audit or remediation script"""
+    path: str
+    mtime_ns: int
+    size: int
+    cis_id: str
+    kind: str
+    mechanism: str
+
+
+def detect_mechanism(parsed: ParsedScript) -> str:
+    """
+    Classify how a script reads or writes its setting: the declared
+    -AuditType/-RemediationType, or the tool it shells out to.
+    """
+    for call in parsed.find_commands(*INVOKE_COMMANDS):
+        declared = parsed.resolve(call.get("AuditType") or call.get("RemediationType"))
+        if isinstance(declared, str) and declared.lower() not in ("custom", ""):
+            declared = declared.lower()
+            return "secedit" if declared == "securitypolicy" else declared
+
+    commands = set()
+    for command in parsed.commands:
+        commands.add(re.sub(r'\.exe$', '', command.name.lower()))
+        if command.name.lower() == "start-process":
+            target = command.get("FilePath") or next(iter(command.positional), "")
+            if isinstance(target, str):
+                commands.add(re.sub(r'\.exe$', '', target.lower()))
+    for tool in ("auditpol", "secedit"):
+        if tool in commands:
+            return tool
+    if commands & {"get-service", "set-service"}:
+        return "service"
+    if commands & {"get-registryvalue", "set-registryvalue",
+                   "get-itemproperty", "set-itemproperty"}:
+        return "registry"
+    return "custom"
+
+
+def build_record(path: Path, stat: os.stat_result) -> Optional[ScriptRecord]:
+    """Parse one script into a record; None if it isn't a CIS script."""
+    match = SCRIPT_NAME_PATTERN.match(path.name)
+    if not match:
+        return None
+    rel_path = repo_path(path)
+    content = path.read_text(encoding='utf-8-sig', errors='replace')
+    return ScriptRecord(
+        path=rel_path,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        cis_id=match.group(1),
+        kind="audit" if match.group(2) == "audit" else "remediation",
+        mechanism=detect_mechanism(parse_source(rel_path, content)),
+    )
+
+
+def _walk_scripts(root: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yield (path, stat) for every .ps1 under root using os.scandir."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.name.lower().endswith(".ps1"):
+                        yield Path(entry.path), entry.stat()
+        except OSError:
+            continue
+
+
+class ScriptInventory:
+    """Path -> ScriptRecord index, refreshed incrementally by mtime"""
+
+    def __init__(self, scripts_dir: Path = SCRIPTS_DIR,
+                 cache_path: Optional[Path] = CACHE_PATH):
+        self.scripts_dir = scripts_dir
+        self.cache_path = cache_path
+        self.records: Dict[str, ScriptRecord] = {}
+        self.last_refresh: Dict[str, float] = {}
+        self._load()
+
+    def _load(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != INVENTORY_VERSION:
+            return
+        self.records = {
+            path: ScriptRecord(**record)
+            for path, record in data.get("records", {}).items()
+        }
+
+    def save(self):
+        """Persist the inventory atomically."""
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INVENTORY_VERSION,
+                "records": {path: asdict(r) for path, r in self.records.items()},
+            }, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the inventory up to date with the tree. Only scripts whose
+        mtime or size changed are re-read. Returns change counts.
+        """
+        start = time.perf_counter()
+        seen = set()
+        added = updated = unchanged = 0
+        for path, stat in _walk_scripts(self.scripts_dir):
+            if not SCRIPT_NAME_PATTERN.match(path.name):
+                continue
+            rel_path = repo_path(path)
+            seen.add(rel_path)
+            record = self.records.get(rel_path)
+            if record and record.mtime_ns == stat.st_mtime_ns \
+                    and record.size == stat.st_size:
+                unchanged += 1
+                continue
+            new_record = build_record(path, stat)
+            if new_record is None:
+                continue
+            if record:
+                updated += 1
+            else:
+                added += 1
+            self.records[rel_path] = new_record
+
+        removed = [path for path in self.records if path not in seen]
+        for path in removed:
+            del self.records[path]
+
+        if added or updated or removed:
+            self.save()
+        self.last_refresh = {
+            "added": added,
+            "updated": updated,
+            "removed": len(removed),
+            "unchanged": unchanged,
+            "elapsed_seconds": round(time.perf_counter() - start, 4),
+        }
+        return self.last_refresh
+
+    def cis_ids(self, kind: str) -> Dict[str, List[ScriptRecord]]:
+        """Map CIS ID -> scripts of the given kind."""
+        result: Dict[str, List[ScriptRecord]] = {}
+        for record in self.records.values():
+            if record.kind == kind:
+                result.setdefault(record.cis_id, []).append(record)
+        return result
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+class CoverageMatrix:
+    """Audit/remediation coverage as bitsets over catalog positions"""
+
+    def __init__(self, catalog: CISCatalog, inventory: ScriptInventory):
+        self.catalog = catalog
+        self.all_mask = (1 << len(catalog)) - 1
+        self.present = {kind: 0 for kind in KINDS}
+        self.orphans: Dict[str, List[str]] = {kind: [] for kind in KINDS}
+        self.mechanisms: Dict[str, Dict[str, int]] = {kind: {} for kind in KINDS}
+
+        for kind in KINDS:
+            for cis_id, records in inventory.cis_ids(kind).items():
+                entry = catalog.get(cis_id)
+                if entry is None:
+                    self.orphans[kind].extend(r.path for r in records)
+                    continue
+                self.present[kind] |= 1 << entry.position
+                for record in records:
+                    by_mechanism = self.mechanisms[kind]
+                    by_mechanism[record.mechanism] = \
+                        by_mechanism.get(record.mechanism, 0) | (1 << entry.position)
+
+        self.groups: Dict[str, Dict[str, int]] = {
+            "section": {}, "profile": {}, "data_source": {},
+        }
+        for entry in catalog:
+            bit = 1 << entry.position
+            for dimension, key in (("section", entry.section),
+                                   ("profile", entry.profile),
+                                   ("data_source", entry.data_source)):
+                group = self.groups[dimension]
+                group[key] = group.get(key, 0) | bit
+
+    def ids(self, bits: int) -> List[str]:
+        """Expand a bitset back into sorted CIS IDs."""
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(self.catalog.entries[low.bit_length() - 1].cis_id)
+            bits ^= low
+        return sorted(result, key=cis_id_sort_key)
+
+    def missing(self, kind: str, mask: Optional[int] = None) -> List[str]:
+        mask = self.all_mask if mask is None else mask
+        return self.ids(mask & ~self.present[kind])
+
+    def cell(self, mask: int) -> Dict[str, int]:
+        """Coverage counts for one group mask."""
+        audit = self.present["audit"] & mask
+        remediation = self.present["remediation"] & mask
+        return {
+            "total": popcount(mask),
+            "audit": popcount(audit),
+            "remediation": popcount(remediation),
+            "both": popcount(audit & remediation),
+            "neither": popcount(mask & ~(audit | remediation)),
+        }
+
+    def matrix(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Coverage cells for every section, profile and data source."""
+        matrix = {}
+        for dimension, groups in self.groups.items():
+            if dimension == "section":
+                keys = sorted(groups, key=cis_id_sort_key)
+            else:
+                keys = sorted(groups)
+            matrix[dimension] = {key: self.cell(groups[key]) for key in keys}
+        return matrix
+
+    def to_json(self) -> dict:
+        return {
+            "catalog_entries": len(self.catalog),
+            "coverage": self.cell(self.all_mask),
+            "matrix": self.matrix(),
+            "script_mechanisms": {
+                kind: {m: popcount(bits) for m, bits in sorted(mechanisms.items())}
+                for kind, mechanisms in self.mechanisms.items()
+            },
+            "missing_audit": self.missing("audit"),
+            "missing_remediation": self.missing("remediation"),
+            "orphan_scripts": self.orphans,
+        }
+
+
+def build_coverage(scripts_dir: Path = SCRIPTS_DIR,
+                   catalog: Optional[CISCatalog] = None
+                   ) -> Tuple[CoverageMatrix, ScriptInventory]:
+    """
+    Refresh the inventory and compute the coverage matrix. Only the
+    repository's own scripts directory uses the on-disk cache; another
+    tree would otherwise evict its entries.
+    """
+    cache_path = CACHE_PATH if Path(scripts_dir).resolve() == SCRIPTS_DIR.resolve() else None
+    inventory = ScriptInventory(Path(scripts_dir), cache_path)
+    inventory.refresh()
+    return CoverageMatrix(catalog or load_catalog(), inventory), inventory
+
+
+if __name__ == "__main__":
+    coverage, inventory = build_coverage()
+    print(f"Inventory refresh: {inventory.last_refresh}")
+    for dimension, cells in coverage.matrix().items():
+        print(f"\nCoverage by {dimension}:")
+        for key, cell in cells.items():
+            print(f"  {key:>8}: {cell['audit']:>3}/{cell['total']:<3} audit, "
+                  f"{cell['remediation']:>3}/{cell['total']:<3} remediation")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+The registry path, value name and service an existing script reads.
+
+Shared by audit_plan.py, which compiles the audits into one plan, and
+check_script_catalog.py, which checks the scripts against the catalog.
+Both read a script's Invoke-CISAudit / Invoke-CISRemediation arguments, or
+the script variables that hold them when the call passes variables.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Tuple
+
+from ps_tokenizer import ParsedScript
+
+# Script variables the audit scripts keep their registry path/value/service in
+PATH_VARIABLES = ("registrypath", "regpath", "keypath")
+VALUE_VARIABLES = ("registryvaluename", "valuename", "registryvalue")
+SERVICE_VARIABLES = ("servicename",)
+
+
+@dataclass
+class ScriptParameters:
+    """What an existing audit script reads, from its Invoke-CISAudit call or variables"""
+    script: str
+    registry_path: Optional[str] = None
+    value_name: Optional[str] = None
+    service_name: Optional[str] = None
+
+
+def _first_literal(values: Iterable[Any]) -> Optional[str]:
+    for value in values:
+        if isinstance(value, str) and value and not value.startswith('$'):
+            return value
+    return None
+
+
+def parameters_of(path: str, parsed: ParsedScript,
+                  command: str = "Invoke-CISAudit") -> ScriptParameters:
+    """
+    What one script reads: the arguments of its first Invoke-CISAudit (or
+    given) call, resolved at the call site, else the script variables that
+    hold them, taking the assignment in effect where each is first read.
+    """
+    calls = parsed.find_commands(command)
+    call = calls[0] if calls else None
+
+    def argument(name: str, fallbacks: Tuple[str, ...]) -> Optional[str]:
+        value = parsed.resolve(call.get(name), call.offset) if call else None
+        in_effect = (parsed.assignment_in_effect(v) for v in fallbacks)
+        return _first_literal([value] + [found[1] for found in in_effect if found])
+
+    return ScriptParameters(
+        script=path,
+        registry_path=argument("RegistryPath", PATH_VARIABLES),
+        value_name=argument("RegistryValueName", VALUE_VARIABLES),
+        service_name=argument("ServiceName", SERVICE_VARIABLES),
+    )
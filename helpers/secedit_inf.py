@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for `secedit /export` security templates.
+
+The section 1 and 2 audit scripts each run secedit, export the whole local
+security policy and pick one line out of it. This module reads a single
+export (UTF-16 INF, as secedit writes it) and evaluates every section 1/2
+recommendation in the catalog against it in one pass:
+
+- [System Access]    password, lockout and account settings (1.1, 1.2, 2.3.x)
+- [Privilege Rights] user rights assignments (2.2.x)
+- [Registry Values]  security options backed by a registry value (2.3.x)
+
+Results are CISResult rows, the Python counterpart of New-CISResultObject,
+so they can be exported next to the PowerShell audit output.
+
+Usage:
+    secedit /export /cfg C:\\temp\\secpol.inf        (on the host)
+    python secedit_inf.py secpol.inf --format csv --output results.csv
+"""
+
+import argparse
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from cis_catalog import CatalogEntry, load_catalog, normalize_registry_path
+from cis_results import PROFILES, CISResult, output_results, status_for
+from recommended_values import (
+    WELL_KNOWN_SIDS, Observation, Value, as_int, compile_phrase, compile_principals,
+)
+
+SYSTEM_ACCESS = "System Access"
+PRIVILEGE_RIGHTS = "Privilege Rights"
+REGISTRY_VALUES = "Registry Values"
+
+SOURCE = "Local Policy"
+
+# Setting name (from the recommendation title) -> [System Access] key
+SYSTEM_ACCESS_KEYS = {
+    "enforce password history": "PasswordHistorySize",
+    "maximum password age": "MaximumPasswordAge",
+    "minimum password age": "MinimumPasswordAge",
+    "minimum password length": "MinimumPasswordLength",
+    "password must meet complexity requirements": "PasswordComplexity",
+    "store passwords using reversible encryption": "ClearTextPassword",
+    "account lockout duration": "LockoutDuration",
+    "account lockout threshold": "LockoutBadCount",
+    "allow administrator account lockout": "AllowAdministratorLockout",
+    "reset account lockout counter after": "ResetLockoutCount",
+    "accounts: administrator account status": "EnableAdminAccount",
+    "accounts: guest account status": "EnableGuestAccount",
+    "accounts: rename administrator account": "NewAdministratorName",
+    "accounts: rename guest account": "NewGuestName",
+    "network access: allow anonymous sid/name translation": "LSAAnonymousNameLookup",
+    "network security: force logoff when logon hours expire": "ForceLogoffWhenHourExpire",
+}
+
+# [System Access] keys where -1 means "never" / "until an administrator unlocks"
+UNLIMITED_KEYS = {"MaximumPasswordAge", "LockoutDuration"}
+
+# [System Access] keys holding an account name rather than a number
+ACCOUNT_NAME_KEYS = {"NewAdministratorName", "NewGuestName"}
+
+# User right display name -> [Privilege Rights] constant
+USER_RIGHTS = {
+    "access credential manager as a trusted caller": "SeTrustedCredManAccessPrivilege",
+    "access this computer from the network": "SeNetworkLogonRight",
+    "act as part of the operating system": "SeTcbPrivilege",
+    "adjust memory quotas for a process": "SeIncreaseQuotaPrivilege",
+    "allow log on locally": "SeInteractiveLogonRight",
+    "allow log on through remote desktop services": "SeRemoteInteractiveLogonRight",
+    "back up files and directories": "SeBackupPrivilege",
+    "change the system time": "SeSystemtimePrivilege",
+    "change the time zone": "SeTimeZonePrivilege",
+    "create a pagefile": "SeCreatePagefilePrivilege",
+    "create a token object": "SeCreateTokenPrivilege",
+    "create global objects": "SeCreateGlobalPrivilege",
+    "create permanent shared objects": "SeCreatePermanentPrivilege",
+    "create symbolic links": "SeCreateSymbolicLinkPrivilege",
+    "debug programs": "SeDebugPrivilege",
+    "deny access to this computer from the network": "SeDenyNetworkLogonRight",
+    "deny log on as a batch job": "SeDenyBatchLogonRight",
+    "deny log on as a service": "SeDenyServiceLogonRight",
+    "deny log on locally": "SeDenyInteractiveLogonRight",
+    "deny log on through remote desktop services": "SeDenyRemoteInteractiveLogonRight",
+    "enable computer and user accounts to be trusted for delegation": "SeEnableDelegationPrivilege",
+    "force shutdown from a remote system": "SeRemoteShutdownPrivilege",
+    "generate security audits": "SeAuditPrivilege",
+    "impersonate a client after authentication": "SeImpersonatePrivilege",
+    "increase scheduling priority": "SeIncreaseBasePriorityPrivilege",
+    "load and unload device drivers": "SeLoadDriverPrivilege",
+    "lock pages in memory": "SeLockMemoryPrivilege",
+    "log on as a batch job": "SeBatchLogonRight",
+    "log on as a service": "SeServiceLogonRight",
+    "manage auditing and security log": "SeSecurityPrivilege",
+    "modify an object label": "SeRelabelPrivilege",
+    "modify firmware environment values": "SeSystemEnvironmentPrivilege",
+    "perform volume maintenance tasks": "SeManageVolumePrivilege",
+    "profile single process": "SeProfileSingleProcessPrivilege",
+    "profile system performance": "SeSystemProfilePrivilege",
+    "replace a process level token": "SeAssignPrimaryTokenPrivilege",
+    "restore files and directories": "SeRestorePrivilege",
+    "shut down the system": "SeShutdownPrivilege",
+    "take ownership of files or other objects": "SeTakeOwnershipPrivilege",
+}
+
+# [Registry Values] type codes (REG_* constants)
+REG_SZ, REG_EXPAND_SZ, REG_BINARY, REG_DWORD, REG_MULTI_SZ = 1, 2, 3, 4, 7
+
+SETTING_NAME_PATTERN = re.compile(
+    r"^(?:Ensure|Configure)\s+'(.*?)'"
+    r"(?:\s+(?:is set to|is NOT set to|to include|is configured)|$)"
+)
+SECTION_PATTERN = re.compile(r'^\[(.+)\]$')
+
+
+def decode_inf(data: bytes) -> str:
+    """
+    Decode an INF file. secedit writes UTF-16 LE with a BOM; templates
+    saved by hand are often UTF-8 or ANSI.
+    """
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return data.decode('utf-16')
+    if len(data) > 1 and data[1:2] == b'\x00':
+        return data.decode('utf-16-le')
+    if data.startswith(b'\xef\xbb\xbf'):
+        return data[3:].decode('utf-8')
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1252')
+
+
+def setting_name(entry: CatalogEntry) -> str:
+    """The quoted policy name in the title ("Enforce password history")."""
+    match = SETTING_NAME_PATTERN.match(entry.title)
+    return match.group(1) if match else ""
+
+
+def unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+@dataclass(frozen=True)
+class RegistryValue:
+    """One [Registry Values] line: MACHINE\\Path\\Name=type,data"""
+    path: str
+    name: str
+    value_type: int
+    data: str
+
+    @property
+    def value(self) -> Value:
+        """The data as int (DWORD), list (MULTI_SZ) or str."""
+        if self.value_type == REG_DWORD:
+            number = as_int(self.data)
+            return number if number is not None else self.data
+        if self.value_type == REG_MULTI_SZ:
+            return [unquote(item) for item in self.data.split(',') if item.strip()]
+        return unquote(self.data)
+
+
+class SeceditExport:
+    """A parsed secedit security template"""
+
+    def __init__(self, sections: Dict[str, Dict[str, str]],
+                 path: Optional[Path] = None):
+        self.path = path
+        # Section and key names are case-insensitive in INF files
+        self.sections = {
+            name.lower(): {key.lower(): (key, value) for key, value in entries.items()}
+            for name, entries in sections.items()
+        }
+        self.registry_values: Dict[Tuple[str, str], RegistryValue] = {}
+        for key, data in self.section(REGISTRY_VALUES).values():
+            registry_path, _, name = key.rpartition('\\')
+            type_code, _, value = data.partition(',')
+            value_type = as_int(type_code)
+            if value_type is None:
+                continue
+            self.registry_values[
+                (normalize_registry_path(registry_path), name.lower())
+            ] = RegistryValue(registry_path, name, value_type, value)
+
+    @classmethod
+    def from_text(cls, text: str, path: Optional[Path] = None) -> "SeceditExport":
+        sections: Dict[str, Dict[str, str]] = {}
+        current: Optional[Dict[str, str]] = None
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line or line.startswith(';'):
+                continue
+            match = SECTION_PATTERN.match(line)
+            if match:
+                current = sections.setdefault(match.group(1).strip(), {})
+                continue
+            if current is None or '=' not in line:
+                continue
+            key, _, value = line.partition('=')
+            current[key.strip()] = value.strip()
+        return cls(sections, path)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "SeceditExport":
+        path = Path(path)
+        return cls.from_text(decode_inf(path.read_bytes()), path)
+
+    def section(self, name: str) -> Dict[str, Tuple[str, str]]:
+        return self.sections.get(name.lower(), {})
+
+    def system_access(self, key: str) -> Optional[str]:
+        item = self.section(SYSTEM_ACCESS).get(key.lower())
+        return item[1] if item else None
+
+    def privilege(self, constant: str) -> List[str]:
+        """Principals holding a user right; an absent line means no one."""
+        item = self.section(PRIVILEGE_RIGHTS).get(constant.lower())
+        if not item:
+            return []
+        return [name.strip() for name in item[1].split(',') if name.strip()]
+
+    def registry_value(self, path: str, name: str) -> Optional[RegistryValue]:
+        return self.registry_values.get((normalize_registry_path(path), name.lower()))
+
+
+def display_principal(principal: str) -> str:
+    """Show well-known SIDs by name ("*S-1-5-32-544" -> "Administrators")."""
+    name = principal.lstrip('*')
+    return WELL_KNOWN_SIDS.get(name.upper(), name)
+
+
+def display_value(value: Value) -> str:
+    if value is None:
+        return "Not Configured"
+    if isinstance(value, list):
+        return ", ".join(value)
+    return str(value)
+
+
+def recommended_value(entry: CatalogEntry) -> str:
+    if entry.expected_value:
+        return entry.expected_value
+    if entry.registry_expected:
+        return "; ".join(entry.registry_expected.values())
+    return "Configured"
+
+
+def default_account_name(entry: CatalogEntry) -> str:
+    """The built-in account name a rename recommendation wants changed."""
+    first_line = entry.default_value.strip().splitlines()[0] if entry.default_value.strip() else ""
+    return first_line.rstrip('.').strip()
+
+
+class SeceditEvaluator:
+    """Evaluates catalog recommendations against one SeceditExport"""
+
+    def __init__(self, export: SeceditExport, computer_name: Optional[str] = None):
+        self.export = export
+        self.computer_name = computer_name
+
+    def result(self, entry: CatalogEntry, observation: Observation,
+               compliant: Optional[bool]) -> CISResult:
+        """The result for an observation once its checks are decided."""
+        extra = {"computer_name": self.computer_name} if self.computer_name else {}
+        return CISResult(
+            cis_id=entry.cis_id,
+            title=entry.title,
+            current_value=observation.current,
+            recommended_value=recommended_value(entry),
+            compliance_status=status_for(compliant),
+            source=SOURCE,
+            details=observation.details,
+            profile=entry.profile,
+            **extra,
+        )
+
+    def evaluate(self, entry: CatalogEntry) -> CISResult:
+        """Evaluate one section 1/2 recommendation."""
+        observation = self.observe(entry)
+        return self.result(entry, observation, observation.decide())
+
+    def evaluate_all(self, entries: Iterable[CatalogEntry]) -> List[CISResult]:
+        return [self.evaluate(entry) for entry in entries]
+
+    def observe(self, entry: CatalogEntry) -> Observation:
+        """What the export holds for a recommendation, not yet decided."""
+        if entry.data_source == "registry":
+            return self._observe_registry(entry)
+        name = setting_name(entry).lower()
+        if name in SYSTEM_ACCESS_KEYS:
+            return self._observe_system_access(entry, SYSTEM_ACCESS_KEYS[name])
+        if name in USER_RIGHTS:
+            return self._observe_privilege(entry, USER_RIGHTS[name])
+        return Observation(current="N/A", details="No secedit setting maps to this recommendation")
+
+    def _observe_system_access(self, entry: CatalogEntry, key: str) -> Observation:
+        raw = self.export.system_access(key)
+        if raw is None:
+            return Observation(current="Not Configured",
+                               details=f"[{SYSTEM_ACCESS}] {key} is not present in the export")
+        value = unquote(raw)
+        observation = Observation(current=value, details=f"[{SYSTEM_ACCESS}] {key} = {raw}")
+
+        if key in ACCOUNT_NAME_KEYS:
+            # Compliant once the account no longer has its well-known name
+            default = default_account_name(entry)
+            observation.outcome = bool(value) and value.lower() != default.lower()
+            return observation
+
+        number = as_int(value)
+        if number == -1 and key in UNLIMITED_KEYS:
+            # "Never expires" / "locked until an administrator unlocks"
+            observation.current = "-1 (never)"
+            number = sys.maxsize
+        observation.check(compile_phrase(entry.expected_value), number)
+        return observation
+
+    def _observe_privilege(self, entry: CatalogEntry, constant: str) -> Observation:
+        principals = self.export.privilege(constant)
+        observation = Observation(
+            current=", ".join(display_principal(p) for p in principals) or "No One",
+            details=f"[{PRIVILEGE_RIGHTS}] {constant}",
+        )
+        if not entry.expected_value:
+            # "Ensure 'Log on as a service' is configured": site-specific
+            observation.details += ": site-specific assignment, review manually"
+            return observation
+        observation.check(compile_principals(entry.expected_value, entry.expects_inclusion),
+                          principals)
+        return observation
+
+    def _observe_registry(self, entry: CatalogEntry) -> Observation:
+        observation = Observation()
+        current = []
+        details = []
+        for location in entry.registry_locations:
+            found = self.export.registry_value(location.path, location.value_name)
+            value = found.value if found else None
+            observation.check(compile_phrase(entry.expected_data_for(location.value_name)), value)
+            current.append(display_value(value))
+            details.append(f"[{REGISTRY_VALUES}] {location.path}:{location.value_name}")
+        observation.current = "; ".join(current)
+        observation.details = "; ".join(details)
+        return observation
+
+
+def select_entries(profile: Optional[str] = None,
+                   cis_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+    """Section 1/2 recommendations, optionally filtered by profile or IDs."""
+    return load_catalog().select(profile=profile, sections=["1", "2"], cis_ids=cis_ids)
+
+
+def evaluate_export(path: Union[str, Path], profile: Optional[str] = None,
+                    computer_name: Optional[str] = None) -> List[CISResult]:
+    """Evaluate every section 1/2 recommendation against one export file."""
+    evaluator = SeceditEvaluator(SeceditExport.from_file(path), computer_name)
+    return evaluator.evaluate_all(select_entries(profile))
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Evaluate a secedit /export file against CIS sections 1 and 2")
+    parser.add_argument("export", type=Path, help="secedit /export /cfg output")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--computer-name", help="ComputerName for the results (default: this host)")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = evaluate_export(args.export, args.profile, args.computer_name)
+    elapsed = time.perf_counter() - started
+
+    output_results(results, args.format, args.output, elapsed, id_width=10)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
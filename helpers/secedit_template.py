@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Compile section 1/2 remediations into one secedit security template.
+
+Each section 1/2 remediation script builds a template for its one setting
+and calls Set-SecurityPolicyTemplate, so a full hardening pass runs
+`secedit /configure` (and rewrites the security database) once per
+setting. This module compiles a selection of recommendations (by profile,
+section or ID) into a single INF template:
+
+- [System Access]    password, lockout and account settings
+- [Privilege Rights] user rights, written as *SID lists
+- [Registry Values]  security options backed by registry values
+
+Values come from the catalog's expected-value phrases. Additional templates
+can be merged in (site overrides, a previous baseline, a secedit /export);
+the same setting given two different values is reported as a conflict
+(user rights compare as sets of principals, so *SIDs match names). Keys
+with no recommendation behind them are passed through with a warning.
+The compiled template is validated by parsing it back with secedit_inf.py
+and evaluating the selected recommendations against it, and is written
+the way Set-SecurityPolicyTemplate writes templates (UTF-16 LE with BOM,
+CRLF).
+
+Usage:
+    python secedit_template.py --profile L1 --output cis-l1.inf
+    secedit /configure /db cis.sdb /cfg cis-l1.inf /quiet   (on the host)
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from cis_catalog import CatalogEntry, load_catalog, normalize_registry_path
+from cis_results import PROFILES
+from recommended_values import (
+    WELL_KNOWN_SIDS, normalize_principal, parse_principals, recommended_setting,
+)
+from registry_pol import value_type_for
+from secedit_inf import (
+    ACCOUNT_NAME_KEYS, PRIVILEGE_RIGHTS, REG_DWORD, REG_MULTI_SZ, REGISTRY_VALUES,
+    SYSTEM_ACCESS, SYSTEM_ACCESS_KEYS, USER_RIGHTS, SeceditEvaluator,
+    SeceditExport, setting_name,
+)
+
+# Fixed sections every template starts with (as in the remediation scripts)
+PREAMBLE = [
+    ("Unicode", [("Unicode", "yes")]),
+    ("Version", [("signature", '"$CHICAGO$"'), ("Revision", "1")]),
+]
+SECTION_ORDER = [SYSTEM_ACCESS, PRIVILEGE_RIGHTS, REGISTRY_VALUES]
+
+# Account or group name -> SID, for writing [Privilege Rights] as *SIDs
+PRINCIPAL_SIDS = {normalize_principal(name): sid for sid, name in WELL_KNOWN_SIDS.items()}
+
+VALID_REGISTRY_TYPES = {1, 2, 3, 4, 7}
+
+KNOWN_ACCESS = set(SYSTEM_ACCESS_KEYS.values())
+KNOWN_RIGHTS = set(USER_RIGHTS.values())
+
+
+@dataclass
+class TemplateSetting:
+    """One key = value line and where it came from"""
+    section: str
+    key: str
+    value: str
+    origin: str
+
+
+@dataclass
+class Conflict:
+    """The same setting given different values by two sources"""
+    section: str
+    key: str
+    values: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        given = ", ".join(f"{origin}={value!r}" for origin, value in self.values)
+        return f"[{self.section}] {self.key}: {given}"
+
+
+def principal_token(name: str) -> str:
+    """"Administrators" -> "*S-1-5-32-544"; unknown names stay as names."""
+    sid = PRINCIPAL_SIDS.get(normalize_principal(name))
+    return f"*{sid}" if sid else name.strip()
+
+
+def comparable_value(section: str, value: str):
+    """A value in a form where equivalent spellings compare equal."""
+    if section == PRIVILEGE_RIGHTS:
+        # "*S-1-5-32-544,Guests" and "BUILTIN\\Guests,Administrators" name the same holders
+        return frozenset(normalize_principal(name) for name in value.split(',') if name.strip())
+    return value.strip()
+
+
+def format_registry_value(value, value_type: int) -> str:
+    if value_type == REG_MULTI_SZ:
+        return f"{value_type}," + ",".join(value if isinstance(value, list) else [str(value)])
+    if value_type == REG_DWORD:
+        return f"{value_type},{value}"
+    return f'{value_type},"{value}"'
+
+
+class TemplateCompiler:
+    """Collects settings from recommendations and templates into one INF"""
+
+    def __init__(self, account_names: Optional[Dict[str, str]] = None,
+                 current: Optional[SeceditExport] = None):
+        # NewAdministratorName / NewGuestName values chosen by the site
+        self.account_names = account_names or {}
+        # Current policy, used to keep existing holders of "to include" rights
+        self.current = current
+        self.settings: Dict[Tuple[str, str], List[TemplateSetting]] = {}
+        self.skipped: List[Tuple[str, str]] = []
+        self.compiled_ids: List[str] = []
+
+    def add(self, section: str, key: str, value: str, origin: str):
+        self.settings.setdefault((section, key.lower()), []).append(
+            TemplateSetting(section, key, value, origin))
+
+    def add_entry(self, entry: CatalogEntry) -> bool:
+        """Add the setting(s) for one recommendation; False if skipped."""
+        if entry.data_source == "registry":
+            added = self._add_registry(entry)
+        else:
+            name = setting_name(entry).lower()
+            if name in SYSTEM_ACCESS_KEYS:
+                added = self._add_system_access(entry, SYSTEM_ACCESS_KEYS[name])
+            elif name in USER_RIGHTS:
+                added = self._add_privilege(entry, USER_RIGHTS[name])
+            else:
+                self.skipped.append((entry.cis_id, "no secedit setting for this recommendation"))
+                added = False
+        if added:
+            self.compiled_ids.append(entry.cis_id)
+        return added
+
+    def _add_system_access(self, entry: CatalogEntry, key: str) -> bool:
+        if key in ACCOUNT_NAME_KEYS:
+            name = self.account_names.get(key)
+            if not name:
+                self.skipped.append((entry.cis_id, f"{key} needs a site-specific account name"))
+                return False
+            self.add(SYSTEM_ACCESS, key, f'"{name}"', entry.cis_id)
+            return True
+        value = recommended_setting(entry.expected_value)
+        if not isinstance(value, int):
+            self.skipped.append((entry.cis_id, f"no fixed value for {entry.expected_value!r}"))
+            return False
+        self.add(SYSTEM_ACCESS, key, str(value), entry.cis_id)
+        return True
+
+    def _add_privilege(self, entry: CatalogEntry, constant: str) -> bool:
+        if not entry.expected_value:
+            self.skipped.append((entry.cis_id, "site-specific user rights assignment"))
+            return False
+        principals = sorted(parse_principals(entry.expected_value))
+        tokens = [principal_token(name) for name in principals]
+        if entry.expects_inclusion and self.current is not None:
+            # Keep whoever already holds the right; secedit replaces the list
+            for existing in self.current.privilege(constant):
+                if normalize_principal(existing) not in principals:
+                    tokens.append(existing)
+        self.add(PRIVILEGE_RIGHTS, constant, ",".join(tokens), entry.cis_id)
+        return True
+
+    def _add_registry(self, entry: CatalogEntry) -> bool:
+        lines = []
+        for location in entry.registry_locations:
+            if normalize_registry_path(location.path).split('\\', 1)[0] != "hklm":
+                continue
+            phrase = entry.expected_data_for(location.value_name)
+            multi = entry.registry_value_type == "REG_MULTI_SZ" or (',' in phrase and '\\' in phrase)
+            value = recommended_setting(phrase, multi_string=multi)
+            if value is None:
+                self.skipped.append((entry.cis_id, f"no fixed value for {phrase!r}"))
+                return False
+            value_type = value_type_for(entry, value)
+            path = location.path.split('\\', 1)[1]
+            lines.append((f"MACHINE\\{path}\\{location.value_name}",
+                          format_registry_value(value, value_type)))
+        for key, value in lines:
+            self.add(REGISTRY_VALUES, key, value, entry.cis_id)
+        return bool(lines)
+
+    def merge(self, export: SeceditExport, origin: str):
+        """Merge every setting of another template (site overrides etc.)."""
+        for section in SECTION_ORDER:
+            for key, value in export.section(section).values():
+                self.add(section, key, value, origin)
+
+    def conflicts(self) -> List[Conflict]:
+        found = []
+        for (section, _), settings in self.settings.items():
+            if len({comparable_value(section, setting.value) for setting in settings}) > 1:
+                first = settings[0]
+                found.append(Conflict(section, first.key,
+                                      [(s.origin, s.value) for s in settings]))
+        return found
+
+    def validate(self) -> List[str]:
+        """Problems secedit would reject."""
+        problems = []
+        for (section, _), settings in self.settings.items():
+            setting = settings[-1]
+            if section == SYSTEM_ACCESS:
+                if setting.key in KNOWN_ACCESS and setting.key not in ACCOUNT_NAME_KEYS and \
+                        not setting.value.lstrip('-').isdigit():
+                    problems.append(f"[{section}] {setting.key} must be a number")
+            elif section == REGISTRY_VALUES:
+                type_code = setting.value.split(',', 1)[0]
+                if not setting.key.upper().startswith("MACHINE\\"):
+                    problems.append(f"[{section}] {setting.key} is not under MACHINE\\")
+                if not type_code.isdigit() or int(type_code) not in VALID_REGISTRY_TYPES:
+                    problems.append(f"[{section}] {setting.key} has invalid type {type_code!r}")
+        return problems
+
+    def warnings(self) -> List[str]:
+        """
+        Keys this module has no recommendation for. They are passed through
+        as given: real exports carry settings such as
+        RequireLogonToChangePassword, but a typo is silently ignored by secedit.
+        """
+        found = []
+        for (section, _), settings in self.settings.items():
+            key = settings[-1].key
+            if section == SYSTEM_ACCESS and key not in KNOWN_ACCESS:
+                found.append(f"[{section}] unrecognized key {key}")
+            elif section == PRIVILEGE_RIGHTS and key not in KNOWN_RIGHTS:
+                found.append(f"[{section}] unrecognized user right {key}")
+        return found
+
+    def render(self) -> str:
+        """The template text; for conflicting settings the last value wins."""
+        lines = []
+        for section, items in PREAMBLE:
+            lines.append(f"[{section}]")
+            lines.extend(f"{key}={value}" for key, value in items)
+        for section in SECTION_ORDER:
+            chosen = [settings[-1] for (name, _), settings in self.settings.items()
+                      if name == section]
+            if not chosen:
+                continue
+            lines.append(f"[{section}]")
+            separator = "=" if section == REGISTRY_VALUES else " = "
+            lines.extend(f"{s.key}{separator}{s.value}".rstrip() for s in chosen)
+        return "\r\n".join(lines) + "\r\n"
+
+    def verify(self, entries: Iterable[CatalogEntry]) -> List[str]:
+        """Evaluate the compiled entries against the rendered template."""
+        export = SeceditExport.from_text(self.render())
+        evaluator = SeceditEvaluator(export)
+        wanted = set(self.compiled_ids)
+        return [f"{result.cis_id}: {result.compliance_status} ({result.current_value})"
+                for result in evaluator.evaluate_all(e for e in entries if e.cis_id in wanted)
+                if result.compliance_status != "Compliant"]
+
+
+def compile_template(entries: Iterable[CatalogEntry],
+                     account_names: Optional[Dict[str, str]] = None,
+                     current: Optional[SeceditExport] = None,
+                     merge: Iterable[Tuple[SeceditExport, str]] = ()) -> TemplateCompiler:
+    compiler = TemplateCompiler(account_names, current)
+    for entry in entries:
+        compiler.add_entry(entry)
+    for export, origin in merge:
+        compiler.merge(export, origin)
+    return compiler
+
+
+def write_template(text: str, path: Union[str, Path]):
+    """Write like Out-File -Encoding Unicode (UTF-16 LE with BOM)."""
+    Path(path).write_bytes(text.encode('utf-16'))
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Compile section 1/2 remediations into one secedit template")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--section", action="append", dest="sections",
+                        help="section prefix, e.g. 1.2 or 2.2 (default: 1 and 2)")
+    parser.add_argument("--id", action="append", dest="cis_ids")
+    parser.add_argument("--admin-name", help="value for 'Rename administrator account'")
+    parser.add_argument("--guest-name", help="value for 'Rename guest account'")
+    parser.add_argument("--current", type=Path,
+                        help="secedit /export of the host, to keep existing holders of 'to include' rights")
+    parser.add_argument("--merge", type=Path, action="append", default=[],
+                        help="additional template to merge (conflicts are reported)")
+    parser.add_argument("--allow-conflicts", action="store_true",
+                        help="write the template even if sources disagree (last one wins)")
+    parser.add_argument("--output", type=Path, default=Path("cis-secedit.inf"))
+    args = parser.parse_args()
+
+    sections = args.sections or ["1", "2"]
+    if not all(s.split('.')[0] in ("1", "2") for s in sections):
+        parser.error("only sections 1 and 2 are applied through secedit")
+    entries = load_catalog().select(args.profile, sections, args.cis_ids)
+    account_names = {key: name for key, name in (("NewAdministratorName", args.admin_name),
+                                                 ("NewGuestName", args.guest_name)) if name}
+    current = SeceditExport.from_file(args.current) if args.current else None
+    merge = [(SeceditExport.from_file(path), path.name) for path in args.merge]
+    compiler = compile_template(entries, account_names, current, merge)
+
+    for cis_id, reason in compiler.skipped:
+        print(f"Skipped {cis_id}: {reason}")
+    conflicts = compiler.conflicts()
+    for conflict in conflicts:
+        print(f"Conflict {conflict}")
+    for warning in compiler.warnings():
+        print(f"Warning: {warning}")
+    # With --allow-conflicts a merged template may deliberately override a recommendation
+    overridden = {origin for conflict in conflicts for origin, _ in conflict.values} \
+        if args.allow_conflicts else set()
+    problems = compiler.validate()
+    for failure in compiler.verify(entries):
+        if failure.split(':', 1)[0] in overridden:
+            print(f"Overridden: {failure}")
+        else:
+            problems.append(failure)
+    for problem in problems:
+        print(f"Invalid: {problem}")
+    if problems or (conflicts and not args.allow_conflicts):
+        print("Template not written")
+        return 1
+
+    write_template(compiler.render(), args.output)
+    print(f"Wrote {len(compiler.compiled_ids)} recommendations "
+          f"({len(compiler.settings)} settings) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
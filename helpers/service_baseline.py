@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for the section 5 (System Services) recommendations.
+
+Each section 5 audit script starts PowerShell to query one service's start
+type. This module evaluates all of them in one pass over a single service
+inventory taken on the host:
+
+    Get-Service | Select-Object Name, DisplayName, StartType, Status |
+        Export-Csv services.csv -NoTypeInformation
+    Get-CimInstance Win32_Service | Select-Object Name, StartMode, State |
+        ConvertTo-Json > services.json
+
+Start types are accepted as names ("Disabled", "Auto"), as the numeric enum
+values ConvertTo-Json writes, or as registry Start values, all of which map
+to the Start value (0-4) the catalog's audit procedures name. A service that
+is not in the inventory is treated like a missing Services\\<name> key.
+
+Non-compliant services are collected into one remediation plan, rendered as
+a single PowerShell script that applies every start-type change in one
+process. The windows/optimization/services/toggle-* scripts are read from the
+same inventory to show what each toggle would do on that host.
+
+Usage:
+    python service_baseline.py services.csv --profile L1 --format csv --output results.csv
+    python service_baseline.py services.json --remediation fix-services.ps1 --toggles
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from cis_catalog import REPO_ROOT, CatalogEntry, load_catalog
+from cis_results import PROFILES, CISResult, output_results, status_for, summarize
+from ps_tokenizer import parse_file
+from recommended_values import (
+    Observation, as_int, compile_phrase, evaluate_phrase, recommended_setting,
+)
+from secedit_inf import decode_inf
+
+SOURCE = "Service Control Manager"
+
+# Registry Start values (HKLM\SYSTEM\CurrentControlSet\Services\<name>:Start)
+START_BOOT, START_SYSTEM, START_AUTOMATIC, START_MANUAL, START_DISABLED = range(5)
+START_NAMES = {
+    START_BOOT: "Boot",
+    START_SYSTEM: "System",
+    START_AUTOMATIC: "Automatic",
+    START_MANUAL: "Manual",
+    START_DISABLED: "Disabled",
+}
+START_ALIASES = {name.lower(): value for value, name in START_NAMES.items()}
+START_ALIASES.update({"auto": START_AUTOMATIC, "automaticdelayedstart": START_AUTOMATIC,
+                      "delayed-auto": START_AUTOMATIC, "demand": START_MANUAL})
+
+# ServiceControllerStatus enum values, as ConvertTo-Json writes Get-Service output
+STATE_NAMES = {1: "Stopped", 2: "StartPending", 3: "StopPending", 4: "Running",
+               5: "ContinuePending", 6: "PausePending", 7: "Paused"}
+
+# Column names used by Get-Service, Win32_Service and sc.exe-style dumps
+NAME_COLUMNS = ("name", "servicename", "service_name")
+START_COLUMNS = ("starttype", "startmode", "start_type", "start")
+STATE_COLUMNS = ("status", "state")
+DISPLAY_COLUMNS = ("displayname", "display_name")
+
+TOGGLE_DIR = REPO_ROOT / "windows" / "optimization" / "services"
+
+
+@dataclass
+class ServiceRecord:
+    """One service from the inventory"""
+    name: str
+    start: Optional[int]
+    state: str = ""
+    display_name: str = ""
+
+    @property
+    def start_name(self) -> str:
+        return START_NAMES.get(self.start, "Unknown") if self.start is not None else "Unknown"
+
+
+def parse_start(value: Any) -> Optional[int]:
+    """Start value 0-4 from "Disabled", "Auto", 4 or "4"."""
+    number = as_int(value)
+    if number is not None:
+        return number if number in START_NAMES else None
+    if isinstance(value, str):
+        return START_ALIASES.get(value.strip().replace(' ', '').lower())
+    return None
+
+
+def parse_state(value: Any) -> str:
+    number = as_int(value)
+    if number is not None:
+        return STATE_NAMES.get(number, str(number))
+    return str(value or "").strip()
+
+
+def _column(row: Dict[str, Any], names: Iterable[str]) -> Any:
+    for name in names:
+        if name in row and row[name] not in (None, ""):
+            return row[name]
+    return None
+
+
+class ServiceInventory:
+    """Services by name (case-insensitive) from a CSV or JSON dump"""
+
+    def __init__(self, records: Iterable[ServiceRecord] = ()):
+        self.services: Dict[str, ServiceRecord] = {}
+        for record in records:
+            self.services[record.name.lower()] = record
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "ServiceInventory":
+        records = []
+        for row in rows:
+            row = {str(key).strip().lower(): value for key, value in row.items()}
+            name = _column(row, NAME_COLUMNS)
+            if not name:
+                continue
+            records.append(ServiceRecord(
+                name=str(name).strip(),
+                start=parse_start(_column(row, START_COLUMNS)),
+                state=parse_state(_column(row, STATE_COLUMNS)),
+                display_name=str(_column(row, DISPLAY_COLUMNS) or ""),
+            ))
+        return cls(records)
+
+    @classmethod
+    def from_text(cls, text: str) -> "ServiceInventory":
+        """Parse JSON (an object or array of objects) or CSV text."""
+        stripped = text.lstrip()
+        if stripped.startswith(('[', '{')):
+            data = json.loads(stripped)
+            return cls.from_rows([data] if isinstance(data, dict) else data)
+        lines = stripped.splitlines()
+        if lines and lines[0].startswith("#TYPE"):
+            lines = lines[1:]       # Export-Csv without -NoTypeInformation
+        return cls.from_rows(csv.DictReader(io.StringIO('\n'.join(lines))))
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "ServiceInventory":
+        # Out-File/> on Windows PowerShell writes UTF-16
+        return cls.from_text(decode_inf(Path(path).read_bytes()))
+
+    def get(self, name: str) -> Optional[ServiceRecord]:
+        return self.services.get(name.lower())
+
+    def __len__(self) -> int:
+        return len(self.services)
+
+
+def service_name(entry: CatalogEntry) -> Optional[str]:
+    """The service a section 5 recommendation is about (from its Services\\<name> key)."""
+    for location in entry.registry_locations:
+        if location.value_name.lower() == "start":
+            return location.path.rstrip('\\').rsplit('\\', 1)[-1]
+    return None
+
+
+def service_entries(profile: Optional[str] = None) -> List[CatalogEntry]:
+    return [entry for entry in load_catalog().select(profile=profile, sections=["5"])
+            if service_name(entry)]
+
+
+def start_phrase(entry: CatalogEntry) -> str:
+    return entry.expected_data_for("Start")
+
+
+class ServiceEvaluator:
+    """Evaluates section 5 recommendations against a ServiceInventory"""
+
+    def __init__(self, inventory: ServiceInventory, computer_name: Optional[str] = None):
+        self.inventory = inventory
+        self.computer_name = computer_name
+
+    def evaluate(self, entry: CatalogEntry) -> CISResult:
+        observation = self.observe(entry)
+        return self.result(entry, observation, observation.decide())
+
+    def observe(self, entry: CatalogEntry) -> Observation:
+        """The inventory's start type for a recommendation, not yet decided."""
+        name = service_name(entry)
+        record = self.inventory.get(name)
+        predicate = compile_phrase(start_phrase(entry))
+        if record is None:
+            observation = Observation(current="Not Installed",
+                                      details=f"Service: {name} (not in inventory)")
+            observation.check(predicate, None)
+            return observation
+        details = f"Service: {record.name}, StartType: {record.start_name}"
+        if record.state:
+            details += f", Status: {record.state}"
+        observation = Observation(current=record.start_name, details=details)
+        observation.check(predicate, record.start)
+        return observation
+
+    def result(self, entry: CatalogEntry, observation: Observation,
+               compliant: Optional[bool]) -> CISResult:
+        """The result for an observation once its checks are decided."""
+        extra = {"computer_name": self.computer_name} if self.computer_name else {}
+        return CISResult(
+            cis_id=entry.cis_id,
+            title=entry.title,
+            current_value=observation.current,
+            recommended_value=entry.expected_value,
+            compliance_status=status_for(compliant),
+            source=SOURCE,
+            details=observation.details,
+            profile=entry.profile,
+            **extra,
+        )
+
+    def evaluate_all(self, entries: Iterable[CatalogEntry]) -> List[CISResult]:
+        return [self.evaluate(entry) for entry in entries]
+
+
+@dataclass
+class ServiceChange:
+    """One start-type change of the remediation plan"""
+    cis_id: str
+    service: str
+    current: str
+    start: int
+    stop: bool
+
+    @property
+    def start_name(self) -> str:
+        return START_NAMES[self.start]
+
+
+def remediation_plan(inventory: ServiceInventory,
+                     entries: Iterable[CatalogEntry]) -> List[ServiceChange]:
+    """Start-type changes for every installed, non-compliant service."""
+    changes = []
+    for entry in entries:
+        name = service_name(entry)
+        record = inventory.get(name)
+        phrase = start_phrase(entry)
+        if record is None or evaluate_phrase(phrase, record.start) is not False:
+            continue
+        target = recommended_setting(phrase)
+        if target not in START_NAMES:
+            continue
+        changes.append(ServiceChange(
+            cis_id=entry.cis_id,
+            service=record.name,
+            current=record.start_name,
+            start=target,
+            stop=target == START_DISABLED and record.state.lower() != "stopped",
+        ))
+    return changes
+
+
+REMEDIATION_TEMPLATE = r'''<#
+.SYNOPSIS
+    Applies the section 5 service start-type changes for @@HOST@@ in one run.
+.DESCRIPTION
+    Generated by helpers/service_baseline.py from a service inventory. Sets the
+    startup type of @@COUNT@@ services and stops the ones being disabled.
+.PARAMETER WhatIf
+    Show the changes without applying them.
+#>
+[CmdletBinding(SupportsShouldProcess=$true)]
+param()
+
+$changes = @(
+@@CHANGES@@
+)
+
+$failed = 0
+foreach ($change in $changes) {
+    $service = Get-Service -Name $change.Name -ErrorAction SilentlyContinue
+    if (-not $service) {
+        Write-Host "$($change.CIS_ID) $($change.Name): not installed, skipped" -ForegroundColor Gray
+        continue
+    }
+    if (-not $PSCmdlet.ShouldProcess($change.Name, "Set startup type to $($change.StartupType)")) {
+        continue
+    }
+    try {
+        # Automatic/Manual/Disabled; Set-Service cannot set Boot/System
+        Set-Service -Name $change.Name -StartupType $change.StartupType -ErrorAction Stop
+        if ($change.Stop -and $service.Status -ne "Stopped") {
+            Stop-Service -Name $change.Name -Force -ErrorAction Stop
+        }
+        Write-Host "$($change.CIS_ID) $($change.Name): $($change.Current) -> $($change.StartupType)" -ForegroundColor Green
+    }
+    catch {
+        $failed++
+        Write-Host "$($change.CIS_ID) $($change.Name): $($_.Exception.Message)" -ForegroundColor Red
+    }
+}
+
+if ($failed) { exit 1 }
+exit 0
+'''
+
+
+def render_remediation(changes: List[ServiceChange], host: str = "this host") -> str:
+    """One PowerShell script applying every change of the plan."""
+    lines = [
+        f'    @{{ CIS_ID = "{c.cis_id}"; Name = "{c.service}"; Current = "{c.current}"; '
+        f'StartupType = "{c.start_name}"; Stop = ${str(c.stop).lower()} }}'
+        for c in changes
+    ]
+    text = REMEDIATION_TEMPLATE.replace("@@HOST@@", host) \
+        .replace("@@COUNT@@", str(len(changes))) \
+        .replace("@@CHANGES@@", "\n".join(lines))
+    return text.replace('\n', '\r\n')
+
+
+@dataclass
+class ToggleScript:
+    """A windows/optimization/services/toggle-* script and the service it flips"""
+    script: str
+    service: str
+    enable_start: int
+
+
+def toggle_scripts(directory: Path = TOGGLE_DIR) -> List[ToggleScript]:
+    """The service each toggle script flips and the start type it enables to."""
+    toggles = []
+    for path in sorted(directory.glob("toggle-*.ps1")):
+        parsed = parse_file(path)
+        service, enable_start = None, None
+        for command in parsed.find_commands("Set-Service"):
+            name = parsed.resolve(command.get("Name"))
+            start = parse_start(parsed.resolve(command.get("StartupType")))
+            if not isinstance(name, str):
+                continue
+            service = service or name
+            if start is not None and start != START_DISABLED:
+                enable_start = start
+        if service:
+            toggles.append(ToggleScript(parsed.path, service, enable_start or START_MANUAL))
+    return toggles
+
+
+def toggle_states(inventory: ServiceInventory,
+                  toggles: Optional[List[ToggleScript]] = None) -> List[Dict[str, str]]:
+    """Current start type of each toggled service and what the toggle would do."""
+    rows = []
+    for toggle in toggles if toggles is not None else toggle_scripts():
+        record = inventory.get(toggle.service)
+        if record is None:
+            action = "fails: service not installed"
+        elif record.start == START_DISABLED:
+            action = f"enable ({START_NAMES[toggle.enable_start]}) and start"
+        else:
+            action = "stop and disable"
+        rows.append({
+            "script": toggle.script,
+            "service": toggle.service,
+            "current": record.start_name if record else "Not Installed",
+            "state": record.state if record else "",
+            "action": action,
+        })
+    return rows
+
+
+def format_text(results: List[CISResult], inventory: ServiceInventory, elapsed: float) -> str:
+    summary = summarize(results)
+    lines = [
+        f"Services in inventory: {len(inventory)}",
+        f"Evaluated {len(results)} recommendations in {elapsed:.3f}s",
+        f"Compliant: {summary['CompliantAudits']}  Non-Compliant: {summary['NonCompliantAudits']}  "
+        f"Not Applicable: {summary['NotApplicableAudits']}  "
+        f"({summary['CompliancePercentage']}%, {summary['OverallStatus']})",
+        "",
+    ]
+    for result in results:
+        lines.append(f"{result.cis_id:<8} {result.compliance_status:<15} "
+                     f"{result.current_value:<14} {result.details}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Evaluate section 5 service recommendations against a service inventory")
+    parser.add_argument("inventory", type=Path, help="Get-Service / Win32_Service dump (CSV or JSON)")
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--computer-name", help="ComputerName for the results (default: this host)")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--remediation", type=Path,
+                        help="write one PowerShell script with all start-type changes")
+    parser.add_argument("--toggles", action="store_true",
+                        help="show what the optimization toggle scripts would do on this host")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    inventory = ServiceInventory.from_file(args.inventory)
+    entries = service_entries(args.profile)
+    results = ServiceEvaluator(inventory, args.computer_name).evaluate_all(entries)
+    elapsed = time.perf_counter() - started
+
+    output_results(results, args.format, args.output, elapsed,
+                   text=lambda results, elapsed: format_text(results, inventory, elapsed))
+
+    if args.remediation:
+        changes = remediation_plan(inventory, entries)
+        host = args.computer_name or args.inventory.stem
+        args.remediation.write_text(render_remediation(changes, host), encoding='utf-8-sig', newline='')
+        print(f"Remediation plan: {len(changes)} start-type changes written to {args.remediation}")
+
+    if args.toggles:
+        for row in toggle_states(inventory):
+            print(f"{Path(row['script']).name:<34} {row['service']:<20} "
+                  f"{row['current']:<14} -> {row['action']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
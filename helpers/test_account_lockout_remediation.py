@@ -1,92 +1,75 @@
 #!/usr/bin/env python3
 """
 Test script to validate account lockout remediation scripts
+
+The structural checks (header, CmdletBinding, module imports, admin check,
+Invoke-CISRemediation CIS_ID, error handling) are the ps_lint.py rules; this
+script adds the one check specific to the 1.2.x scripts: they apply a
+[System Access] security policy template.
 """
 
-import re
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ps_lint import SCRIPTS_DIR, lint_source, repo_path  # noqa: E402
+from ps_tokenizer import HERESTRING, STRING, parse_source  # noqa: E402
+
 
 def validate_remediation_script(file_path):
     """Validate a remediation script for proper structure and syntax"""
-    print(f"\nValidating: {file_path}")
-    
+    path = repo_path(file_path)
+    print(f"\nValidating: {path}")
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Check for required components
-        checks = {
-            'CIS Benchmark header': r'# CIS Benchmark:.*\d+\.\d+\.\d+',
-            'CmdletBinding': r'\[CmdletBinding\(\)\]',
-            'Import module': r'Import-Module',
-            'Admin rights check': r'Test-AdminRights',
-            'Security policy template': r'\[System Access\]',
-            'Invoke-CISRemediation': (
-                r'Invoke-CISRemediation.*CIS_ID.*"\d+\.\d+\.\d+"'
-            ),
-            'Error handling': r'catch\s*{',
-        }
-        
-        all_passed = True
-        for check_name, pattern in checks.items():
-            if re.search(pattern, content, re.MULTILINE | re.IGNORECASE):
-                print(f"  ✓ {check_name}")
-            else:
-                print(f"  ✗ {check_name}")
-                all_passed = False
-        
-        # Extract CIS ID from file name
-        cis_id_match = re.search(r'(\d+\.\d+\.\d+)', str(file_path))
-        if cis_id_match:
-            cis_id = cis_id_match.group(1)
-            # Check if CIS ID is referenced in the script
-            if cis_id in content:
-                print(f"  ✓ CIS ID {cis_id} referenced correctly")
-            else:
-                print(f"  ✗ CIS ID {cis_id} not found in script")
-                all_passed = False
-        
-        return all_passed
-        
-    except Exception as e:
+        content = file_path.read_bytes().decode('utf-8-sig')
+    except (OSError, UnicodeDecodeError) as e:
         print(f"  ✗ Error reading file: {e}")
         return False
 
+    findings = lint_source(path, content)
+    for finding in findings:
+        print(f"  ✗ line {finding.line}: [{finding.rule_id}] {finding.message}")
+    if not findings:
+        print("  ✓ ps_lint rules")
+
+    # The template must be real script text, not a comment
+    template = any(token.kind in (STRING, HERESTRING) and "[System Access]" in token.text
+                   for token in parse_source(path, content).tokens)
+    print(f"  {'✓' if template else '✗'} Security policy template")
+
+    return template and not findings
+
 
 def main():
     """Main function"""
     print("=== Account Lockout Remediation Script Validation ===")
-    
+
     # Find all remediation scripts for account lockout controls
-    remediation_dir = Path("windows/security/remediations")
-    account_lockout_scripts = []
-    
-    for script_file in remediation_dir.glob("*.ps1"):
-        if "1.2." in script_file.name:
-            account_lockout_scripts.append(script_file)
-    
+    account_lockout_scripts = sorted(SCRIPTS_DIR.rglob("1.2.*-remediate-*.ps1"))
+
     script_count = len(account_lockout_scripts)
     print(f"Found {script_count} account lockout remediation scripts")
-    
+
     # Validate each script
     validation_results = {}
     for script_path in account_lockout_scripts:
         is_valid = validate_remediation_script(script_path)
         validation_results[script_path.name] = is_valid
-    
+
     # Summary
     print("\n=== Validation Summary ===")
     passed_count = sum(1 for result in validation_results.values() if result)
     total_count = len(validation_results)
-    
+
     for script_name, is_valid in validation_results.items():
         status = "PASS" if is_valid else "FAIL"
         print(f"{script_name}: {status}")
-    
+
     print(f"\nResults: {passed_count}/{total_count} scripts passed validation")
-    
-    if passed_count == total_count:
+
+    if total_count and passed_count == total_count:
         print("✓ All scripts are properly structured")
         return 0
     else:
@@ -95,4 +78,4 @@ def main():
 
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    sys.exit(main())
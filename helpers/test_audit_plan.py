@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the bulk audit plan compiler (audit_plan.py)
+"""
+
+import dataclasses
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from audit_plan import (  # noqa: E402
+    DATA_SOURCES, build_plan, registry_key, render_driver, script_parameters,
+)
+from cis_catalog import load_catalog  # noqa: E402
+from ps_tokenizer import TokenCache, parse_source  # noqa: E402
+from recommended_values import evaluate_phrase, evaluate_rule, phrase_rule  # noqa: E402
+from script_parameters import ScriptParameters, parameters_of  # noqa: E402
+
+SAMPLE_VALUES = [None, 0, 1, 2, 4, -1, 15, 24, 60, 365, 900, 999999, "",
+                 "Disabled", "0x10", [], ["a"], "a,b"]
+
+
+def test_rules_match_phrases():
+    """The rules shipped to the driver decide exactly like evaluate_phrase()"""
+    phrases = set()
+    for entry in load_catalog():
+        phrases.add(entry.expected_value)
+        phrases.update(entry.registry_expected.values())
+    for phrase in phrases:
+        rule = json.loads(json.dumps(phrase_rule(phrase)))
+        for value in SAMPLE_VALUES:
+            assert evaluate_rule(rule, value) == evaluate_phrase(phrase, value), (phrase, value)
+    assert phrase_rule("900 or less, but not 0") == {"op": "le", "value": 900, "except": 0}
+    assert phrase_rule("4 or that the key does not exist") == \
+        {"op": "eq", "value": 4, "missing_ok": True}
+
+
+def test_registry_grouping():
+    """Each registry key appears once, with every value the checks read"""
+    catalog = load_catalog()
+    plan = build_plan(catalog.select())
+    keys = [f"{k['hive']}\\{k['path']}".lower() for k in plan["registry_keys"]]
+    assert len(keys) == len(set(keys)) == plan["counts"]["registry_keys"]
+    locations = {(l.normalized_path, l.value_name.lower())
+                 for e in catalog for l in e.registry_locations}
+    assert plan["counts"]["registry_values"] == len(locations)
+    assert len(keys) < len(locations) / 2
+    # Checks of one key are adjacent, in the order the keys are read
+    order = [keys.index(check["reads"][0]["key"].lower()) for check in plan["checks"]["registry"]]
+    assert order == sorted(order)
+    assert registry_key("HKU\\[USER SID]\\Software\\Policies\\X") == ("HKCU", "Software\\Policies\\X")
+    assert registry_key("HKLM:\\SOFTWARE\\Policies") == ("HKLM", "SOFTWARE\\Policies")
+
+
+def test_plan_by_source():
+    """Every recommendation lands in exactly one data-source group"""
+    entries = load_catalog().select("L1")
+    plan = build_plan(entries)
+    planned = [c["cis_id"] for source in DATA_SOURCES for c in plan["checks"][source]]
+    assert sorted(planned + [u["cis_id"] for u in plan["unplanned"]]) == \
+        sorted(e.cis_id for e in entries)
+    secedit = {c["cis_id"]: c for c in plan["checks"]["secedit"]}
+    assert secedit["1.1.1"]["rule"] == {"op": "ge", "value": 24}
+    assert secedit["1.2.1"]["unlimited"]
+    assert secedit["2.2.2"]["principals"] == ["administrators", "remote desktop users"]
+    assert secedit["2.2.16"]["inclusion"]
+    audit = {c["cis_id"]: c for c in plan["checks"]["auditpol"]}
+    assert audit["17.1.1"]["required"] == 3
+    service = plan["checks"]["service"][0]
+    assert service["reads"][0]["key"].startswith("HKLM\\SYSTEM\\CurrentControlSet\\Services\\")
+
+
+def test_script_parameters():
+    """Audit scripts that read a different location than the catalog are reported"""
+    entries = load_catalog().select(cis_ids=["2.3.1.2", "5.1"])
+    scripts = {
+        "2.3.1.2": ScriptParameters("windows/x/2.3.1.2-audit-x.ps1",
+                                    "HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\System",
+                                    "LimitBlankPasswordUse"),
+        "5.1": ScriptParameters("windows/x/5.1-audit-x.ps1", service_name="BTAGService"),
+    }
+    plan = build_plan(entries, scripts)
+    assert len(plan["warnings"]) == 1 and plan["warnings"][0].startswith("2.3.1.2:")
+    assert plan["checks"]["registry"][0]["script"] == "windows/x/2.3.1.2-audit-x.ps1"
+
+
+# Checks the setting, then re-assigns the variables for a Group Policy check
+REASSIGNING = r'''function Test-Setting {
+    $registryPath = "HKLM:\SYSTEM\CurrentControlSet\Services\LanManServer\Parameters"
+    $valueName = "RequireSecuritySignature"
+    Get-RegistryValue -KeyPath $registryPath -ValueName $valueName
+}
+function Test-GroupPolicy {
+    $registryPath = "HKLM:\SOFTWARE\Policies\Microsoft\Windows\LanmanServer"
+    Get-RegistryValue -KeyPath $registryPath -ValueName $valueName
+}
+'''
+
+
+def test_parameters_at_call_site():
+    """Re-assigned variables resolve to the assignment in effect where they are read"""
+    parsed = parse_source("x.ps1", REASSIGNING, TokenCache(None))
+    parameters = parameters_of("x.ps1", parsed)
+    assert parameters.registry_path.endswith("\\LanManServer\\Parameters")
+    assert parameters.value_name == "RequireSecuritySignature"
+    called = parse_source("y.ps1", REASSIGNING + 'Invoke-CISAudit -CIS_ID "2.3.9.2" -RegistryPath $registryPath\n',
+                          TokenCache(None))
+    assert parameters_of("y.ps1", called).registry_path.endswith("\\Policies\\Microsoft\\Windows\\LanmanServer")
+
+    entries = load_catalog().select(sections=["2.3"])
+    plan = build_plan(entries, script_parameters())
+    assert not [w for w in plan["warnings"] if w.startswith("2.3.9.2:")]
+
+
+def test_entry_without_locations():
+    """A registry or service entry with no location is unplanned, not a crash"""
+    entries = load_catalog().select(cis_ids=["5.1", "5.2"])
+    entries[0] = dataclasses.replace(entries[0], registry_locations=[])
+    plan = build_plan(entries)
+    assert [u["cis_id"] for u in plan["unplanned"]] == [entries[0].cis_id]
+    assert [c["cis_id"] for c in plan["checks"]["service"]] == [entries[1].cis_id]
+
+
+def test_driver():
+    """The driver embeds the plan verbatim and produces framework result objects"""
+    plan = build_plan(load_catalog().select(sections=["1", "17"]))
+    driver = render_driver(plan, "..\\..\\modules")
+    assert "\r\n" in driver and "@@" not in driver
+    embedded = re.search(r"\$plan = @'\r\n(.*?)\r\n'@", driver, re.S).group(1)
+    assert json.loads(embedded.replace('\r\n', '\n')) == plan
+    assert '$ModulesPath = "$PSScriptRoot\\..\\..\\modules"' in driver
+    assert "New-CISResultObject" in driver and "Export-CISAuditResults" in driver
+    assert driver.count("secedit.exe /export") == 1 and driver.count("auditpol.exe /backup") == 1
+
+
+def main():
+    """Main test function"""
+    tests = [test_rules_match_phrases, test_registry_grouping, test_plan_by_source,
+             test_script_parameters, test_parameters_at_call_site,
+             test_entry_without_locations, test_driver]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the auditpol backup evaluator (auditpol_backup.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from auditpol_backup import (  # noqa: E402
+    AuditPolicyBackup, AuditPolicyEvaluator, audit_policy_entries,
+    subcategory_guid,
+)
+
+# `auditpol /backup /file:audit.csv` output (trimmed)
+BACKUP = '''Machine Name,Policy Target,Subcategory,Subcategory GUID,Inclusion Setting,Exclusion Setting,Setting Value
+WS01,System,Audit Credential Validation,{0cce923f-69ae-11d9-bed3-505054503030},Success and Failure,,3
+WS01,System,Audit Security Group Management,{0cce9237-69ae-11d9-bed3-505054503030},Success and Failure,,3
+WS01,System,Audit Process Creation,{0cce922b-69ae-11d9-bed3-505054503030},No Auditing,,0
+WS01,System,Audit Account Lockout,{0cce9217-69ae-11d9-bed3-505054503030},Failure,,2
+WS01,System,Audit Logon,{0cce9215-69ae-11d9-bed3-505054503030},Success,,1
+WS01,System,Audit Audit Policy Change,{0cce922f-69ae-11d9-bed3-505054503030},Success,,1
+WS01,System,Überwachung Anmelden (localized),{0cce921c-69ae-11d9-bed3-505054503030},Erfolg und Fehler,,3
+,System,Option:CrashOnAuditFail,,Disabled,,0
+'''
+
+
+def load_fixture() -> AuditPolicyBackup:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.csv"
+        path.write_bytes(BACKUP.replace('\n', '\r\n').encode('utf-8-sig'))
+        return AuditPolicyBackup.from_file(path)
+
+
+def test_backup_parsing():
+    """Subcategory rows by GUID, global options kept apart"""
+    backup = load_fixture()
+    assert backup.machine_name == "WS01"
+    assert len(backup.settings) == 7
+    assert backup.options == {"CrashOnAuditFail": "0"}
+    assert backup.find(None, "Audit Logon").setting == 1
+
+
+def test_subcategory_mapping():
+    """Every section 17 recommendation maps to a subcategory GUID"""
+    entries = {e.cis_id: e for e in audit_policy_entries()}
+    assert all(subcategory_guid(e) for e in entries.values())
+    assert subcategory_guid(entries["17.7.1"]) == "{0cce922f-69ae-11d9-bed3-505054503030}"
+    assert subcategory_guid(entries["17.3.1"]) == "{0cce9248-69ae-11d9-bed3-505054503030}"
+
+
+def test_evaluation():
+    """Exact and "include" settings evaluated in one pass"""
+    results = {r.cis_id: r for r in
+               AuditPolicyEvaluator(load_fixture()).evaluate_all(audit_policy_entries())}
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert status["17.1.1"] == "Compliant"
+    assert status["17.2.2"] == "Compliant"        # include 'Success'
+    assert status["17.3.2"] == "Non-Compliant"
+    assert status["17.5.1"] == "Compliant"        # include 'Failure'
+    assert status["17.5.4"] == "Non-Compliant"    # needs both
+    assert status["17.5.5"] == "Compliant"        # matched by GUID
+    assert status["17.7.1"] == "Compliant"
+    assert status["17.9.1"] == "Not Applicable"   # not in the backup
+    assert results["17.5.4"].current_value == "Success"
+    assert results["17.1.1"].computer_name == "WS01"
+    assert results["17.1.1"].source == "auditpol.exe"
+
+
+def main():
+    """Main test function"""
+    tests = [test_backup_parsing, test_subcategory_mapping, test_evaluation]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the script-vs-catalog consistency checker (check_script_catalog.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from check_script_catalog import check_call, check_tree, extract_calls  # noqa: E402
+from cis_catalog import load_catalog  # noqa: E402
+
+# Arguments passed literally and through a variable
+CALLS = r'''$CIS_ID = "2.3.7.4"
+$path = "HKLM:\SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System"
+Invoke-CISAudit -CIS_ID $CIS_ID -Section "2" -RegistryPath $path `
+    -RegistryValueName "InactivityTimeoutSecs" -RegistryValueType "DWord" -RegistryValueData "0x384"
+$path = "HKLM:\SOFTWARE\Policies\Other"
+'''
+
+# No registry arguments: the key lives in variables read by a custom script block
+VARIABLES = r'''$auditResult = Invoke-CISAudit -CIS_ID "2.3.7.4" -AuditType "Custom" -CustomScriptBlock {
+    $registryPath = "HKLM:\SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System"
+    $valueName = "InactivityTimeoutSec"
+    $value = Get-RegistryValue -KeyPath $registryPath -ValueName $valueName
+    $registryPath = "HKLM:\SOFTWARE\Policies\Microsoft\Windows\System"
+    $policy = Get-RegistryValue -KeyPath $registryPath -ValueName $valueName
+}
+'''
+
+
+def test_extract_calls():
+    """Arguments resolve at the call site; variables stand in for missing arguments"""
+    (call,) = extract_calls("2.3.7.4-audit-x.ps1", CALLS)
+    assert call.get("CIS_ID") == "2.3.7.4"
+    assert call.get("registrypath").endswith("\\Policies\\System")
+
+    invoke, variables = extract_calls("2.3.7.4-audit-x.ps1", VARIABLES)
+    assert invoke.get("RegistryPath") is None
+    assert (variables.command, variables.line) == ("variables", 2)
+    assert variables.arguments == {
+        "RegistryPath": "HKLM:\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Policies\\System",
+        "RegistryValueName": "InactivityTimeoutSec",
+    }
+
+
+def test_check_call():
+    """Each disagreement with the catalog is reported with its kind"""
+    catalog = load_catalog()
+    (call,) = extract_calls("2.3.7.4-audit-x.ps1", CALLS)
+    assert check_call(call, catalog, "2.3.7.4") == []
+
+    call.arguments.update(Section="1", RegistryValueData="0", RegistryValueType="String")
+    kinds = [m.kind for m in check_call(call, catalog, "2.3.7.4")]
+    assert kinds == ["section-mismatch", "type-mismatch"]    # "900 or less, but not 0" is not a list
+
+    _, variables = extract_calls("2.3.7.4-audit-x.ps1", VARIABLES)
+    (mismatch,) = check_call(variables, catalog, "2.3.7.4")
+    assert (mismatch.kind, mismatch.catalog_value) == ("value-name-mismatch", "InactivityTimeoutSecs")
+
+    call.arguments.update(CIS_ID="99.1")
+    assert [m.kind for m in check_call(call, catalog, "2.3.7.4")] == ["unknown-cis-id"]
+
+
+def test_check_tree():
+    """A scripts directory outside the repository is checked by absolute path"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = Path(tmp)
+        (scripts / "2.3.7.4-audit-x.ps1").write_text(VARIABLES)
+        (scripts / "2.3.7.4-remediate-x.ps1").write_text(CALLS.replace("Invoke-CISAudit", "Invoke-CISRemediation"))
+        (scripts / "helper.ps1").write_text(CALLS)
+        report = check_tree(scripts)
+        assert (report["stats"]["scripts"], report["stats"]["calls"]) == (2, 3)
+        (mismatch,) = report["mismatches"]
+        assert mismatch["path"] == (scripts / "2.3.7.4-audit-x.ps1").resolve().as_posix()
+
+
+def main():
+    """Main test function"""
+    tests = [test_extract_calls, test_check_call, test_check_tree]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
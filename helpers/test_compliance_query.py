@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the bitmap-indexed compliance queries (compliance_query.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from compliance_query import (  # noqa: E402
+    BitmapIndex, QuerySyntaxError, open_index, popcount,
+)
+from fleet_fixtures import write_fleet  # noqa: E402
+from result_store import ingest  # noqa: E402
+
+INVENTORY = "ComputerName,Type,Site\r\nWS01,laptop,hq\r\nWS02,laptop,branch\r\nWS03,desktop,hq\r\n" \
+            "WS04,desktop,hq\r\nWS05,Laptop,branch\r\nGONE,laptop,hq\r\n"
+
+
+def build_index(folder: Path) -> BitmapIndex:
+    ingest(folder / "store", write_fleet(folder), workers=1)
+    (folder / "hosts.csv").write_text(INVENTORY)
+    return open_index(folder / "store", folder / "hosts.csv")
+
+
+def test_queries():
+    """Prefixes expand along the ID hierarchy; and/or/not combine host sets"""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = build_index(Path(tmp))
+
+        def hosts(expression):
+            return index.host_names(index.query(expression))
+
+        assert index.hosts == ["WS01", "WS02", "WS03", "WS04", "WS05"]
+        assert hosts("fail:18") == ["WS01", "WS02", "WS05"]
+        assert hosts("fail:18@L1") == ["WS01", "WS02"]
+        assert hosts("fail:18.4") == hosts("fail:18.4.*") == ["WS01", "WS02"]
+        assert hosts("fail:2.3.7.4 and fail:18.4.6") == ["WS02"]
+        assert hosts("fail:1 or fail:2") == ["WS02", "WS04"]
+        assert hosts("not fail:18") == ["WS03", "WS04"]
+        assert hosts("type=laptop and not (fail:18.4.6 or host=ws05)") == []
+        assert hosts("type=LAPTOP and pass:18.4") == ["WS05"]
+        assert hosts("site=hq and pass:1.1.1") == ["WS01", "WS03"]
+        # 1.1.2 is in the catalog but was not audited: a valid, empty prefix
+        assert hosts("fail:1.1.2") == []
+
+        for bad in ["", "fail:18 and", "(fail:18", "fail:18 )", "lost:18", "fail:99", "18.4.6"]:
+            try:
+                index.query(bad)
+                raise AssertionError(f"accepted {bad!r}")
+            except QuerySyntaxError:
+                pass
+
+
+def test_control_rates_and_persistence():
+    """Rates count only selected hosts evaluated for the control; save/load round trips"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        index = build_index(folder)
+        laptops = index.query("type=laptop")
+        assert popcount(laptops) == 3
+        rates = {r.cis_id: (r.matching, r.evaluated, r.rate) for r in index.control_rates(within=laptops)}
+        assert rates == {"2.3.7.4": (1, 3, 33.33), "18.4.6": (2, 3, 66.67), "18.9.3.1": (1, 3, 33.33)}
+        assert [r.cis_id for r in index.control_rates(within=laptops, min_rate=50)] == ["18.4.6"]
+
+        index.save(folder / "fleet.cbm")
+        loaded = BitmapIndex.load(folder / "fleet.cbm")
+        assert loaded.hosts == index.hosts and loaded.statuses == index.statuses
+        assert loaded.attributes == index.attributes and loaded.profiles == index.profiles
+        assert loaded.query("type=laptop and fail:18@L1") == index.query("type=laptop and fail:18@L1")
+
+        (folder / "fleet.cbm").write_bytes(b"CISBMAP\x00" + b"\x01\x00" * 8)
+        try:
+            BitmapIndex.load(folder / "fleet.cbm")
+            raise AssertionError("loaded a corrupt index")
+        except ValueError:
+            pass
+
+
+def test_latest_result_wins():
+    """A host audited twice is indexed with its most recent result"""
+    index = BitmapIndex.from_rows([
+        ("18.4.6", "Non-Compliant", "WS01", "2026-10-01 10:00:00", "L1"),
+        ("18.4.6", "Compliant", "ws01", "2026-10-02 10:00:00", "L1"),
+        ("18.4.6", "Non-Compliant", "WS02", "2026-10-02 10:00:00", "L1"),
+        ("18.4.6", "Compliant", "WS02", "2026-09-30 10:00:00", "L1"),
+    ])
+    assert index.host_names(index.query("fail:18.4.6")) == ["WS02"]
+    assert index.host_names(index.query("pass:18.4.6")) == ["WS01"]
+
+
+def main():
+    """Main test function"""
+    tests = [test_queries, test_control_rates_and_persistence, test_latest_result_wins]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-host drift detector (drift_detector.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_results import CISResult, results_to_csv  # noqa: E402
+from drift_detector import (  # noqa: E402
+    DriftDetector, Fingerprint, FingerprintFormatError, FingerprintStore,
+)
+
+
+def write_run(path: Path, host: str, timestamp: str, results: dict):
+    """results: {cis_id: (status, current value)}"""
+    rows = [CISResult(cis_id, f"Control {cis_id}", value, "1", status, "Registry",
+                      audit_timestamp=timestamp, computer_name=host, user_name="auditor")
+            for cis_id, (status, value) in results.items()]
+    path.write_text(results_to_csv(rows), encoding='utf-8')
+    return path
+
+
+NIGHT_1 = {"1.1.1": ("Compliant", "24"), "2.3.7.4": ("Non-Compliant", "0"),
+           "18.4.6": ("Compliant", "1"), "18.9.3.1": ("Compliant", "1")}
+NIGHT_2 = {"1.1.1": ("Non-Compliant", "10"), "2.3.7.4": ("Compliant", "1"),
+           "18.4.6": ("Compliant", "2"), "18.9.3.1": ("Error", ""), "5.13": ("Non-Compliant", "2")}
+
+
+def test_transitions():
+    """Only changes since the last run come out; replays and partial runs are quiet"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        state = folder / "state"
+        first = [write_run(folder / "ws01-1.csv", "WS01", "2026-10-01 02:00:00", NIGHT_1),
+                 write_run(folder / "ws02-1.csv", "WS02", "2026-10-01 02:00:00", NIGHT_1)]
+        detector = DriftDetector(state)
+        assert list(detector.scan(first)) == []
+        assert detector.stats.baselined == 2 and FingerprintStore(state).hosts() == ["ws01", "ws02"]
+
+        second = write_run(folder / "ws01-2.csv", "WS01", "2026-10-02 02:00:00", NIGHT_2)
+        detector = DriftDetector(state)
+        changes = {t.cis_id: (t.kind, t.previous_status, t.status) for t in detector.scan([second])}
+        assert changes == {
+            "1.1.1": ("newly-failing", "Compliant", "Non-Compliant"),
+            "2.3.7.4": ("fixed", "Non-Compliant", "Compliant"),
+            "18.4.6": ("value-changed", "Compliant", "Compliant"),
+            "18.9.3.1": ("status-changed", "Compliant", "Error"),
+            "5.13": ("newly-failing", "", "Non-Compliant"),
+        }
+        assert detector.stats.transitions["newly-failing"] == 2
+
+        # Replaying the drop reports nothing; a one-control re-run keeps the others
+        detector = DriftDetector(state)
+        assert list(detector.scan(first + [second])) == []
+        assert detector.stats.stale == 3
+        partial = write_run(folder / "ws01-3.csv", "WS01", "2026-10-03 02:00:00",
+                            {"1.1.1": ("Compliant", "24")})
+        dry = DriftDetector(state, update=False)
+        assert [t.kind for t in dry.scan([partial])] == ["fixed"]
+        assert [t.kind for t in DriftDetector(state).scan([partial])] == ["fixed"]
+        fingerprint = FingerprintStore(state).load("WS01")
+        assert len(fingerprint.controls) == 5 and fingerprint.timestamp == "2026-10-03 02:00:00"
+
+
+def test_fingerprint_format():
+    """Fingerprints round-trip; damaged files are reported, not misread"""
+    with tempfile.TemporaryDirectory() as tmp:
+        fingerprint = Fingerprint("WS01", "2026-10-01 02:00:00",
+                                  {"1.1.1": (1, 2 ** 64 - 1), "18.9.3.1": (0, 7)})
+        data = fingerprint.to_bytes()
+        assert Fingerprint.from_bytes("WS01", data) == fingerprint
+        for damaged in (data[:-3], data + b"\x00", b"PK\x03\x04" + data[4:]):
+            try:
+                Fingerprint.from_bytes("WS01", damaged)
+                raise AssertionError("read a damaged fingerprint")
+            except FingerprintFormatError:
+                pass
+
+        folder = Path(tmp)
+        (folder / "state").mkdir()
+        (folder / "state" / "ws01.fp").write_bytes(data[:-3])
+        run = write_run(folder / "ws01.csv", "WS01", "2026-10-02 02:00:00", NIGHT_1)
+        detector = DriftDetector(folder / "state")
+        assert list(detector.scan([run, folder / "missing.csv"])) == []
+        assert len(detector.errors) == 2 and detector.stats.failed == 1
+
+
+def main():
+    """Main test function"""
+    tests = [test_transitions, test_fingerprint_format]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the process-pool fleet runner (fleet_runner.py)
+"""
+
+import csv
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_catalog import load_catalog  # noqa: E402
+from fleet_fixtures import write_inputs  # noqa: E402
+from fleet_runner import FleetRunner, discover_hosts  # noqa: E402
+from host_bundle import ZLIB, BundleReader, pack_bundle  # noqa: E402
+
+SECTIONS = ["1", "5", "17"]
+
+
+def make_fleet(folder: Path) -> Path:
+    """Three bundles, one folder of loose exports and one corrupt bundle"""
+    fleet = folder / "fleet"
+    fleet.mkdir()
+    inputs = write_inputs(folder)
+    for host in ("WS01", "WS02", "WS03"):
+        pack_bundle(fleet / f"{host}.cisb", host, inputs)
+    loose = fleet / "WS04"
+    loose.mkdir()
+    for files in inputs.values():
+        (loose / files[0].name).write_bytes(files[0].read_bytes())
+    (fleet / "WS05.cisb").write_bytes(b"not a bundle" * 4)
+    (fleet / "notes.txt").write_text("ignored")
+    return fleet
+
+
+def read_rows(path: Path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_run_and_resume():
+    """Results stream to one CSV; a resumed run only retries what is missing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        hosts = discover_hosts([make_fleet(folder)])
+        assert [h.name for h in hosts] == ["WS01.cisb", "WS02.cisb", "WS03.cisb", "WS04", "WS05.cisb"]
+        per_host = len(load_catalog().select(sections=SECTIONS))
+        output = folder / "results.csv"
+        runner = FleetRunner(output, workers=2, sections=SECTIONS)
+        stats = runner.run(hosts)
+        assert (stats.hosts, stats.failed) == (5, 1)
+        assert runner.errors[0][0].endswith("WS05.cisb")
+        rows = read_rows(output)
+        assert len(rows) == stats.results == 4 * per_host
+        assert {row["ComputerName"] for row in rows} == {"WS01", "WS02", "WS03", "WS04"}
+        assert stats.hosts_per_second > 0
+
+        # Interrupted mid-write: the partial rows are dropped on resume
+        with open(output, 'a', encoding='utf-8', newline='') as f:
+            f.write('"1.1.1","Enforce password history","24"')
+        resumed = FleetRunner(output, workers=2, sections=SECTIONS, resume=True)
+        stats = resumed.run(hosts)
+        assert (stats.hosts, stats.skipped, stats.failed) == (1, 4, 1)
+        assert len(read_rows(output)) == 4 * per_host
+        journal = (folder / "results.csv.journal").read_text().splitlines()
+        assert len(journal) == 4 and int(journal[-1].split('\t')[0]) == output.stat().st_size
+
+
+def test_corrupt_member():
+    """A bundle whose compressed member is damaged fails that host only"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        hosts = discover_hosts([make_fleet(folder)])[:2]
+        with BundleReader(hosts[1]) as reader:
+            member = next(m for m in reader.members.values()
+                          if m.compression == ZLIB and m.kind != "manifest")
+        data = bytearray(hosts[1].read_bytes())
+        middle = member.offset + member.stored_length // 2
+        data[middle:middle + 4] = bytes(b ^ 0xFF for b in data[middle:middle + 4])
+        hosts[1].write_bytes(bytes(data))
+
+        runner = FleetRunner(folder / "results.csv", workers=2, sections=SECTIONS)
+        stats = runner.run(hosts)
+        assert (stats.hosts, stats.failed) == (2, 1)
+        assert runner.errors[0][0].endswith("WS02.cisb")
+        assert "BundleFormatError" in runner.errors[0][1], runner.errors[0][1]
+        assert {row["ComputerName"] for row in read_rows(folder / "results.csv")} == {"WS01"}
+
+
+def test_unparseable_export():
+    """A parser error other than OSError/ValueError (csv.Error) fails that host only"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        fleet = make_fleet(folder)
+        audit = next((fleet / "WS04").glob("*audit*.csv"))
+        audit.write_text(audit.read_text(encoding='utf-8') + '"' + "x" * 200000 + '"\n',
+                         encoding='utf-8')
+        runner = FleetRunner(folder / "results.csv", workers=1, sections=SECTIONS)
+        stats = runner.run(discover_hosts([fleet]))
+        assert (stats.hosts, stats.failed) == (5, 2)
+        assert any(path.endswith("WS04") and error.startswith("Error:")
+                   for path, error in runner.errors), runner.errors
+        computers = {row["ComputerName"] for row in read_rows(folder / "results.csv")}
+        assert computers == {"WS01", "WS02", "WS03"}
+
+
+def test_json_lines():
+    """JSON Lines output, one result object per line"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        hosts = discover_hosts([make_fleet(folder)])[:2]
+        output = folder / "results.jsonl"
+        stats = FleetRunner(output, "jsonl", workers=1, sections=["17"]).run(hosts)
+        lines = output.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == stats.results
+        assert json.loads(lines[0])["Source"] == "auditpol.exe"
+
+
+def main():
+    """Main test function"""
+    tests = [test_run_and_resume, test_corrupt_member, test_unparseable_export, test_json_lines]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming fleet sketches (fleet_sketches.py)
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fleet_fixtures import write_fleet  # noqa: E402
+from fleet_sketches import (  # noqa: E402
+    CANDIDATES, CountMinSketch, DDSketch, HyperLogLog, SketchFormatError, SketchSet, SketchStore,
+)
+from ingest_service import IngestService  # noqa: E402
+from result_store import COLUMNS, read_results_csv  # noqa: E402
+
+
+def synthetic_rows(hosts: int, seed: int = 7) -> list:
+    """Results for a fleet where control k fails on roughly 1/k of the hosts"""
+    rng = random.Random(seed)
+    controls = [f"18.9.{k}.1" for k in range(1, 41)]
+    rows = []
+    for h in range(hosts):
+        for k, cis_id in enumerate(controls, 1):
+            row = [""] * len(COLUMNS)
+            row[COLUMNS.index("CIS_ID")] = cis_id
+            row[COLUMNS.index("ComputerName")] = f"HOST{h:05d}"
+            row[COLUMNS.index("AuditTimestamp")] = f"2026-10-0{1 + h % 2} 02:00:00"
+            row[COLUMNS.index("ComplianceStatus")] = \
+                "Non-Compliant" if rng.random() < 1 / k else "Compliant"
+            row[COLUMNS.index("CurrentValue")] = str(rng.randint(1, 1000)) if k == 1 else "Enabled"
+            rows.append(row)
+    return rows
+
+
+def test_error_bounds():
+    """Each sketch stays within its stated error bound"""
+    cms = CountMinSketch.for_error(0.01, 0.01)
+    truth = {f"k{i}": 1000 // i for i in range(1, 300)}
+    for key, count in truth.items():
+        cms.add(key, count)
+    # Never under; over by more than the bound for at most ~delta of the keys
+    assert all(cms.estimate(key) >= count for key, count in truth.items())
+    over = [key for key, count in truth.items() if cms.estimate(key) > count + cms.error_bound]
+    assert len(over) <= 3 * cms.delta * len(truth), over
+
+    hll = HyperLogLog(11)
+    for i in range(20000):
+        hll.add(f"host{i}")
+    assert abs(hll.count() - 20000) <= 3 * hll.standard_error * 20000
+    small = HyperLogLog(11)
+    for i in range(50):
+        small.add(f"host{i}")
+    assert abs(small.count() - 50) <= 2
+
+    values = [random.Random(1).randint(1, 999) for _ in range(5000)] + [0] * 100 + [-5] * 50
+    sketch = DDSketch(0.01)
+    for value in values:
+        sketch.add(value)
+    ordered = sorted(values)
+    for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * abs(exact) + 1e-9, (q, exact)
+
+
+def test_shards_merge_exactly():
+    """Two shards merged give the same sketches as one pass over every row"""
+    rows = synthetic_rows(600)
+    whole, first, second = SketchSet(), SketchSet(), SketchSet()
+    whole.add_rows(rows)
+    first.add_rows(rows[::2])
+    second.add_rows(rows[1::2])
+    first.merge(second)
+    assert first.failing.counts == whole.failing.counts and first.results == whole.results
+    assert first.hosts.registers == whole.hosts.registers
+    assert {k: v.registers for k, v in first.failing_hosts.items()} == \
+        {k: v.registers for k, v in whole.failing_hosts.items()}
+    assert first.values["18.9.1.1"].positive == whole.values["18.9.1.1"].positive
+
+    top = whole.top_failing(3)
+    assert [e.key for e in top] == ["18.9.1.1", "18.9.2.1", "18.9.3.1"]
+    assert top[0].value == 600 and "w.p." in top[0].bound
+    failing = whole.failing_host_count("18.9.2.1")
+    assert abs(failing.value - 300) <= 3 * failing.error
+    assert whole.failing_host_count("1.1.1").value == 0
+    median = whole.quantiles("18.9.1.1", [0.5])[0]
+    assert 400 <= median.value <= 600 and whole.quantiles("18.9.2.1", [0.5]) == []
+
+
+def test_store_and_ingestion():
+    """Per-day sketch files persist, merge over ranges and fill during ingestion"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        store = SketchStore(folder / "sketches")
+        assert store.add_rows(synthetic_rows(100)) == ["2026-10-01", "2026-10-02"]
+        one_day = store.merged(date(2026, 10, 1), date(2026, 10, 1))
+        both = store.merged(date(2026, 9, 1), date(2026, 10, 31))
+        assert (one_day.results, both.results) == (2000, 4000)
+        assert abs(both.hosts.count() - 100) <= 2
+        assert SketchSet.from_bytes(one_day.to_bytes()).failing.counts == one_day.failing.counts
+
+        (folder / "sketches" / "2026-10-02.sketch").write_bytes(b"CISSKCH\x00\x01\x00\x00\x00junk")
+        try:
+            store.merged(date(2026, 10, 1), date(2026, 10, 2))
+            raise AssertionError("merged a corrupt sketch file")
+        except SketchFormatError:
+            pass
+
+        drop = folder / "drop"
+        drop.mkdir()
+        files = write_fleet(drop)
+        rows = [row for file in files for row in read_results_csv(file)]
+        service = IngestService(drop, folder / "store", concurrency=1, sketches=folder / "live")
+        asyncio.run(service.run(once=True))
+        live = SketchStore(folder / "live").merged(date(2026, 10, 1), date(2026, 10, 1))
+        assert live.results == len(rows) == 20
+        assert {e.key: e.value for e in live.top_failing()} == \
+            {"18.4.6": 2, "2.3.7.4": 1, "1.1.1": 1, "18.9.3.1": 1}
+
+        # Backfilling over the live sketches replaces the day rather than adding to it
+        for _ in range(2):
+            assert SketchStore(folder / "live").rebuild(rows) == ["2026-10-01"]
+        rebuilt = SketchStore(folder / "live").merged(date(2026, 10, 1), date(2026, 10, 1))
+        assert rebuilt.results == 20 and rebuilt.failing.counts == live.failing.counts
+
+        # Days sketched with different parameters refuse to merge
+        SketchStore(folder / "live", precision=8).rebuild(
+            [row[:COLUMNS.index("AuditTimestamp")] + ["2026-10-02 02:00:00"]
+             + row[COLUMNS.index("AuditTimestamp") + 1:] for row in rows])
+        try:
+            SketchStore(folder / "live").merged(date(2026, 10, 1), date(2026, 10, 2))
+            raise AssertionError("merged sketches of different precision")
+        except ValueError as e:
+            assert "2026-10-02.sketch" in str(e)
+
+
+
+def test_rebuild_holds_few_days():
+    """A rebuild that writes days out between chunks gives the same sketches"""
+    rows = synthetic_rows(50)           # hosts alternate between two days
+    with tempfile.TemporaryDirectory() as tmp:
+        whole = SketchStore(Path(tmp) / "whole")
+        evicting = SketchStore(Path(tmp) / "one", cache_days=1)
+        assert whole.rebuild(rows) == evicting.rebuild(rows, chunk_rows=40) == \
+            ["2026-10-01", "2026-10-02"]
+        for day in whole.days():
+            assert evicting.load(day).to_bytes() == whole.load(day).to_bytes()
+        assert evicting.rebuild(rows, chunk_rows=40) == whole.days()
+        assert evicting.load("2026-10-01").results == 1000
+
+        sketches = whole.merged(date(2026, 10, 1), date(2026, 10, 2))
+        assert len(sketches.top_failing(CANDIDATES)) == len(sketches.candidates) == 36
+        try:
+            sketches.top_failing(CANDIDATES + 1)
+            raise AssertionError("asked for more controls than are tracked")
+        except ValueError:
+            pass
+
+
+def main():
+    """Main test function"""
+    tests = [test_error_bounds, test_shards_merge_exactly, test_store_and_ingestion,
+             test_rebuild_holds_few_days]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test script for the Group Policy report evaluator (gpo_report.py)
+"""
+
+import io
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_catalog import load_catalog  # noqa: E402
+from gpo_report import (  # noqa: E402
+    GPOEvaluator, evaluate_policy, iter_gpos, load_gpos, merge_gpos,
+)
+
+# Trimmed Get-GPOReport -All -ReportType Xml output: two GPOs
+REPORT = '''<?xml version="1.0" encoding="utf-16"?>
+<report xmlns="http://www.microsoft.com/GroupPolicy/Settings">
+<GPO xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <Identifier>
+    <Identifier xmlns="http://www.microsoft.com/GroupPolicy/Types">{31B2F340-016D-11D2-945F-00C04FB984F9}</Identifier>
+    <Domain xmlns="http://www.microsoft.com/GroupPolicy/Types">contoso.com</Domain>
+  </Identifier>
+  <Name>Default Domain Policy</Name>
+  <Computer>
+    <Enabled>true</Enabled>
+    <ExtensionData>
+      <Extension xmlns:q1="http://www.microsoft.com/GroupPolicy/Settings/Security" xsi:type="q1:SecuritySettings">
+        <q1:Account><q1:Name>PasswordHistorySize</q1:Name><q1:SettingNumber>10</q1:SettingNumber><q1:Type>Password</q1:Type></q1:Account>
+        <q1:Account><q1:Name>MinimumPasswordLength</q1:Name><q1:SettingNumber>7</q1:SettingNumber><q1:Type>Password</q1:Type></q1:Account>
+        <q1:Account><q1:Name>PasswordComplexity</q1:Name><q1:SettingBoolean>true</q1:SettingBoolean><q1:Type>Password</q1:Type></q1:Account>
+      </Extension>
+      <Name>Security</Name>
+    </ExtensionData>
+  </Computer>
+  <User><Enabled>true</Enabled></User>
+</GPO>
+<GPO xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <Identifier>
+    <Identifier xmlns="http://www.microsoft.com/GroupPolicy/Types">{6AC1786C-016F-11D2-945F-00C04FB984F9}</Identifier>
+  </Identifier>
+  <Name>CIS L1</Name>
+  <Computer>
+    <Enabled>true</Enabled>
+    <ExtensionData>
+      <Extension xmlns:q1="http://www.microsoft.com/GroupPolicy/Settings/Security" xsi:type="q1:SecuritySettings">
+        <q1:Account><q1:Name>PasswordHistorySize</q1:Name><q1:SettingNumber>24</q1:SettingNumber><q1:Type>Password</q1:Type></q1:Account>
+        <q1:UserRightsAssignment>
+          <q1:Name>SeTrustedCredManAccessPrivilege</q1:Name>
+        </q1:UserRightsAssignment>
+        <q1:UserRightsAssignment>
+          <q1:Name>SeNetworkLogonRight</q1:Name>
+          <q1:Member><Name xmlns="http://www.microsoft.com/GroupPolicy/Types">BUILTIN\\Administrators</Name><SID xmlns="http://www.microsoft.com/GroupPolicy/Types">S-1-5-32-544</SID></q1:Member>
+          <q1:Member><Name xmlns="http://www.microsoft.com/GroupPolicy/Types">NT AUTHORITY\\Authenticated Users</Name><SID xmlns="http://www.microsoft.com/GroupPolicy/Types">S-1-5-11</SID></q1:Member>
+        </q1:UserRightsAssignment>
+        <q1:SecurityOptions>
+          <q1:KeyName>MACHINE\\System\\CurrentControlSet\\Control\\Lsa\\LimitBlankPasswordUse</q1:KeyName>
+          <q1:SettingNumber>1</q1:SettingNumber>
+          <q1:Display><q1:Name>Accounts: Limit local account use of blank passwords to console logon only</q1:Name></q1:Display>
+        </q1:SecurityOptions>
+        <q1:SecurityOptions><q1:SystemAccessPolicyName>EnableGuestAccount</q1:SystemAccessPolicyName><q1:SettingNumber>1</q1:SettingNumber></q1:SecurityOptions>
+        <q1:SystemServices><q1:Name>Spooler</q1:Name><q1:StartupMode>Disabled</q1:StartupMode></q1:SystemServices>
+      </Extension>
+      <Name>Security</Name>
+    </ExtensionData>
+    <ExtensionData>
+      <Extension xmlns:q2="http://www.microsoft.com/GroupPolicy/Settings/Auditing" xsi:type="q2:AuditSettings">
+        <q2:AuditSetting>
+          <q2:PolicyTarget>System</q2:PolicyTarget>
+          <q2:SubcategoryName>Audit Credential Validation</q2:SubcategoryName>
+          <q2:SubcategoryGuid>{0cce923f-69ae-11d9-bed3-505054503030}</q2:SubcategoryGuid>
+          <q2:SettingValue>3</q2:SettingValue>
+        </q2:AuditSetting>
+      </Extension>
+      <Name>Advanced Audit Configuration</Name>
+    </ExtensionData>
+    <ExtensionData>
+      <Extension xmlns:q3="http://www.microsoft.com/GroupPolicy/Settings/Registry" xsi:type="q3:RegistrySettings">
+        <q3:Policy>
+          <q3:Name>Mandate the minimum version of SMB</q3:Name>
+          <q3:State>Enabled</q3:State>
+          <q3:Explain>@@EXPLAIN@@</q3:Explain>
+          <q3:Category>Network/Lanman Server</q3:Category>
+          <q3:DropDownList><q3:Name>Minimum version</q3:Name><q3:State>Enabled</q3:State><q3:Value><q3:Name>3.1.1</q3:Name></q3:Value></q3:DropDownList>
+        </q3:Policy>
+        <q3:Policy>
+          <q3:Name>Mandate the minimum version of SMB</q3:Name>
+          <q3:State>Enabled</q3:State>
+          <q3:Category>Network/Lanman Workstation</q3:Category>
+          <q3:DropDownList><q3:Name>Minimum version</q3:Name><q3:State>Enabled</q3:State><q3:Value><q3:Name>3.0</q3:Name></q3:Value></q3:DropDownList>
+        </q3:Policy>
+        <q3:Policy>
+          <q3:Name>Allow Use of Camera</q3:Name>
+          <q3:State>Disabled</q3:State>
+          <q3:Category>Windows Components/Camera</q3:Category>
+        </q3:Policy>
+        <q3:RegistrySetting>
+          <q3:KeyPath>SYSTEM\\CurrentControlSet\\Services\\NetBT\\Parameters</q3:KeyPath>
+          <q3:Value><q3:Name>NodeType</q3:Name><q3:Number>2</q3:Number></q3:Value>
+        </q3:RegistrySetting>
+      </Extension>
+      <Name>Registry</Name>
+    </ExtensionData>
+  </Computer>
+  <User><Enabled>false</Enabled></User>
+</GPO>
+</report>
+'''
+
+
+def report_bytes(explain_size: int = 0) -> bytes:
+    text = REPORT.replace("@@EXPLAIN@@", "x" * explain_size)
+    return text.replace('\n', '\r\n').encode('utf-16')
+
+
+def evaluate(gpo_names):
+    gpos = {g.name: g for g in load_gpos(io.BytesIO(report_bytes()))}
+    evaluator = GPOEvaluator(merge_gpos([gpos[name] for name in gpo_names]), "contoso.com")
+    catalog = load_catalog()
+    return {cis_id: evaluator.evaluate(catalog.get(cis_id)) for cis_id in (
+        "1.1.1", "1.1.4", "1.1.5", "2.2.1", "2.2.2", "2.3.1.1", "2.3.1.2",
+        "5.13", "17.1.1", "18.4.1", "18.6.7.6", "18.6.8.6", "18.4.5")}
+
+
+def test_parse_report():
+    """A UTF-16 -All report: GPO identity, settings by kind, disabled sections"""
+    gpos = load_gpos(io.BytesIO(report_bytes()))
+    assert [g.name for g in gpos] == ["Default Domain Policy", "CIS L1"]
+    default, cis = gpos
+    assert default.guid == "{31B2F340-016D-11D2-945F-00C04FB984F9}" and default.domain == "contoso.com"
+    assert default.settings[("system_access", "passwordcomplexity")].value == 1
+    assert cis.enabled == {"Computer": True, "User": False}
+    kinds = sorted(kind for kind, _ in cis.settings)
+    assert kinds == ["audit", "policy", "policy", "policy", "privilege", "privilege",
+                     "registry", "registry", "service", "system_access", "system_access"]
+    assert cis.settings[("privilege", "senetworklogonright")].value == ["*S-1-5-32-544", "*S-1-5-11"]
+    assert cis.settings[("privilege", "setrustedcredmanaccessprivilege")].value == []
+    # Only the named GPO's settings are kept
+    wanted = load_gpos(io.BytesIO(report_bytes()), ["cis l1"])
+    assert not wanted[0].settings and wanted[1].settings
+
+
+def test_merged_precedence():
+    """The higher-precedence GPO wins each setting it configures"""
+    results = evaluate(["CIS L1", "Default Domain Policy"])
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert results["1.1.1"].current_value == "24" and status["1.1.1"] == "Compliant"
+    assert results["1.1.1"].details.startswith("GPO: CIS L1;")
+    assert status["1.1.4"] == "Non-Compliant"           # 7 from the default policy
+    assert status["1.1.5"] == "Compliant"
+    assert results["1.1.5"].details.startswith("GPO: Default Domain Policy;")
+    assert results["1.1.5"].source == "Group Policy"
+    assert results["1.1.5"].computer_name == "contoso.com"
+    # Lower precedence first: the default policy's history size wins
+    assert evaluate(["Default Domain Policy", "CIS L1"])["1.1.1"].compliance_status == "Non-Compliant"
+
+
+def test_setting_kinds():
+    """User rights, security options, services, audit and registry settings"""
+    results = evaluate(["CIS L1"])
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert status["2.2.1"] == "Compliant"              # No One
+    assert status["2.2.2"] == "Non-Compliant"
+    assert results["2.2.2"].current_value == "Administrators, Authenticated Users"
+    assert status["2.3.1.1"] == "Non-Compliant"        # guest account enabled
+    assert status["2.3.1.2"] == "Compliant"            # LimitBlankPasswordUse
+    assert status["5.13"] == "Compliant"
+    assert results["5.13"].current_value == "Disabled"
+    assert status["17.1.1"] == "Compliant"
+    assert status["18.4.5"] == "Compliant"             # NodeType via extra registry settings
+    assert status["1.1.5"] == "Non-Compliant"          # not configured: not enforced
+    assert results["1.1.5"].current_value == "Not Configured"
+
+
+def test_administrative_templates():
+    """Policies matched by name, disambiguated by category, options checked"""
+    results = evaluate(["CIS L1"])
+    assert results["18.6.7.6"].compliance_status == "Compliant"
+    assert results["18.6.7.6"].current_value == "Enabled: 3.1.1"
+    assert results["18.6.8.6"].compliance_status == "Non-Compliant"
+    assert results["18.4.1"].compliance_status == "Non-Compliant"
+    assert evaluate_policy("Disabled", "Disabled", []) is True
+    assert evaluate_policy("Enabled", "Disabled", []) is False
+    assert evaluate_policy("Enabled: Disable driver (recommended)", "Enabled",
+                           [("Configure", "Disable driver (recommended)")]) is True
+    assert evaluate_policy("Enabled: 5 or fewer seconds", "Enabled", [("Seconds", "5")]) is True
+    assert evaluate_policy("Enabled: 5 or fewer seconds", "Enabled", []) is None
+
+
+def test_streaming_memory():
+    """Peak memory stays far below the report size: settings are dropped once read"""
+    policy = REPORT.split("<q3:Policy>")[1].split("</q3:Policy>")[0]
+    text = REPORT.replace(f"<q3:Policy>{policy}</q3:Policy>", f"<q3:Policy>{policy}</q3:Policy>" * 200)
+    data = text.replace("@@EXPLAIN@@", "x" * 50_000).encode('utf-16')
+    tracemalloc.start()
+    try:
+        gpos = list(iter_gpos(io.BytesIO(data)))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert len(data) > 20_000_000 and peak < 2_000_000, peak
+    assert len(gpos[1].settings) == 11
+
+
+def main():
+    """Main test function"""
+    tests = [test_parse_report, test_merged_precedence, test_setting_kinds,
+             test_administrative_templates, test_streaming_memory]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
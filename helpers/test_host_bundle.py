@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for per-host snapshot bundles (host_bundle.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_catalog import load_catalog  # noqa: E402
+from fleet_fixtures import write_inputs  # noqa: E402
+from host_bundle import (  # noqa: E402
+    HEADER, BundleFormatError, BundleReader, BundleWriter, evaluate_bundle,
+    evaluate_bundles, pack_bundle, validate_bundle,
+)
+
+
+def test_round_trip():
+    """Members come back byte-for-byte and load into the evaluators' parsers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        inputs = write_inputs(folder)
+        bundle = folder / "WS01.cisb"
+        pack_bundle(bundle, "WS01", inputs)
+        assert not (folder / "WS01.cisb.tmp").exists()
+        with BundleReader(bundle) as reader:
+            assert reader.names() == ["secedit/secpol.inf", "registry/hklm.reg",
+                                      "auditpol/audit.csv", "services/services.csv", "manifest"]
+            assert reader.read("registry/hklm.reg") == inputs["registry"][0].read_bytes()
+            assert reader.members["registry/hklm.reg"].compression == 1
+            assert all(m.offset % 8 == 0 for m in reader.members.values())
+            assert reader.host == "WS01" and reader.manifest["members"][0] == "secedit/secpol.inf"
+            assert reader.secedit_export().system_access("PasswordHistorySize") == "24"
+            assert reader.registry_snapshot().value(
+                "HKLM\\SYSTEM\\CurrentControlSet\\Services\\NetBT\\Parameters", "NodeType") == 2
+            assert len(reader.service_inventory()) == 1
+        assert validate_bundle(bundle) == []
+
+
+def test_evaluation():
+    """Each recommendation is evaluated from the member that holds its input"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        bundle = folder / "WS01.cisb"
+        inputs = write_inputs(folder)
+        pack_bundle(bundle, "WS01", inputs)
+        partial = folder / "WS01-audit.cisb"
+        pack_bundle(partial, "WS01", {"auditpol": inputs["auditpol"]})
+        entries = load_catalog().select(cis_ids=["1.1.1", "1.1.4", "2.2.1", "2.3.1.2", "5.13",
+                                                 "17.1.1", "18.4.5", "18.9.3.1"])
+        with BundleReader(bundle) as reader:
+            results = {r.cis_id: r for r in evaluate_bundle(reader, entries)}
+        with BundleReader(partial) as reader:
+            assert [r.cis_id for r in evaluate_bundle(reader, entries)] == ["17.1.1"]
+        with BundleReader(bundle) as reader, BundleReader(partial) as audit_only:
+            together = evaluate_bundles([reader, audit_only], entries)
+        assert [r.to_dict() for r in together[0]] == [r.to_dict() for r in results.values()]
+        assert [r.cis_id for r in together[1]] == ["17.1.1"]
+    assert len(results) == len(entries)
+    assert results["18.9.3.1"].compliance_status == "Non-Compliant"     # not in the export
+    assert results["1.1.1"].source == "Local Policy" and results["1.1.1"].is_compliant
+    assert results["1.1.4"].compliance_status == "Non-Compliant"
+    assert results["2.3.1.2"].source == "Local Policy"
+    assert results["5.13"].source == "Service Control Manager" and results["5.13"].is_compliant
+    assert results["17.1.1"].is_compliant and results["18.4.5"].is_compliant
+    assert results["18.4.5"].computer_name == "WS01"
+
+
+def test_validation():
+    """Corrupt data, truncation and foreign files are reported, not raised"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        bundle = folder / "WS01.cisb"
+        pack_bundle(bundle, "WS01", write_inputs(folder), compress=False)
+        data = bytearray(bundle.read_bytes())
+        with BundleReader(bundle) as reader:
+            member = reader.members["services/services.csv"]
+        data[member.offset + 2] ^= 0xFF
+        corrupt = folder / "corrupt.cisb"
+        corrupt.write_bytes(data)
+        problems = validate_bundle(corrupt)
+        assert len(problems) == 1 and "services/services.csv" in problems[0]
+
+        truncated = folder / "truncated.cisb"
+        truncated.write_bytes(bundle.read_bytes()[:-10])
+        assert "outside the file" in validate_bundle(truncated)[0]
+
+        foreign = folder / "foreign.cisb"
+        foreign.write_bytes(b"PK\x03\x04" + b"\x00" * HEADER.size)
+        assert validate_bundle(foreign) == ["Missing bundle signature"]
+        try:
+            BundleReader(foreign)
+            raise AssertionError("opened a foreign file")
+        except BundleFormatError:
+            pass
+
+        empty = folder / "empty.cisb"
+        with BundleWriter(empty, "WS02") as writer:
+            writer.add("services", b'"Name","StartType"\r\n')
+        assert validate_bundle(empty) == ["services: no settings found"]
+
+
+def main():
+    """Main test function"""
+    tests = [test_round_trip, test_evaluation, test_validation]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for the drop-folder ingestion service (ingest_service.py)
+"""
+
+import asyncio
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_results import REMEDIATION_FIELDS  # noqa: E402
+from fleet_fixtures import write_fleet  # noqa: E402
+from ingest_service import JOURNAL, IngestService  # noqa: E402
+from result_store import REMEDIATION_COLUMNS, ResultStore  # noqa: E402
+
+
+def write_remediation(path: Path):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+    writer.writerow(REMEDIATION_FIELDS)
+    writer.writerow(["1.1.1", "Enforce password history", "0", "24", "Remediated", "Updated",
+                     "True", "False", "Local Policy", "", "2026-10-01 11:00:00", "WS01", "admin"])
+    path.write_text(buffer.getvalue(), encoding='utf-8')
+
+
+def test_once_with_duplicates_and_failures():
+    """Each distinct export is committed once; broken files move to failed/"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drop, store = Path(tmp) / "drop", Path(tmp) / "store"
+        drop.mkdir()
+        files = write_fleet(drop)
+        shutil.copy(files[0], drop / "WS01-resent.csv")
+        (drop / "broken.csv").write_text("not,a,result\n1,2,3\n")
+        (drop / "~WS09.csv").write_text("still copying")
+        write_remediation(drop / "WS01-remediation.csv")
+
+        service = IngestService(drop, store, concurrency=2, batch_files=2)
+        metrics = asyncio.run(service.run(once=True))
+        assert (metrics.committed, metrics.duplicates, metrics.failed) == (6, 1, 1)
+        assert metrics.rows == 21 and len(metrics.lags) == 6
+        assert service.errors[0][0].endswith("broken.csv")
+        with ResultStore(store) as audit:
+            assert audit.rows == 20
+        with ResultStore(store / "remediation") as remediation:
+            rows = list(remediation.iter_rows(REMEDIATION_COLUMNS))
+            assert rows[0][4] == "Remediated" and rows[0][11] == "WS01"
+        assert sorted(p.name for p in (drop / "failed").iterdir()) == ["broken.csv", "broken.csv.error.txt"]
+        assert len(list((drop / "processed").iterdir())) == 7
+        assert [p.name for p in drop.glob("*.csv")] == ["~WS09.csv"]
+
+        # A restarted service still knows what it has committed
+        shutil.copy(drop / "processed" / "WS02.csv", drop / "WS02.csv")
+        again = IngestService(drop, store, concurrency=1)
+        metrics = asyncio.run(again.run(once=True))
+        assert (metrics.committed, metrics.duplicates) == (0, 1)
+        assert "cis_ingest_files_duplicate_total 1\n" in metrics.prometheus()
+
+
+def test_recovery_ignores_uncommitted_batches():
+    """A journaled batch whose segment never appeared is ingested again"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drop, store = Path(tmp) / "drop", Path(tmp) / "store"
+        drop.mkdir()
+        write_fleet(drop)
+        service = IngestService(drop, store, concurrency=1, done="keep")
+        asyncio.run(service.run(once=True))
+        segment = next(store.glob("*.seg"))
+        segment.rename(store / "000001.seg.tmp")     # as if the commit never finished
+        (store / "000099.seg.tmp").write_bytes(b"")  # another writer's, not in the journal
+
+        restarted = IngestService(drop, store, concurrency=1, done="keep")
+        assert restarted.hashes == set() and not (store / "000001.seg.tmp").exists()
+        assert (store / "000099.seg.tmp").exists()
+        metrics = asyncio.run(restarted.run(once=True))
+        assert metrics.committed == 5
+        assert sorted(p.name for p in store.glob("*.seg")) == ["000002.seg"]
+        assert len((store / JOURNAL).read_text().splitlines()) == 10
+
+
+def test_broken_pool_is_replaced():
+    """A parser process that dies breaks the pool; a new one parses the file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drop, store = Path(tmp) / "drop", Path(tmp) / "store"
+        drop.mkdir()
+        files = write_fleet(drop)
+        service = IngestService(drop, store, concurrency=1)
+        broken = ProcessPoolExecutor(1)
+        try:
+            broken.submit(os._exit, 1).result()
+        except BrokenProcessPool:
+            pass
+        service._pool = broken
+        try:
+            parsed = asyncio.run(service._parse_file(str(files[0])))
+            assert service._pool is not broken
+            assert not parsed.error and len(parsed.rows) == 4
+        finally:
+            service._pool.shutdown()
+
+
+def test_commit_failure_stops_service():
+    """A commit that fails (disk full) stops the service instead of hanging the parsers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drop, store = Path(tmp) / "drop", Path(tmp) / "store"
+        drop.mkdir()
+        files = write_fleet(drop)
+        service = IngestService(drop, store, concurrency=1, queue_size=1, batch_files=1,
+                                watch="poll", poll_interval=0.05)
+
+        def full(batch):
+            raise OSError(28, "No space left on device")
+
+        service._write_batch = full
+        metrics = asyncio.run(asyncio.wait_for(service.run(), 10))
+        assert service.failure == "OSError: [Errno 28] No space left on device"
+        assert metrics.committed == 0
+        assert all(file.exists() for file in files)
+        assert any("commit failed" in error for _, error in service.errors)
+
+
+def test_watch_modes():
+    """Files arriving while the service runs are committed, by polling or inotify"""
+    for mode in ("poll", "inotify" if sys.platform.startswith("linux") else "poll"):
+        with tempfile.TemporaryDirectory() as tmp:
+            drop, store = Path(tmp) / "drop", Path(tmp) / "store"
+            drop.mkdir()
+            staging = Path(tmp) / "staging"
+            staging.mkdir()
+            files = write_fleet(staging)
+            service = IngestService(drop, store, concurrency=2, batch_seconds=0.05,
+                                    watch=mode, poll_interval=0.05)
+
+            async def scenario():
+                task = asyncio.ensure_future(service.run())
+                await asyncio.sleep(0.1)
+                for file in files:
+                    file.replace(drop / file.name)
+                deadline = time.monotonic() + 10
+                while service.metrics.committed < len(files) and time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                service.stop()
+                return await task
+
+            metrics = asyncio.run(scenario())
+            assert metrics.committed == 5, f"{mode}: {metrics.describe()}"
+            assert metrics.snapshot()["lag_max_seconds"] < 10
+
+
+def main():
+    """Main test function"""
+    tests = [test_once_with_duplicates_and_failures, test_recovery_ignores_uncommitted_batches,
+             test_broken_pool_is_replaced, test_commit_failure_stops_service, test_watch_modes]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
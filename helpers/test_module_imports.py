@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the module import slimming analyzer (module_imports.py)
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import module_imports  # noqa: E402
+from module_imports import ModuleGraph, analyze_script, analyze_tree, rewrite_imports  # noqa: E402
+
+SCRIPT_PATH = "windows/deferred/security/remediations/section_5/5.13-remediate-print-spooler.ps1"
+
+BEFORE = r'''[CmdletBinding()]
+param()
+
+# Import the required modules using ModuleIndex
+$modulePath = Join-Path $PSScriptRoot "..\..\..\..\..\modules\ModuleIndex.psm1"
+Import-Module $modulePath -Force -WarningAction SilentlyContinue
+
+# Check admin rights and handle elevation
+if (-not (Test-AdminRights)) {
+    Invoke-Elevation
+}
+Invoke-CISRemediation -CIS_ID "5.13" -RemediationType "Custom"
+'''
+
+AFTER = r'''[CmdletBinding()]
+param()
+
+# Import the modules this script calls
+Import-Module "$PSScriptRoot\..\..\..\..\..\modules\WindowsUtils.psm1" -Force -WarningAction SilentlyContinue
+Import-Module "$PSScriptRoot\..\..\..\..\..\modules\CISRemediation.psm1" -Force -WarningAction SilentlyContinue
+
+# Check admin rights and handle elevation
+if (-not (Test-AdminRights)) {
+    Invoke-Elevation
+}
+Invoke-CISRemediation -CIS_ID "5.13" -RemediationType "Custom"
+'''
+
+
+def test_required_modules():
+    """Called functions map to the modules that define them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "5.13-remediate-x.ps1"
+        script.write_text(BEFORE)
+        result = analyze_script(ModuleGraph(), script)
+    assert result.imported == ["ModuleIndex"]
+    assert result.required == ["WindowsUtils", "CISRemediation"]
+    assert result.called["CISRemediation"] == ["invoke-cisremediation"]
+    assert result.can_slim and result.missing == []
+
+
+def test_rewrite_imports():
+    """The import block and the comment naming ModuleIndex are both rewritten"""
+    script = module_imports.REPO_ROOT / SCRIPT_PATH
+    assert rewrite_imports(BEFORE, script, ["WindowsUtils", "CISRemediation"]) == AFTER
+
+    # A comment further up, or in a here-string, is left alone
+    spaced = BEFORE.replace("ModuleIndex\n$modulePath", "ModuleIndex\n\n$modulePath")
+    assert "# Import the required modules using ModuleIndex" in \
+        rewrite_imports(spaced, script, ["WindowsUtils"])
+    quoted = "$help = @'\nImport-Module $modulePath\n'@\n"
+    assert rewrite_imports(quoted, script, ["WindowsUtils"]) == quoted
+
+
+def test_apply():
+    """--apply rewrites a script in place so its imports resolve"""
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / "5.13-remediate-print-spooler.ps1"
+        shutil.copy(module_imports.REPO_ROOT / SCRIPT_PATH, copy)
+        report = analyze_tree([copy], apply=True)
+        assert report["stats"]["rewritten"] == 1
+        content = copy.read_text(encoding='utf-8')
+    assert "ModuleIndex" not in content
+    assert "# Import the modules this script calls\n" in content
+    prefix = module_imports.modules_relative_path(copy)
+    assert f'Import-Module "$PSScriptRoot\\{prefix}\\CISRemediation.psm1"' in content
+
+
+def main():
+    """Main test function"""
+    tests = [test_required_modules, test_rewrite_imports, test_apply]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
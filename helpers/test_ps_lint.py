@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the PowerShell lint engine (ps_lint.py)
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import ps_lint  # noqa: E402
+from ps_lint import lint_source, lint_tree  # noqa: E402
+
+# Where a section 1 audit script lives; modules\ is five levels up
+AUDIT_PATH = "windows/deferred/security/audits/section_1/1.1.1-audit-password-history.ps1"
+
+GOOD = r'''# CIS Benchmark: 1.1.1 (L1) Ensure 'Enforce password history' is set to '24 or more password(s)'
+[CmdletBinding()]
+param()
+
+$modulePath = Join-Path $PSScriptRoot "..\..\..\..\..\modules\ModuleIndex.psm1"
+Import-Module $modulePath -Force
+Import-Module "$PSScriptRoot\..\..\..\..\..\modules\CISFramework.psm1" -Force
+
+if (-not (Test-AdminRights)) { Invoke-Elevation }
+
+$CIS_ID = "1.1.1"
+try {
+    Invoke-CISAudit -CIS_ID $CIS_ID -AuditType "Custom"
+} catch {
+    Write-Error $_
+}
+'''
+
+BAD = r'''# CIS Benchmark: 1.1.2 (L1) Ensure 'Maximum password age' is set to '365 or fewer days'
+# [CmdletBinding()]  Test-AdminRights  catch { }
+Import-Module "$..\..\..\modules\CISFramework.psm1" -Force
+$modulePath = Join-Path $PSScriptRoot "..\..\modules\ModuleIndex.psm1"
+Invoke-CISAudit -CIS_ID "1.1.2" -AuditType "Custom"
+'''
+
+
+def rules_of(findings) -> dict:
+    by_rule = {}
+    for finding in findings:
+        by_rule.setdefault(finding.rule_id, []).append(finding)
+    return by_rule
+
+
+def test_rules():
+    """A well-formed audit script passes; each defect trips its rule"""
+    assert lint_source(AUDIT_PATH, GOOD) == []
+
+    found = rules_of(lint_source(AUDIT_PATH, BAD))
+    assert sorted(found) == ["admin-check", "cis-header", "cis-id-match", "cmdlet-binding",
+                             "error-handling", "module-import-path"]
+    assert "1.1.2" in found["cis-header"][0].message
+    assert found["cis-id-match"][0].line == 5
+    messages = [f.message for f in found["module-import-path"]]
+    assert messages == ["Module path is not relative to $PSScriptRoot: $..\\..\\..\\modules\\CISFramework.psm1",
+                        "Module path does not exist: ..\\..\\modules\\ModuleIndex.psm1"]
+
+
+def test_non_cis_scripts():
+    """Scripts not named {cis_id}-{audit|remediate}-* only get the import rule"""
+    path = "windows/deferred/Run-Everything.ps1"
+    assert lint_source(path, "Write-Host 'hello'\n") == []
+    findings = lint_source(path, 'Import-Module ".\\modules\\CISFramework.psm1"\n')
+    assert [f.rule_id for f in findings] == ["module-import-path"]
+
+
+def test_cache_merges_subsets():
+    """Linting some files keeps the cached results of the others"""
+    original = ps_lint.CACHE_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        ps_lint.CACHE_PATH = Path(tmp) / "cache" / "ps_lint.json"
+        try:
+            scripts = Path(tmp) / "scripts"
+            scripts.mkdir()
+            for cis_id in ("1.1.1", "1.1.2"):
+                (scripts / f"{cis_id}-audit-x.ps1").write_text(GOOD.replace("1.1.1", cis_id))
+
+            # Outside the repo the two module imports don't resolve
+            report = lint_tree([scripts])
+            assert (report["stats"]["files_checked"], report["stats"]["findings"]) == (2, 4)
+            (scripts / "1.1.2-audit-x.ps1").write_text(GOOD.replace("1.1.1", "1.1.2") + "\n")
+            report = lint_tree([scripts / "1.1.2-audit-x.ps1"])
+            assert report["stats"]["files_checked"] == 1
+
+            # Another rule selection is cached alongside, not instead
+            lint_tree([scripts], rule_ids=["cis-header"])
+            report = lint_tree([scripts])
+            assert (report["stats"]["files_cached"], report["stats"]["files_checked"]) == (2, 0)
+            cache = json.loads(ps_lint.CACHE_PATH.read_text())
+            assert len(cache["rulesets"]) == 2
+
+            # Deleted scripts are dropped the next time the cache is written
+            (scripts / "1.1.1-audit-x.ps1").unlink()
+            (scripts / "1.1.2-audit-x.ps1").write_text(GOOD.replace("1.1.1", "1.1.2"))
+            lint_tree([scripts])
+            entries = ps_lint.load_cache(ps_lint.ruleset_fingerprint())
+            assert [Path(path).name for path in entries] == ["1.1.2-audit-x.ps1"]
+        finally:
+            ps_lint.CACHE_PATH = original
+
+
+def main():
+    """Main test function"""
+    tests = [test_rules, test_non_cis_scripts, test_cache_merges_subsets]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
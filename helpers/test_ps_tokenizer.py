@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared PowerShell tokenizer (ps_tokenizer.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ps_tokenizer import (  # noqa: E402
+    COMMAND, COMMENT, FUNCTION, HERESTRING, KEYWORD, TokenCache, parse_source,
+    tokenize,
+)
+
+SAMPLE = '''<#
+.SYNOPSIS
+    Import-Module "$PSScriptRoot\\..\\modules\\Commented.psm1"
+#>
+# Import-Module "$PSScriptRoot\\..\\modules\\AlsoCommented.psm1"
+Import-Module "$PSScriptRoot\\..\\modules\\CISFramework.psm1" -Force -WarningAction SilentlyContinue
+
+$CIS_ID = "17.5.1"
+$template = @"
+[System Access]
+Invoke-CISAudit -CIS_ID "9.9.9"
+"@
+
+function Test-Local {
+    param([Parameter(Mandatory = $true)][string]$Name)
+    $map = @{ Title = "x"; Value = 1 }
+    auditpol /get /subcategory:"{0cce9217-69ae-11d9-bed3-505054503030}"
+}
+
+try {
+    Invoke-CISAudit -CIS_ID $CIS_ID -AuditType "Registry" `
+        -RegistryPath "HKLM:\\SOFTWARE\\Test" -VerboseOutput:$VerboseOutput
+} catch {
+    Write-Error "Failed: $($_.Exception.Message)"
+}
+'''
+
+
+def test_comments_and_here_strings():
+    """Code inside comments and here-strings is not tokenized as commands"""
+    tokens = tokenize(SAMPLE)
+    kinds = [token.kind for token in tokens]
+    assert kinds.count(COMMENT) == 2
+    assert kinds.count(HERESTRING) == 1
+    commands = [token.text for token in tokens if token.kind == COMMAND]
+    assert commands.count("Import-Module") == 1
+    assert commands.count("Invoke-CISAudit") == 1
+
+
+def test_commands_and_arguments():
+    """Parameters, switches, line continuations and $variables resolve"""
+    parsed = parse_source("sample.ps1", SAMPLE, TokenCache(None))
+    (invoke,) = parsed.find_commands("Invoke-CISAudit")
+    assert invoke.line == 21
+    assert parsed.resolve(invoke.get("CIS_ID")) == "17.5.1"
+    assert invoke.get("RegistryPath") == "HKLM:\\SOFTWARE\\Test"
+    assert invoke.get("VerboseOutput") == "$VerboseOutput"
+
+    (module,) = parsed.find_commands("Import-Module")
+    assert module.positional == ["$PSScriptRoot\\..\\modules\\CISFramework.psm1"]
+    assert module.get("Force") is True
+
+
+REASSIGNED = r'''$registryPath = "HKLM:\SYSTEM\Parameters"
+$valueName = "RequireSecuritySignature"
+if (Test-RegistryKey -KeyPath $registryPath) { }
+Invoke-CISAudit -CIS_ID "2.3.9.2" -RegistryPath $registryPath
+$registryPath = "HKLM:\SOFTWARE\Policies\LanmanServer"
+Get-RegistryValue -KeyPath $registryPath
+'''
+
+
+def test_assignment_in_effect():
+    """A re-assigned $variable resolves to the assignment in effect at each use"""
+    parsed = parse_source("sample.ps1", REASSIGNED, TokenCache(None))
+    invoke, read = parsed.find_commands("Invoke-CISAudit", "Get-RegistryValue")
+    assert parsed.variables["registrypath"] == "HKLM:\\SOFTWARE\\Policies\\LanmanServer"
+    assert parsed.resolve(invoke.get("RegistryPath"), invoke.offset) == "HKLM:\\SYSTEM\\Parameters"
+    assert parsed.resolve(read.get("KeyPath"), read.offset) == "HKLM:\\SOFTWARE\\Policies\\LanmanServer"
+    assert parsed.resolve("$registryPath", 0) == "$registryPath"      # not yet assigned
+    assert parsed.assignment_in_effect("registryPath") == (0, "HKLM:\\SYSTEM\\Parameters")
+    assert parsed.assignment_in_effect("$valueName")[1] == "RequireSecuritySignature"
+    assert parsed.assignment_in_effect("missing") is None
+
+
+def test_keywords_and_definitions():
+    """Function names, keywords and hashtable keys are classified"""
+    parsed = parse_source("sample.ps1", SAMPLE, TokenCache(None))
+    assert parsed.function_definitions == ["Test-Local"]
+    keywords = {t.text for t in parsed.tokens if t.kind == KEYWORD}
+    assert {"function", "param", "try", "catch"} <= keywords
+    names = {c.name for c in parsed.commands}
+    assert "Title" not in names and "Mandatory" not in names
+    assert "auditpol" in names
+    assert [t.text for t in parsed.tokens if t.kind == FUNCTION] == ["Test-Local"]
+
+
+def test_cache_round_trip():
+    """Token streams survive the on-disk cache unchanged"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = TokenCache(Path(cache_dir))
+        digest, tokens = first.tokens(SAMPLE)
+        second = TokenCache(Path(cache_dir))
+        assert second.tokens(SAMPLE) == (digest, tokens)
+        assert (first.misses, second.hits) == (1, 1)
+
+
+def test_cache_prune_and_lru():
+    """Streams of changed or deleted scripts are pruned; memory keeps the most recent"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = Path(tmp) / "scripts"
+        scripts.mkdir()
+        kept, changed = scripts / "kept.ps1", scripts / "changed.ps1"
+        kept.write_text(SAMPLE)
+        changed.write_text("Get-Item C:\\\n")
+        cache = TokenCache(Path(tmp) / "cache", memory_entries=2)
+        kept_digest, _ = cache.tokens(kept.read_text())
+        old_digest, _ = cache.tokens(changed.read_text())
+        changed.write_text("Get-Item D:\\\n")
+        new_digest, _ = cache.tokens(changed.read_text())
+        assert list(cache.memory) == [old_digest, new_digest]
+        cache.tokens(kept.read_text())
+        assert list(cache.memory) == [new_digest, kept_digest]
+
+        (Path(tmp) / "cache" / "v0" / "ab").mkdir(parents=True)
+        (Path(tmp) / "cache" / "v0" / "ab" / "stale.bin").write_bytes(b"")
+        assert cache.prune([scripts]) == 2
+        stored = sorted(path.stem for path in cache.directory.rglob("*.bin"))
+        assert stored == sorted([kept_digest, new_digest])
+        assert not (Path(tmp) / "cache" / "v0").exists()
+        changed.unlink()
+        assert cache.prune([scripts]) == 1 and not cache._path(new_digest).exists()
+
+
+def main():
+    """Main test function"""
+    tests = [test_comments_and_here_strings, test_commands_and_arguments, test_assignment_in_effect,
+             test_keywords_and_definitions, test_cache_round_trip, test_cache_prune_and_lru]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for compiled recommended-value predicates (recommended_values.py)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from recommended_values import (  # noqa: E402
+    AnyOf, AtLeast, DecisionTable, Equals, MissingOk, NumericPredicate, Observation,
+    Predicate, compile_phrase, compile_principals, evaluate_phrase, evaluate_rule,
+    phrase_rule, recommended_setting,
+)
+
+
+def test_compiled_once():
+    """A phrase compiles to one shared predicate; variants of it normalize the same"""
+    predicate = compile_phrase("24 or more password(s)")
+    assert predicate is compile_phrase("24 or more password(s)")
+    assert predicate == AtLeast(24)
+    assert compile_phrase("Enabled") == Equals(1)
+    assert compile_principals("Administrators", False) is compile_principals("Administrators", False)
+    assert compile_principals("Administrators")(["BUILTIN\\Administrators"])
+
+
+def test_phrase_forms():
+    """Grouped numbers with units, hex, alternatives and excluded bounds"""
+    assert evaluate_phrase("16,384 KB or greater", 32768)
+    assert not evaluate_phrase("16,384 KB or greater", 8192)
+    assert evaluate_phrase("0xff (255))", 255) and evaluate_phrase("0xff (255))", "0xff")
+    assert evaluate_phrase("15 or fewer minute(s), but not Never (0)", 10)
+    assert not evaluate_phrase("15 or fewer minute(s), but not Never (0)", 0)
+    either = compile_phrase("Disabled' or 'Not Installed")
+    assert isinstance(either, AnyOf)
+    assert either(0) and not either(1)
+    assert recommended_setting("Disabled' or 'Not Installed") == 0
+    assert phrase_rule("Disabled' or 'Not Installed")["op"] == "any"
+    assert isinstance(compile_phrase("1 or that the key does not exist"), MissingOk)
+
+
+def test_distinct_columns():
+    """A column of distinct values gets one outcome each, same as calling per value"""
+    column = [None, 0, 1, "0x1", "text", ["a"]]
+    for phrase in ("1", "1 or that the key does not exist", "Disabled' or 'Not Installed",
+                   "between 1 and 3", "text", "<blank>"):
+        predicate = compile_phrase(phrase)
+        assert predicate.evaluate_distinct(column) == [predicate(value) for value in column], phrase
+    for abstract in (Predicate, NumericPredicate):
+        try:
+            abstract()
+            assert False, f"{abstract.__name__} is instantiable"
+        except TypeError:
+            pass
+
+
+def test_decision_table():
+    """Hosts sharing a value are decided once; multi-check observations combine"""
+    calls = []
+
+    class Counting(Equals):
+        def evaluate_distinct(self, values):
+            calls.append(list(values))
+            return super().evaluate_distinct(values)
+
+    predicate = Counting(1)
+    hosts = []
+    for value in (1, 1, 0, 1, None):
+        observation = Observation()
+        observation.check(predicate, value)
+        hosts.append(observation)
+    both = Observation()
+    both.check(predicate, 1)
+    both.check(compile_phrase("text"), None)
+    fixed = Observation(outcome=False)
+    table = DecisionTable()
+    for observation in hosts + [both, fixed]:
+        table.add(observation)
+    table.decide()
+    assert calls == [[1, 0, None]]
+    assert [table.outcome(observation) for observation in hosts] == [True, True, False, True, False]
+    assert table.outcome(both) is None and table.outcome(fixed) is False
+    assert all(table.outcome(observation) == observation.decide() for observation in hosts + [both])
+
+
+def test_principal_rule():
+    """User-right predicates have a rule evaluate_rule() agrees with"""
+    for phrase, inclusion in (("Administrators, LOCAL SERVICE", False), ("Guests", True),
+                              ("No One", False)):
+        predicate = compile_principals(phrase, inclusion)
+        rule = predicate.rule()
+        assert rule["op"] == "principals"
+        for value in ([], ["*S-1-5-32-544", "LOCAL SERVICE"], ["BUILTIN\\Guests", "Users"]):
+            assert evaluate_rule(rule, value) == predicate(value), (phrase, value)
+
+
+def main():
+    """Main test function"""
+    tests = [test_compiled_once, test_phrase_forms, test_distinct_columns,
+             test_decision_table, test_principal_rule]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
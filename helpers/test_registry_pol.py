@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the Registry.pol reader/writer (registry_pol.py)
+"""
+
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_catalog import load_catalog  # noqa: E402
+from recommended_values import evaluate_phrase  # noqa: E402
+from registry_pol import (  # noqa: E402
+    PolicyFile, PolicyFormatError, compile_policy, make_entry, policy_key,
+)
+from registry_snapshot import REG_DWORD, REG_MULTI_SZ, REG_SZ  # noqa: E402
+
+
+def preg_entry(key: str, name: str, value_type: int, data: bytes) -> bytes:
+    """An entry encoded by hand, the way the Group Policy editor writes it"""
+    def text(value: str) -> bytes:
+        return value.encode('utf-16-le')
+    return (text('[') + text(key) + b'\x00\x00' + text(';') + text(name) +
+            b'\x00\x00' + text(';') + struct.pack('<I', value_type) + text(';') +
+            struct.pack('<I', len(data)) + text(';') + data + text(']'))
+
+
+SAMPLE = b'PReg\x01\x00\x00\x00' + b''.join([
+    preg_entry('Software\\Policies\\Microsoft\\Windows\\System',
+               'EnableSmartScreen', REG_DWORD, b'\x01\x00\x00\x00'),
+    preg_entry('Software\\Policies\\Microsoft\\Windows\\System',
+               'ShellSmartScreenLevel', REG_SZ, 'Block\x00'.encode('utf-16-le')),
+    preg_entry('Software\\Policies\\Microsoft\\Windows\\System',
+               '**del.Legacy', REG_SZ, b' \x00\x00\x00'),
+    # Odd-length data and a name ending in a character with a zero low byte
+    preg_entry('Software\\Vendor', 'Ā', 3, b'\x00\x00\x3b'),
+    preg_entry('Software\\Vendor', 'Paths', REG_MULTI_SZ,
+               'A\x00B\x00\x00'.encode('utf-16-le')),
+])
+
+
+def test_round_trip():
+    """Existing files are reproduced byte-for-byte, from bytes or mmap"""
+    policy = PolicyFile.parse(SAMPLE)
+    assert len(policy) == 5
+    assert policy.serialize() == SAMPLE
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Registry.pol"
+        path.write_bytes(SAMPLE)
+        mapped = PolicyFile.read(path)
+        assert mapped.serialize() == SAMPLE
+        assert isinstance(mapped.entries[0].data, memoryview)
+    assert PolicyFile.parse(memoryview(SAMPLE)).serialize() == SAMPLE
+
+
+def test_decoding():
+    """Entry values decode by registry type"""
+    policy = PolicyFile.parse(SAMPLE)
+    values = [entry.value for entry in policy.entries]
+    assert values[0] == 1 and values[1] == "Block"
+    assert values[3] == b'\x00\x00\x3b'
+    assert values[4] == ["A", "B"]
+    assert policy.entries[3].value_name == 'Ā'
+    assert policy.find('software\\policies\\microsoft\\windows\\system',
+                       'enablesmartscreen') is policy.entries[0]
+
+
+def test_malformed():
+    """Truncated files and bad signatures are rejected"""
+    for data in (b'', b'XReg\x01\x00\x00\x00', SAMPLE[:-1], SAMPLE[:30]):
+        try:
+            PolicyFile.parse(data)
+        except PolicyFormatError:
+            continue
+        raise AssertionError(f"accepted {data[:12]!r}...")
+
+
+def test_compile_profile():
+    """Every compiled value satisfies its recommendation's phrase"""
+    catalog = load_catalog()
+    entries = catalog.select(profile="L1")
+    machine, skipped = compile_policy(entries, "hklm")
+    assert len(machine) > 250
+    assert {cis_id for cis_id, _ in skipped} == {"2.3.7.5", "2.3.7.6", "18.10.17.1"}
+    reparsed = PolicyFile.parse(machine.serialize())
+    by_value = {(e.key.lower(), e.value_name.lower()): e for e in reparsed.entries}
+    for entry in entries:
+        for location in entry.registry_locations:
+            key = policy_key(location.path, "hklm")
+            compiled = by_value.get((key.lower(), location.value_name.lower())) if key else None
+            if compiled is not None:
+                phrase = entry.expected_data_for(location.value_name)
+                assert evaluate_phrase(phrase, compiled.value), (entry.cis_id, compiled.value)
+
+    user, _ = compile_policy(catalog.select(sections=["19"]), "hkcu")
+    assert user.entries and all(e.key.lower().startswith("software\\") for e in user.entries)
+
+    device_classes, _ = compile_policy([catalog.get("18.9.7.1.2")], "hklm")
+    assert [(e.value_name, e.value) for e in device_classes.entries][:2] == [
+        ("1", "{d48179be-ec20-11d1-b6b8-00c04fa372a7}"),
+        ("2", "{7ebefbc0-3200-11d2-b4c2-00a0C9697d07}"),
+    ]
+
+
+def test_many_entries():
+    """Tens of thousands of entries parse and serialize unchanged"""
+    entries = [make_entry(f"Software\\Policies\\Vendor{i % 100}", f"Value{i}", i, REG_DWORD)
+               for i in range(20000)]
+    data = PolicyFile(entries).serialize()
+    policy = PolicyFile.parse(data)
+    assert len(policy) == 20000 and policy.entries[-1].value == 19999
+    assert policy.serialize() == data
+
+
+def main():
+    """Main test function"""
+    tests = [test_round_trip, test_decoding, test_malformed, test_compile_profile,
+             test_many_entries]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except (AssertionError, PolicyFormatError) as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
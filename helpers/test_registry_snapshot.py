@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the registry snapshot evaluator (registry_snapshot.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from registry_snapshot import (  # noqa: E402
+    REG_BINARY, REG_DWORD, REG_EXPAND_SZ, REG_MULTI_SZ, REG_QWORD, REG_SZ,
+    RegistryEvaluator, RegistrySnapshot, catalog_key_paths, format_value,
+    parse_value, registry_entries,
+)
+
+# `reg export` output (Windows Registry Editor Version 5.00, UTF-16)
+HKLM_EXPORT = r'''Windows Registry Editor Version 5.00
+
+[HKEY_LOCAL_MACHINE\SOFTWARE\Policies\Microsoft\Windows\System]
+"EnableSmartScreen"=dword:00000001
+"ShellSmartScreenLevel"="Block"
+"Paths"=hex(7):41,00,3a,00,5c,00,00,00,42,00,5c,00,78,00,00,00,00,00
+"LogFile"=hex(2):25,00,53,00,79,00,73,00,74,00,65,00,6d,00,52,00,6f,00,6f,00,\
+  74,00,25,00,00,00
+"Quota"=hex(b):00,00,00,00,01,00,00,00
+"Blob"=hex:de,ad,be,ef
+"Removed"=dword:00000001
+"Removed"=-
+"Bad"=dword:
+"AlsoBad"=hex(4):zz
+
+[HKEY_LOCAL_MACHINE\SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System\CredSSP\Parameters]
+"AllowEncryptionOracle"=dword:00000002
+
+[HKEY_LOCAL_MACHINE\SYSTEM\CurrentControlSet\Services\BTAGService]
+"Start"=dword:00000004
+"DisplayName"="@%SystemRoot%\\system32\\BTAGService.dll,-101"
+
+[HKEY_LOCAL_MACHINE\SYSTEM\CurrentControlSet\Services\Unrelated]
+"Start"=dword:00000002
+
+[-HKEY_LOCAL_MACHINE\SYSTEM\CurrentControlSet\Services\Gone]
+'''
+
+# regedit "Win9x/NT4" export of a user hive (REGEDIT4, ANSI)
+HKU_EXPORT = r'''REGEDIT4
+
+[HKEY_USERS\S-1-5-21-1004336348-1177238915-682003330-1001\Software\Policies\Microsoft\Windows\CloudContent]
+"ConfigureWindowsSpotlight"=dword:00000002
+"Note"=hex(2):41,42,00
+'''
+
+
+def write_exports(directory: Path):
+    hklm = directory / "hklm.reg"
+    hklm.write_bytes(HKLM_EXPORT.replace('\n', '\r\n').encode('utf-16'))
+    hku = directory / "hku.reg"
+    hku.write_bytes(HKU_EXPORT.replace('\n', '\r\n').encode('cp1252'))
+    return hklm, hku
+
+
+def test_value_decoding():
+    """.reg data syntax decodes to typed values"""
+    assert parse_value('dword:0000000a') == (REG_DWORD, 10)
+    assert parse_value('hex(b):00,00,00,00,01,00,00,00') == (REG_QWORD, 1 << 32)
+    assert parse_value('"C:\\\\Temp \\"x\\""') == (REG_SZ, 'C:\\Temp "x"')
+    assert parse_value('hex(7):61,00,00,00,62,00,00,00,00,00') == (REG_MULTI_SZ, ["a", "b"])
+    assert parse_value('hex(2):41,42,00', unicode=False) == (REG_EXPAND_SZ, "AB")
+    assert parse_value('hex:01,02') == (REG_BINARY, b'\x01\x02')
+    for typed in [(REG_DWORD, 10), (REG_QWORD, 1 << 32), (REG_SZ, 'C:\\Temp "x"'),
+                  (REG_MULTI_SZ, ["a", "b"]), (REG_EXPAND_SZ, "%SystemRoot%"),
+                  (REG_BINARY, b'\x01\x02')]:
+        assert parse_value(format_value(*typed)) == typed, typed
+    assert format_value(REG_DWORD, 10) == 'dword:0000000a'
+
+
+def test_snapshot_loading():
+    """Both encodings, continuation lines, deletions and hive aliases"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = RegistrySnapshot()
+        for path in write_exports(Path(tmp)):
+            snapshot.load(path)
+
+    policy = "HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\System"
+    assert snapshot.value(policy, "enablesmartscreen") == 1
+    assert snapshot.value(policy, "Paths") == ["A:\\", "B\\x"]
+    assert snapshot.value(policy, "LogFile") == "%SystemRoot%"
+    assert snapshot.value(policy, "Quota") == 1 << 32
+    assert snapshot.value(policy, "Blob") == b'\xde\xad\xbe\xef'
+    assert snapshot.value(policy, "Removed") is None
+    assert snapshot.value(
+        "HKCU\\Software\\Policies\\Microsoft\\Windows\\CloudContent",
+        "ConfigureWindowsSpotlight") == 2
+    assert snapshot.value("HKEY_CURRENT_USER\\Software\\Policies\\Microsoft\\"
+                          "Windows\\CloudContent", "Note") == "AB"
+    assert len(snapshot) == sum(1 for _ in snapshot.walk()) == 12
+    # Malformed data is skipped and counted, not raised
+    assert snapshot.value(policy, "Bad") is None and snapshot.bad_values == 2
+
+
+def test_catalog_evaluation():
+    """Registry-backed recommendations evaluated in one sweep"""
+    entries = registry_entries()
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = RegistrySnapshot(keep=catalog_key_paths(entries))
+        for path in write_exports(Path(tmp)):
+            snapshot.load(path)
+    # Keys no recommendation reads are never stored
+    assert not snapshot.key_exists("HKLM\\SYSTEM\\CurrentControlSet\\Services\\Unrelated")
+    assert snapshot.skipped_keys == 1
+
+    results = {r.cis_id: r for r in RegistryEvaluator(snapshot, "WS01").evaluate_all(entries)}
+    assert len(results) == len(entries)
+    assert results["18.10.76.2.1"].compliance_status == "Compliant"
+    assert results["18.9.4.1"].compliance_status == "Non-Compliant"
+    assert results["18.9.4.1"].current_value == "2"
+    assert results["5.1"].compliance_status == "Compliant"
+    assert results["19.7.8.1"].compliance_status == "Compliant"
+    assert results["18.4.1"].current_value == "Not Configured"
+    assert results["18.4.1"].source == "Registry"
+
+
+def main():
+    """Main test function"""
+    tests = [test_value_decoding, test_snapshot_loading, test_catalog_evaluation]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
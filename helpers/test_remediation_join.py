@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the remediation effectiveness join (remediation_join.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from remediation_join import join_store  # noqa: E402
+from result_store import COLUMNS, REMEDIATION_COLUMNS, SegmentWriter  # noqa: E402
+
+# (host, cis_id, timestamp, status)
+REMEDIATIONS = [
+    ("WS01", "1.1.1", "2026-10-01 10:00:00", "Remediated"),
+    ("WS02", "1.1.1", "2026-10-01 10:00:00", "Remediated"),
+    ("WS03", "1.1.1", "2026-10-01 10:00:00", "Remediated"),
+    ("WS04", "1.1.1", "2026-10-01 10:00:00", "PartiallyRemediated"),
+    ("WS01", "18.4.6", "2026-10-01 10:00:00", "Failed"),
+    ("WS05", "2.3.7.4", "2026-10-01 10:00:00", "Remediated"),
+    ("WS05", "2.3.7.4", "2026-10-03 10:00:00", "Remediated"),
+]
+
+AUDITS = [
+    ("ws01", "1.1.1", "2026-09-30 02:00:00", "Non-Compliant"),    # before any remediation
+    ("WS01", "1.1.1", "2026-10-05 02:00:00", "Non-Compliant"),    # reverted, 88 hours in
+    ("WS01", "1.1.1", "2026-10-02 02:00:00", "Compliant"),
+    ("WS02", "1.1.1", "2026-10-02 02:00:00", "Compliant"),
+    ("WS02", "1.1.1", "2026-10-05 02:00:00", "Compliant"),
+    ("WS03", "1.1.1", "2026-10-02 02:00:00", "Non-Compliant"),    # did not take
+    ("WS04", "1.1.1", "2026-10-20 02:00:00", "Compliant"),        # outside the window
+    ("WS01", "18.4.6", "2026-10-02 02:00:00", "Non-Compliant"),
+    ("WS05", "2.3.7.4", "2026-10-02 02:00:00", "Compliant"),
+    ("WS05", "2.3.7.4", "2026-10-04 02:00:00", "Non-Compliant"),  # belongs to the second event
+    ("WS09", "1.1.1", "2026-10-02 02:00:00", "Non-Compliant"),    # never remediated
+]
+
+
+def write_store(folder: Path) -> Path:
+    store = folder / "store"
+    (store / "remediation").mkdir(parents=True)
+    audits = SegmentWriter(store / "000001.seg")
+    for host, cis_id, timestamp, status in AUDITS:
+        row = dict(zip(COLUMNS, [""] * len(COLUMNS)), CIS_ID=cis_id, ComputerName=host,
+                   AuditTimestamp=timestamp, ComplianceStatus=status)
+        audits.add([row[name] for name in COLUMNS])
+    audits.close()
+    events = SegmentWriter(store / "remediation" / "000001.seg", REMEDIATION_COLUMNS)
+    for host, cis_id, timestamp, status in REMEDIATIONS:
+        row = dict(zip(REMEDIATION_COLUMNS, [""] * len(REMEDIATION_COLUMNS)), CIS_ID=cis_id,
+                   ComputerName=host, RemediationTimestamp=timestamp, Status=status)
+        events.add([row[name] for name in REMEDIATION_COLUMNS])
+    events.close()
+    return store
+
+
+def test_effectiveness():
+    """Success, reversion and time to revert per control; partitions agree"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = write_store(Path(tmp))
+        results, join = join_store(store)
+        by_id = {c.cis_id: c for c in results}
+        assert list(by_id) == ["1.1.1", "2.3.7.4", "18.4.6"]
+
+        password = by_id["1.1.1"]
+        assert (password.attempts, password.applied, password.verified, password.unverified) == (4, 4, 3, 1)
+        assert (password.succeeded, password.reverted) == (2, 1)
+        assert (password.success_rate, password.reversion_rate) == (66.67, 50.0)
+        assert password.median_hours_to_revert == 88.0
+
+        lockout = by_id["2.3.7.4"]
+        assert (lockout.verified, lockout.succeeded, lockout.reverted) == (2, 1, 0)
+        failed = by_id["18.4.6"]
+        assert (failed.attempts, failed.applied, failed.verified) == (1, 0, 0)
+        assert join.audit_rows == len(AUDITS) and join.matched_rows == 9
+
+        partitioned, join = join_store(store, partitions=3)
+        assert [c.to_dict() for c in partitioned] == [c.to_dict() for c in results]
+        assert join.audit_rows <= 3 * len(AUDITS)
+
+        # A longer window verifies WS04; a short revert window misses WS01's reversion
+        wide = {c.cis_id: c for c in join_store(store, window_days=30)[0]}
+        assert wide["1.1.1"].verified == 4 and wide["1.1.1"].succeeded == 3
+        short = {c.cis_id: c for c in join_store(store, revert_days=2)[0]}
+        assert short["1.1.1"].reverted == 0
+
+
+def test_wrong_input():
+    """An audit store passed as the remediation side is refused"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = write_store(Path(tmp))
+        try:
+            join_store(store, remediation=store)
+            raise AssertionError("joined audits to audits")
+        except ValueError:
+            pass
+
+
+def main():
+    """Main test function"""
+    tests = [test_effectiveness, test_wrong_input]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
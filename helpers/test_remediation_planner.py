@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the remediation conflict/dedup planner (remediation_planner.py)
+"""
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_catalog import load_catalog  # noqa: E402
+from remediation_planner import (  # noqa: E402
+    CONFLICT, DEPENDENT, DUPLICATE, MERGED, build_plan, level_profiles, profile_entries,
+)
+
+
+def variant(cis_id: str, new_id: str, **changes):
+    """A copy of a catalog entry under another ID (e.g. a site benchmark overlay)"""
+    return replace(load_catalog().get(cis_id), cis_id=new_id, **changes)
+
+
+def settings_by_id(plan):
+    return {d.cis_id: s for s in plan.settings for d in s.demands}
+
+
+def test_catalog_plan():
+    """The full catalog batches into four runs with each setting written once"""
+    plan = build_plan(profile_entries("L2", bitlocker=True), ("L1", "L2", "BL"))
+    stats = plan.stats()
+    assert stats["recommendations"] == 518
+    assert [batch for batch, _, _ in plan.batches] == ["secedit", "registry", "service", "auditpol"]
+    written = [s.key for _, _, members in plan.batches for s in members]
+    assert len(written) == len(set(written)) == stats["planned_writes"]
+    assert stats["conflicts"] == 0 and not plan.violations
+    # 2.3.x security options are applied with the security template
+    batch_of = {d.cis_id: batch for batch, _, members in plan.batches
+                for s in members for d in s.demands}
+    assert batch_of["1.1.1"] == batch_of["2.3.1.2"] == "secedit"
+    assert batch_of["18.4.2"] == "registry" and batch_of["5.1"] == "service"
+    assert len(profile_entries("L1")) < len(profile_entries("L2"))
+    assert level_profiles(bitlocker=True) == ("L1", "L2", "BL")
+    assert len(profile_entries(bitlocker=True)) == len(profile_entries()) == 518
+
+
+def test_real_catalog_settings():
+    """Same-named recommendations in the catalog write different settings, so the
+    savings on the real catalog come from batching, not from duplicates"""
+    plan = build_plan(profile_entries())
+    by_id = settings_by_id(plan)
+    for server, client in [("18.6.7.6", "18.6.8.6"), ("18.6.7.3", "18.6.8.1"),
+                           ("2.3.9.2", "2.3.8.1"), ("18.10.89.1.1", "18.10.89.2.1")]:
+        assert by_id[server].key != by_id[client].key
+        assert by_id[server].status == by_id[client].status == "single"
+    stats = plan.stats()
+    assert stats["duplicates"] == stats["merged"] == stats["writes_eliminated"] == 0
+    assert (stats["naive_runs"], stats["planned_runs"]) == (518, 4)
+    # The lockout and password age settings of sections 1.1/1.2 are consistent
+    entries = load_catalog().select(cis_ids=["1.1.2", "1.1.3", "1.2.1", "1.2.2", "1.2.4"])
+    assert not build_plan(entries).violations
+
+
+def test_smb1_client_dependency():
+    """Disabling the SMBv1 client driver also drops it from the Workstation dependencies"""
+    plan = build_plan(load_catalog().select(cis_ids=["18.4.1", "18.4.2"]))
+    dependent = plan.by_status(DEPENDENT)
+    assert [s.key.display.rpartition(':')[2] for s in dependent] == ["DependOnService"]
+    assert dependent[0].value == ("Bowser", "MRxSmb20", "NSI")
+    assert [d.cis_id for d in dependent[0].demands] == ["18.4.1"]
+    registry = [members for batch, _, members in plan.batches if batch == "registry"][0]
+    assert dependent[0] in registry and len(registry) == 3
+    stats = plan.stats()
+    assert (stats["naive_writes"], stats["planned_writes"]) == (2, 3)
+    # The server setting alone has no dependency
+    assert not build_plan([load_catalog().get("18.4.2")]).by_status(DEPENDENT)
+
+
+def test_duplicates_and_merges():
+    """Same-setting demands collapse; compatible ones merge to a value both accept"""
+    entries = [
+        load_catalog().get("18.6.7.6"),
+        variant("18.6.7.6", "18.6.7.99"),                                        # same value
+        load_catalog().get("1.2.2"),
+        variant("1.2.2", "1.2.99", title="Ensure 'Account lockout threshold' is set to "
+                                      "'3 or fewer invalid logon attempt(s), but not 0'"),
+        load_catalog().get("17.5.1"),                                       # include Failure
+        variant("17.5.1", "17.5.99", title="Ensure 'Audit Account Lockout' is set to include 'Success'"),
+        load_catalog().get("2.2.16"),                                       # include Guests
+        variant("2.2.16", "2.2.99", title="Ensure 'Deny access to this computer from the network' "
+                                       "to include 'Local account'"),
+        load_catalog().get("2.3.1.3"),                                      # site-specific name
+        variant("2.3.1.3", "2.3.1.99"),
+    ]
+    plan = build_plan(entries)
+    by_id = settings_by_id(plan)
+    assert by_id["18.6.7.99"].status == DUPLICATE and by_id["18.6.7.99"].value == 785
+    assert by_id["1.2.99"].status == MERGED and by_id["1.2.99"].value == 3
+    assert by_id["17.5.99"].status == MERGED and by_id["17.5.99"].value == 3    # Success | Failure
+    assert by_id["2.2.99"].status == MERGED and by_id["2.2.99"].value == {"guests", "local account"}
+    assert by_id["2.3.1.99"].status == MERGED and by_id["2.3.1.99"] in plan.manual
+    stats = plan.stats()
+    assert stats["writes_eliminated"] == 4 and stats["naive_writes"] == 8
+
+
+def test_conflicts_and_relations():
+    """Incompatible values and invalid lockout combinations are reported, not written"""
+    entries = [
+        load_catalog().get("18.4.2"),
+        variant("18.4.2", "18.4.99", registry_expected={"*": "1"}),
+        load_catalog().get("1.2.1"),
+        variant("1.2.4", "1.2.4", title="Ensure 'Reset account lockout counter after' "
+                                       "is set to '30 or more minute(s)'"),
+    ]
+    plan = build_plan(entries)
+    by_id = settings_by_id(plan)
+    assert by_id["18.4.99"].status == CONFLICT
+    assert all(by_id["18.4.99"] not in members for _, _, members in plan.batches)
+    assert len(plan.violations) == 1 and "ResetLockoutCount=30" in plan.violations[0]
+
+
+def main():
+    """Main test function"""
+    tests = [test_catalog_plan, test_real_catalog_settings, test_smb1_client_dependency,
+             test_duplicates_and_merges, test_conflicts_and_relations]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
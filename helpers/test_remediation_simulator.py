@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the remediation dry-run simulator (remediation_simulator.py)
+"""
+
+import json
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_catalog import load_catalog  # noqa: E402
+from fleet_fixtures import write_inputs  # noqa: E402
+from fleet_runner import run_chunks  # noqa: E402
+from host_bundle import BundleReader, pack_bundle  # noqa: E402
+from registry_snapshot import RegistrySnapshot  # noqa: E402
+from remediation_simulator import (  # noqa: E402
+    RegistryOverlay, RemediationSimulator, init_worker, rollback_inf, rollback_reg,
+    simulate_hosts, write_rollback,
+)
+from secedit_inf import SeceditExport  # noqa: E402
+
+AUDIT_KEY = "HKLM\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Policies\\System\\Audit"
+
+EXTRA_REGISTRY = '''Windows Registry Editor Version 5.00
+
+[HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Policies\\System\\Audit]
+"ProcessCreationIncludeCmdLine_Enabled"=dword:00000000
+'''
+
+IDS = ["1.1.1", "1.1.4", "2.2.1", "2.3.1.2", "2.3.7.1", "5.13", "17.1.1", "18.4.5", "18.9.3.1"]
+
+
+def make_bundle(folder: Path) -> Path:
+    inputs = write_inputs(folder)
+    extra = folder / "audit-policies.reg"
+    extra.write_bytes(EXTRA_REGISTRY.replace('\n', '\r\n').encode('utf-16'))
+    inputs["registry"].append(extra)
+    bundle = folder / "WS01.cisb"
+    pack_bundle(bundle, "WS01", inputs)
+    return bundle
+
+
+def test_overlay_is_copy_on_write():
+    """Writes land in the overlay; the snapshot underneath is not modified"""
+    base = RegistrySnapshot()
+    base.load_lines(EXTRA_REGISTRY.splitlines())
+    overlay = RegistryOverlay(base)
+    overlay.set(AUDIT_KEY, "ProcessCreationIncludeCmdLine_Enabled", 4, 1)
+    overlay.set(AUDIT_KEY, "NewValue", 1, "x")
+    assert overlay.value(AUDIT_KEY, "processcreationincludecmdline_enabled") == 1
+    assert base.value(AUDIT_KEY, "ProcessCreationIncludeCmdLine_Enabled") == 0
+    assert (len(base), len(overlay)) == (1, 2)
+
+
+def test_simulation_and_rollback():
+    """Only unmet settings change; rollback restores or deletes exactly those"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        bundle = make_bundle(folder)
+        simulator = RemediationSimulator(load_catalog().select(cis_ids=IDS))
+        assert [reason for _, reason in simulator.unsimulated] == ["audit policy is not simulated"]
+        with BundleReader(bundle) as reader:
+            simulation = simulator.simulate(reader)
+            again = simulator.simulate(reader)
+
+        changed = {change.write.display: change for change in simulation.changes}
+        assert sorted(changed) == [
+            "HKLM\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Policies\\System:DisableCAD",
+            f"{AUDIT_KEY}:ProcessCreationIncludeCmdLine_Enabled",
+            "[System Access] MinimumPasswordLength",
+        ]
+        assert [c.to_dict() for c in again.changes] == [c.to_dict() for c in simulation.changes]
+        assert sorted(simulation.fixed) == ["1.1.4", "18.9.3.1", "2.3.7.1"]
+        assert simulation.regressed == []
+        summary = simulation.summary()
+        assert summary["evaluated"] == len(IDS)
+        assert summary["compliant_after"] == summary["compliant_before"] + 3
+
+        # The rollback files parse back to the previous state
+        restored = RegistrySnapshot()
+        restored.load_lines(rollback_reg(simulation.changes).splitlines())
+        assert restored.value(AUDIT_KEY, "ProcessCreationIncludeCmdLine_Enabled") == 0
+        assert '"DisableCAD"=-' in rollback_reg(simulation.changes)
+        inf, notes = rollback_inf(simulation.changes)
+        assert SeceditExport.from_text(inf).system_access("MinimumPasswordLength") == "8"
+        assert notes == []
+        written = write_rollback(simulation, folder / "rollback")
+        assert [path.name for path in written] == ["WS01-rollback.reg", "WS01-rollback.inf"]
+        assert written[0].read_bytes().startswith(b'\xff\xfe')
+
+
+def test_hosts_on_the_fleet_pool():
+    """Hosts run on the fleet pool; each one's output and rollback comes back as it finishes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        bundle = make_bundle(folder)
+        broken = folder / "WS02.cisb"
+        broken.write_bytes(b"not a bundle" * 4)
+        entries = load_catalog().select(cis_ids=IDS)
+        with ProcessPoolExecutor(1, initializer=init_worker,
+                                 initargs=(entries, "json", folder / "rollback")) as pool:
+            outcomes = {Path(o.path).name: o
+                        for o in run_chunks(pool, simulate_hosts, [str(bundle), str(broken)], 1)}
+        assert outcomes["WS02.cisb"].error.startswith("BundleFormatError")
+        item = json.loads(outcomes["WS01.cisb"].text)
+        assert item["host"] == "WS01" and len(item["changes"]) == 3
+        assert outcomes["WS01.cisb"].results == len(IDS)
+        assert (folder / "rollback" / "WS01-rollback.reg").exists()
+
+
+def main():
+    """Main test function"""
+    tests = [test_overlay_is_copy_on_write, test_simulation_and_rollback,
+             test_hosts_on_the_fleet_pool]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
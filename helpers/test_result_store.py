@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar fleet result store (result_store.py)
+"""
+
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fleet_fixtures import write_fleet  # noqa: E402
+from result_store import (  # noqa: E402
+    COLUMNS, INGEST_LOG, ResultStore, Segment, SegmentWriter, StoreFormatError, ingest,
+    reserve_segment,
+)
+
+
+def test_segment_round_trip():
+    """Rows come back unchanged; codes are the narrowest array that fits"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "000001.seg"
+        writer = SegmentWriter(path, ["Name", "Value"])
+        rows = [(f"name{i % 300}", "same") for i in range(1000)]
+        for row in rows:
+            writer.add(row)
+        for short_or_long in (("name0",), ("name0", "same", "extra")):
+            try:
+                writer.add(short_or_long)
+                raise AssertionError(f"accepted a row of {len(short_or_long)} values")
+            except ValueError:
+                pass
+        writer.close()
+        segment = Segment(path)
+        try:
+            assert segment.rows == 1000
+            assert segment.column("Name").typecode == "H" and segment.column("Value").typecode == "B"
+            assert list(zip(segment.column("Name").values(), segment.column("Value").values())) == rows
+        finally:
+            segment.close()
+
+        path.write_bytes(b"PK\x03\x04" + b"\x00" * 40)
+        try:
+            Segment(path)
+            raise AssertionError("opened a foreign file")
+        except StoreFormatError:
+            pass
+
+
+def test_ingest_and_rates():
+    """CSVs load in parallel; rates per control, section and host match the rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        files = write_fleet(folder)
+        (folder / "broken.csv").write_text("not,a,result\n1,2,3\n")
+        store_path = folder / "store"
+        stats, errors = ingest(store_path, files + [folder / "broken.csv"], workers=2,
+                               files_per_segment=2)
+        assert (stats.files, stats.failed, stats.rows, stats.segments) == (5, 1, 20, 3)
+        assert errors[0][0].endswith("broken.csv")
+        again, _ = ingest(store_path, files, workers=1)
+        assert (again.skipped, again.rows) == (5, 0)
+
+        with ResultStore(store_path) as store:
+            assert store.rows == 20
+            rows = list(store.iter_rows())
+            assert rows[0] == ("1.1.1", "Control 1.1.1", "1", "1", "Compliant", "Registry", "", "",
+                               "L1", "2026-10-01 10:00:00", "WS01", "auditor")
+            assert len(rows[0]) == len(COLUMNS)
+
+            by_id = {r.key: r for r in store.compliance_rates("cis_id")}
+            assert list(by_id) == ["1.1.1", "2.3.7.4", "18.4.6", "18.9.3.1"]
+            assert (by_id["18.4.6"].compliant, by_id["18.4.6"].total, by_id["18.4.6"].rate) == (3, 5, 60.0)
+            sections = {r.key: (r.compliant, r.total) for r in store.compliance_rates("section")}
+            assert sections == {"1": (4, 5), "2": (4, 5), "18": (7, 10)}
+            hosts = {r.key: r.rate for r in store.compliance_rates("host", {"Profile": "L1"})}
+            assert hosts == {"WS01": 66.67, "WS02": 33.33, "WS03": 100.0, "WS04": 66.67, "WS05": 100.0}
+            expected = Counter(row[4] for row in rows if row[0] == "2.3.7.4")
+            assert store.status_counts("cis_id")["2.3.7.4"] == expected
+
+
+def test_concurrent_writers_and_journal():
+    """Claimed names are skipped; a logged batch whose segment never appeared is re-ingested"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        files = write_fleet(folder)
+        store_path = folder / "store"
+        store_path.mkdir()
+        # Another writer holds 000001 and 000002 (one claimed, one published)
+        claimed = reserve_segment(store_path)
+        other = SegmentWriter(reserve_segment(store_path))
+        assert (claimed.name, other.path.name) == ("000001.seg", "000002.seg")
+        other.add(["x"] * len(COLUMNS))
+        other.close()
+        # A crash between logging a batch and renaming its segment into place
+        (store_path / INGEST_LOG).write_text(f"000009.seg\t{files[0]}\n", encoding='utf-8')
+
+        stats, _ = ingest(store_path, files, workers=1, files_per_segment=5)
+        assert (stats.files, stats.skipped, stats.segments) == (5, 0, 1)
+        assert claimed.stat().st_size == 0
+        names = sorted(p.name for p in store_path.glob("*.seg"))
+        assert names == ["000001.seg", "000002.seg", "000010.seg"], names
+        with ResultStore(store_path) as store:
+            assert len(store.segments) == 2 and store.rows == 21
+
+
+def main():
+    """Main test function"""
+    tests = [test_segment_round_trip, test_ingest_and_rates, test_concurrent_writers_and_journal]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
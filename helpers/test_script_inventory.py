@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the script inventory and coverage matrix (script_inventory.py)
+and the gap reports built on them (analyze_gaps.py)
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analyze_gaps import analyze_gaps  # noqa: E402
+from cis_catalog import load_catalog  # noqa: E402
+from ps_tokenizer import parse_source  # noqa: E402
+from script_inventory import CoverageMatrix, ScriptInventory, detect_mechanism  # noqa: E402
+
+AUDIT = 'Invoke-CISAudit -CIS_ID "1.1.1" -AuditType "SecurityPolicy"\n'
+REMEDIATION = 'secedit.exe /configure /db x.sdb /cfg x.inf\n'
+
+
+def write_scripts(root: Path):
+    """Two 1.1.1 scripts, one script for an ID not in the catalog, one non-CIS script."""
+    section = root / "section_1"
+    section.mkdir(parents=True)
+    (section / "1.1.1-audit-password-history.ps1").write_text(AUDIT)
+    (section / "1.1.1-remediate-password-history.ps1").write_text(REMEDIATION)
+    (section / "99.9-audit-unknown.ps1").write_text(AUDIT.replace("1.1.1", "99.9"))
+    (root / "Run-All.ps1").write_text("Write-Host 'hi'\n")
+
+
+def test_detect_mechanism():
+    """Declared audit types win; otherwise the tool the script calls"""
+    assert detect_mechanism(parse_source("a.ps1", AUDIT)) == "secedit"
+    assert detect_mechanism(parse_source("r.ps1", REMEDIATION)) == "secedit"
+    assert detect_mechanism(parse_source("s.ps1", "Set-Service -Name x\n")) == "service"
+    assert detect_mechanism(parse_source("c.ps1", "Write-Host 'hi'\n")) == "custom"
+
+
+def test_incremental_refresh():
+    """Only changed scripts are re-read; paths outside the repo stay absolute"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = Path(tmp) / "scripts"
+        write_scripts(scripts)
+        cache = Path(tmp) / "inventory.json"
+
+        inventory = ScriptInventory(scripts, cache)
+        assert inventory.refresh()["added"] == 3
+        assert all(Path(path).is_absolute() for path in inventory.records)
+
+        audit = scripts / "section_1" / "1.1.1-audit-password-history.ps1"
+        audit.write_text(AUDIT + "\n")
+        os.utime(audit, ns=(0, 0))
+        (scripts / "section_1" / "99.9-audit-unknown.ps1").unlink()
+        refresh = ScriptInventory(scripts, cache).refresh()
+        assert (refresh["updated"], refresh["removed"], refresh["unchanged"]) == (1, 1, 1)
+
+
+def test_coverage_matrix():
+    """Catalog IDs without scripts are missing; unknown IDs are orphans"""
+    catalog = load_catalog()
+    with tempfile.TemporaryDirectory() as tmp:
+        write_scripts(Path(tmp))
+        inventory = ScriptInventory(Path(tmp), None)
+        inventory.refresh()
+        coverage = CoverageMatrix(catalog, inventory)
+
+    assert coverage.cell(coverage.all_mask)["both"] == 1
+    assert "1.1.1" not in coverage.missing("audit")
+    assert len(coverage.missing("remediation")) == len(catalog) - 1
+    assert [Path(p).name for p in coverage.orphans["audit"]] == ["99.9-audit-unknown.ps1"]
+    assert coverage.matrix()["section"]["1"]["audit"] == 1
+    assert coverage.to_json()["script_mechanisms"]["audit"] == {"secedit": 1}
+
+
+def test_analyze_gaps_reports():
+    """Reports go to the output directory and include the orphan count"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts, output = Path(tmp) / "scripts", Path(tmp) / "reports"
+        write_scripts(scripts)
+        output.mkdir()
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            cis_ids, missing_audit, _ = analyze_gaps(scripts, output)
+
+        assert "Orphan scripts: 1" in stdout.getvalue()
+        assert len(missing_audit) == len(cis_ids) - 1
+        summary = (output / "gap_analysis_summary.txt").read_text()
+        assert "Orphan scripts: 1" in summary
+        assert summary.rstrip().endswith("99.9-audit-unknown.ps1")
+        report = (output / "missing_audit_report.txt").read_text()
+        assert f"Total missing: {len(missing_audit)}" in report
+        assert json.loads((output / "gap_analysis.json").read_text())["coverage"]["audit"] == 1
+
+
+def main():
+    """Main test function"""
+    tests = [test_detect_mechanism, test_incremental_refresh, test_coverage_matrix,
+             test_analyze_gaps_reports]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
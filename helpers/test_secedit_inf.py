@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline secedit export evaluator (secedit_inf.py)
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_results import CISResult, output_results, results_to_csv, summarize  # noqa: E402
+from recommended_values import evaluate_phrase, evaluate_principals  # noqa: E402
+from secedit_inf import SeceditEvaluator, SeceditExport, select_entries  # noqa: E402
+
+# Trimmed-down `secedit /export` output as written on a Windows 11 host
+EXPORT = r'''[Unicode]
+Unicode=yes
+[System Access]
+MinimumPasswordAge = 1
+MaximumPasswordAge = -1
+MinimumPasswordLength = 8
+PasswordComplexity = 1
+PasswordHistorySize = 24
+LockoutBadCount = 5
+ResetLockoutCount = 15
+LockoutDuration = -1
+AllowAdministratorLockout = 1
+RequireLogonToChangePassword = 0
+ForceLogoffWhenHourExpire = 0
+NewAdministratorName = "Administrator"
+NewGuestName = "Visitor"
+ClearTextPassword = 0
+LSAAnonymousNameLookup = 0
+EnableAdminAccount = 0
+EnableGuestAccount = 0
+[Event Audit]
+AuditSystemEvents = 0
+[Registry Values]
+MACHINE\System\CurrentControlSet\Control\Lsa\LimitBlankPasswordUse=4,1
+MACHINE\System\CurrentControlSet\Control\SAM\RelaxMinimumPasswordLengthLimits=4,1
+MACHINE\Software\Microsoft\Windows\CurrentVersion\Policies\System\InactivityTimeoutSecs=4,0
+MACHINE\Software\Microsoft\Windows\CurrentVersion\Policies\System\ConsentPromptBehaviorAdmin=4,2
+MACHINE\Software\Microsoft\Windows\CurrentVersion\Policies\System\LegalNoticeText=7,Authorized use only.
+MACHINE\System\CurrentControlSet\Control\SecurePipeServers\Winreg\AllowedExactPaths\Machine=7,System\CurrentControlSet\Control\ProductOptions,System\CurrentControlSet\Control\Server Applications,Software\Microsoft\Windows NT\CurrentVersion
+[Privilege Rights]
+SeNetworkLogonRight = *S-1-1-0,*S-1-5-32-544,*S-1-5-32-545,*S-1-5-32-551
+SeBackupPrivilege = *S-1-5-32-544
+SeDenyNetworkLogonRight = Guest,*S-1-5-32-546,*S-1-5-113
+SeDenyInteractiveLogonRight = Guest
+SeServiceLogonRight = *S-1-5-80-0
+SeIncreaseBasePriorityPrivilege = *S-1-5-32-544,*S-1-5-90-0
+[Version]
+signature="$CHICAGO$"
+Revision=1
+'''
+
+
+def load_fixture() -> SeceditExport:
+    """Write the fixture the way secedit does (UTF-16 LE with BOM) and parse it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "secpol.inf"
+        path.write_bytes(EXPORT.replace('\n', '\r\n').encode('utf-16'))
+        return SeceditExport.from_file(path)
+
+
+def evaluate(*cis_ids):
+    evaluator = SeceditEvaluator(load_fixture(), computer_name="WS01")
+    return {r.cis_id: r for r in evaluator.evaluate_all(select_entries(cis_ids=list(cis_ids)))}
+
+
+def test_phrases():
+    """Recommended-value phrases from titles and audit procedures"""
+    assert evaluate_phrase("24 or more password(s)", 24)
+    assert not evaluate_phrase("14 or more character(s)", 8)
+    assert evaluate_phrase("365 or fewer days, but not 0", 365)
+    assert not evaluate_phrase("365 or fewer days, but not 0", 0)
+    assert not evaluate_phrase("900 or less, but not 0", 0)
+    assert evaluate_phrase("between 5 and 14", 14)
+    assert evaluate_phrase("1, 2 or 3", "2") and not evaluate_phrase("1 or 2", 3)
+    assert evaluate_phrase("4 or that the key does not exist", None)
+    assert evaluate_phrase("Disabled", 0) and not evaluate_phrase("Enabled", None)
+    assert evaluate_phrase("<blank> i.e. no value set", [])
+    assert evaluate_phrase("text", None) is None
+    assert evaluate_principals("Administrators, LOCAL SERVICE",
+                               ["*S-1-5-19", "BUILTIN\\Administrators"])
+    assert evaluate_principals("Guests", ["Guest", "*S-1-5-32-546"], inclusion=True)
+    assert evaluate_principals("No One", [])
+
+
+def test_system_access():
+    """Password, lockout and account settings from [System Access]"""
+    results = evaluate("1.1.1", "1.1.2", "1.1.4", "1.2.1", "2.3.1.1",
+                       "2.3.1.3", "2.3.1.4", "2.3.11.6")
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert status["1.1.1"] == "Compliant"
+    assert status["1.1.2"] == "Non-Compliant"      # -1: passwords never expire
+    assert status["1.1.4"] == "Non-Compliant"
+    assert status["1.2.1"] == "Compliant"          # -1: locked until unlocked
+    assert status["2.3.1.1"] == "Compliant"
+    assert status["2.3.1.3"] == "Non-Compliant"    # still "Administrator"
+    assert status["2.3.1.4"] == "Compliant"
+    assert status["2.3.11.6"] == "Non-Compliant"
+    assert results["1.1.1"].details == "[System Access] PasswordHistorySize = 24"
+    assert results["1.1.1"].computer_name == "WS01"
+
+
+def test_privilege_rights():
+    """User rights assignments from [Privilege Rights]"""
+    results = evaluate("2.2.1", "2.2.2", "2.2.7", "2.2.16", "2.2.17",
+                       "2.2.19", "2.2.25", "2.2.29")
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert status["2.2.1"] == "Compliant"          # absent line = No One
+    assert status["2.2.2"] == "Non-Compliant"
+    assert status["2.2.7"] == "Compliant"
+    assert status["2.2.16"] == "Compliant"
+    assert status["2.2.17"] == "Non-Compliant"
+    assert status["2.2.19"] == "Non-Compliant"     # the Guest account, not Guests
+    assert status["2.2.25"] == "Compliant"
+    assert status["2.2.29"] == "Not Applicable"
+    assert results["2.2.2"].current_value == \
+        "Everyone, Administrators, Users, Backup Operators"
+
+
+def test_registry_values():
+    """Security options from [Registry Values]"""
+    results = evaluate("1.1.6", "2.3.1.2", "2.3.7.4", "2.3.7.5", "2.3.10.7",
+                       "2.3.17.2", "2.3.7.3")
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert status["1.1.6"] == "Compliant"
+    assert status["2.3.1.2"] == "Compliant"
+    assert status["2.3.7.4"] == "Non-Compliant"    # 0 is excluded
+    assert status["2.3.7.5"] == "Compliant"
+    assert status["2.3.10.7"] == "Compliant"
+    assert status["2.3.17.2"] == "Compliant"
+    assert status["2.3.7.3"] == "Non-Compliant"
+    assert results["2.3.7.3"].current_value == "Not Configured"
+
+
+def test_full_pass():
+    """Every section 1/2 recommendation produces one well-formed result"""
+    entries = select_entries()
+    results = SeceditEvaluator(load_fixture()).evaluate_all(entries)
+    assert [r.cis_id for r in results] == [e.cis_id for e in entries]
+    summary = summarize(results)
+    assert summary["TotalAudits"] == len(entries)
+    assert summary["CompliantAudits"] + summary["NonCompliantAudits"] + \
+        summary["NotApplicableAudits"] == len(entries)
+    header = results_to_csv(results[:1]).splitlines()[0]
+    assert header.startswith('"CIS_ID","Title","CurrentValue","RecommendedValue"')
+
+    # BitLocker entries carry profile BL, which New-CISResultObject also accepts
+    assert {r.profile for r in results} <= {"L1", "L2", "BL"}
+    assert CISResult("18.10.9.1.1", "t", "1", "1", "Compliant", profile="BL").profile == "BL"
+    try:
+        CISResult("1.1.1", "t", "24", "24", "Compliant", profile="L3")
+        raise AssertionError("accepted profile L3")
+    except ValueError:
+        pass
+
+
+def test_output_formats():
+    """The shared CLI output writes csv/json files and prints text"""
+    results = SeceditEvaluator(load_fixture()).evaluate_all(select_entries())[:3]
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            output_results(results, "csv", Path(tmp) / "r.csv")
+            output_results(results, "json", Path(tmp) / "r.json")
+            output_results(results, "text", elapsed=0.5, id_width=8)
+        assert (Path(tmp) / "r.csv").read_bytes() == results_to_csv(results).encode('utf-8')
+        rows = json.loads((Path(tmp) / "r.json").read_text(encoding='utf-8'))
+        assert [row["CIS_ID"] for row in rows] == [r.cis_id for r in results]
+
+    lines = stdout.getvalue().splitlines()
+    assert lines[0] == f"Results written to: {Path(tmp) / 'r.csv'}"
+    assert lines[2].startswith(f"{results[0].cis_id:<8} {results[0].compliance_status}")
+    assert lines[-1].endswith("(0.500s)")
+
+
+def main():
+    """Main test function"""
+    tests = [test_phrases, test_system_access, test_privilege_rights,
+             test_registry_values, test_full_pass, test_output_formats]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the combined secedit template compiler (secedit_template.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from secedit_inf import SeceditExport, select_entries  # noqa: E402
+from secedit_template import (  # noqa: E402
+    TemplateCompiler, compile_template, principal_token, write_template,
+)
+
+# Current policy on the host (only [Privilege Rights] matters here)
+CURRENT = r'''[Privilege Rights]
+SeDenyNetworkLogonRight = *S-1-5-32-546,CONTOSO\Contractors
+'''
+
+# A site override that disagrees with the benchmark on one setting
+OVERRIDE = r'''[System Access]
+PasswordHistorySize = 12
+LockoutBadCount = 5
+'''
+
+# Part of a real `secedit /export`, with keys no recommendation covers
+EXPORT = r'''[System Access]
+MinimumPasswordAge = 1
+PasswordHistorySize = 24
+RequireLogonToChangePassword = 0
+[Privilege Rights]
+SeNetworkLogonRight = Administrators,*S-1-5-32-555
+SeDelegateSessionUserImpersonatePrivilege = *S-1-5-32-544
+'''
+
+
+def test_principal_tokens():
+    """Well-known names become *SIDs, other accounts stay as names"""
+    assert principal_token("Administrators") == "*S-1-5-32-544"
+    assert principal_token("LOCAL SERVICE") == "*S-1-5-19"
+    assert principal_token("CONTOSO\\Contractors") == "CONTOSO\\Contractors"
+
+
+def test_compile_profile():
+    """L1 sections 1 and 2 compile into one valid, compliant template"""
+    entries = select_entries("L1")
+    compiler = compile_template(entries, {"NewAdministratorName": "ws-admin",
+                                          "NewGuestName": "ws-visitor"})
+    assert not compiler.conflicts()
+    assert not compiler.validate()
+    assert not compiler.verify(entries)
+    export = SeceditExport.from_text(compiler.render())
+    assert export.system_access("PasswordHistorySize") == "24"
+    assert export.system_access("NewAdministratorName") == '"ws-admin"'
+    assert export.privilege("SeNetworkLogonRight") == ["*S-1-5-32-544", "*S-1-5-32-555"]
+    assert export.privilege("SeTrustedCredManAccessPrivilege") == []
+    assert export.registry_value(
+        "MACHINE\\System\\CurrentControlSet\\Control\\Lsa", "LimitBlankPasswordUse").value == 1
+    skipped = dict(compiler.skipped)
+    assert "2.2.29" not in compiler.compiled_ids
+    assert "2.3.7.5" in skipped                  # legal notice text is site-specific
+    assert len(compiler.compiled_ids) > 60
+
+
+def test_account_names_required():
+    """Rename recommendations are skipped without a site-chosen name"""
+    compiler = compile_template(select_entries(cis_ids=["2.3.1.3", "2.3.1.4"]))
+    assert compiler.compiled_ids == []
+    assert len(compiler.skipped) == 2
+
+
+def test_inclusion_keeps_current():
+    """'Include' rights keep existing holders when a current export is given"""
+    entries = select_entries(cis_ids=["2.2.16"])
+    plain = compile_template(entries)
+    merged = compile_template(entries, current=SeceditExport.from_text(CURRENT))
+    key = ("Privilege Rights", "sedenynetworklogonright")
+    assert plain.settings[key][0].value == "*S-1-5-32-546"
+    assert merged.settings[key][0].value == "*S-1-5-32-546,CONTOSO\\Contractors"
+
+
+def test_conflicts():
+    """Two sources giving one setting different values are reported"""
+    entries = select_entries(cis_ids=["1.1.1", "1.2.2"])
+    compiler = compile_template(entries, merge=[(SeceditExport.from_text(OVERRIDE), "site.inf")])
+    conflicts = compiler.conflicts()
+    assert [c.key for c in conflicts] == ["PasswordHistorySize"]
+    assert conflicts[0].values == [("1.1.1", "24"), ("site.inf", "12")]
+    # LockoutBadCount agrees with the benchmark value: no conflict
+    assert len(compiler.settings[("System Access", "lockoutbadcount")]) == 2
+
+
+def test_merge_export():
+    """A real export merges cleanly: *SIDs match names, unknown keys pass through"""
+    entries = select_entries(cis_ids=["1.1.1", "1.1.3", "2.2.2"])
+    compiler = compile_template(entries, merge=[(SeceditExport.from_text(EXPORT), "secpol.inf")])
+    assert compiler.conflicts() == []
+    assert compiler.validate() == [] and compiler.verify(entries) == []
+    assert compiler.warnings() == [
+        "[System Access] unrecognized key RequireLogonToChangePassword",
+        "[Privilege Rights] unrecognized user right SeDelegateSessionUserImpersonatePrivilege",
+    ]
+    export = SeceditExport.from_text(compiler.render())
+    assert export.system_access("RequireLogonToChangePassword") == "0"
+
+    merged = compile_template(entries, merge=[(SeceditExport.from_text(
+        "[Privilege Rights]\nSeNetworkLogonRight = *S-1-5-32-544\n"), "site.inf")])
+    assert [c.key for c in merged.conflicts()] == ["SeNetworkLogonRight"]
+
+
+def test_validation_and_encoding():
+    """Bad values are reported, unknown keys warned about; templates are UTF-16 with CRLF"""
+    compiler = TemplateCompiler()
+    compiler.add("System Access", "PasswordHistory", "24", "typo")
+    compiler.add("System Access", "LockoutBadCount", "five", "typo")
+    compiler.add("Privilege Rights", "SeMadeUpRight", "*S-1-5-32-544", "typo")
+    compiler.add("Registry Values", "MACHINE\\Software\\X\\Y", "9,1", "typo")
+    assert len(compiler.validate()) == 2
+    assert len(compiler.warnings()) == 2
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cis.inf"
+        write_template(compile_template(select_entries(cis_ids=["1.1.1"])).render(), path)
+        data = path.read_bytes()
+        assert data.startswith(b'\xff\xfe')
+        assert "\r\n[System Access]\r\nPasswordHistorySize = 24\r\n" in data.decode('utf-16')
+        assert SeceditExport.from_file(path).system_access("PasswordHistorySize") == "24"
+
+
+def main():
+    """Main test function"""
+    tests = [test_principal_tokens, test_compile_profile, test_account_names_required,
+             test_inclusion_keeps_current, test_conflicts, test_merge_export,
+             test_validation_and_encoding]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
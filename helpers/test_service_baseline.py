@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the section 5 services-baseline evaluator (service_baseline.py)
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from service_baseline import (  # noqa: E402
+    ServiceEvaluator, ServiceInventory, remediation_plan, render_remediation,
+    service_entries, service_name, toggle_scripts, toggle_states,
+)
+
+# Get-Service | Select-Object Name, DisplayName, StartType, Status | Export-Csv
+INVENTORY_CSV = '''"Name","DisplayName","StartType","Status"
+"BTAGService","Bluetooth Audio Gateway Service","Manual","Stopped"
+"Spooler","Print Spooler","Automatic","Running"
+"RemoteRegistry","Remote Registry","Disabled","Stopped"
+"Browser","Computer Browser","Manual","Stopped"
+"lfsvc","Geolocation Service","Disabled","Stopped"
+'''
+
+# Get-Service ... | ConvertTo-Json writes the enums as numbers
+INVENTORY_JSON = [
+    {"Name": "Spooler", "StartType": 2, "Status": 4},
+    {"Name": "RemoteRegistry", "StartType": 4, "Status": 1},
+]
+
+
+def load_fixture() -> ServiceInventory:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "services.csv"
+        path.write_bytes(INVENTORY_CSV.replace('\n', '\r\n').encode('utf-16'))
+        return ServiceInventory.from_file(path)
+
+
+def evaluate(inventory: ServiceInventory):
+    return {r.cis_id: r for r in ServiceEvaluator(inventory, "WS01").evaluate_all(service_entries())}
+
+
+def test_inventory_formats():
+    """CSV (UTF-16) and JSON dumps with names or enum numbers"""
+    csv_inventory = load_fixture()
+    json_inventory = ServiceInventory.from_text(json.dumps(INVENTORY_JSON))
+    assert len(csv_inventory) == 5
+    assert csv_inventory.get("spooler").start_name == "Automatic"
+    assert json_inventory.get("Spooler").start_name == "Automatic"
+    assert json_inventory.get("Spooler").state == "Running"
+    win32 = ServiceInventory.from_text('"Name","StartMode","State"\n"Spooler","Auto","Running"\n')
+    assert win32.get("Spooler").start == 2
+
+
+def test_evaluation():
+    """Every section 5 recommendation evaluated from one inventory"""
+    entries = service_entries()
+    assert len(entries) == 41 and all(service_name(e) for e in entries)
+    results = evaluate(load_fixture())
+    status = {cis_id: r.compliance_status for cis_id, r in results.items()}
+    assert status["5.1"] == "Non-Compliant"        # Manual
+    assert status["5.13"] == "Non-Compliant"       # Automatic
+    assert status["5.20"] == "Compliant"
+    assert status["5.3"] == "Non-Compliant"        # installed, so must be Disabled
+    assert status["5.7"] == "Compliant"            # IISADMIN: not installed is fine
+    assert results["5.13"].details == "Service: Spooler, StartType: Automatic, Status: Running"
+    assert results["5.13"].source == "Service Control Manager"
+    assert results["5.13"].computer_name == "WS01"
+
+
+def test_remediation_plan():
+    """Non-compliant installed services become one batch of start-type changes"""
+    changes = remediation_plan(load_fixture(), service_entries())
+    assert [(c.cis_id, c.service, c.start_name, c.stop) for c in changes] == [
+        ("5.1", "BTAGService", "Disabled", False),
+        ("5.3", "Browser", "Disabled", False),
+        ("5.13", "Spooler", "Disabled", True),
+    ]
+    script = render_remediation(changes, "WS01")
+    assert script.count("CIS_ID = ") == 3
+    assert 'Name = "Spooler"; Current = "Automatic"; StartupType = "Disabled"; Stop = $true' in script
+    assert "SupportsShouldProcess" in script and "\r\n" in script
+
+
+def test_toggle_scripts():
+    """The optimization toggles are read from the same inventory"""
+    toggles = {Path(t.script).name: t for t in toggle_scripts()}
+    assert toggles["toggle-print-spooler.ps1"].service == "Spooler"
+    assert toggles["toggle-geolocation-service.ps1"].enable_start == 3
+    states = {row["service"]: row for row in toggle_states(load_fixture())}
+    assert states["Spooler"]["action"] == "stop and disable"
+    assert states["lfsvc"]["action"] == "enable (Manual) and start"
+    assert states["SysMain"]["current"] == "Not Installed"
+
+
+def main():
+    """Main test function"""
+    tests = [test_inventory_formats, test_evaluation, test_remediation_plan,
+             test_toggle_scripts]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the compliance trend store (trend_store.py)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cis_results import CISResult, results_to_csv  # noqa: E402
+from trend_store import TrendFormatError, TrendStore, read_rollup  # noqa: E402
+
+CONTROLS = [("1.1.1", "L1"), ("18.9.3.1", "L2"), ("18.9.4.1", "L1")]
+HOSTS = {"WS01": "laptop", "WS02": "laptop", "WS03": "desktop"}
+MONDAY = date(2026, 9, 28)
+
+
+def write_night(folder: Path, day: date) -> list:
+    """
+    One run per host; WS01 fails 18.9.3.1 until Thursday. WS02 runs twice:
+    the first run fails everything, the later one passes everything.
+    """
+    files = []
+    for host in HOSTS:
+        runs = [("02:00:00", set())]
+        if host == "WS01" and day < MONDAY + timedelta(days=3):
+            runs = [("02:00:00", {"18.9.3.1"})]
+        if host == "WS02":
+            runs = [("01:00:00", {cis_id for cis_id, _ in CONTROLS}), ("03:00:00", set())]
+        for clock, failing in runs:
+            rows = [CISResult(cis_id, f"Control {cis_id}", "1", "1",
+                              "Non-Compliant" if cis_id in failing else "Compliant", "Registry",
+                              profile=profile, audit_timestamp=f"{day} {clock}",
+                              computer_name=host, user_name="auditor")
+                    for cis_id, profile in CONTROLS]
+            path = folder / f"{host}-{day}-{clock[:2]}.csv"
+            path.write_text(results_to_csv(rows), encoding='utf-8')
+            files.append(path)
+    return files
+
+
+def build_store(folder: Path, days: int = 8) -> TrendStore:
+    """A store fed and compacted nightly from MONDAY on"""
+    store = TrendStore(folder / "trends", raw_days=2, daily_days=9)
+    store.set_groups({host: {"Type": kind} for host, kind in HOSTS.items()}, "Type")
+    for offset in range(days):
+        day = MONDAY + timedelta(days=offset)
+        stats, errors = store.add(write_night(folder, day), today=day)
+        assert errors == [] and stats.rows == 12 and stats.late == 0
+        store.compact(today=day)
+    return store
+
+
+def test_rollups_and_queries():
+    """Daily and weekly rollups answer range queries without raw data"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = build_store(Path(tmp))
+        end = MONDAY + timedelta(days=7)
+        assert sorted(p.name for p in (store.path / "raw").iterdir()) == \
+            ["2026-10-03", "2026-10-04", "2026-10-05"]
+        footprint = store.footprint()
+        assert footprint["day"][0] == 8 and footprint["week"][0] == 1
+
+        shutil.rmtree(store.path / "raw")
+        (store.path / "raw").mkdir()
+        days = store.trend("18.9", MONDAY, end)
+        assert [p.period for p in days][:2] == ["2026-09-28", "2026-09-29"]
+        # Each host counted once per day: WS02's later passing run wins
+        assert [(p.compliant, p.total) for p in days] == [(5, 6)] * 3 + [(6, 6)] * 5
+        assert days[0].statuses["Non-Compliant"] == 1 and days[0].key == "18.9"
+
+        weeks = store.trend("18.9", MONDAY, end, period="week")
+        assert [(p.period, p.compliant, p.total) for p in weeks] == [("2026-09-28", 39, 42)]
+        laptops = store.trend("18", MONDAY, MONDAY, by="group")
+        assert [(p.key, p.compliant, p.total) for p in laptops] == [("desktop", 2, 2), ("laptop", 3, 4)]
+        sections = store.trend(None, MONDAY, MONDAY, by="section", profile="L1")
+        assert [(p.key, p.compliant, p.total) for p in sections] == [("1", 3, 3), ("18", 3, 3)]
+
+        # Past the daily window only weeks remain; late rows are refused
+        done = store.compact(today=MONDAY + timedelta(days=20))
+        assert done["day dropped"] == 8 and done["week"] == 1
+        assert store.trend("18.9", MONDAY, end) == []
+        assert [p.compliant for p in store.trend("18.9", MONDAY, end, period="week")] == [39, 6]
+        stats, _ = store.add(write_night(Path(tmp), MONDAY), today=MONDAY + timedelta(days=20))
+        assert (stats.skipped, stats.rows) == (4, 0)
+        (Path(tmp) / "old").mkdir()
+        stats, _ = store.add(write_night(Path(tmp) / "old", MONDAY), today=MONDAY + timedelta(days=20))
+        assert (stats.files, stats.late) == (4, 12)
+
+
+def test_configuration_and_format():
+    """Windows persist with the store; a foreign file is not read as a rollup"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        TrendStore(folder / "trends", raw_days=3, daily_days=30)
+        config = folder / "trends" / "store.json"
+        os.utime(config, ns=(0, 0))
+        reopened = TrendStore(folder / "trends")
+        assert (reopened.raw_days, reopened.daily_days) == (3, 30)
+        assert config.stat().st_mtime_ns == 0          # opening to query writes nothing
+        TrendStore(folder / "trends", raw_days=4)
+        assert config.stat().st_mtime_ns != 0 and TrendStore(folder / "trends").raw_days == 4
+        try:
+            TrendStore(folder / "other", raw_days=10, daily_days=12)
+            raise AssertionError("accepted a daily window shorter than raw + a week")
+        except ValueError:
+            pass
+
+        bogus = folder / "bogus.rollup"
+        bogus.write_bytes(b"CISTRND\x00\x01\x00\x00\x00\x05\x00\x00\x00\x01\x00\x00\x00")
+        try:
+            list(read_rollup(bogus))
+            raise AssertionError("read a truncated rollup")
+        except TrendFormatError:
+            pass
+
+
+def main():
+    """Main test function"""
+    tests = [test_rollups_and_queries, test_configuration_and_format]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the module import path updater (update-module-imports.py)
+"""
+
+import importlib.util
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+UPDATER = REPO_ROOT / "update-module-imports.py"
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+spec = importlib.util.spec_from_file_location("update_module_imports", UPDATER)
+updater = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(updater)
+
+SCRIPTS = [
+    # Import-Module "$PSScriptRoot\..\..\..\modules\CISRemediation.psm1"
+    "windows/deferred/security/remediations/section_17/17.5.4-remediate-logon.ps1",
+    # Join-Path $PSScriptRoot "..\..\..\..\modules\ModuleIndex.psm1"
+    "windows/deferred/security/audits/section_1/1.1.1-audit-password-history.ps1",
+]
+
+REFERENCE = re.compile(r'(\$PSScriptRoot\\)?((?:\.\.\\)*modules\\[\w.-]+\.psm1)', re.IGNORECASE)
+
+
+def references(content: str) -> list:
+    return [match.group(0) for line in content.splitlines()
+            if re.match(r'\s*(Import-Module|\$modulePath = Join-Path)', line)
+            for match in REFERENCE.finditer(line)]
+
+
+def test_real_scripts():
+    """Real CIS scripts keep $PSScriptRoot and end up with resolvable module paths"""
+    for relative in SCRIPTS:
+        path = REPO_ROOT / relative
+        content = path.read_text(encoding='utf-8')
+        updated, changes = updater.update_imports(str(path), content)
+        assert changes, relative
+        found = references(updated)
+        assert found and len(found) == len(references(content)), found
+        assert "$.." not in updated
+        for reference in found:
+            target = reference.split("\\", 1)[1] if reference.startswith("$") else reference
+            assert (path.parent / target.replace("\\", "/")).resolve().is_file(), reference
+        # Only the ..\ run changes; the rest of the script is untouched
+        assert updated.replace("..\\", "") == content.replace("..\\", "")
+        assert updater.update_imports(str(path), updated)[1] == []
+
+
+def test_leaves_other_paths_alone():
+    """Absolute paths and mentions inside comments are not rewritten"""
+    content = ('# Import-Module "$PSScriptRoot\\..\\modules\\X.psm1"\n'
+               'Import-Module "C:\\Tools\\modules\\X.psm1"\n'
+               'Import-Module "$PSScriptRoot\\lib\\modules\\X.psm1"\n')
+    assert updater.update_imports(str(REPO_ROOT / "windows" / "x.ps1"), content) == (content, [])
+
+
+def test_command_line_run():
+    """Running the script over a copied tree rewrites imports in place"""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / SCRIPTS[0]
+        script.parent.mkdir(parents=True)
+        script.write_bytes((REPO_ROOT / SCRIPTS[0]).read_bytes())
+        output = subprocess.run([sys.executable, str(UPDATER)], cwd=tmp, capture_output=True,
+                                text=True, check=True).stdout
+        assert "Files updated: 1" in output, output
+        line = next(line for line in script.read_text(encoding='utf-8').splitlines()
+                    if line.startswith("Import-Module"))
+        assert line.startswith('Import-Module "$PSScriptRoot\\..\\'), line
+        target = line.split('"')[1].split("\\", 1)[1].replace("\\", "/")
+        assert (script.parent / target).resolve() == REPO_ROOT / "modules" / "CISRemediation.psm1"
+
+
+def main():
+    """Main test function"""
+    tests = [test_real_scripts, test_leaves_other_paths_alone, test_command_line_run]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Compliance trend store: audit results over time, kept as rollups.
+
+Result CSVs go into raw day partitions (raw/<yyyy-mm-dd>/, result store
+segments, see result_store.py) by AuditTimestamp. Compaction turns every
+raw day into a daily rollup and every complete ISO week of daily rollups
+into a weekly one, then drops what has aged out:
+
+    raw       per-run rows              kept raw_days (default 14)
+    daily     one file per day          kept daily_days (default 120)
+    weekly    one file per Monday       kept forever
+
+A rollup holds ComplianceStatus counts per (CIS_ID, Profile, host group),
+counting each host's latest result of the day once. Sections, profiles
+and groups are sums over those records, so a range query such as
+"section 18.9 over the last 90 days" reads one small file per day (or
+week) and never touches raw rows. Weekly counts are the sum of their
+days: host-day observations, not distinct hosts.
+
+Host groups come from an inventory CSV (compliance_query.read_inventory)
+and one of its columns (--group-by Type); hosts not in it fall in group "".
+
+Rollup file layout (little-endian):
+
+    header   20 bytes   magic b"CISTRND\\0", version u16, flags u16,
+                        string count u32, record count u32
+    strings             (count + 1) u32 offsets, then the UTF-8 strings
+    records             per record 24 bytes: CIS_ID, Profile and group
+                        string indexes u16 each, reserved u16, then
+                        Compliant, Non-Compliant, Error and Not
+                        Applicable counts u32 each
+
+Usage:
+    python trend_store.py add trends/ results/ --inventory hosts.csv --group-by Type
+    python trend_store.py compact trends/
+    python trend_store.py query trends/ --prefix 18.9 --days 90 --by profile
+    python trend_store.py info trends/
+"""
+
+import argparse
+import csv
+import io
+import json
+import shutil
+import struct
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from cis_catalog import cis_id_sort_key, get_major_section
+from cis_results import COMPLIANCE_STATUSES
+from compliance_query import read_inventory
+from result_store import (
+    COLUMNS, INGEST_LOG, SEGMENT_SUFFIX, GroupRate, ResultStore, SegmentWriter,
+    find_csvs, read_results_csv,
+)
+
+MAGIC = b"CISTRND\x00"
+VERSION = 1
+HEADER = struct.Struct('<8sHHII')
+OFFSET = struct.Struct('<I')
+RECORD = struct.Struct('<HHHH4I')
+
+ROLLUP_SUFFIX = ".rollup"
+CONFIG_FILE = "store.json"
+GROUPS_FILE = "groups.json"
+
+DEFAULTS = {"raw_days": 14, "daily_days": 120}
+
+PERIODS = ("day", "week")
+
+# Trend breakdowns: record field and whether it is the CIS_ID's top-level section
+DIMENSIONS = {
+    "cis_id": (0, False),
+    "section": (0, True),
+    "profile": (1, False),
+    "group": (2, False),
+}
+
+CIS_ID, STATUS, HOST, TIMESTAMP, PROFILE = (
+    COLUMNS.index(name) for name in
+    ("CIS_ID", "ComplianceStatus", "ComputerName", "AuditTimestamp", "Profile"))
+
+RollupKey = Tuple[str, str, str]
+
+
+class TrendFormatError(ValueError):
+    """The file is not a valid rollup"""
+
+
+def write_rollup(path: Path, counts: Dict[RollupKey, List[int]]):
+    """Write a rollup under a temporary name and rename it into place."""
+    strings: Dict[str, int] = {}
+    records = bytearray()
+    for key in sorted(counts, key=lambda k: (cis_id_sort_key(k[0]), k[1], k[2])):
+        indexes = [strings.setdefault(text, len(strings)) for text in key]
+        records += RECORD.pack(*indexes, 0, *counts[key])
+    if len(strings) > 0xFFFF:
+        raise ValueError(f"{path}: too many distinct keys for a rollup")
+    encoded = [text.encode('utf-8') for text in strings]
+    offsets, position = [], 0
+    for text in encoded:
+        offsets.append(position)
+        position += len(text)
+    offsets.append(position)
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(encoded), len(counts)))
+        f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        f.write(b"".join(encoded))
+        f.write(records)
+    temp.replace(path)
+
+
+def read_rollup(path: Path) -> Iterator[Tuple[str, str, str, Tuple[int, ...]]]:
+    """(CIS_ID, Profile, group, status counts) records of a rollup."""
+    data = path.read_bytes()
+    try:
+        magic, version, _, string_count, record_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise TrendFormatError(f"{path} is not a trend rollup")
+        offsets = [o for (o,) in OFFSET.iter_unpack(
+            data[HEADER.size:HEADER.size + (string_count + 1) * OFFSET.size])]
+        base = HEADER.size + len(offsets) * OFFSET.size
+        strings = [data[base + start:base + end].decode('utf-8')
+                   for start, end in zip(offsets, offsets[1:])]
+        records = base + offsets[-1]
+        if len(data) - records != record_count * RECORD.size:
+            raise TrendFormatError(f"{path}: expected {record_count} records")
+        for cis_id, profile, group, _, *counts in RECORD.iter_unpack(data[records:]):
+            yield strings[cis_id], strings[profile], strings[group], tuple(counts)
+    except (struct.error, UnicodeDecodeError, IndexError) as e:
+        raise TrendFormatError(f"{path}: corrupt rollup ({e})") from None
+
+
+def week_of(day: date) -> date:
+    """The Monday starting the ISO week of a day."""
+    return day - timedelta(days=day.weekday())
+
+
+@dataclass
+class TrendPoint(GroupRate):
+    """Compliance of one key over one period (a day, or the week from a Monday)"""
+    period: str = ""
+
+
+@dataclass
+class AddStats:
+    """Totals of one add"""
+    files: int = 0
+    skipped: int = 0
+    failed: int = 0
+    rows: int = 0
+    late: int = 0
+    days: int = 0
+
+    def describe(self) -> str:
+        return (f"{self.files} files added ({self.failed} failed, {self.skipped} already "
+                f"added), {self.rows:,} rows over {self.days} days"
+                + (f", {self.late:,} rows older than the raw window dropped" if self.late else ""))
+
+
+class TrendStore:
+    """A directory of raw day partitions and daily/weekly rollups"""
+
+    def __init__(self, path: Union[str, Path], raw_days: Optional[int] = None,
+                 daily_days: Optional[int] = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        config_path = self.path / CONFIG_FILE
+        stored = json.loads(config_path.read_text(encoding='utf-8')) if config_path.exists() else None
+        config = dict(DEFAULTS, **(stored or {}))
+        for name, value in (("raw_days", raw_days), ("daily_days", daily_days)):
+            if value is not None:
+                config[name] = value
+        if config["daily_days"] < config["raw_days"] + 7:
+            # a day can change while it has raw data, and its week is rebuilt
+            # from daily rollups, so the whole week must still be in the daily tier
+            raise ValueError("daily_days must be at least raw_days + 7")
+        if config != stored:
+            # only on creation or a changed window, so queries don't write
+            config_path.write_text(json.dumps(config, indent=2), encoding='utf-8')
+        self.raw_days, self.daily_days = config["raw_days"], config["daily_days"]
+        groups_path = self.path / GROUPS_FILE
+        self.groups: Dict[str, str] = (json.loads(groups_path.read_text(encoding='utf-8'))
+                                       if groups_path.exists() else {})
+        for tier in ("raw", "day", "week"):
+            (self.path / tier).mkdir(exist_ok=True)
+
+    def set_groups(self, inventory: Dict[str, Dict[str, str]], attribute: str):
+        """Host groups from an inventory column; applies to rollups built from now on."""
+        self.groups.update({host.lower(): attributes.get(attribute, "")
+                            for host, attributes in inventory.items()})
+        (self.path / GROUPS_FILE).write_text(json.dumps(self.groups, indent=2, sort_keys=True),
+                                             encoding='utf-8')
+
+    # Ingest
+
+    def add(self, files: Iterable[Union[str, Path]], today: Optional[date] = None
+            ) -> Tuple[AddStats, List[Tuple[str, str]]]:
+        """
+        Split result CSVs into raw day partitions, one new segment per day
+        touched. Rows dated before the raw window are dropped (their day may
+        already be compacted). Files already added are skipped.
+        """
+        oldest = (today or date.today()) - timedelta(days=self.raw_days)
+        log = self.path / INGEST_LOG
+        done = set(log.read_text(encoding='utf-8').splitlines()) if log.exists() else set()
+        stats, errors = AddStats(), []
+        writers: Dict[str, SegmentWriter] = {}
+        added = []
+        for file in files:
+            file = str(Path(file))
+            if file in done:
+                stats.skipped += 1
+                continue
+            try:
+                rows = read_results_csv(file)
+            except (OSError, ValueError, csv.Error) as e:
+                stats.failed += 1
+                errors.append((file, str(e)))
+                continue
+            for row in rows:
+                day = row[TIMESTAMP][:10]
+                try:
+                    dated = date.fromisoformat(day)
+                except ValueError:
+                    errors.append((file, f"bad AuditTimestamp {row[TIMESTAMP]!r} for {row[CIS_ID]}"))
+                    continue
+                if dated < oldest:
+                    stats.late += 1
+                    continue
+                writer = writers.get(day)
+                if writer is None:
+                    folder = self.path / "raw" / day
+                    folder.mkdir(exist_ok=True)
+                    number = max((int(p.stem) for p in folder.glob(f"*{SEGMENT_SUFFIX}")
+                                  if p.stem.isdigit()), default=0) + 1
+                    writer = writers[day] = SegmentWriter(folder / f"{number:06d}{SEGMENT_SUFFIX}")
+                writer.add(row)
+                stats.rows += 1
+            stats.files += 1
+            added.append(file)
+        for writer in writers.values():
+            writer.close()
+        stats.days = len(writers)
+        with open(log, 'a', encoding='utf-8') as journal:
+            journal.writelines(f"{file}\n" for file in added)
+        return stats, errors
+
+    # Compaction
+
+    def _rollup_day(self, folder: Path) -> Dict[RollupKey, List[int]]:
+        """Status counts of a raw day, each host's latest result per control once."""
+        latest: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+        with ResultStore(folder) as raw:
+            for cis_id, status, host, timestamp, profile in raw.iter_rows(
+                    ("CIS_ID", "ComplianceStatus", "ComputerName", "AuditTimestamp", "Profile")):
+                key = (host.lower(), cis_id)
+                seen = latest.get(key)
+                if seen is None or timestamp >= seen[0]:
+                    latest[key] = (timestamp, status, profile)
+        counts: Dict[RollupKey, List[int]] = {}
+        for (host, cis_id), (_, status, profile) in latest.items():
+            if status not in COMPLIANCE_STATUSES:
+                continue
+            key = (cis_id, profile, self.groups.get(host, ""))
+            counts.setdefault(key, [0, 0, 0, 0])[COMPLIANCE_STATUSES.index(status)] += 1
+        return counts
+
+    def compact(self, today: Optional[date] = None) -> Counter:
+        """
+        Roll up raw days changed since their rollup and complete weeks whose
+        days changed, then drop raw and daily data past their windows.
+        Returns what was done per tier.
+        """
+        today = today or date.today()
+        done: Counter = Counter()
+
+        for folder in sorted((self.path / "raw").iterdir()):
+            rollup = self.path / "day" / (folder.name + ROLLUP_SUFFIX)
+            newest = max((p.stat().st_mtime_ns for p in folder.glob(f"*{SEGMENT_SUFFIX}")), default=0)
+            if newest and (not rollup.exists() or rollup.stat().st_mtime_ns < newest):
+                write_rollup(rollup, self._rollup_day(folder))
+                done["day"] += 1
+            if date.fromisoformat(folder.name) < today - timedelta(days=self.raw_days):
+                shutil.rmtree(folder)
+                done["raw dropped"] += 1
+
+        days: Dict[date, List[Path]] = {}
+        for rollup in (self.path / "day").glob(f"*{ROLLUP_SUFFIX}"):
+            days.setdefault(week_of(date.fromisoformat(rollup.stem)), []).append(rollup)
+        for monday, rollups in sorted(days.items()):
+            if monday + timedelta(days=7) > today:
+                continue        # week not over yet
+            weekly = self.path / "week" / (monday.isoformat() + ROLLUP_SUFFIX)
+            newest = max(p.stat().st_mtime_ns for p in rollups)
+            if not weekly.exists() or weekly.stat().st_mtime_ns < newest:
+                counts: Dict[RollupKey, List[int]] = {}
+                for rollup in sorted(rollups):
+                    for cis_id, profile, group, statuses in read_rollup(rollup):
+                        total = counts.setdefault((cis_id, profile, group), [0, 0, 0, 0])
+                        for i, count in enumerate(statuses):
+                            total[i] += count
+                write_rollup(weekly, counts)
+                done["week"] += 1
+            for rollup in rollups:
+                if rollup.parent.name == "day" and \
+                        date.fromisoformat(rollup.stem) < today - timedelta(days=self.daily_days):
+                    rollup.unlink()
+                    done["day dropped"] += 1
+        return done
+
+    # Queries
+
+    def rollups(self, period: str, start: date, end: date) -> List[Path]:
+        """Rollup files of a tier whose period starts within [start, end]."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}; expected one of {', '.join(PERIODS)}")
+        if period == "week":
+            start = week_of(start)
+        return sorted(p for p in (self.path / period).glob(f"*{ROLLUP_SUFFIX}")
+                      if start <= date.fromisoformat(p.stem) <= end)
+
+    def trend(self, prefix: Optional[str] = None, start: Optional[date] = None,
+              end: Optional[date] = None, period: str = "day", by: Optional[str] = None,
+              profile: Optional[str] = None, group: Optional[str] = None) -> List[TrendPoint]:
+        """
+        Compliance per period for controls at or below a CIS_ID prefix,
+        optionally broken down by cis_id, section, profile or group.
+        """
+        if by is not None and by not in DIMENSIONS:
+            raise ValueError(f"Unknown breakdown {by!r}; expected one of {', '.join(DIMENSIONS)}")
+        end = end or date.today()
+        start = start or end - timedelta(days=90)
+        points = []
+        for rollup in self.rollups(period, start, end):
+            counts: Dict[str, List[int]] = {}
+            for record in read_rollup(rollup):
+                cis_id = record[0]
+                if prefix and cis_id != prefix and not cis_id.startswith(prefix + '.'):
+                    continue
+                if profile and record[1].lower() != profile.lower():
+                    continue
+                if group is not None and record[2].lower() != group.lower():
+                    continue
+                if by is None:
+                    key = prefix or "all"
+                else:
+                    field, by_section = DIMENSIONS[by]
+                    key = get_major_section(cis_id) if by_section else record[field]
+                total = counts.setdefault(key, [0, 0, 0, 0])
+                for i, count in enumerate(record[3]):
+                    total[i] += count
+            order = cis_id_sort_key if by in ("cis_id", "section") else str.lower
+            for key in sorted(counts, key=order):
+                statuses = dict(zip(COMPLIANCE_STATUSES, counts[key]))
+                points.append(TrendPoint(key, statuses["Compliant"], sum(counts[key]),
+                                         statuses, period=rollup.stem))
+        return points
+
+    def footprint(self) -> Dict[str, Tuple[int, int]]:
+        """(files, bytes) per tier."""
+        tiers = {"raw": f"*/*{SEGMENT_SUFFIX}", "day": f"*{ROLLUP_SUFFIX}",
+                 "week": f"*{ROLLUP_SUFFIX}"}
+        sizes = {}
+        for tier, pattern in tiers.items():
+            files = list((self.path / tier).glob(pattern))
+            sizes[tier] = (len(files), sum(p.stat().st_size for p in files))
+        return sizes
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Compliance trends over time from audit results")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="add result CSVs to the raw tier")
+    add_parser.add_argument("store", type=Path)
+    add_parser.add_argument("paths", nargs="+", type=Path, help="CSV files or directories of them")
+    add_parser.add_argument("--inventory", type=Path, help="CSV of host attributes")
+    add_parser.add_argument("--group-by", default="Type", help="inventory column naming the host group")
+    add_parser.add_argument("--raw-days", type=int, help="days of raw results to keep")
+    add_parser.add_argument("--daily-days", type=int, help="days of daily rollups to keep")
+    add_parser.add_argument("--no-compact", action="store_true", help="do not compact after adding")
+
+    compact_parser = commands.add_parser("compact", help="roll up and expire old data")
+    compact_parser.add_argument("store", type=Path)
+
+    info_parser = commands.add_parser("info", help="storage per tier")
+    info_parser.add_argument("store", type=Path)
+
+    query_parser = commands.add_parser("query", help="compliance per day or week")
+    query_parser.add_argument("store", type=Path)
+    query_parser.add_argument("--prefix", help="CIS_ID or section prefix (e.g. 18.9)")
+    query_parser.add_argument("--days", type=int, default=90, help="how far back (default: 90)")
+    query_parser.add_argument("--period", choices=PERIODS,
+                              help="resolution (default: day within the daily window, else week)")
+    query_parser.add_argument("--by", choices=sorted(DIMENSIONS))
+    query_parser.add_argument("--profile")
+    query_parser.add_argument("--group")
+    query_parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    query_parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    try:
+        store = TrendStore(args.store, getattr(args, "raw_days", None), getattr(args, "daily_days", None))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "add":
+        if args.inventory:
+            store.set_groups(read_inventory(args.inventory), args.group_by)
+        stats, errors = store.add(find_csvs(args.paths))
+        for file, error in errors:
+            print(f"Failed: {file}: {error}", file=sys.stderr)
+        print(stats.describe())
+    if args.command in ("add", "compact") and not getattr(args, "no_compact", False):
+        done = store.compact()
+        print("Compacted: " + (", ".join(f"{count} {tier}" for tier, count in done.items()) or "nothing to do"))
+    if args.command in ("add", "compact"):
+        return 0
+
+    if args.command == "info":
+        for tier, (files, size) in store.footprint().items():
+            print(f"{tier:<6} {files:>6,} files {size:>14,} bytes")
+        return 0
+
+    period = args.period or ("day" if args.days <= store.daily_days else "week")
+    started = time.perf_counter()
+    points = store.trend(args.prefix, date.today() - timedelta(days=args.days), date.today(),
+                         period, args.by, args.profile, args.group)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(["Period", "Group", "Compliant", "Total", "CompliancePercentage"])
+        writer.writerows([p.period, p.key, p.compliant, p.total, p.rate] for p in points)
+        output = buffer.getvalue()
+    elif args.format == "json":
+        output = json.dumps([{"period": p.period, "group": p.key, "compliant": p.compliant,
+                              "total": p.total, "rate": p.rate, "statuses": p.statuses}
+                             for p in points], indent=2)
+    else:
+        lines = [f"{p.period}  {p.key:<16} {p.rate:>7.2f}%  {p.compliant:>10,}/{p.total:<10,}"
+                 for p in points]
+        lines.append(f"\n{len(points)} points from {period} rollups ({elapsed:.1f} ms)")
+        output = "\n".join(lines)
+
+    if args.output:
+        args.output.write_text(output, encoding='utf-8', newline='')
+        print(f"Results written to: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
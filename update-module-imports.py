@@ -1,64 +1,91 @@
 #!/usr/bin/env python3
 """
 Python script to update module import paths in Windows PowerShell scripts
-This script updates all references from windows/modules/ to the new modules/ location
+This script points every $PSScriptRoot-relative modules\\*.psm1 reference at the
+modules/ directory, whatever depth the script now lives at. Import-Module and
+Join-Path arguments are located with the shared tokenizer (helpers/ps_tokenizer.py),
+so commented-out imports and here-strings are left alone.
 """
 
 import os
 import re
+import sys
 
-# Define the patterns to search for and their replacements
-patterns = {
-    # Pattern 1: Direct module imports (like CISFramework.psm1)
-    r'Import-Module "\$PSScriptRoot\\..\\..\\modules\\': r'Import-Module "$PSScriptRoot\\..\\..\\..\\modules\\',
-    
-    # Pattern 2: ModuleIndex imports with Join-Path
-    r'Join-Path \$PSScriptRoot "..\\..\\..\\modules\\ModuleIndex\.psm1"': r'Join-Path $PSScriptRoot "..\\..\\..\\..\\modules\\ModuleIndex.psm1"',
-    
-    # Pattern 3: ModuleIndex imports with relative path (root level)
-    r'Join-Path \$PSScriptRoot "modules\\ModuleIndex\.psm1"': r'Join-Path $PSScriptRoot "..\\modules\\ModuleIndex.psm1"',
-    
-    # Pattern 4: Direct imports with fewer levels
-    r'Import-Module "\$PSScriptRoot\\..\\modules\\': r'Import-Module "$PSScriptRoot\\..\\..\\modules\\',
-    
-    # Pattern 5: ModuleIndex imports with fewer levels
-    r'Join-Path \$PSScriptRoot "..\\..\\modules\\ModuleIndex\.psm1"': r'Join-Path $PSScriptRoot "..\\..\\..\\modules\\ModuleIndex.psm1"',
-}
-
-# Get all PowerShell scripts in the windows directory recursively
-script_files = []
-for root, dirs, files in os.walk("windows"):
-    for file in files:
-        if file.endswith(".ps1"):
-            script_files.append(os.path.join(root, file))
-
-print(f"Found {len(script_files)} PowerShell scripts to process")
-
-updated_files = 0
-
-for file_path in script_files:
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        file_updated = False
-        
-        for pattern, replacement in patterns.items():
-            if re.search(pattern, content):
-                print(f"Updating pattern '{pattern}' in {file_path}")
-                content = re.sub(pattern, replacement, content)
-                file_updated = True
-        
-        if file_updated and content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"Updated: {file_path}")
-            updated_files += 1
-            
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}")
-
-print(f"\nUpdate complete!")
-print(f"Files processed: {len(script_files)}")
-print(f"Files updated: {updated_files}")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "helpers"))
+
+from ps_tokenizer import HERESTRING, STRING, WORD, parse_source  # noqa: E402
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+
+# "$PSScriptRoot\..\..\modules\CISFramework.psm1" or "..\..\modules\CISFramework.psm1":
+# only ..\ segments may sit between the optional $PSScriptRoot\ and modules\
+MODULE_REFERENCE = re.compile(r'(?<![\w.\\$-])(\$PSScriptRoot\\)?((?:\.\.\\)*modules\\)([\w.-]+\.psm1)',
+                              re.IGNORECASE)
+
+
+def module_prefix(file_path, modules_dir=MODULES_DIR):
+    """The ..\\..\\modules\\ prefix that reaches modules_dir from the script's directory"""
+    script_dir = os.path.dirname(os.path.abspath(file_path))
+    return os.path.relpath(modules_dir, script_dir).replace(os.sep, '\\') + '\\'
+
+
+def update_imports(file_path, content, modules_dir=MODULES_DIR):
+    """Return the content with module references re-pointed, and the (old, new) pairs changed"""
+    prefix = module_prefix(file_path, modules_dir)
+    parsed = parse_source(file_path, content)
+    edits = []
+    for command in parsed.find_commands("Import-Module", "Join-Path"):
+        for token in command.elements:
+            if token.kind not in (STRING, HERESTRING, WORD):
+                continue
+            for match in MODULE_REFERENCE.finditer(token.text):
+                if match.group(2) != prefix:
+                    start = token.offset + match.start(2)
+                    edits.append((start, start + len(match.group(2)), prefix))
+
+    changes = []
+    # Apply from the end so earlier offsets stay valid
+    for start, end, replacement in sorted(edits, reverse=True):
+        changes.append((content[start:end], replacement))
+        content = content[:start] + replacement + content[end:]
+    return content, changes[::-1]
+
+
+def main():
+    """Main function"""
+    # Get all PowerShell scripts in the windows directory recursively
+    script_files = []
+    for root, dirs, files in os.walk("windows"):
+        for file in files:
+            if file.endswith(".ps1"):
+                script_files.append(os.path.join(root, file))
+
+    print(f"Found {len(script_files)} PowerShell scripts to process")
+
+    updated_files = 0
+
+    for file_path in script_files:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            content, changes = update_imports(file_path, content)
+            for old, new in changes:
+                print(f"Updating '{old}' -> '{new}' in {file_path}")
+
+            if changes:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                print(f"Updated: {file_path}")
+                updated_files += 1
+
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+
+    print(f"\nUpdate complete!")
+    print(f"Files processed: {len(script_files)}")
+    print(f"Files updated: {updated_files}")
+
+
+if __name__ == "__main__":
+    main()